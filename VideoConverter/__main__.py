@@ -0,0 +1,10 @@
+"""python -m VideoConverter: GUI olmadan (headless) komut satırı girişi"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
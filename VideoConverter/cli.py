@@ -0,0 +1,780 @@
+"""
+TM Video Converter - Komut satırı (headless) arayüzü
+
+Tkinter import etmeden dönüştürme motorunu çalıştırır; cron, SSH veya
+ekransız render sunucularında kullanılabilir. Her olay stdout'a tek
+satırlık JSON olarak yazılır (stream komutunda çıktı stdout ise stderr'e).
+
+Kullanım:
+    python -m VideoConverter convert girdi.ts --preset "TS -> MP4 (Kalite Korunur)"
+    python -m VideoConverter batch *.ts --output-dir out --preset "MP4 Donustur (CPU - Hizli)"
+    python -m VideoConverter batch *.ts --metrics-port 9464 --metrics-file metrics.jsonl
+    python -m VideoConverter watch gelen/ --output-dir out --preset "TS -> MP4 (Kalite Korunur)"
+    python -m VideoConverter batch *.ts --priority idle --cpu-limit 4 --memory-limit 2G
+    python -m VideoConverter batch *.ts --retries 3 --fallback cpu,reencode --retry-backoff 10
+    kill -USR1 <pid>   # toplu/izleme işini duraklat (uzun encode'lar kaldığı yerden sürer)
+    kill -USR2 <pid>   # devam ettir
+    python -m VideoConverter estimate *.ts --calibrate 3 --budget-hours 8
+    python -m VideoConverter renditions girdi.ts --preset "1080p'ye Donustur" --preset "720p'ye Kucult"
+    python -m VideoConverter stream - -o - --format mpegts < girdi.ts > cikti.ts
+    python -m VideoConverter presets
+    python -m VideoConverter encoders
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core import capabilities, ffmpeg_log, hw_backends, priority, retry, telemetry
+from core.converter import BatchConverter
+from core.estimator import Estimator
+from core.segmented import SegmentedConverter
+from core.streaming import StreamConverter, is_url
+from core.ffmpeg_utils import FFmpegUtils
+from core.installer import Installer
+from core.job_store import JobStore
+from core.output_cache import OutputCache
+from core.planner import RemuxPlanner
+from core.renditions import MultiRenditionConverter
+from core.presets import PRESETS, adapt_to_host, get_preset
+from core.watcher import WatchIngest
+from utils.helpers import generate_output_path, get_supported_formats
+
+# Çıkış kodları
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_NO_FFMPEG = 3
+EXIT_INTERRUPTED = 130
+
+DEFAULT_PRESET = "MP4 Donustur (CPU - Standart)"
+
+_emit_lock = threading.Lock()
+# Olayların yazıldığı akış (None: sys.stdout)
+_event_stream = None
+
+
+def emit(event: str, **fields):
+    """Tek satırlık JSON olay yaz"""
+    record = {"event": event, "time": round(time.time(), 3)}
+    record.update(fields)
+    stream = _event_stream or sys.stdout
+    with _emit_lock:
+        stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        stream.flush()
+
+
+def _parse_value(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def build_settings(preset_name: str, overrides: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Preset ayarlarını al ve --set key=value ile ezilenleri uygula"""
+    preset = get_preset(preset_name)
+    if preset is None:
+        raise ValueError(f"Bilinmeyen preset: {preset_name}")
+
+    settings = dict(preset)
+    if hw_backends.is_hardware_encoder(settings.get("vcodec")):
+        # Donanım encoder'ı bu makinede yoksa çalışan arka uca/CPU'ya düş
+        settings = adapt_to_host(settings, capabilities.hw_encoders())
+    if settings.get("audio_only"):
+        settings["vcodec"] = None
+
+    for override in overrides or []:
+        if "=" not in override:
+            raise ValueError(f"Gecersiz --set degeri: {override} (key=value bekleniyor)")
+        key, value = override.split("=", 1)
+        settings[key.strip()] = _parse_value(value.strip())
+
+    return settings
+
+
+def _process_settings(args) -> Dict[str, Any]:
+    """--priority/--nice/--ionice/--cpu-limit/--memory-limit ile verilen süreç ayarları"""
+    values = {
+        "priority": args.priority,
+        "nice": args.nice,
+        "ionice": args.ionice,
+        "cpu_limit": args.cpu_limit,
+        "memory_limit": args.memory_limit,
+        "cgroup_root": args.cgroup_root,
+    }
+    return {key: value for key, value in values.items() if value is not None}
+
+
+def _retry_policy(args) -> Optional[retry.RetryPolicy]:
+    """--retries/--retry-backoff/--fallback ile tekrar politikası (0 tekrar: kapalı)"""
+    if args.retries <= 0:
+        return None
+    ladder = [] if args.fallback == "none" else [step.strip() for step in args.fallback.split(",") if step.strip()]
+    unknown = [step for step in ladder if step not in retry.LADDER]
+    if unknown:
+        raise ValueError(f"Bilinmeyen geri dusme adimi: {', '.join(unknown)}")
+    return retry.RetryPolicy(max_attempts=args.retries + 1, backoff=args.retry_backoff,
+                             ladder=ladder, retry_unknown=args.retry_unknown)
+
+
+def _output_for(input_path: str, args, settings: Dict[str, Any]) -> str:
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(input_path))
+    return generate_output_path(input_path, output_dir, settings.get("output_format", ".mp4"))
+
+
+def _progress_fields(progress: Dict[str, Any]) -> Dict[str, Any]:
+    keys = ("percent", "current_time", "fps", "speed", "size", "frame")
+    return {key: round(progress[key], 3) if isinstance(progress[key], float) else progress[key]
+            for key in keys if key in progress}
+
+
+def _plan_fields(decision: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "video": decision.get("video"),
+        "audio": decision.get("audio"),
+        "remux": bool(decision.get("changed")),
+        "reasons": decision.get("reasons", {}),
+        "message": RemuxPlanner.describe(decision)
+    }
+
+
+def cmd_convert(args) -> int:
+    settings = dict(build_settings(args.preset, args.set), **_process_settings(args))
+    if args.segments is not None:
+        settings["segment_parallel"] = args.segments > 1
+
+    input_path = args.input
+    if not os.path.exists(input_path):
+        emit("error", input=input_path, message="Girdi dosyasi bulunamadi")
+        return EXIT_FAILED
+
+    output_path = args.output or _output_for(input_path, args, settings)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    info = FFmpegUtils.get_video_info(input_path)
+    duration = info.get("duration", 0) if info else 0
+    emit("start", input=input_path, output=output_path, preset=args.preset, duration=duration)
+
+    converter = SegmentedConverter(workers=args.segments if args.segments else None)
+    converter.log_dir = args.ffmpeg_log_dir or converter.log_dir
+    converter.metrics = _open_metrics(args)
+    done = threading.Event()
+    result = {"code": EXIT_FAILED}
+
+    def on_plan(decision):
+        emit("plan", input=input_path, **_plan_fields(decision))
+
+    def on_progress(progress):
+        emit("progress", input=input_path, **_progress_fields(progress))
+
+    def on_complete(output):
+        size = os.path.getsize(output) if os.path.exists(output) else 0
+        emit("complete", input=input_path, output=output, size=size, telemetry=converter.last_telemetry,
+             log=converter.last_log)
+        result["code"] = EXIT_OK
+        done.set()
+
+    def on_error(error):
+        emit("error", input=input_path, message=error, log=converter.last_log)
+        result["code"] = EXIT_INTERRUPTED if converter.is_cancelled else EXIT_FAILED
+        done.set()
+
+    converter.set_callbacks(progress=on_progress, complete=on_complete, error=on_error, plan=on_plan)
+    converter.convert(input_path, output_path, settings, duration, video_info=info)
+
+    try:
+        while not done.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        converter.cancel()
+        done.wait(10)
+        return EXIT_INTERRUPTED
+
+    return result["code"]
+
+
+def _rendition_suffix(index: int, settings: Dict[str, Any]) -> str:
+    resolution = settings.get("resolution")
+    if resolution and settings.get("vcodec") is not None:
+        return f"_{resolution.split(':')[-1]}p"
+    return f"_{index + 1}"
+
+
+def cmd_renditions(args) -> int:
+    input_path = args.input
+    if not os.path.exists(input_path):
+        emit("error", input=input_path, message="Girdi dosyasi bulunamadi")
+        return EXIT_FAILED
+
+    renditions = []
+    outputs = set()
+    output_dir = args.output_dir or os.path.dirname(os.path.abspath(input_path))
+    for index, preset_name in enumerate(args.preset or [DEFAULT_PRESET]):
+        settings = dict(build_settings(preset_name, args.set), **_process_settings(args))
+        output = generate_output_path(input_path, output_dir, settings.get("output_format", ".mp4"),
+                                      suffix=_rendition_suffix(index, settings))
+        if output in outputs:
+            output = generate_output_path(input_path, output_dir, settings.get("output_format", ".mp4"),
+                                          suffix=f"_{index + 1}")
+        outputs.add(output)
+        renditions.append({"output": output, "settings": settings})
+    os.makedirs(output_dir, exist_ok=True)
+
+    info = FFmpegUtils.get_video_info(input_path)
+    duration = info.get("duration", 0) if info else 0
+    emit("start", input=input_path, outputs=[item["output"] for item in renditions], duration=duration)
+
+    converter = MultiRenditionConverter()
+    converter.log_dir = args.ffmpeg_log_dir or converter.log_dir
+    done = threading.Event()
+    result = {"code": EXIT_FAILED}
+
+    def on_plan(decision):
+        emit("plan", input=input_path, **_plan_fields(decision))
+
+    def on_rendition_progress(index, output, progress):
+        emit("progress", index=index, output=output, **_progress_fields(progress))
+
+    def on_complete(outputs_done):
+        for output in outputs_done:
+            size = os.path.getsize(output) if os.path.exists(output) else 0
+            emit("complete", input=input_path, output=output, size=size)
+        result["code"] = EXIT_OK
+        done.set()
+
+    def on_error(error):
+        emit("error", input=input_path, message=error, log=converter.last_log)
+        result["code"] = EXIT_INTERRUPTED if converter.is_cancelled else EXIT_FAILED
+        done.set()
+
+    converter.set_callbacks(complete=on_complete, error=on_error, plan=on_plan)
+    converter.set_rendition_callback(on_rendition_progress)
+    converter.convert_renditions(input_path, renditions, duration, video_info=info)
+
+    try:
+        while not done.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        converter.cancel()
+        done.wait(10)
+        return EXIT_INTERRUPTED
+
+    return result["code"]
+
+
+def cmd_stream(args) -> int:
+    global _event_stream
+    if args.output == "-":
+        # stdout medya verisini taşır
+        _event_stream = sys.stderr
+
+    settings = dict(build_settings(args.preset, args.set), **_process_settings(args))
+    source = args.input
+    if source != "-" and not is_url(source) and not os.path.exists(source):
+        emit("error", input=source, message="Girdi dosyasi bulunamadi")
+        return EXIT_FAILED
+
+    info = None
+    if source != "-" and os.path.isfile(source):
+        info = FFmpegUtils.get_video_info(source)
+    duration = info.get("duration", 0) if info else 0
+    emit("start", input=source, output=args.output, format=args.format, duration=duration)
+
+    streamer = StreamConverter()
+    streamer.set_callbacks(progress=lambda progress: emit("progress", input=source, **_progress_fields(progress)))
+    result = {}
+
+    def worker():
+        result["value"] = streamer.convert(source, args.output, settings, args.format, duration, video_info=info)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        streamer.cancel()
+        thread.join(10)
+        emit("error", input=source, message="Akis iptal edildi")
+        return EXIT_INTERRUPTED
+
+    success, message = result.get("value", (False, "Akis tamamlanamadi"))
+    if not success:
+        emit("error", input=source, message=message)
+        return EXIT_FAILED
+    emit("complete", input=source, output=args.output)
+    return EXIT_OK
+
+
+def _install_pause_signals(batch: BatchConverter):
+    """
+    SIGUSR1 kuyruğu duraklatır, SIGUSR2 devam ettirir (POSIX)
+
+    Çalışan işler kontrol noktasında durdurulur: CPU ve bellek boşalır,
+    uzun encode'lar devam edince kaldığı yerden sürer.
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        return
+
+    def run(action, event):
+        # Sinyal işleyicisi kilit beklemesin
+        def work():
+            emit(event, jobs=action())
+        threading.Thread(target=work, daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, lambda signum, frame: run(lambda: batch.pause(checkpoint=True), "paused"))
+    signal.signal(signal.SIGUSR2, lambda signum, frame: run(batch.resume, "resumed"))
+
+
+def _emit_retry(index, item, plan):
+    emit("retry", index=index, input=item["input"], attempt=item.get("attempts", 0),
+         failure=plan["failure"], step=plan["step"], delay=plan["delay"],
+         vcodec=plan["settings"].get("vcodec"), acodec=plan["settings"].get("acodec"))
+
+
+def run_batch(batch: BatchConverter, workers: int) -> int:
+    """Kuyruğu çalıştır, bitene kadar bekle ve çıkış kodunu döndür"""
+    done = threading.Event()
+
+    def on_probe(summary):
+        emit("probe", **summary)
+        for index, item in enumerate(batch.queue):
+            if "plan" in item:
+                emit("plan", index=index, input=item["input"], **_plan_fields(item["plan"]))
+
+    def on_batch_progress(completed, total, queue=None):
+        emit("batch_progress", completed=completed, total=total)
+
+    def on_item_progress(index, item, progress):
+        emit("progress", index=index, input=item["input"], **_progress_fields(progress))
+
+    def on_complete(queue):
+        done.set()
+
+    batch.set_callbacks(
+        batch_progress=on_batch_progress,
+        item_progress=on_item_progress,
+        complete=on_complete,
+        probe_complete=on_probe,
+        retry=_emit_retry
+    )
+    _install_pause_signals(batch)
+    batch.start(max_workers=workers)
+
+    try:
+        while not done.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        batch.cancel()
+        done.wait(10)
+        return EXIT_INTERRUPTED
+
+    counts = {"completed": 0, "failed": 0, "cancelled": 0}
+    for index, item in enumerate(batch.queue):
+        status = item.get("status")
+        counts[status] = counts.get(status, 0) + 1
+        emit("item_result", index=index, input=item["input"], output=item["output"],
+             status=status, error=item.get("error"), skipped=bool(item.get("skipped")),
+             cached=item.get("cached"), retries=item.get("retries"), log=item.get("log"),
+             telemetry=item.get("telemetry"))
+    if batch.telemetry_summary.get("jobs"):
+        emit("telemetry", **batch.telemetry_summary)
+    emit("batch_complete", **counts)
+
+    if counts.get("cancelled"):
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if counts.get("failed") else EXIT_OK
+
+
+def _open_cache(args) -> Optional[OutputCache]:
+    if not args.cache:
+        return None
+    max_bytes = int(args.cache_max_gb * 1024 ** 3) if args.cache_max_gb else None
+    return OutputCache(args.cache_dir, max_bytes=max_bytes, use_content_hash=args.cache_hash)
+
+
+def _open_metrics(args) -> Optional[telemetry.MetricsRegistry]:
+    """
+    --metrics-file / --metrics-port verildiyse telemetri çıktılarını aç
+
+    Returns:
+        Dönüştürücülere verilecek metrik kaydı; telemetri istenmediyse None
+    """
+    if not (args.metrics_file or args.metrics_port is not None):
+        return None
+    if not telemetry.supported():
+        emit("warning", message="Surec telemetrisi bu platformda desteklenmiyor (/proc yok)")
+    registry = telemetry.get_metrics()
+    if args.metrics_file:
+        registry.open_file(args.metrics_file)
+    if args.metrics_port is not None:
+        port = registry.serve(args.metrics_port, args.metrics_host)
+        emit("metrics", url=f"http://{args.metrics_host}:{port}/metrics", file=args.metrics_file)
+    elif args.metrics_file:
+        emit("metrics", url=None, file=args.metrics_file)
+    return registry
+
+
+def cmd_batch(args) -> int:
+    settings = dict(build_settings(args.preset, args.set), **_process_settings(args))
+    store = JobStore(args.job_db) if args.job_db or args.resume else None
+    batch = BatchConverter(job_store=store, output_cache=_open_cache(args))
+    batch.retry_policy = _retry_policy(args)
+    batch.log_dir = args.ffmpeg_log_dir or batch.log_dir
+    batch.metrics = _open_metrics(args)
+
+    batch.calibration_windows = args.calibrate
+
+    if args.resume:
+        resumed = batch.resume_from_store()
+        emit("resume", jobs=resumed)
+
+    reserved = set()
+    missing = 0
+    for input_path in args.inputs:
+        if not os.path.exists(input_path):
+            emit("error", input=input_path, message="Girdi dosyasi bulunamadi")
+            missing += 1
+            continue
+        output_path = _output_for(input_path, args, settings)
+        if output_path in reserved:
+            base, ext = os.path.splitext(output_path)
+            output_path = f"{base}_{len(reserved)}{ext}"
+        reserved.add(output_path)
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        batch.add_to_queue(input_path, output_path, dict(settings))
+
+    if not batch.queue:
+        emit("batch_complete", completed=0, failed=0, cancelled=0)
+        return EXIT_FAILED if args.inputs else EXIT_OK
+
+    code = run_batch(batch, args.workers)
+    return EXIT_FAILED if missing and code == EXIT_OK else code
+
+
+def cmd_watch(args) -> int:
+    preset_names = args.preset or [DEFAULT_PRESET]
+    for name in preset_names:
+        build_settings(name, args.set)
+    for path in args.paths:
+        if not os.path.isdir(path):
+            emit("error", input=path, message="Izlenecek klasor bulunamadi")
+            return EXIT_FAILED
+
+    store = JobStore(args.job_db) if args.job_db else None
+    batch = BatchConverter(job_store=store, output_cache=_open_cache(args))
+    batch.retry_policy = _retry_policy(args)
+    batch.log_dir = args.ffmpeg_log_dir or batch.log_dir
+    batch.metrics = _open_metrics(args)
+    if store:
+        emit("resume", jobs=batch.resume_from_store())
+
+    def on_item_progress(index, item, progress):
+        emit("progress", index=index, input=item["input"], **_progress_fields(progress))
+
+    def on_batch_progress(completed, total, queue=None):
+        for index, item in enumerate(batch.queue, batch.queue_offset):
+            status = item.get("status")
+            if status in ("completed", "failed", "cancelled") and not item.get("reported"):
+                item["reported"] = True
+                emit("item_result", index=index, input=item["input"], output=item["output"],
+                     status=status, error=item.get("error"), retries=item.get("retries"),
+                     log=item.get("log"), telemetry=item.get("telemetry"))
+
+    def on_enqueue(item, preset_name):
+        emit("enqueue", input=item["input"], output=item["output"], preset=preset_name,
+             status=item.get("status"), duration=item.get("duration"), cached=item.get("cached"))
+        if "plan" in item:
+            emit("plan", input=item["input"], **_plan_fields(item["plan"]))
+
+    # '*' kabul eden presetlerde sadece bilinen video uzantıları izlenir
+    wildcard = any("*" in PRESETS[name].get("input_formats", ["*"]) for name in preset_names)
+    options = {}
+    if wildcard:
+        options["extensions"] = set(get_supported_formats()["video_input"])
+
+    service = WatchIngest(
+        batch,
+        args.paths,
+        preset_names,
+        output_dir=args.output_dir,
+        settings_for=lambda name: dict(build_settings(name, args.set), **_process_settings(args)),
+        on_enqueue=on_enqueue,
+        settle_seconds=args.settle,
+        include_existing=args.include_existing,
+        force_polling=args.poll,
+        on_fallback=lambda reason: emit("warning", message=reason, backend="polling"),
+        **options
+    )
+    batch.set_callbacks(batch_progress=on_batch_progress, item_progress=on_item_progress, retry=_emit_retry)
+    _install_pause_signals(batch)
+    service.start(max_workers=args.workers)
+    emit("watch", paths=[os.path.abspath(path) for path in args.paths],
+         backend=service.watcher.backend_name, presets=preset_names)
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        service.watcher.stop()
+        batch.cancel()
+        return EXIT_INTERRUPTED
+
+
+def cmd_estimate(args) -> int:
+    """Dönüştürmeden tahmin et; --calibrate ile deneme encode'u yapar"""
+    settings = build_settings(args.preset, args.set)
+    batch = BatchConverter()
+    batch.max_workers = max(1, args.workers)
+    for input_path in args.inputs:
+        if not os.path.exists(input_path):
+            emit("error", input=input_path, message="Girdi dosyasi bulunamadi")
+            continue
+        batch.add_to_queue(input_path, _output_for(input_path, args, settings), dict(settings))
+
+    summary = batch.probe_queue()
+    for index, item in enumerate(batch.queue):
+        if item.get("info"):
+            emit("item_estimate", index=index, input=item["input"], duration=item.get("duration"),
+                 seconds=round(Estimator.estimate_seconds(item["info"], item["settings"]), 1),
+                 remux=bool(item.get("plan", {}).get("changed")))
+
+    result = {
+        "files": summary["readable"],
+        "unreadable": summary["unreadable"],
+        "total_duration": summary["total_duration"],
+        "seconds": round(summary["estimated_seconds"], 1)
+    }
+    high = summary["estimated_seconds"]
+
+    if args.calibrate:
+        try:
+            calibration = batch.calibrate_queue(args.calibrate, args.window_seconds)
+        except KeyboardInterrupt:
+            return EXIT_INTERRUPTED
+        for index, item in enumerate(batch.queue):
+            if "calibration" in item:
+                emit("item_calibration", index=index, input=item["input"], **item["calibration"])
+        if calibration["calibrated"]:
+            result["calibrated_groups"] = calibration["groups"]
+            result["seconds_range"] = [round(value, 1) for value in calibration["seconds"]]
+            result["size_range"] = list(calibration["size"])
+            high = calibration["seconds"][2]
+
+    if args.budget_hours:
+        result["budget_seconds"] = args.budget_hours * 3600
+        result["fits"] = high <= result["budget_seconds"]
+    emit("estimate", **result)
+    return EXIT_OK if summary["readable"] else EXIT_FAILED
+
+
+def cmd_presets(args) -> int:
+    for name, preset in PRESETS.items():
+        emit("preset", name=name, category=preset.get("category"),
+             output_format=preset.get("output_format"), description=preset.get("description"))
+    return EXIT_OK
+
+
+def cmd_encoders(args) -> int:
+    # Her zaman yeniden test edilir ve anlık görüntü güncellenir
+    snapshot = capabilities.probe(refresh_hw=True)
+    if snapshot is None:
+        emit("error", message="FFmpeg bulunamadi")
+        return EXIT_NO_FFMPEG
+    detected = snapshot["hw"]
+    for backend in hw_backends.BACKENDS:
+        if not backend.supported_here():
+            continue
+        emit("encoder_backend", name=backend.name, label=backend.label,
+             available=backend.name in detected, encoders=detected.get(backend.name, []),
+             presets=backend.presets)
+    return EXIT_OK
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m VideoConverter",
+        description="TM Video Converter - headless komut satiri"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(p):
+        p.add_argument("--preset", default=DEFAULT_PRESET, help="Preset adi (bkz. 'presets')")
+        p.add_argument("--output-dir", help="Cikti klasoru (varsayilan: girdinin klasoru)")
+        p.add_argument("--set", action="append", metavar="KEY=VALUE",
+                       help="Preset ayarini ez (JSON deger kabul eder), tekrar edilebilir")
+
+    def add_cache(p):
+        p.add_argument("--cache", action="store_true",
+                       help="Ayni girdi/ayar/ffmpeg icin onceki ciktiyi yeniden kullan")
+        p.add_argument("--cache-dir", help="Cikti onbellegi klasoru")
+        p.add_argument("--cache-max-gb", type=float, help="Onbellek boyut siniri (en eski kullanilanlar silinir)")
+        p.add_argument("--cache-hash", action="store_true",
+                       help="Girdiyi yol/boyut/mtime yerine tam icerik hash'i ile tani")
+
+    def add_priority(p, default):
+        p.add_argument("--priority", choices=sorted(priority.PROFILES),
+                       help=f"ffmpeg surec onceligi (varsayilan: {default})")
+        p.add_argument("--nice", type=int, help="Profilin nice degerini ez (Windows: oncelik sinifi)")
+        p.add_argument("--ionice", help="Profilin disk onceligini ez: idle, best-effort:N veya realtime:N")
+        p.add_argument("--cpu-limit", type=float, metavar="CORES",
+                       help="Is basina CPU siniri (cekirdek; cgroup v2 gerekir)")
+        p.add_argument("--memory-limit", metavar="SIZE", help="Is basina bellek siniri, orn. 2G (cgroup v2 gerekir)")
+        p.add_argument("--cgroup-root", help=f"Yetki devredilmis cgroup v2 klasoru (varsayilan: ${priority.CGROUP_ENV})")
+
+    def add_retry(p):
+        p.add_argument("--retries", type=int, default=3,
+                       help="Kurtarilabilir hatalarda is basina en fazla tekrar (0: kapali)")
+        p.add_argument("--retry-backoff", type=float, default=5.0, metavar="SEC",
+                       help="Gecici hatalarda ilk bekleme; her denemede iki katina cikar")
+        p.add_argument("--fallback", default=",".join(retry.LADDER),
+                       help="Geri dusme adimlari (cpu, reencode, drop_streams) ya da none")
+        p.add_argument("--retry-unknown", action="store_true",
+                       help="Siniflandirilamayan hatalari da tekrar dene")
+
+    def add_logs(p):
+        p.add_argument("--ffmpeg-log-dir", metavar="DIR",
+                       help=f"ffmpeg stderr'ini is basina gzip'li dosyaya yaz (varsayilan: ${ffmpeg_log.LOG_DIR_ENV})")
+
+    def add_metrics(p):
+        p.add_argument("--metrics-file", help="ffmpeg surec orneklerini ve is ozetlerini JSONL olarak ekle")
+        p.add_argument("--metrics-port", type=int,
+                       help="Prometheus metinli /metrics ucunu bu portta ac (0: bos port)")
+        p.add_argument("--metrics-host", default="127.0.0.1", help="Metrik ucunun dinledigi adres")
+
+    p_convert = sub.add_parser("convert", help="Tek dosya donustur")
+    p_convert.add_argument("input")
+    p_convert.add_argument("-o", "--output", help="Cikti dosyasi")
+    p_convert.add_argument("--segments", type=int, default=None,
+                           help="Parcali paralel encode icin is sayisi (1 = kapali)")
+    add_common(p_convert)
+    add_metrics(p_convert)
+    add_priority(p_convert, priority.INTERACTIVE)
+    add_logs(p_convert)
+    p_convert.set_defaults(func=cmd_convert)
+
+    p_batch = sub.add_parser("batch", help="Birden fazla dosyayi toplu donustur")
+    p_batch.add_argument("inputs", nargs="*")
+    p_batch.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                         help="Eszamanli agir encode sayisi")
+    p_batch.add_argument("--resume", action="store_true", help="Yarim kalan isleri devam ettir")
+    p_batch.add_argument("--job-db", help="Is deposu (SQLite) yolu")
+    p_batch.add_argument("--calibrate", type=int, default=0, metavar="N",
+                         help="Baslamadan once grup basina N pencerelik deneme encode'u yap")
+    add_common(p_batch)
+    add_cache(p_batch)
+    add_metrics(p_batch)
+    add_priority(p_batch, priority.BACKGROUND)
+    add_retry(p_batch)
+    add_logs(p_batch)
+    p_batch.set_defaults(func=cmd_batch)
+
+    p_watch = sub.add_parser("watch", help="Klasorleri izle, gelen dosyalari donustur")
+    p_watch.add_argument("paths", nargs="+")
+    p_watch.add_argument("--preset", action="append",
+                         help="Preset adi; tekrar edilebilir, uzantiya gore input_formats ile secilir")
+    p_watch.add_argument("--output-dir", help="Cikti klasoru (varsayilan: girdinin klasoru)")
+    p_watch.add_argument("--set", action="append", metavar="KEY=VALUE",
+                         help="Preset ayarini ez (JSON deger kabul eder), tekrar edilebilir")
+    p_watch.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                         help="Eszamanli agir encode sayisi")
+    p_watch.add_argument("--settle", type=float, default=5.0,
+                         help="Dosya boyutu bu kadar saniye degismezse hazir sayilir")
+    p_watch.add_argument("--include-existing", action="store_true",
+                         help="Baslangicta klasorde olan dosyalari da isle")
+    p_watch.add_argument("--poll", action="store_true", help="inotify yerine yoklama kullan")
+    p_watch.add_argument("--job-db", help="Is deposu (SQLite) yolu")
+    add_cache(p_watch)
+    add_metrics(p_watch)
+    add_priority(p_watch, priority.BACKGROUND)
+    add_retry(p_watch)
+    add_logs(p_watch)
+    p_watch.set_defaults(func=cmd_watch)
+
+    p_estimate = sub.add_parser("estimate", help="Donusturmeden sure/boyut tahmini yap")
+    p_estimate.add_argument("inputs", nargs="+")
+    p_estimate.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Eszamanli agir encode sayisi")
+    p_estimate.add_argument("--calibrate", type=int, default=0, metavar="N",
+                            help="Grup basina N kisa pencere encode ederek kalibre et")
+    p_estimate.add_argument("--window-seconds", type=float, default=5.0,
+                            help="Kalibrasyon penceresinin uzunlugu")
+    p_estimate.add_argument("--budget-hours", type=float,
+                            help="Bu sureye sigar mi (ust sinir tahminiyle)")
+    add_common(p_estimate)
+    p_estimate.set_defaults(func=cmd_estimate)
+
+    p_renditions = sub.add_parser("renditions", help="Tek girdiden tek decode ile birden fazla cikti uret")
+    p_renditions.add_argument("input")
+    p_renditions.add_argument("--preset", action="append",
+                              help="Cikti basina preset adi; tekrar edilebilir (bkz. 'presets')")
+    p_renditions.add_argument("--output-dir", help="Cikti klasoru (varsayilan: girdinin klasoru)")
+    p_renditions.add_argument("--set", action="append", metavar="KEY=VALUE",
+                              help="Tum ciktilarin preset ayarini ez (JSON deger kabul eder), tekrar edilebilir")
+    add_priority(p_renditions, priority.INTERACTIVE)
+    add_logs(p_renditions)
+    p_renditions.set_defaults(func=cmd_renditions)
+
+    p_stream = sub.add_parser("stream", help="Pipe/FIFO/URL uzerinden diske ara dosya yazmadan donustur")
+    p_stream.add_argument("input", help="Dosya, URL (http://, tcp://, ...) veya stdin icin '-'")
+    p_stream.add_argument("-o", "--output", default="-", help="Cikti dosyasi/FIFO veya stdout icin '-'")
+    p_stream.add_argument("--format", default="fmp4", choices=sorted(StreamConverter.STREAM_FORMATS),
+                          help="Akis formati (parcali MP4, MPEG-TS veya Matroska)")
+    p_stream.add_argument("--preset", default=DEFAULT_PRESET, help="Preset adi (bkz. 'presets')")
+    p_stream.add_argument("--set", action="append", metavar="KEY=VALUE",
+                          help="Preset ayarini ez (JSON deger kabul eder), tekrar edilebilir")
+    add_priority(p_stream, priority.INTERACTIVE)
+    p_stream.set_defaults(func=cmd_stream)
+
+    p_presets = sub.add_parser("presets", help="Presetleri listele")
+    p_presets.set_defaults(func=cmd_presets)
+
+    p_encoders = sub.add_parser("encoders", help="Donanim encoder arka uclarini test et ve listele")
+    p_encoders.set_defaults(func=cmd_encoders)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command != "presets":
+        ffmpeg_ok, message = Installer.check_ffmpeg()
+        if not ffmpeg_ok:
+            emit("error", message=message)
+            return EXIT_NO_FFMPEG
+
+    # SIGTERM'i de iptal olarak ele al (servis yöneticileri için)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+
+    try:
+        code = args.func(args)
+        # Tamponda kalan çıktı da burada yazılsın (kırık pipe aşağıda yakalanır)
+        sys.stdout.flush()
+        return code
+    except ValueError as e:
+        emit("error", message=str(e))
+        return EXIT_USAGE
+    except BrokenPipeError:
+        # Okuyan taraf erken kapandı (ör. `presets | head`): çıkışta Python'un
+        # stdout'u tekrar boşaltmaya çalışıp hata yazmaması için devnull'a bağla
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
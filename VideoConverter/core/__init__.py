@@ -1,5 +1,30 @@
-from .converter import VideoConverter
-from .ffmpeg_utils import FFmpegUtils
-from .presets import PRESETS, get_preset
-from .estimator import Estimator
-from .installer import Installer
+"""
+Dönüştürme motoru
+
+Alt modüller ilk erişimde yüklenir: `from core import capabilities` gibi
+hafif içe aktarmalar tüm motoru (subprocess, sqlite, urllib...) çekmez.
+"""
+import importlib
+
+_EXPORTS = {
+    "VideoConverter": ".converter",
+    "SegmentedConverter": ".segmented",
+    "MultiRenditionConverter": ".renditions",
+    "StreamConverter": ".streaming",
+    "FFmpegUtils": ".ffmpeg_utils",
+    "PRESETS": ".presets",
+    "get_preset": ".presets",
+    "Estimator": ".estimator",
+    "Installer": ".installer",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,216 @@
+"""Kısa deneme encode'larıyla süre/boyut tahminini kalibre etme"""
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .converter import VideoConverter
+from .ffmpeg_utils import FFmpegUtils
+from .progress import ProgressReader
+
+
+class Calibrator:
+    """
+    Kaynaktan birkaç kısa pencereyi gerçek ayarlarla encode edip ölçer
+
+    Varsayılan olarak farklı konumlardan 3 x 5 saniye alınır. Ölçülen
+    x gerçek zamanlı hız ve saniye başına byte tüm süreye uzatılır;
+    pencereler arasındaki fark güven aralığını verir.
+    """
+
+    WINDOWS = 3
+    WINDOW_SECONDS = 5.0
+    # Az sayıda örnekten uzatmanın payı (aralık en az bu kadar geniş)
+    MIN_MARGIN = 0.10
+
+    def __init__(
+        self,
+        windows: int = WINDOWS,
+        window_seconds: float = WINDOW_SECONDS,
+        converter: Optional[VideoConverter] = None
+    ):
+        self.windows = max(1, int(windows))
+        self.window_seconds = max(1.0, float(window_seconds))
+        self.converter = converter or VideoConverter()
+        self.is_cancelled = False
+        self._process = None
+
+    def _offsets(self, duration: float) -> List[Tuple[float, float]]:
+        """(başlangıç, uzunluk) pencereleri; kısa videolarda tek pencere"""
+        if duration <= self.window_seconds * self.windows:
+            return [(0.0, min(duration, self.window_seconds) or self.window_seconds)]
+        offsets = []
+        for index in range(self.windows):
+            center = duration * (index + 1) / (self.windows + 1)
+            start = max(0.0, min(duration - self.window_seconds, center - self.window_seconds / 2))
+            offsets.append((start, self.window_seconds))
+        return offsets
+
+    def _encode_window(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        start: float,
+        length: float,
+        video_info: Optional[Dict] = None
+    ) -> Optional[Dict[str, float]]:
+        window_settings = dict(settings)
+        window_settings["trim_start"] = start
+        window_settings["trim_duration"] = length
+        cmd = self.converter.build_command(input_path, output_path, window_settings, video_info)
+
+        started = time.monotonic()
+        self._process = self.converter._start_process(cmd, window_settings)
+        last = {}
+        for progress in ProgressReader(length, rate=None).read(self._process.stdout):
+            last = progress
+        self._process.wait()
+        self.converter._finish_stderr(self._process)
+        wall = time.monotonic() - started
+        code = self._process.returncode
+        self._process = None
+
+        if code != 0 or self.is_cancelled:
+            return None
+        try:
+            size = os.path.getsize(output_path)
+        except OSError:
+            return None
+
+        # ffmpeg'in bildirdiği hız süreç açılış maliyetini içermez
+        media = last.get("current_time") or length
+        speed = last.get("speed") or (media / wall if wall > 0 else 0)
+        if media <= 0 or speed <= 0:
+            return None
+        return {"speed": speed, "bytes_per_second": size / media, "wall": wall}
+
+    def calibrate(
+        self,
+        input_path: str,
+        settings: Dict[str, Any],
+        video_info: Optional[Dict] = None,
+        output_format: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Bir kaynak için deneme encode'u yap
+
+        Returns:
+            {"speed", "speed_range", "bytes_per_second", "bytes_range",
+             "samples", "remux"} ya da ölçülemezse None
+        """
+        info = video_info or FFmpegUtils.get_video_info(input_path)
+        if not info or not info.get("duration"):
+            return None
+
+        output_format = output_format or settings.get("output_format") or ".mp4"
+        settings = self.converter.plan_settings(input_path, f"calibration{output_format}", settings, info)
+        decision = self.converter.last_plan
+
+        work_dir = tempfile.mkdtemp(prefix="tmvc_calibration_")
+        samples = []
+        try:
+            for index, (start, length) in enumerate(self._offsets(info["duration"])):
+                if self.is_cancelled:
+                    return None
+                output_path = os.path.join(work_dir, f"window_{index}{output_format}")
+                sample = self._encode_window(input_path, output_path, settings, start, length, info)
+                if sample:
+                    samples.append(sample)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        if not samples:
+            return None
+
+        speeds = [sample["speed"] for sample in samples]
+        rates = [sample["bytes_per_second"] for sample in samples]
+        return {
+            "speed": statistics.median(speeds),
+            "speed_range": self._range(speeds),
+            "bytes_per_second": statistics.median(rates),
+            "bytes_range": self._range(rates),
+            "samples": len(samples),
+            "remux": decision.get("video") == "copy"
+        }
+
+    def _range(self, values: List[float]) -> Tuple[float, float]:
+        """Örnekler arası farkı en az MIN_MARGIN genişliğinde aralığa çevir"""
+        low, high = min(values), max(values)
+        middle = statistics.median(values)
+        return min(low, middle * (1 - self.MIN_MARGIN)), max(high, middle * (1 + self.MIN_MARGIN))
+
+    @staticmethod
+    def extrapolate(calibration: Dict[str, Any], duration: float, speed_factor: float = 1.0) -> Dict[str, Any]:
+        """
+        Kalibrasyonu bir videonun tamamına uzat
+
+        Returns:
+            {"seconds": (düşük, orta, yüksek), "size": (düşük, orta, yüksek)}
+        """
+        media = duration / speed_factor if speed_factor and speed_factor > 0 else duration
+        slow, fast = calibration["speed_range"]
+        small, large = calibration["bytes_range"]
+        return {
+            "seconds": (media / fast, media / calibration["speed"], media / slow),
+            "size": (int(media * small), int(media * calibration["bytes_per_second"]), int(media * large))
+        }
+
+    @staticmethod
+    def group_key(info: Dict, settings: Dict[str, Any]) -> tuple:
+        """Aynı kalibrasyonu paylaşan işlerin anahtarı: (çözünürlük, codec, preset)"""
+        resolution = settings.get("resolution") or f"{info.get('width', 0)}:{info.get('height', 0)}"
+        return resolution, settings.get("vcodec") or "none", settings.get("preset") or ""
+
+    def calibrate_items(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Kuyruk öğelerini grup başına bir kez kalibre et
+
+        Her gruptan en uzun dosya temsilci seçilir. Sonuç öğelere
+        item["calibration"] olarak yazılır.
+
+        Returns:
+            {"groups", "calibrated", "seconds": (düşük, orta, yüksek),
+             "size": (düşük, orta, yüksek)}
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for item in items:
+            info = item.get("info")
+            if not info:
+                continue
+            groups.setdefault(self.group_key(info, item["settings"]), []).append(item)
+
+        totals = {"groups": len(groups), "calibrated": 0, "seconds": [0.0, 0.0, 0.0], "size": [0, 0, 0]}
+        for members in groups.values():
+            if self.is_cancelled:
+                break
+            sample = max(members, key=lambda item: item["info"].get("duration", 0))
+            output_format = os.path.splitext(sample["output"])[1] or None
+            calibration = self.calibrate(sample["input"], sample["settings"], sample["info"], output_format)
+            if not calibration:
+                continue
+            totals["calibrated"] += len(members)
+            for item in members:
+                estimate = self.extrapolate(
+                    calibration, item["info"].get("duration", 0), item["settings"].get("speed") or 1.0
+                )
+                item["calibration"] = estimate
+                for index in range(3):
+                    totals["seconds"][index] += estimate["seconds"][index]
+                    totals["size"][index] += estimate["size"][index]
+
+        totals["seconds"] = tuple(totals["seconds"])
+        totals["size"] = tuple(totals["size"])
+        return totals
+
+    def cancel(self):
+        """Çalışan deneme encode'unu durdur"""
+        self.is_cancelled = True
+        process = self._process
+        if process:
+            try:
+                process.terminate()
+            except OSError:
+                pass
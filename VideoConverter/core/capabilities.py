@@ -0,0 +1,209 @@
+"""FFmpeg yetenek anlık görüntüsü: yollar, sürüm, encoder listesi, donanım testleri"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+from . import hw_backends
+from .storage import get_data_path
+
+SCHEMA_VERSION = 1
+SNAPSHOT_FILE = "capabilities.json"
+# Anlık görüntü geçerli olsa da donanım testleri bu süreden sonra arka planda tazelenir
+REFRESH_AFTER = 6 * 3600
+
+_paths: Dict[str, str] = {}
+_snapshot: Optional[Dict[str, Any]] = None
+_lock = threading.Lock()
+_refreshing = threading.Event()
+
+
+def _app_dir() -> str:
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_binary(name: str) -> Optional[str]:
+    """
+    ffmpeg/ffprobe yolunu bul (PATH, sonra uygulama klasörü)
+
+    Bulunan yol süreç boyunca saklanır; bulunamazsa saklanmaz, böylece
+    kurulumdan sonraki ilk çağrı yeni yolu görür.
+    """
+    path = _paths.get(name)
+    if path:
+        return path
+
+    path = shutil.which(name)
+    if not path:
+        if platform.system().lower() == "windows":
+            local_path = os.path.join(_app_dir(), "ffmpeg", "bin", f"{name}.exe")
+        else:
+            local_path = os.path.join(_app_dir(), "ffmpeg", name)
+        if os.path.exists(local_path):
+            path = local_path
+
+    if path:
+        _paths[name] = path
+    return path
+
+
+def forget_paths():
+    """Saklanan yolları unut (kurulum/kaldırma sonrası)"""
+    _paths.clear()
+
+
+def binary_key(path: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Anlık görüntünün anahtarı: ikili dosyanın yolu, mtime ve boyutu"""
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"path": os.path.abspath(path), "mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _snapshot_path() -> str:
+    return get_data_path(SNAPSHOT_FILE)
+
+
+def _read() -> Optional[Dict[str, Any]]:
+    try:
+        with open(_snapshot_path(), "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) and data.get("schema") == SCHEMA_VERSION else None
+
+
+def _write(snapshot: Dict[str, Any]):
+    path = _snapshot_path()
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(snapshot, handle, indent=2)
+        os.replace(temp_path, path)
+    except OSError:
+        pass
+
+
+def _use(snapshot: Dict[str, Any]):
+    """Anlık görüntüyü süreç geneline yay (deneme encode'ları tekrar yapılmaz)"""
+    global _snapshot
+    _snapshot = snapshot
+    ffmpeg_path = snapshot["ffmpeg"]["path"]
+    hw_backends.prime(ffmpeg_path, snapshot.get("hw", {}), snapshot.get("encoders"))
+    _paths.setdefault("ffmpeg", ffmpeg_path)
+    if snapshot.get("ffprobe_path"):
+        _paths.setdefault("ffprobe", snapshot["ffprobe_path"])
+
+
+def current() -> Optional[Dict[str, Any]]:
+    """
+    Geçerli anlık görüntü (bellek, sonra disk); ffmpeg ikilisi değiştiyse None
+
+    Hiçbir alt süreç çalıştırmaz, sadece stat yapar.
+    """
+    with _lock:
+        snapshot = _snapshot or _read()
+        if snapshot is None:
+            return None
+        key = snapshot.get("ffmpeg")
+        if not key or binary_key(key.get("path")) != key:
+            return None
+        if snapshot is not _snapshot:
+            _use(snapshot)
+        return snapshot
+
+
+def probe(ffmpeg_path: Optional[str] = None, refresh_hw: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Yetenekleri ölç, diske yaz ve döndür (ffmpeg yoksa None)
+
+    refresh_hw False ise bu süreçte zaten yapılmış donanım testleri yeniden
+    kullanılır (ör. başlangıç sihirbazının yaptıkları).
+    """
+    from .installer import Installer
+
+    ffmpeg_path = ffmpeg_path or find_binary("ffmpeg")
+    key = binary_key(ffmpeg_path)
+    if key is None:
+        return None
+
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-version"],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        version = result.stdout.split("\n")[0] if result.stdout else ""
+    except Exception:
+        version = ""
+
+    detected = hw_backends.detect(ffmpeg_path, refresh=refresh_hw)
+    snapshot = {
+        "schema": SCHEMA_VERSION,
+        "ffmpeg": key,
+        "ffprobe_path": find_binary("ffprobe"),
+        "version": version,
+        "ffmpeg_ok": bool(version) and Installer._is_supported_ffmpeg_version(version),
+        "encoders": sorted(hw_backends.encoder_names(ffmpeg_path)),
+        "hw": detected,
+        "hw_encoders": [encoder for encoders in detected.values() for encoder in encoders],
+        "created": time.time(),
+    }
+    with _lock:
+        _write(snapshot)
+        _use(snapshot)
+    return snapshot
+
+
+def is_stale(snapshot: Dict[str, Any]) -> bool:
+    return time.time() - snapshot.get("created", 0) > REFRESH_AFTER
+
+
+def refresh_async(callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+    """
+    Donanım testlerini arka planda yenile
+
+    callback(snapshot) sadece kullanılabilir donanım encoder'ları değiştiyse
+    çağrılır (arka plan thread'inden). Zaten çalışan bir yenileme varsa False.
+    """
+    if _refreshing.is_set():
+        return False
+    _refreshing.set()
+    before = (current() or {}).get("hw_encoders")
+
+    def worker():
+        try:
+            snapshot = probe(refresh_hw=True)
+        finally:
+            _refreshing.clear()
+        if snapshot and callback and snapshot["hw_encoders"] != before:
+            callback(snapshot)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return True
+
+
+def hw_encoders() -> List[str]:
+    """Çalışan donanım encoder'ları: anlık görüntüden, yoksa ölçerek"""
+    snapshot = current() or probe()
+    return list(snapshot["hw_encoders"]) if snapshot else []
+
+
+def encoder_names() -> frozenset:
+    """Derlemedeki encoder adları: anlık görüntüden, yoksa -encoders ile"""
+    snapshot = current()
+    if snapshot:
+        return frozenset(snapshot.get("encoders", []))
+    ffmpeg_path = find_binary("ffmpeg")
+    return hw_backends.encoder_names(ffmpeg_path) if ffmpeg_path else frozenset()
@@ -1,72 +1,212 @@
 """Video dönüştürme motoru"""
 import subprocess
+import sys
 import threading
+import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Callable
 from .ffmpeg_utils import FFmpegUtils
 from .installer import Installer
+from .scheduler import ResourceScheduler, classify_job
+from .job_store import JobStore
+from .output_cache import OutputCache, detach
+from .planner import RemuxPlanner
+from .progress import ProgressReader
+from .retry import RetryPolicy
+from .history import get_encode_history
+from .estimator import Estimator
+from . import ffmpeg_log, filter_graph, gpu_pipeline, hw_backends, priority, telemetry
+from .ffmpeg_log import StderrCapture
+from .filter_graph import FilterGraph
+from .telemetry import JobSampler, MetricsRegistry
 
 
 class VideoConverter:
     """FFmpeg tabanlı video dönüştürücü"""
 
+    # Saniyedeki en fazla ilerleme callback'i
+    PROGRESS_RATE = ProgressReader.DEFAULT_RATE
+
+    # Pipe/FIFO'ya yazılabilen (geri sarma gerektirmeyen) akış formatları
+    STREAM_MUXERS = {
+        "fmp4": ["-f", "mp4", "-movflags", "frag_keyframe+empty_moov+default_base_moof"],
+        "mpegts": ["-f", "mpegts"],
+        "matroska": ["-f", "matroska"],
+    }
+
+    # convert_sync hata mesajında gösterilen en fazla stderr satırı
+    SYNC_ERROR_LINES = 20
+
+    # settings["drop_streams"] -> stream türünü çıktıdan atan seçenek
+    STREAM_DROP_FLAGS = {"subtitle": "-sn", "data": "-dn"}
+
+    # Bu süreden uzun encode'lar kontrol noktasında durdurulunca yazılan
+    # kısım parça olarak saklanır ve iş kaldığı yerden devam eder
+    CHECKPOINT_MIN_DURATION = 300
+
     def __init__(self):
         self.process: Optional[subprocess.Popen] = None
         self.is_running = False
         self.is_cancelled = False
+        self.is_paused = False
+        # stop_at_checkpoint() çağrıldı: iş hata değil duraklatma ile biter
+        self.is_stopping = False
+        # Kaldığı yerden devam bilgisi: {"parts": [parça yolları], "done": çıktı saniyesi}
+        self.checkpoint: Optional[Dict[str, Any]] = None
+        # Dondurulmuş geçen süre (geçmişe gerçek encode süresi yazılsın)
+        self.paused_seconds = 0.0
+        self._paused_at: Optional[float] = None
+        self._checkpointable = False
+        # ffmpeg başlamadan pause() çağrıldı: _start_process süreci hemen dondurur
+        self._pause_pending = False
+        # Son başlatılan ffmpeg süreci (self.process atanmadan önce de görünür)
+        self._launched: Optional[subprocess.Popen] = None
+        self._start_lock = threading.Lock()
         self._progress_callback: Optional[Callable] = None
         self._complete_callback: Optional[Callable] = None
         self._error_callback: Optional[Callable] = None
+        self._plan_callback: Optional[Callable] = None
+        self.last_plan: Optional[Dict[str, Any]] = None
+        self.progress_rate = self.PROGRESS_RATE
+        # Makineyi paylaşan eşzamanlı iş sayısı (geçmiş kaydı için)
+        self.concurrency = 1
+        # ffmpeg süreç önceliği (bkz. priority.PROFILES); toplu işler "background"
+        self.priority = priority.INTERACTIVE
+        self.video_info: Optional[Dict] = None
+        # Süreç örnekleri buraya yayınlanır (None: telemetri kapalı, örnekleyici başlamaz)
+        self.metrics: Optional[MetricsRegistry] = None
+        # Metriklerdeki iş etiketi (None: çıktı dosyasının adı)
+        self.telemetry_job: Optional[str] = None
+        self.last_telemetry: Optional[Dict[str, Any]] = None
+        # Son ffmpeg sürecinin çıkış kodu (hata sınıflandırması için)
+        self.last_returncode: Optional[int] = None
+        # Verilirse ffmpeg stderr'i iş başına gzip'li dosyaya da yazılır
+        self.log_dir: Optional[str] = os.environ.get(ffmpeg_log.LOG_DIR_ENV) or None
+        # Son işin stderr özeti (bkz. StderrCapture.summary)
+        self.last_log: Optional[Dict[str, Any]] = None
+        # Süreç PID'i -> stderr okuyucusu
+        self._stderr: Dict[int, StderrCapture] = {}
+        self._stderr_lock = threading.Lock()
         self.ffmpeg_path = Installer.get_ffmpeg_path()
 
-    @staticmethod
-    def _build_atempo_filter(speed: float) -> str:
-        """Build a valid FFmpeg atempo chain for speeds outside 0.5-2.0."""
-        filters = []
-        remaining = float(speed)
-
-        while remaining > 2.0:
-            filters.append("atempo=2.0")
-            remaining /= 2.0
-
-        while remaining < 0.5:
-            filters.append("atempo=0.5")
-            remaining /= 0.5
-
-        filters.append(f"atempo={remaining:.4g}")
-        return ",".join(filters)
-
-    @staticmethod
-    def _merge_filter(cmd: list, flag: str, ff_filter: str):
-        for i, arg in enumerate(cmd):
-            if arg == flag:
-                cmd[i + 1] = f"{cmd[i + 1]},{ff_filter}"
-                return
-        cmd.extend([flag, ff_filter])
-
     def set_callbacks(
         self,
         progress: Optional[Callable] = None,
         complete: Optional[Callable] = None,
-        error: Optional[Callable] = None
+        error: Optional[Callable] = None,
+        plan: Optional[Callable] = None
     ):
         """Callback fonksiyonları ayarla"""
         self._progress_callback = progress
         self._complete_callback = complete
         self._error_callback = error
+        self._plan_callback = plan
+
+    def plan_settings(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        video_info: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream kopyalama yeterliyse ayarları -c copy'ye çevir
+
+        Karar last_plan'a yazılır ve plan callback'i ile bildirilir.
+        settings["smart_copy"] = False ile kapatılabilir. Plan ayarları
+        değiştirirse eski ayarlarla yazılmış checkpoint parçaları silinir.
+        """
+        if video_info is None:
+            video_info = FFmpegUtils.get_video_info(input_path)
+        self.video_info = video_info
+
+        decision = RemuxPlanner.plan(video_info, settings, output_path)
+        self.last_plan = decision
+        if self._plan_callback:
+            self._plan_callback(decision)
+        planned = settings
+        if decision["changed"]:
+            planned = RemuxPlanner.apply(planned, decision)
+        # NVDEC kaynağı çözemiyorsa GPU hattı kapanır (NVENC yine kullanılır)
+        planned = gpu_pipeline.adjust_for_source(planned, video_info)
+        if self.checkpoint and planned != settings:
+            self.discard_checkpoint(self.checkpoint)
+            self.checkpoint = None
+        return planned
+
+    def build_filters(self, settings: Dict[str, Any], video_info: Optional[Dict] = None) -> FilterGraph:
+        """
+        Ayarlardan filtre grafiğini oluştur
+
+        Kaynak bilgisi verilirse filtreler en az pikselin işleneceği sırada
+        çalışır. Bilgi açıkça verilir: önceki bir işin self.video_info'su
+        başka boyuttaki bir kaynağa uygulanmasın.
+        """
+        source_size = filter_graph.source_size_of(video_info)
+        graph = FilterGraph(source_size)
+
+        if settings.get("vcodec") is not None:
+            resolution = settings.get("resolution")
+            # Kaynakla aynı boyuta ölçekleme atlanır
+            if resolution and (source_size is None or filter_graph.parse_size(resolution) != source_size):
+                graph.video.add(filter_graph.scale(resolution))
+
+        speed = settings.get("speed")
+        if speed and float(speed) != 1.0:
+            if settings.get("vcodec") is not None:
+                graph.video.add(filter_graph.setpts(float(speed)))
+            if settings.get("acodec") is not None:
+                graph.audio.add(filter_graph.atempo(float(speed)))
+
+        if settings.get("vcodec") is not None:
+            graph.video.add(filter_graph.eq(
+                settings.get("brightness"), settings.get("contrast"), settings.get("saturation")
+            ))
+        return graph
+
+    def attach_hardware(self, graph: FilterGraph, settings: Dict[str, Any]) -> list:
+        """
+        GPU hattı/donanım arka ucu için video zincirini uyarla
+
+        Returns:
+            -i öncesine eklenecek cihaz argümanları
+        """
+        vcodec = settings.get("vcodec")
+        if gpu_pipeline.is_enabled(settings):
+            # CUDA decode + GPU filtreleri, kareler NVENC'e kadar GPU'da kalır
+            graph.video.transform = lambda filters: gpu_pipeline.build_chain(
+                filters,
+                lambda name: gpu_pipeline.has_filter(self.ffmpeg_path, name)
+            )
+            return gpu_pipeline.input_args()
+        backend = hw_backends.backend_for(vcodec) if vcodec and vcodec != "copy" else None
+        if backend:
+            # VAAPI gibi arka uçlar cihaz açılışı ve kare yüklemesi ister
+            graph.video.tail = backend.upload_filters()
+            return backend.input_args()
+        return []
 
     def build_command(
         self,
         input_path: str,
         output_path: str,
-        settings: Dict[str, Any]
+        settings: Dict[str, Any],
+        video_info: Optional[Dict] = None
     ) -> list:
-        """FFmpeg komutunu oluştur"""
+        """FFmpeg komutunu oluştur (video_info: girdinin ffprobe bilgisi, filtre sırası için)"""
         cmd = [self.ffmpeg_path, "-y", "-hide_banner"]
 
-        # Girdi
+        # Girdi (trim_start: hızlı arama için -i'den önce)
+        trim_start = settings.get("trim_start")
+        if trim_start:
+            cmd.extend(["-ss", f"{float(trim_start):.3f}"])
         cmd.extend(["-i", input_path])
 
+        trim_duration = settings.get("trim_duration")
+        if trim_duration:
+            cmd.extend(["-t", f"{float(trim_duration):.3f}"])
+
         # Video codec
         vcodec = settings.get("vcodec")
         if vcodec is None:
@@ -81,24 +221,12 @@ class VideoConverter:
             if bitrate:
                 cmd.extend(["-b:v", bitrate])
 
-            # Preset
+            # Preset (donanım encoder'larında native ölçeğe çevrilir)
             preset = settings.get("preset")
             if preset:
-                if "nvenc" in vcodec:
-                    # NVENC preset mapping
-                    nvenc_presets = {
-                        "ultrafast": "p1",
-                        "superfast": "p2",
-                        "veryfast": "p3",
-                        "faster": "p3",
-                        "fast": "p4",
-                        "medium": "p5",
-                        "slow": "p6",
-                        "slower": "p7",
-                        "veryslow": "p7"
-                    }
-                    nvenc_preset = nvenc_presets.get(preset, preset)
-                    cmd.extend(["-preset", nvenc_preset])
+                backend = hw_backends.backend_for(vcodec)
+                if backend:
+                    cmd.extend(backend.preset_args(preset))
                 else:
                     cmd.extend(["-preset", preset])
 
@@ -116,81 +244,38 @@ class VideoConverter:
             if audio_bitrate:
                 cmd.extend(["-b:a", audio_bitrate])
 
-        # Çözünürlük
-        video_enabled = vcodec is not None
-        audio_enabled = acodec is not None
+        # Kapsayıcının taşıyamadığı ek stream'ler
+        for stream in settings.get("drop_streams") or ():
+            flag = self.STREAM_DROP_FLAGS.get(stream)
+            if flag:
+                cmd.append(flag)
 
-        resolution = settings.get("resolution")
-        if resolution and video_enabled:
-            self._merge_filter(cmd, "-vf", f"scale={resolution}")
+        # Filtreler (sıralama ve birleştirme FilterGraph'ta)
+        video_enabled = vcodec is not None
+        graph = self.build_filters(settings, video_info)
 
         # FPS
         fps = settings.get("fps")
         if fps and video_enabled:
             cmd.extend(["-r", str(fps)])
 
-        # Hız değişikliği
-        speed = settings.get("speed")
-        if speed and speed != 1.0:
-            video_filter = None
-            audio_filter = self._build_atempo_filter(float(speed))
-
-            # Yüksek hızlar için atempo zincirleme
-            if speed > 2.0:
-                remaining = speed
-                audio_filters = []
-                while remaining > 2.0:
-                    audio_filters.append("atempo=2.0")
-                    remaining /= 2.0
-                audio_filters.append(f"atempo={remaining}")
-                audio_filter = ",".join(audio_filters)
-
-            # Mevcut video filtresiyle birleştir
-            existing_vf = None
-            for i, arg in enumerate(cmd):
-                if arg == "-vf":
-                    existing_vf = i + 1
-                    break
+        if video_enabled:
+            cmd[3:3] = self.attach_hardware(graph, settings)
+        cmd.extend(graph.args())
 
-            if video_enabled:
-                if existing_vf:
-                    cmd[existing_vf] = f"{cmd[existing_vf]},setpts={1/float(speed)}*PTS"
-                else:
-                    cmd.extend(["-vf", f"setpts={1/float(speed)}*PTS"])
-
-            if audio_enabled:
-                cmd.extend(["-af", audio_filter])
-
-        # Renk ayarları
-        brightness = settings.get("brightness")
-        contrast = settings.get("contrast")
-        saturation = settings.get("saturation")
-
-        color_filters = []
-        if brightness is not None:
-            color_filters.append(f"brightness={brightness}")
-        if contrast is not None:
-            color_filters.append(f"contrast={contrast}")
-        if saturation is not None:
-            color_filters.append(f"saturation={saturation}")
-
-        if color_filters and video_enabled:
-            eq_filter = f"eq={':'.join(color_filters)}"
-
-            # Mevcut video filtresiyle birleştir
-            existing_vf = None
-            for i, arg in enumerate(cmd):
-                if arg == "-vf":
-                    existing_vf = i + 1
-                    break
+        # Encoder thread sayısı (paralel işlerde aşırı yüklenmeyi önler)
+        threads = settings.get("threads")
+        if threads:
+            cmd.extend(["-threads", str(int(threads))])
 
-            if existing_vf:
-                cmd[existing_vf] = f"{cmd[existing_vf]},{eq_filter}"
-            else:
-                cmd.extend(["-vf", eq_filter])
+        # Akış çıktısı (pipe/FIFO): uzantı olmadığından muxer açıkça verilir
+        stream_format = settings.get("stream_format")
+        if stream_format:
+            cmd.extend(self.STREAM_MUXERS[stream_format])
 
-        # İlerleme bilgisi için
-        cmd.extend(["-progress", "pipe:1"])
+        # İlerleme bilgisi için (stderr istatistik satırları kapalı);
+        # akışta stdout medya verisini taşıdığından başka hedef verilir
+        cmd.extend(["-nostats", "-progress", settings.get("progress_url") or "pipe:1"])
 
         # Çıktı
         cmd.append(output_path)
@@ -202,7 +287,8 @@ class VideoConverter:
         input_path: str,
         output_path: str,
         settings: Dict[str, Any],
-        duration: float = 0
+        duration: float = 0,
+        video_info: Optional[Dict] = None
     ):
         """
         Dönüştürmeyi başlat (async thread'de)
@@ -212,6 +298,7 @@ class VideoConverter:
             output_path: Çıktı dosya yolu
             settings: Dönüştürme ayarları
             duration: Video süresi (ilerleme hesaplama için)
+            video_info: Önceden alınmış ffprobe bilgisi (remux planı için)
         """
         if self.is_running:
             if self._error_callback:
@@ -220,14 +307,33 @@ class VideoConverter:
 
         self.is_running = True
         self.is_cancelled = False
+        self._reset_pause_state()
 
         thread = threading.Thread(
-            target=self._convert_thread,
-            args=(input_path, output_path, settings, duration)
+            target=self._plan_and_convert,
+            args=(input_path, output_path, settings, duration, video_info)
         )
         thread.daemon = True
         thread.start()
 
+    def _plan_and_convert(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        duration: float,
+        video_info: Optional[Dict]
+    ):
+        """Remux planını çıkar, ardından dönüştürme thread'ini çalıştır"""
+        try:
+            settings = self.plan_settings(input_path, output_path, settings, video_info)
+        except Exception as e:
+            self.is_running = False
+            if self._error_callback:
+                self._error_callback(str(e))
+            return
+        self._convert_thread(input_path, output_path, settings, duration)
+
     def _convert_thread(
         self,
         input_path: str,
@@ -236,60 +342,371 @@ class VideoConverter:
         duration: float
     ):
         """Dönüştürme thread'i"""
+        started = time.monotonic()
+        sampler = None
+        self.last_telemetry = None
+        self.last_returncode = None
+        self.last_log = None
+        capture = None
+        checkpoint = self.checkpoint
+        done = checkpoint["done"] if checkpoint else 0.0
+        target = self._part_path(output_path, len(checkpoint["parts"])) if checkpoint else output_path
+        self._checkpointable = self.can_checkpoint(settings, duration)
         try:
-            cmd = self.build_command(input_path, output_path, settings)
+            cmd = self.build_command(input_path, target, self._resume_settings(settings, done), self.video_info)
 
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True
-            )
+            self.process = self._start_process(cmd, settings, self.job_label(output_path))
+            sampler = self._start_sampler(self.process, self.job_label(output_path))
 
-            progress_state = {}
-            for line in self.process.stdout:
-                if self.is_cancelled:
-                    self.process.terminate()
-                    break
-
-                # İlerleme parse et
-                progress = FFmpegUtils.parse_progress(line, duration, progress_state)
-                if progress and self._progress_callback:
+            for progress in self._iter_progress(self.process, duration):
+                if done:
+                    progress = self._shift_progress(progress, done, duration)
+                if sampler:
+                    sampler.note_progress(progress)
+                if self._progress_callback:
                     self._progress_callback(progress)
 
+            # Son örnek süreç toplanmadan (zombi iken) alınır
+            if sampler:
+                sampler.stop()
             self.process.wait()
-
-            if self.is_cancelled:
-                # İptal edildiyse çıktı dosyasını sil
-                if os.path.exists(output_path):
-                    os.remove(output_path)
+            self.last_returncode = self.process.returncode
+            self.last_telemetry = self._finish_sampler(sampler, self.process)
+            sampler = None
+            capture = self._finish_stderr(self.process)
+            if capture:
+                self.last_log = capture.summary()
+
+            if self.is_stopping and not self.is_cancelled:
+                self._save_checkpoint(output_path, target, done)
+                if self._error_callback:
+                    self._error_callback("Dönüştürme duraklatıldı")
+            elif self.is_cancelled:
+                # İptal edildiyse çıktı dosyasını ve parçaları sil
+                if os.path.exists(target):
+                    os.remove(target)
+                self.discard_checkpoint(self.checkpoint)
+                self.checkpoint = None
                 if self._error_callback:
                     self._error_callback("Dönüştürme iptal edildi")
             elif self.process.returncode == 0:
+                if checkpoint:
+                    self._join_parts(checkpoint["parts"] + [target], output_path)
+                    self.checkpoint = None
+                else:
+                    # Parçalı işlerde süre sadece son parçanındır: geçmişe yazılmaz
+                    self._record_history(output_path, settings, started)
                 if self._complete_callback:
                     self._complete_callback(output_path)
             else:
                 if self._error_callback:
-                    self._error_callback(f"FFmpeg hatası (kod: {self.process.returncode})")
+                    detail = capture.message() if capture else ""
+                    self._error_callback(
+                        f"FFmpeg hatası (kod: {self.process.returncode})" + (f": {detail}" if detail else "")
+                    )
 
         except Exception as e:
             if self._error_callback:
                 self._error_callback(str(e))
         finally:
+            if sampler:
+                self.last_telemetry = self._finish_sampler(sampler, self.process)
+            if self.process is not None and capture is None:
+                self._finish_stderr(self.process)
             self.is_running = False
+            self.is_paused = False
             self.process = None
 
+    def _record_history(self, output_path: str, settings: Dict[str, Any], started: float):
+        """Biten işin gerçek süresini/boyutunu tahmin modeli için kaydet"""
+        try:
+            get_encode_history().record(
+                self.video_info, settings, time.monotonic() - started - self.paused_seconds, output_path,
+                concurrency=self.concurrency
+            )
+        except Exception as e:
+            print(f"Gecmis kaydedilemedi: {e}", file=sys.stderr)
+
+    def job_label(self, output_path: str) -> str:
+        """Metriklerdeki iş etiketi"""
+        return self.telemetry_job or os.path.basename(output_path)
+
+    def _start_sampler(self, process: subprocess.Popen, job: str) -> Optional[JobSampler]:
+        """ffmpeg sürecinin kaynak örneklemesini başlat (/proc yoksa None)"""
+        if self.metrics is None or not telemetry.supported():
+            return None
+        return JobSampler(process.pid, job, self.metrics).start()
+
+    def _finish_sampler(
+        self,
+        sampler: Optional[JobSampler],
+        process: Optional[subprocess.Popen]
+    ) -> Optional[Dict[str, Any]]:
+        """Örneklemeyi bitir, özeti metriklere bildir ve döndür"""
+        if sampler is None:
+            return None
+        summary = sampler.stop()
+        if self.is_cancelled:
+            summary["status"] = "cancelled"
+        elif process is not None and process.returncode == 0:
+            summary["status"] = "completed"
+        else:
+            summary["status"] = "failed"
+        if self.metrics:
+            self.metrics.finish(summary)
+        return summary
+
+    def process_options(self, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Bu dönüştürücünün rolü ve iş ayarlarından süreç önceliği/sınırları"""
+        return priority.resolve(settings, self.priority)
+
+    def _start_process(
+        self,
+        cmd: list,
+        settings: Optional[Dict[str, Any]] = None,
+        job: Optional[str] = None,
+        stdin=None,
+        stdout=subprocess.PIPE,
+        on_line: Optional[Callable[[bytes], bool]] = None
+    ) -> subprocess.Popen:
+        """
+        FFmpeg sürecini başlat: stdout'tan ilerleme okunur (binary), stderr
+        ayrı bir okuyucuyla boşaltılır (bkz. _finish_stderr)
+
+        Akış dönüştürmede stdin/stdout veri için kullanılır; ilerleme o zaman
+        stderr'den gelir ve on_line ile StderrCapture'a verilir.
+
+        Süreç başlamadan önce gelen duraklatma istekleri burada uygulanır:
+        stop_at_checkpoint() sonrası ffmpeg hiç başlatılmaz, pause() sonrası
+        başlar başlamaz dondurulur.
+        """
+        with self._start_lock:
+            if self.is_stopping:
+                raise RuntimeError("Dönüştürme duraklatıldı")
+            process = priority.popen(
+                cmd,
+                self.process_options(settings),
+                stdin=stdin,
+                stdout=stdout,
+                stderr=subprocess.PIPE
+            )
+            self._launched = process
+            if self._pause_pending:
+                self._pause_pending = False
+                priority.suspend_process(process)
+        capture = StderrCapture(process.stderr, job or os.path.basename(cmd[-1]), self.log_dir, process.pid,
+                                on_line)
+        with self._stderr_lock:
+            self._stderr[process.pid] = capture
+        return process
+
+    def _finish_stderr(self, process: subprocess.Popen) -> Optional[StderrCapture]:
+        """Süreç bittikten sonra stderr okuyucusunu kapat, cgroup'unu sil ve okuyucuyu döndür"""
+        with self._stderr_lock:
+            capture = self._stderr.pop(process.pid, None)
+        if capture is not None:
+            capture.close()
+        priority.release_cgroup(process)
+        return capture
+
+    def _iter_progress(self, process: subprocess.Popen, duration: float):
+        """Süreç çıktısından ilerleme sözlüklerini üret (iptalde süreci durdurur)"""
+        reader = ProgressReader(duration, rate=self.progress_rate)
+        for progress in reader.read(process.stdout, should_stop=lambda: self.is_cancelled):
+            yield progress
+        if self.is_cancelled and process.poll() is None:
+            process.terminate()
+        # Kalan çıktıyı boşalt (pipe dolup süreç bloklanmasın)
+        process.stdout.read()
+
     def cancel(self):
         """Dönüştürmeyi iptal et"""
         self.is_cancelled = True
-        if self.process:
-            self.process.terminate()
+        process = self.process
+        if process:
+            process.terminate()
+            # Dondurulmuş süreç sinyali ancak devam edince işler
+            if self.is_paused:
+                priority.resume_process(process)
+                self._mark_resumed()
+
+    def _reset_pause_state(self):
+        self.is_paused = False
+        self.is_stopping = False
+        self.paused_seconds = 0.0
+        self._paused_at = None
+        self._pause_pending = False
+        self._launched = None
+
+    def _mark_paused(self):
+        self.is_paused = True
+        self._paused_at = time.monotonic()
+
+    def _mark_resumed(self):
+        if self._paused_at is not None:
+            self.paused_seconds += time.monotonic() - self._paused_at
+        self._paused_at = None
+        self.is_paused = False
+
+    def pause(self) -> bool:
+        """
+        Çalışan ffmpeg sürecini yerinde dondur (SIGSTOP / NtSuspendProcess)
+
+        ffmpeg henüz başlamadıysa (planlama sürüyor) istek kaydedilir ve
+        süreç başlar başlamaz dondurulur.
+
+        Returns:
+            Dondurulduysa True; iş yoksa ya da platform desteklemiyorsa False
+        """
+        with self._start_lock:
+            process = self.process or self._launched
+            if not self.is_running or self.is_paused or self.is_stopping:
+                return False
+            if process is None:
+                if not priority.can_suspend():
+                    return False
+                self._pause_pending = True
+            elif not priority.suspend_process(process):
+                return False
+            self._mark_paused()
+        return True
+
+    def resume(self) -> bool:
+        """Dondurulmuş işi devam ettir"""
+        with self._start_lock:
+            process = self.process or self._launched
+            if not self.is_paused:
+                return False
+            self._pause_pending = False
+            if process is not None:
+                priority.resume_process(process)
+            self._mark_resumed()
+        return True
+
+    def can_checkpoint(self, settings: Dict[str, Any], duration: float) -> bool:
+        """
+        İş kontrol noktasında durdurulup kaldığı yerden devam edebilir mi
+
+        Sadece uzun, videosu encode edilen ve dosyaya yazan işler: copy
+        işleri -ss ile keyframe'e yuvarlanır, kısa işleri baştan almak ucuzdur.
+        """
+        vcodec = settings.get("vcodec")
+        return (
+            (duration or 0) >= self.CHECKPOINT_MIN_DURATION
+            and vcodec not in (None, "copy")
+            and not settings.get("stream_format")
+            and sys.platform != "win32"
+        )
+
+    def stop_at_checkpoint(self) -> bool:
+        """
+        İşi duraklatma olarak bitir
+
+        Uzun encode'larda ffmpeg düzgünce durdurulur (SIGINT: yazılan kısım
+        geçerli bir dosya olarak kapanır) ve parça checkpoint'e eklenir; diğer
+        işler sonlandırılır ve devam ettirilince baştan başlar. İş bitince
+        error callback'i çağrılır, is_stopping True kalır.
+
+        ffmpeg henüz başlamadıysa hiç başlatılmaz (bkz. _start_process); iş
+        mevcut checkpoint'iyle duraklatılmış olarak biter.
+
+        Returns:
+            Kaldığı yerden devam edecekse True
+        """
+        with self._start_lock:
+            process = self.process or self._launched
+            if not self.is_running:
+                return False
+            self.is_stopping = True
+            if process is None:
+                self._pause_pending = False
+                if self.is_paused:
+                    self._mark_resumed()
+                return bool(self.checkpoint)
+        graceful = self._checkpointable and priority.interrupt_process(process)
+        if not graceful:
+            process.terminate()
+        if self.is_paused:
+            priority.resume_process(process)
+            self._mark_resumed()
+        return graceful
+
+    @staticmethod
+    def _part_path(output_path: str, index: int) -> str:
+        base, ext = os.path.splitext(output_path)
+        return f"{base}.part{index}{ext}"
+
+    @staticmethod
+    def _resume_settings(settings: Dict[str, Any], done: float) -> Dict[str, Any]:
+        """Kalan kısmı encode edecek ayarlar (done: yazılmış çıktı saniyesi)"""
+        if not done:
+            return settings
+        speed = float(settings.get("speed") or 1.0)
+        resumed = dict(settings)
+        # trim_start girdi, trim_duration çıktı zaman çizgisindedir
+        resumed["trim_start"] = float(settings.get("trim_start") or 0) + done * speed
+        if settings.get("trim_duration"):
+            resumed["trim_duration"] = max(0.001, float(settings["trim_duration"]) - done)
+        return resumed
+
+    @staticmethod
+    def _shift_progress(progress: Dict[str, Any], done: float, duration: float) -> Dict[str, Any]:
+        """Devam eden parçanın ilerlemesini tüm işe göre çevir"""
+        if "current_time" in progress:
+            progress["current_time"] += done
+            if duration > 0 and progress.get("ffmpeg_progress") != "end":
+                progress["percent"] = min(100, progress["current_time"] / duration * 100)
+        return progress
+
+    def _save_checkpoint(self, output_path: str, target: str, done: float):
+        """Duraklatılan encode'un yazılan kısmını parça olarak sakla"""
+        info = None
+        if self._checkpointable and os.path.exists(target):
+            info = FFmpegUtils.get_video_info(target, use_cache=False)
+        written = (info or {}).get("duration") or 0
+        if written <= 0:
+            # Kullanılabilir kısım yok: önceki parçalar korunur, bu kısım baştan alınır
+            if os.path.exists(target):
+                os.remove(target)
+            return
+        part = self._part_path(output_path, 0) if target == output_path else target
+        if part != target:
+            os.replace(target, part)
+        parts = (self.checkpoint or {}).get("parts", []) + [part]
+        self.checkpoint = {"parts": parts, "done": round(done + written, 3)}
+
+    def _join_parts(self, parts: list, output_path: str):
+        """Parçaları yeniden encode etmeden birleştir ve sil"""
+        list_path = f"{output_path}.parts.txt"
+        with open(list_path, "w", encoding="utf-8") as handle:
+            for part in parts:
+                escaped = os.path.abspath(part).replace("'", "'\\''")
+                handle.write(f"file '{escaped}'\n")
+        cmd = [self.ffmpeg_path, "-y", "-hide_banner", "-f", "concat", "-safe", "0", "-i", list_path,
+               "-map", "0", "-c", "copy", output_path]
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+        finally:
+            os.remove(list_path)
+        if result.returncode != 0:
+            raise RuntimeError("Parcalar birlestirilemedi")
+        self.discard_checkpoint({"parts": parts})
+
+    @staticmethod
+    def discard_checkpoint(checkpoint: Optional[Dict[str, Any]]):
+        """Checkpoint parçalarını sil"""
+        for part in (checkpoint or {}).get("parts", []):
+            try:
+                os.remove(part)
+            except OSError:
+                pass
 
     def convert_sync(
         self,
         input_path: str,
         output_path: str,
-        settings: Dict[str, Any]
+        settings: Dict[str, Any],
+        video_info: Optional[Dict] = None
     ) -> tuple:
         """
         Senkron dönüştürme (test/CLI için)
@@ -298,18 +715,33 @@ class VideoConverter:
             (success: bool, message: str)
         """
         try:
-            cmd = self.build_command(input_path, output_path, settings)
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True
-            )
-
-            if result.returncode == 0:
+            settings = self.plan_settings(input_path, output_path, settings, video_info)
+            cmd = self.build_command(input_path, output_path, settings, self.video_info)
+
+            started = time.monotonic()
+            self.last_log = None
+            process = self._start_process(cmd, settings, self.job_label(output_path))
+            sampler = self._start_sampler(process, self.job_label(output_path))
+            try:
+                duration = (self.video_info or {}).get("duration") or 0
+                for progress in self._iter_progress(process, duration):
+                    if sampler:
+                        sampler.note_progress(progress)
+                if sampler:
+                    sampler.stop()
+                process.wait()
+            finally:
+                self.last_telemetry = self._finish_sampler(sampler, process)
+                capture = self._finish_stderr(process)
+            if capture:
+                self.last_log = capture.summary()
+
+            if process.returncode == 0:
+                self._record_history(output_path, settings, started)
                 return True, "Dönüştürme başarılı"
             else:
-                return False, result.stderr
+                # Tüm stderr yerine sınırlı özet (ayrıntı last_log / günlük dosyasında)
+                return False, capture.message(self.SYNC_ERROR_LINES) if capture else ""
 
         except Exception as e:
             return False, str(e)
@@ -318,28 +750,61 @@ class VideoConverter:
 class BatchConverter:
     """Toplu video dönüştürücü"""
 
-    def __init__(self):
+    def __init__(self, job_store: Optional[JobStore] = None, output_cache: Optional[OutputCache] = None):
         self.converter = VideoConverter()
+        self.job_store = job_store
+        # Verilirse aynı girdi/ayar/ffmpeg için bitmiş çıktı yeniden kullanılır
+        self.output_cache = output_cache
         self.queue: list = []
         self.current_index = 0
         self.is_running = False
         self.is_cancelled = False
+        # pause() ile tüm kuyruk duraklatıldı: yeni eklenen işler de bekler
+        self.is_paused = False
+        self.keep_alive = False
+        # İzleme modunda bellekte tutulan bitmiş iş sayısı; daha eskileri
+        # kuyruğun başından atılır (indeksler queue_offset ile korunur)
+        self.keep_finished = 1000
+        self.queue_offset = 0
+        self._pruned_duration = 0.0
         self.max_workers = 1
+        self.priority = priority.BACKGROUND
+        # İş başına gzip'li ffmpeg günlüklerinin klasörü (None: sadece bellekte özet)
+        self.log_dir: Optional[str] = self.converter.log_dir
+        self.probe_workers = min(8, os.cpu_count() or 1)
+        self.probe_summary: Dict[str, Any] = {}
+        # > 0 ise başlamadan önce grup başına bu kadar pencere ile kalibre et
+        self.calibration_windows = 0
+        self._calibrator = None
+        self.scheduler: Optional[ResourceScheduler] = None
+        # Başarısız işlerin tekrar/geri düşme politikası (None: tekrar yok)
+        self.retry_policy: Optional[RetryPolicy] = RetryPolicy()
+        # Bitişte işlerin telemetri özeti (bkz. telemetry.summarize)
+        self.telemetry_summary: Dict[str, Any] = {}
+        # İşlerin örnekleri buraya yayınlanır (None: telemetri kapalı)
+        self.metrics: Optional[MetricsRegistry] = None
         self._lock = threading.Lock()
-        self._active_converters = []
+        # Kuyruk indeksi -> çalışan dönüştürücü
+        self._active_converters: Dict[int, VideoConverter] = {}
         self._batch_progress_callback: Optional[Callable] = None
         self._item_progress_callback: Optional[Callable] = None
         self._batch_complete_callback: Optional[Callable] = None
+        self._probe_complete_callback: Optional[Callable] = None
+        self._retry_callback: Optional[Callable] = None
 
     def set_callbacks(
         self,
         batch_progress: Optional[Callable] = None,
         item_progress: Optional[Callable] = None,
-        complete: Optional[Callable] = None
+        complete: Optional[Callable] = None,
+        probe_complete: Optional[Callable] = None,
+        retry: Optional[Callable] = None
     ):
         self._batch_progress_callback = batch_progress
         self._item_progress_callback = item_progress
         self._batch_complete_callback = complete
+        self._probe_complete_callback = probe_complete
+        self._retry_callback = retry
 
     def add_to_queue(
         self,
@@ -348,36 +813,246 @@ class BatchConverter:
         settings: Dict[str, Any]
     ):
         """Kuyruğa ekle"""
-        self.queue.append({
+        item = {
             "input": input_path,
             "output": output_path,
             "settings": settings,
             "status": "pending",
-            "progress": 0
-        })
+            "progress": 0,
+            "attempts": 0
+        }
+        if self.job_store:
+            item["job_id"] = self.job_store.add(input_path, output_path, settings)
+        with self._lock:
+            self.queue.append(item)
+        return item
+
+    def enqueue(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Çalışan kuyruğa yeni iş ekle (izleme modu)
+
+        Dosya hemen taranır; okunamayan girdiler encode slotu almadan
+        'failed' olur. Beklemedeki dispatcher uyandırılır.
+        """
+        item = self.add_to_queue(input_path, output_path, settings)
+        if item.get("status") == "pending":
+            info = FFmpegUtils.get_video_info(input_path)
+            item["info"] = info
+            try:
+                item["input_size"] = os.path.getsize(input_path)
+            except OSError:
+                item["input_size"] = 0
+            if info:
+                item["duration"] = info.get("duration", 0) or 0
+                self._plan_item(item)
+                self._restore_cached(item)
+            else:
+                self._set_status(item, "failed", "Dosya okunamadi (ffprobe)")
+        if self.is_paused and item.get("status") == "pending":
+            self._set_status(item, "paused")
+
+        scheduler = self.scheduler
+        if scheduler:
+            with scheduler.condition:
+                scheduler.condition.notify_all()
+        self._prune_finished()
+        return item
+
+    def resume_from_store(self) -> int:
+        """Yarım kalan işleri depodan kuyruğa yükle, yüklenen iş sayısını döndür"""
+        if not self.job_store:
+            return 0
+
+        jobs = []
+        for job in self.job_store.load_unfinished():
+            if not os.path.exists(job["input"]):
+                self.job_store.update(job["job_id"], status="failed", error="Girdi dosyasi bulunamadi")
+                continue
+            # Aynı iş (aynı ayar ve değişmemiş girdi) başka bir kayıtla
+            # doğrulanmış olarak bittiyse tekrar yapılmaz
+            if self.job_store.find_verified_output(job["input"], job["output"], job["settings"]):
+                VideoConverter.discard_checkpoint(job.pop("checkpoint", None))
+                job.pop("interrupted", None)
+                job["progress"] = 100
+                job["skipped"] = True
+                self._set_status(job, "completed")
+            jobs.append(job)
+
+        with self._lock:
+            self.queue.extend(jobs)
+        return len(jobs)
 
     def clear_queue(self):
         """Kuyruğu temizle"""
+        if self.job_store:
+            self.job_store.discard([item["job_id"] for item in self.queue if "job_id" in item])
         self.queue.clear()
+        self.queue_offset = 0
+        self._pruned_duration = 0.0
         self.current_index = 0
 
-    def start(self, max_workers: int = 1):
-        """Toplu dönüştürmeyi başlat"""
-        if not self.queue:
+    def _set_status(self, item: Dict[str, Any], status: str, error: Optional[str] = None):
+        """Kuyruk öğesinin durumunu güncelle ve depoya yansıt"""
+        item["status"] = status
+        if error is not None:
+            item["error"] = error
+
+        job_id = item.get("job_id")
+        if not self.job_store or job_id is None:
+            return
+        if status == "completed":
+            self.job_store.mark_completed(job_id, item["output"])
+        else:
+            self.job_store.update(job_id, status=status, error=error, attempts=item.get("attempts", 0),
+                                  checkpoint=item.get("checkpoint"))
+
+    def start(self, max_workers: int = 1, keep_alive: bool = False):
+        """
+        Toplu dönüştürmeyi başlat
+
+        keep_alive=True ise kuyruk boşalınca durmaz, enqueue() ile gelen
+        yeni işleri bekler (stop() çağrılana kadar).
+        """
+        if not self.queue and not keep_alive:
             return
 
         self.is_running = True
         self.is_cancelled = False
+        self.is_paused = False
+        self.keep_alive = keep_alive
         self.current_index = 0
         self.max_workers = max(1, int(max_workers or 1))
 
         for item in self.queue:
+            if item.get("skipped"):
+                continue
             item["status"] = "pending"
             item["progress"] = 0
+            item.pop("error", None)
+            item.pop("retry_at", None)
 
         thread = threading.Thread(target=self._process_parallel, daemon=True)
         thread.start()
 
+    def probe_queue(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Kuyruktaki tüm dosyaları sınırlı bir thread havuzuyla önceden tara
+
+        Süre ve stream bilgilerini kuyruğa yazar, okunamayan girdileri
+        encode slotu kullanılmadan 'failed' olarak işaretler.
+
+        Önbellekte karşılığı olan işler burada tamamlanır (cached sayısı).
+
+        Returns:
+            {"total_duration", "total_bytes", "readable", "unreadable",
+             "cached", "estimated_seconds"}
+        """
+        workers = max(1, int(max_workers or self.probe_workers))
+        pending = [item for item in self.queue if item.get("status", "pending") in ("pending", "paused")]
+
+        def probe(item):
+            if "info" not in item:
+                item["info"] = FFmpegUtils.get_video_info(item["input"])
+            try:
+                item["input_size"] = os.path.getsize(item["input"])
+            except OSError:
+                item["input_size"] = 0
+            return item
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                list(pool.map(probe, pending))
+
+        summary = {"total_duration": 0.0, "total_bytes": 0, "readable": 0, "unreadable": 0,
+                   "cached": 0, "estimated_seconds": 0.0}
+        for item in pending:
+            if self.is_cancelled:
+                break
+            info = item.get("info")
+            if not info:
+                self._set_status(item, "failed", "Dosya okunamadi (ffprobe)")
+                summary["unreadable"] += 1
+                continue
+            item["duration"] = info.get("duration", 0) or 0
+            self._plan_item(item)
+            summary["readable"] += 1
+            if self._restore_cached(item):
+                summary["cached"] += 1
+                continue
+            summary["total_duration"] += item["duration"]
+            summary["total_bytes"] += item.get("input_size", 0)
+            summary["estimated_seconds"] += Estimator.estimate_seconds(info, item["settings"])
+
+        # Paralel işçiler toplam süreyi kabaca böler
+        summary["estimated_seconds"] /= max(1, self.max_workers)
+        self.probe_summary = summary
+        return summary
+
+    def _plan_item(self, item: Dict[str, Any]):
+        """
+        Remux planını kuyruk öğesine uygula
+
+        Scheduler'ın işi doğru sınıflandırması (copy -> I/O bütçesi) için
+        plan encode slotu ayrılmadan önce çıkarılır.
+        """
+        decision = RemuxPlanner.plan(item.get("info"), item["settings"], item["output"])
+        item["plan"] = decision
+        if decision["changed"]:
+            # Kopyalama reddedilirse istenen encoder'a dönülebilsin
+            item.setdefault("requested", item["settings"])
+            item["settings"] = RemuxPlanner.apply(item["settings"], decision)
+            item.pop("job_class", None)
+            # Eski ayarlarla yazılan parçalar yeni ayarlarla birleştirilemez
+            VideoConverter.discard_checkpoint(item.pop("checkpoint", None))
+            item.pop("interrupted", None)
+
+    def _restore_cached(self, item: Dict[str, Any]) -> bool:
+        """
+        Aynı iş önbellekte varsa çıktıyı oradan yerleştir ve işi tamamla
+
+        Yoksa parmak izi, iş bitince çıktının önbelleğe eklenmesi için saklanır.
+        """
+        cache = self.output_cache
+        if not cache or not cache.enabled:
+            return False
+        fingerprint = cache.fingerprint(item["input"], item["output"], item["settings"])
+        if not fingerprint:
+            return False
+        item["cache_key"] = fingerprint
+        method = cache.restore(fingerprint, item["output"])
+        if not method:
+            return False
+        item["cached"] = method
+        item["progress"] = 100
+        # Yarım kalmış denemenin parçalarına artık gerek yok
+        VideoConverter.discard_checkpoint(item.pop("checkpoint", None))
+        item.pop("interrupted", None)
+        self._set_status(item, "completed")
+        return True
+
+    def _store_cached(self, item: Dict[str, Any]):
+        fingerprint = item.get("cache_key")
+        if self.output_cache and fingerprint:
+            self.output_cache.store(fingerprint, item["output"])
+
+    def media_progress(self) -> tuple:
+        """(işlenen medya süresi, toplam medya süresi) saniye cinsinden"""
+        processed = self._pruned_duration
+        total = self._pruned_duration
+        for item in self.queue:
+            duration = item.get("duration", 0) or 0
+            total += duration
+            if item.get("status") in ("completed", "failed", "cancelled"):
+                processed += duration
+            elif item.get("status") in ("processing", "paused"):
+                processed += duration * (item.get("progress", 0) or 0) / 100
+        return processed, total
+
     def _process_next(self):
         """Sıradaki dosyayı işle"""
         if self.current_index >= len(self.queue):
@@ -417,82 +1092,362 @@ class BatchConverter:
             duration
         )
 
+    def calibrate_queue(self, windows: int = 3, window_seconds: float = 5.0) -> Dict[str, Any]:
+        """
+        Okunabilen bekleyen işleri (çözünürlük, codec, preset) grubu başına
+        bir kez deneme encode'u ile kalibre et
+
+        Returns:
+            Calibrator.calibrate_items sonucu; süreler işçi sayısına bölünmüş
+        """
+        # calibration modülü VideoConverter'a bağlı olduğu için burada yüklenir
+        from .calibration import Calibrator
+
+        self._calibrator = Calibrator(windows=windows, window_seconds=window_seconds)
+        self._calibrator.converter.priority = self.priority
+        self._calibrator.converter.log_dir = self.log_dir
+        items = [item for item in self.queue if item.get("status") == "pending" and item.get("info")]
+        try:
+            totals = self._calibrator.calibrate_items(items)
+        finally:
+            self._calibrator = None
+        workers = max(1, self.max_workers)
+        totals["seconds"] = tuple(value / workers for value in totals["seconds"])
+        return totals
+
     def _process_parallel(self):
+        started = time.monotonic()
+        summary = self.probe_queue()
+        if self.calibration_windows and not self.is_cancelled:
+            summary["calibration"] = self.calibrate_queue(self.calibration_windows)
+        if self._probe_complete_callback:
+            self._probe_complete_callback(summary)
+        if summary["unreadable"] and self._batch_progress_callback:
+            self._batch_progress_callback(self._completed_count(), self.queue_offset + len(self.queue), self.queue)
+
+        self.scheduler = ResourceScheduler(encode_slots=self.max_workers)
+        cond = self.scheduler.condition
         workers = []
-        worker_count = min(self.max_workers, len(self.queue))
 
-        for _ in range(worker_count):
-            thread = threading.Thread(target=self._worker_loop, daemon=True)
+        while not self.is_cancelled:
+            with cond:
+                index, item, cost = self._next_admissible()
+                if item is None:
+                    if (self.scheduler.running == 0 and not self._has_pending()
+                            and not self.keep_alive):
+                        break
+                    cond.wait(0.5)
+                    continue
+
+            thread = threading.Thread(
+                target=self._run_item,
+                args=(index, item, cost),
+                daemon=True
+            )
+            # Uzun süren izleme modunda biten thread'leri biriktirme
+            workers = [worker for worker in workers if worker.is_alive()]
             workers.append(thread)
             thread.start()
 
         for thread in workers:
             thread.join()
 
+        self.telemetry_summary = telemetry.summarize(
+            [item["telemetry"] for item in self.queue if item.get("telemetry")],
+            time.monotonic() - started, self.max_workers
+        )
+        if self.telemetry_summary["jobs"] and self.metrics:
+            self.metrics.record("batch", **self.telemetry_summary)
         self.is_running = False
         if self._batch_complete_callback:
             self._batch_complete_callback(self.queue)
 
-    def _next_item(self):
+    def _has_pending(self) -> bool:
         with self._lock:
-            if self.current_index >= len(self.queue):
-                return None, None
+            return any(item.get("status") in ("pending", "paused") for item in self.queue)
 
-            index = self.current_index
-            self.current_index += 1
-            item = self.queue[index]
-            item["status"] = "processing"
-            return index, item
+    def _next_admissible(self):
+        """
+        Bütçeye sığan ilk bekleyen işi seç (scheduler kilidi tutulurken çağrılır)
+
+        Sıradaki ağır bir encode beklerken arkasındaki remux'lar
+        I/O bütçesinden çalışmaya devam edebilir.
+        """
+        blocked = set()
+        now = time.monotonic()
+        with self._lock:
+            for index, item in enumerate(self.queue, self.queue_offset):
+                if item.get("status") != "pending":
+                    continue
+                # Tekrar denemesi bekleme süresinde
+                if item.get("retry_at", 0) > now:
+                    continue
+                job_class = item.get("job_class") or classify_job(item["settings"])
+                item["job_class"] = job_class
+                # Aynı sınıf içinde sıra korunur
+                if job_class in blocked:
+                    continue
+                cost = self.scheduler.job_cost(job_class)
+                if self.scheduler.try_acquire(cost):
+                    # Duraklatılıp devam eden iş yeni bir deneme sayılmaz
+                    if not item.pop("interrupted", False):
+                        item["attempts"] = item.get("attempts", 0) + 1
+                    self._set_status(item, "processing")
+                    return index, item, cost
+                blocked.add(job_class)
+        return None, None, None
 
     def _completed_count(self) -> int:
-        return sum(1 for item in self.queue if item.get("status") in ("completed", "failed", "cancelled"))
+        finished = sum(1 for item in self.queue if item.get("status") in ("completed", "failed", "cancelled"))
+        return self.queue_offset + finished
 
-    def _worker_loop(self):
-        while not self.is_cancelled:
-            index, item = self._next_item()
-            if item is None:
+    def _prune_finished(self):
+        """
+        İzleme modunda kuyruğun başındaki eski bitmiş işleri bellekten at
+
+        Uzun süren serviste kuyruk (ve her olayda yapılan taramalar)
+        sınırsız büyümez. Sadece baştaki kesintisiz bitmiş bölüm atılır,
+        böylece çalışan işlerin indeksleri değişmez.
+        """
+        if not self.keep_alive:
+            return
+        with self._lock:
+            lead = 0
+            for item in self.queue:
+                if item.get("status") not in ("completed", "failed", "cancelled"):
+                    break
+                lead += 1
+            drop = lead - self.keep_finished
+            if drop <= 0:
                 return
+            self._pruned_duration += sum(item.get("duration", 0) or 0 for item in self.queue[:drop])
+            del self.queue[:drop]
+            self.queue_offset += drop
+
+    def _job_settings(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Scheduler'ın belirlediği thread sayısını ayarlara ekle"""
+        settings = dict(item["settings"])
+        threads = self.scheduler.threads_for(item["job_class"])
+        if threads and not settings.get("threads"):
+            settings["threads"] = threads
+        return settings
+
+    def _run_item(self, index: int, item: Dict[str, Any], cost: Dict[str, int]):
+        converter = VideoConverter()
+        # Toplam callback hızı işçi sayısından bağımsız kalsın
+        converter.progress_rate = max(0.5, VideoConverter.PROGRESS_RATE / self.max_workers)
+        converter.concurrency = max(1, self.scheduler.running)
+        converter.telemetry_job = f"{index}:{os.path.basename(item['output'])}"
+        # Toplu işler ön plandaki dönüştürmeyi ve arayüzü yavaşlatmasın
+        converter.priority = self.priority
+        converter.log_dir = self.log_dir
+        converter.metrics = self.metrics
+        converter.checkpoint = item.get("checkpoint")
+        with self._lock:
+            self._active_converters[index] = converter
 
-            converter = VideoConverter()
+        done = threading.Event()
+
+        def on_progress(progress):
+            item["progress"] = progress.get("percent", item.get("progress", 0))
+            if self._item_progress_callback:
+                self._item_progress_callback(index, item, progress)
+
+        def on_complete(output):
+            item["progress"] = 100
+            if converter.last_telemetry:
+                item["telemetry"] = converter.last_telemetry
+            if converter.last_log:
+                item["log"] = converter.last_log
+            item.pop("checkpoint", None)
+            # Önceki başarısız denemenin hatası kalmasın (ayrıntı item["retries"]'te)
+            item.pop("error", None)
+            self._store_cached(item)
+            self._set_status(item, "completed")
+            done.set()
+
+        def on_error(error):
+            if converter.last_telemetry:
+                item["telemetry"] = converter.last_telemetry
+            if converter.last_log:
+                item["log"] = converter.last_log
+            if converter.is_stopping and not self.is_cancelled:
+                # Kontrol noktasında duraklatıldı: resume() ile kaldığı yerden
+                item["checkpoint"] = converter.checkpoint
+                item["interrupted"] = True
+                item.pop("suspended", None)
+                self._set_status(item, "pending" if item.pop("resume", False) else "paused", error)
+            elif self.is_cancelled:
+                self._set_status(item, "cancelled", error)
+            elif not self._schedule_retry(index, item, error, converter.last_returncode):
+                self._set_status(item, "failed", error)
+            done.set()
+
+        converter.set_callbacks(progress=on_progress, complete=on_complete, error=on_error)
+
+        try:
+            duration = item.get("duration")
+            if duration is None:
+                info = FFmpegUtils.get_video_info(item["input"])
+                duration = info.get("duration", 0) if info else 0
+            # Önbellekten hardlink ile gelmiş eski çıktı üzerine yazılmasın
+            detach(item["output"])
+            converter.convert(item["input"], item["output"], self._job_settings(item), duration,
+                              video_info=item.get("info"))
+            done.wait()
+        finally:
             with self._lock:
-                self._active_converters.append(converter)
+                if self._active_converters.get(index) is converter:
+                    del self._active_converters[index]
+            self.scheduler.release(cost)
 
-            done = threading.Event()
+        if self._batch_progress_callback:
+            self._batch_progress_callback(self._completed_count(), self.queue_offset + len(self.queue), self.queue)
+        self._prune_finished()
 
-            def on_progress(progress):
-                item["progress"] = progress.get("percent", item.get("progress", 0))
-                if self._item_progress_callback:
-                    self._item_progress_callback(index, item, progress)
+    def _schedule_retry(self, index: int, item: Dict[str, Any], error: str, returncode: Optional[int]) -> bool:
+        """
+        Başarısız işi politikaya göre tekrar sıraya koy
 
-            def on_complete(output):
-                item["status"] = "completed"
-                item["progress"] = 100
-                done.set()
+        Geri düşme adımında iş yeni ayarlarla hemen, geçici hatada
+        bekleme süresi dolunca tekrar denenir.
+        """
+        policy = self.retry_policy
+        if not policy:
+            return False
+        plan = policy.plan(item["settings"], error, returncode, item.get("attempts", 0),
+                           item["output"], item.get("requested"))
+        if plan is None:
+            return False
+
+        if plan["settings"] is not item["settings"]:
+            item["settings"] = plan["settings"]
+            item.pop("job_class", None)
+            # Önceki ayarlarla yazılan parçalar ve önbellek anahtarı geçersiz
+            VideoConverter.discard_checkpoint(item.pop("checkpoint", None))
+            item.pop("cache_key", None)
+        item.setdefault("retries", []).append({
+            "attempt": item.get("attempts", 0),
+            "failure": plan["failure"],
+            "step": plan["step"],
+            "delay": plan["delay"],
+            "error": error,
+        })
+        if plan["delay"]:
+            item["retry_at"] = time.monotonic() + plan["delay"]
+        else:
+            item.pop("retry_at", None)
+        item["progress"] = 0
+        self._set_status(item, "paused" if self.is_paused else "pending", error)
+        if self._retry_callback:
+            self._retry_callback(index, item, plan)
+        return True
+
+    def stop(self):
+        """İzleme modunu kapat: bekleyen ve çalışan işler bitince durur"""
+        self.keep_alive = False
+        scheduler = self.scheduler
+        if scheduler:
+            with scheduler.condition:
+                scheduler.condition.notify_all()
+
+    def _targets(self, index: Optional[int]):
+        if index is None:
+            return list(enumerate(self.queue, self.queue_offset))
+        position = index - self.queue_offset
+        return [(index, self.queue[position])] if 0 <= position < len(self.queue) else []
+
+    def pause(self, index: Optional[int] = None, checkpoint: bool = False) -> int:
+        """
+        Tüm kuyruğu (index=None) ya da tek bir işi duraklat
 
-            def on_error(error):
-                item["status"] = "cancelled" if self.is_cancelled else "failed"
-                item["error"] = error
-                done.set()
+        Bekleyen işler başlamaz. Çalışan işler yerinde dondurulur (slotu ve
+        belleği tutar); checkpoint=True ise ya da platform dondurmayı
+        desteklemiyorsa kontrol noktasında durdurulur ve slotu bırakır:
+        uzun encode'lar devam edince kaldığı yerden sürer.
 
-            converter.set_callbacks(progress=on_progress, complete=on_complete, error=on_error)
+        Returns:
+            Duraklatılan iş sayısı
+        """
+        if index is None:
+            self.is_paused = True
+        count = 0
+        with self._lock:
+            targets = self._targets(index)
+            active = dict(self._active_converters)
+        for position, item in targets:
+            status = item.get("status")
+            if status == "pending":
+                self._set_status(item, "paused")
+                count += 1
+            elif status == "processing" and position in active:
+                converter = active[position]
+                if not checkpoint and converter.pause():
+                    item["suspended"] = True
+                    self._set_status(item, "paused")
+                    count += 1
+                elif converter.stop_at_checkpoint():
+                    # Süreç bitince on_error durumu 'paused' yapar
+                    count += 1
+                elif converter.is_stopping:
+                    count += 1
+            elif status == "paused" and checkpoint and item.get("suspended") and position in active:
+                # Dondurulmuş işi slotunu bırakacak şekilde durdur
+                active[position].stop_at_checkpoint()
+        return count
+
+    def resume(self, index: Optional[int] = None) -> int:
+        """
+        Duraklatılmış işleri devam ettir
 
-            info = FFmpegUtils.get_video_info(item["input"])
-            duration = info.get("duration", 0) if info else 0
-            converter.convert(item["input"], item["output"], item["settings"], duration)
-            done.wait()
+        Dondurulmuş işler kaldığı yerden sürer, diğerleri (checkpoint'li
+        olanlar dahil) yeniden sıraya girer.
 
-            with self._lock:
-                if converter in self._active_converters:
-                    self._active_converters.remove(converter)
+        Returns:
+            Devam ettirilen iş sayısı
+        """
+        if index is None:
+            self.is_paused = False
+        count = 0
+        with self._lock:
+            targets = self._targets(index)
+            active = dict(self._active_converters)
+        for position, item in targets:
+            if item.get("status") != "paused":
+                continue
+            converter = active.get(position)
+            if item.pop("suspended", False) and converter and not converter.is_stopping:
+                converter.resume()
+                self._set_status(item, "processing")
+            elif converter is None:
+                self._set_status(item, "pending")
+            else:
+                # Kontrol noktasında durması bekleniyor: bitince sıraya girer
+                item["resume"] = True
+            count += 1
 
-            if self._batch_progress_callback:
-                self._batch_progress_callback(self._completed_count(), len(self.queue), self.queue)
+        scheduler = self.scheduler
+        if scheduler:
+            with scheduler.condition:
+                scheduler.condition.notify_all()
+        return count
 
     def cancel(self):
         """Toplu dönüştürmeyi iptal et"""
         self.is_cancelled = True
         self.converter.cancel()
+        calibrator = self._calibrator
+        if calibrator:
+            calibrator.cancel()
         with self._lock:
-            for converter in list(self._active_converters):
+            for converter in list(self._active_converters.values()):
                 converter.cancel()
+            pending = [item["job_id"] for item in self.queue
+                       if "job_id" in item and item.get("status") in ("pending", "paused")]
+            for item in self.queue:
+                if item.get("status") != "processing":
+                    VideoConverter.discard_checkpoint(item.pop("checkpoint", None))
+        if self.job_store:
+            # Kullanıcı iptal etti: bekleyenler bir sonraki açılışta devam etmesin
+            self.job_store.discard(pending)
         self.is_running = False
@@ -1,6 +1,10 @@
 """Dosya boyutu ve süre tahmini"""
 from typing import Dict, Optional, Tuple
 
+from .history import EncodeHistory, get_encode_history
+from .hw_backends import backend_for
+from .units import parse_bitrate
+
 
 class Estimator:
     """Dönüştürme tahmini hesaplama"""
@@ -19,7 +23,7 @@ class Estimator:
         "veryslow": 0.3
     }
 
-    # GPU (NVENC) encoding ortalama hızları
+    # GPU (NVENC) encoding ortalama hızları; diğer arka uçlar speed_factor ile ölçeklenir
     GPU_SPEEDS = {
         "p1": 50.0,
         "p2": 40.0,
@@ -39,7 +43,8 @@ class Estimator:
         video_bitrate: int,
         audio_bitrate: int = 192,
         audio_only: bool = False,
-        copy_mode: bool = False
+        copy_mode: bool = False,
+        size_ratio: Optional[float] = None
     ) -> int:
         """
         Tahmini dosya boyutu hesapla
@@ -50,6 +55,7 @@ class Estimator:
             audio_bitrate: Audio bitrate (kbps)
             audio_only: Sadece ses mi
             copy_mode: Sadece format değiştirme (codec kopyalama)
+            size_ratio: Geçmişten öğrenilen gerçek/hesaplanan boyut oranı
 
         Returns:
             Tahmini boyut (byte)
@@ -72,8 +78,8 @@ class Estimator:
             total_bitrate = video_bitrate + audio_bitrate  # kbps
             size_bytes = (total_bitrate * 1000 * duration) / 8
 
-        # %5 overhead ekle (container, metadata vs.)
-        size_bytes *= 1.05
+        # Öğrenilmiş oran yoksa %5 overhead ekle (container, metadata vs.)
+        size_bytes *= size_ratio if size_ratio else 1.05
 
         return int(size_bytes)
 
@@ -82,7 +88,9 @@ class Estimator:
         video_duration: float,
         preset: str,
         is_gpu: bool,
-        speed_factor: float = 1.0
+        speed_factor: float = 1.0,
+        settings: Optional[Dict] = None,
+        video_info: Optional[Dict] = None
     ) -> float:
         """
         Tahmini dönüştürme süresi hesapla
@@ -92,12 +100,22 @@ class Estimator:
             preset: Encoding preset
             is_gpu: GPU kullanılıyor mu
             speed_factor: Video hız faktörü (2x hızlandırma = 0.5 süre)
+            settings/video_info: Verilirse bu makinenin geçmişinden
+                öğrenilen hız kullanılır
 
         Returns:
             Tahmini süre (saniye)
         """
-        if is_gpu:
+        if settings is not None and video_info:
+            learned = get_encode_history().predict_speed(settings, video_info)
+            if learned:
+                return video_duration / max(speed_factor, 1e-6) / learned
+
+        backend = backend_for((settings or {}).get("vcodec"))
+        if is_gpu or backend:
             speed = Estimator.GPU_SPEEDS.get(preset, 20.0)
+            if backend:
+                speed *= backend.speed_factor
         else:
             speed = Estimator.CPU_SPEEDS.get(preset, 2.5)
 
@@ -198,26 +216,14 @@ class Estimator:
         Returns:
             Formatlanmış tahmin
         """
-        duration = video_info.get("duration", 0)
         audio_only = preset_settings.get("audio_only", False)
-        speed = preset_settings.get("speed", 1.0)
 
-        # Bitrate parse et
-        bitrate_str = preset_settings.get("bitrate", "5000k")
-        if isinstance(bitrate_str, str):
-            video_bitrate = int(bitrate_str.replace("k", "").replace("K", ""))
-        else:
-            video_bitrate = bitrate_str
-
-        audio_bitrate_str = preset_settings.get("audio_bitrate", "192k")
-        if isinstance(audio_bitrate_str, str):
-            audio_bitrate = int(audio_bitrate_str.replace("k", "").replace("K", ""))
-        else:
-            audio_bitrate = audio_bitrate_str
+        # Bitrate parse et (kbps)
+        video_bitrate = parse_bitrate(preset_settings.get("bitrate", "5000k")) // 1000
+        audio_bitrate = parse_bitrate(preset_settings.get("audio_bitrate", "192k")) // 1000 or None
 
-        # Hız etkisi
-        if speed != 1.0:
-            duration = duration / speed
+        # Hız ve kırpma etkisi (geçmişteki size_ratio da çıktı süresiyle ölçülür)
+        duration = EncodeHistory.output_duration(float(video_info.get("duration") or 0), preset_settings)
 
         # Copy mode kontrolü
         vcodec = preset_settings.get("vcodec", "")
@@ -228,24 +234,46 @@ class Estimator:
         )
 
         # Boyut tahmini
+        history = get_encode_history()
         file_size = Estimator.estimate_file_size(
-            duration, video_bitrate, audio_bitrate, audio_only, copy_mode
+            duration, video_bitrate, audio_bitrate, audio_only, copy_mode,
+            size_ratio=None if copy_mode else history.size_ratio(preset_settings)
         )
 
         # Süre tahmini
-        if copy_mode:
-            # Copy modunda sadece kopyalama yapılır, çok hızlı
-            # Tahmini: 100 MB/s I/O hızı varsayarak
-            file_size_mb = video_info.get("size", 0) / (1024 * 1024)
-            encoding_duration = max(1, file_size_mb / 100)  # En az 1 saniye
-        else:
-            is_gpu = preset_settings.get("gpu", False)
-            preset_name = preset_settings.get("preset", "medium")
-            encoding_duration = Estimator.estimate_duration(
-                video_info.get("duration", 0),
-                preset_name or "medium",
-                is_gpu,
-                speed
-            )
+        encoding_duration = Estimator.estimate_seconds(video_info, preset_settings, copy_mode)
 
         return Estimator.format_estimate(file_size, encoding_duration, video_info)
+
+    @staticmethod
+    def estimate_seconds(
+        video_info: Dict,
+        preset_settings: Dict,
+        copy_mode: Optional[bool] = None
+    ) -> float:
+        """
+        Tek bir işin tahmini duvar saati süresi (saniye)
+
+        Geçmiş varsa bu makinenin ölçülen hızını, yoksa sabitleri kullanır.
+        """
+        if copy_mode is None:
+            copy_mode = (
+                preset_settings.get("vcodec") == "copy" or
+                preset_settings.get("category") == "copy" or
+                preset_settings.get("copy_mode", False)
+            )
+
+        if copy_mode:
+            # Copy modunda sadece kopyalama yapılır, çok hızlı
+            # Geçmiş yoksa 100 MB/s I/O hızı varsayılır
+            throughput = get_encode_history().copy_throughput() or 100 * 1024 * 1024
+            return max(1, video_info.get("size", 0) / throughput)  # En az 1 saniye
+
+        return Estimator.estimate_duration(
+            video_info.get("duration", 0),
+            preset_settings.get("preset") or "medium",
+            preset_settings.get("gpu", False),
+            preset_settings.get("speed") or 1.0,
+            settings=preset_settings,
+            video_info=video_info
+        )
@@ -0,0 +1,208 @@
+"""ffmpeg stderr'i: ayrı okuyucu, sınırlı halka tampon, sıkıştırılmış iş günlüğü ve uyarı/hata dizini"""
+import gzip
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Any, List, Optional
+
+# Verilirse her ffmpeg süreci için <klasör>/<iş>-<zaman>-<pid>.log.gz yazılır
+LOG_DIR_ENV = "TMVC_FFMPEG_LOG_DIR"
+
+_ERROR_RE = re.compile(
+    r"error|failed|invalid|cannot|could not|couldn't|unable|not supported|no such|"
+    r"unknown encoder|unknown decoder|permission denied|not found|conversion failed|killed",
+    re.IGNORECASE
+)
+_WARNING_RE = re.compile(
+    r"warning|deprecated|discard|non[- ]monoton|past duration|too many packets buffered|"
+    r"application provided invalid|corrupt|missing|truncat|mismatch|guessed|overread|"
+    r"concealing|skipping|dropping|queue input is backward",
+    re.IGNORECASE
+)
+# Tekrarlanan mesajlar adres/sayı farkı gözetmeden tek kayıtta sayılır
+_NORMALIZE_RE = re.compile(r"0x[0-9a-f]+|\d+(?:\.\d+)?", re.IGNORECASE)
+
+
+def line_level(line: str) -> Optional[str]:
+    """Satırın dizinlenecek seviyesi ("error"/"warning"), değilse None"""
+    if _ERROR_RE.search(line):
+        return "error"
+    if _WARNING_RE.search(line):
+        return "warning"
+    return None
+
+
+def _safe_name(job: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", job or "ffmpeg").strip("._")[:80] or "ffmpeg"
+
+
+def prune_logs(log_dir: str, keep: int):
+    """En yeni keep günlük dışındakileri sil"""
+    try:
+        names = [name for name in os.listdir(log_dir) if name.endswith(".log.gz")]
+    except OSError:
+        return
+    if len(names) <= keep:
+        return
+    paths = [os.path.join(log_dir, name) for name in names]
+    paths.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+    for path in paths[:len(paths) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class StderrCapture:
+    """
+    Bir ffmpeg sürecinin stderr'ini ayrı bir thread'de boşaltır
+
+    Bellekte sadece son RING_LINES satır ve en fazla MAX_ISSUES farklı
+    uyarı/hata tutulur; aynı mesajın tekrarları sayılır. log_dir verilirse
+    tüm çıktı olduğu gibi gzip ile iş başına bir dosyaya akıtılır.
+
+    on_line verilirse her ham satır önce ona verilir; True dönerse satır
+    (ör. stderr'e yönlendirilmiş -progress satırı) saklanmaz.
+    """
+
+    RING_LINES = 200
+    MAX_ISSUES = 100
+    MAX_LINE = 1000
+    CHUNK_SIZE = 64 * 1024
+    MAX_LOG_FILES = 1000
+
+    def __init__(self, stream, job: str = "", log_dir: Optional[str] = None, pid: Optional[int] = None,
+                 on_line: Optional[Callable[[bytes], bool]] = None):
+        self.job = job
+        self.lines = 0
+        self.bytes = 0
+        self.counts = {"error": 0, "warning": 0}
+        self.log_path: Optional[str] = None
+        self._stream = stream
+        self._on_line = on_line
+        self._ring: deque = deque(maxlen=self.RING_LINES)
+        self._issues: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._log = self._open_log(log_dir, pid) if log_dir else None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _open_log(self, log_dir: str, pid: Optional[int]):
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            prune_logs(log_dir, self.MAX_LOG_FILES - 1)
+            stamp = time.strftime("%Y%m%d-%H%M%S")
+            path = os.path.join(log_dir, f"{_safe_name(self.job)}-{stamp}-{pid or os.getpid()}.log.gz")
+            handle = gzip.open(path, "wb", compresslevel=6)
+        except OSError as e:
+            print(f"ffmpeg gunlugu acilamadi: {e}", file=sys.stderr)
+            return None
+        self.log_path = path
+        return handle
+
+    def _run(self):
+        read = getattr(self._stream, "read1", self._stream.read)
+        pending = b""
+        try:
+            while True:
+                chunk = read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.bytes += len(chunk)
+                if self._log:
+                    try:
+                        self._log.write(chunk)
+                    except OSError:
+                        self._log = None
+                # İstatistik satırları \r ile biter
+                lines = (pending + chunk).replace(b"\r", b"\n").split(b"\n")
+                pending = lines.pop()[-self.MAX_LINE * 4:]
+                for line in lines:
+                    self._line(line)
+            if pending:
+                self._line(pending)
+        except (OSError, ValueError):
+            pass
+        finally:
+            if self._log:
+                try:
+                    self._log.close()
+                except OSError:
+                    pass
+                self._log = None
+
+    def _line(self, raw: bytes):
+        if self._on_line is not None and self._on_line(raw):
+            return
+        self._add(raw)
+
+    def _add(self, raw: bytes):
+        line = raw.decode("utf-8", "replace").strip()[:self.MAX_LINE]
+        # Boş satırlar ve -stats ilerleme satırları saklanmaz
+        if not line or line.startswith(("frame=", "size=")):
+            return
+        with self._lock:
+            self.lines += 1
+            self._ring.append(line)
+            level = line_level(line)
+            if level is None:
+                return
+            self.counts[level] += 1
+            key = _NORMALIZE_RE.sub("#", line)
+            issue = self._issues.get(key)
+            if issue is not None:
+                issue["count"] += 1
+                issue["last_line"] = self.lines
+                self._issues.move_to_end(key)
+                return
+            if len(self._issues) >= self.MAX_ISSUES:
+                # Önce en eski uyarı, yoksa en eski hata düşer
+                victim = next((name for name, item in self._issues.items() if item["level"] == "warning"),
+                              next(iter(self._issues)))
+                del self._issues[victim]
+            self._issues[key] = {"level": level, "text": line, "count": 1,
+                                 "first_line": self.lines, "last_line": self.lines}
+
+    def close(self, timeout: float = 5.0):
+        """Okuyucuyu bekle (süreç bittikten sonra çağrılır)"""
+        self._thread.join(timeout)
+
+    def tail(self, lines: int = 20) -> List[str]:
+        with self._lock:
+            return list(self._ring)[-lines:]
+
+    def issues(self, level: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Dizinlenen mesajlar, en son görülen en sonda"""
+        with self._lock:
+            return [dict(item) for item in self._issues.values() if level is None or item["level"] == level]
+
+    def message(self, lines: int = 5) -> str:
+        """
+        Kullanıcıya gösterilecek hata nedeni
+
+        Dizinlenen son hatalar ve bağlam için son iki satır; hata
+        dizinlenmediyse (seviyesiz mesajlar) son satırlar.
+        """
+        errors = [item["text"] for item in self.issues("error")][-lines:]
+        if not errors:
+            return "\n".join(self.tail(lines))
+        return "\n".join(errors + [line for line in self.tail(2) if line not in errors])
+
+    def summary(self, issues: int = 10) -> Dict[str, Any]:
+        """İş kaydı için özet: sayılar, en son hatalar/uyarılar ve günlük dosyası"""
+        indexed = self.issues()
+        # Hatalar önce, her grupta en son görülenler
+        ordered = [item for item in reversed(indexed) if item["level"] == "error"]
+        ordered += [item for item in reversed(indexed) if item["level"] == "warning"]
+        return {
+            "job": self.job,
+            "lines": self.lines,
+            "bytes": self.bytes,
+            "errors": self.counts["error"],
+            "warnings": self.counts["warning"],
+            "issues": ordered[:issues],
+            "log": self.log_path,
+        }
@@ -4,39 +4,16 @@ import shutil
 import json
 import re
 import platform
-import os
 import sys
 from typing import Optional, Dict, List, Tuple
 
-
-def _get_app_dir() -> str:
-    """Uygulama klasörünü al"""
-    if getattr(sys, 'frozen', False):
-        return os.path.dirname(sys.executable)
-    else:
-        return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+from . import capabilities, hw_backends
+from .probe_cache import get_probe_cache
 
 
 def _get_ffprobe_path() -> str:
-    """FFprobe yolunu al"""
-    # Önce PATH'de ara
-    system_path = shutil.which("ffprobe")
-    if system_path:
-        return system_path
-
-    # Yerel kurulumu kontrol et
-    app_dir = _get_app_dir()
-    system = platform.system().lower()
-
-    if system == "windows":
-        local_path = os.path.join(app_dir, "ffmpeg", "bin", "ffprobe.exe")
-    else:
-        local_path = os.path.join(app_dir, "ffmpeg", "ffprobe")
-
-    if os.path.exists(local_path):
-        return local_path
-
-    return "ffprobe"
+    """FFprobe yolunu al (PATH, sonra yerel kurulum; süreç boyunca saklanır)"""
+    return capabilities.find_binary("ffprobe") or "ffprobe"
 
 
 class FFmpegUtils:
@@ -44,26 +21,30 @@ class FFmpegUtils:
 
     @staticmethod
     def check_ffmpeg() -> Tuple[bool, str]:
-        """FFmpeg kurulu mu kontrol et"""
-        ffmpeg_path = shutil.which("ffmpeg")
-        if ffmpeg_path:
-            try:
-                result = subprocess.run(
-                    ["ffmpeg", "-version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                version_line = result.stdout.split('\n')[0]
-                return True, version_line
-            except Exception as e:
-                return False, f"FFmpeg calistirilamadi: {e}"
-        return False, "FFmpeg bulunamadi"
+        """FFmpeg kurulu mu kontrol et (geçerli anlık görüntü varsa ffmpeg çalıştırılmaz)"""
+        ffmpeg_path = capabilities.find_binary("ffmpeg")
+        if not ffmpeg_path:
+            return False, "FFmpeg bulunamadi"
+
+        snapshot = capabilities.current()
+        if snapshot and snapshot.get("version"):
+            return True, snapshot["version"]
+        try:
+            result = subprocess.run(
+                [ffmpeg_path, "-version"],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            version_line = result.stdout.split('\n')[0]
+            return True, version_line
+        except Exception as e:
+            return False, f"FFmpeg calistirilamadi: {e}"
 
     @staticmethod
     def check_ffprobe() -> Tuple[bool, str]:
         """FFprobe kurulu mu kontrol et"""
-        ffprobe_path = shutil.which("ffprobe")
+        ffprobe_path = capabilities.find_binary("ffprobe")
         if ffprobe_path:
             return True, ffprobe_path
         return False, "FFprobe bulunamadi"
@@ -71,35 +52,13 @@ class FFmpegUtils:
     @staticmethod
     def check_nvenc() -> Tuple[bool, List[str]]:
         """NVIDIA NVENC desteği kontrol et"""
-        available_encoders = []
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-hide_banner", "-encoders"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            output = result.stdout
-
-            nvenc_encoders = ["h264_nvenc", "hevc_nvenc", "av1_nvenc"]
-            for encoder in nvenc_encoders:
-                if encoder in output:
-                    # Gerçekten çalışıyor mu test et
-                    test = subprocess.run(
-                        ["ffmpeg", "-hide_banner", "-f", "lavfi", "-i",
-                         "nullsrc=s=256x256:d=1", "-c:v", encoder,
-                         "-f", "null", "-"],
-                        capture_output=True,
-                        timeout=10
-                    )
-                    if test.returncode == 0:
-                        available_encoders.append(encoder)
-
-            if available_encoders:
-                return True, available_encoders
-            return False, []
-        except Exception:
-            return False, []
+        return hw_backends.check_backend(capabilities.find_binary("ffmpeg") or "ffmpeg", "nvenc")
+
+    @staticmethod
+    def check_hw_encoders() -> Tuple[bool, List[str]]:
+        """Tüm donanım encoder arka uçlarını (NVENC/QSV/AMF/VAAPI/VideoToolbox) kontrol et"""
+        encoders = capabilities.hw_encoders()
+        return bool(encoders), encoders
 
     @staticmethod
     def get_system_info() -> Dict[str, str]:
@@ -295,8 +254,22 @@ class FFmpegUtils:
         )
 
     @staticmethod
-    def get_video_info(file_path: str) -> Optional[Dict]:
-        """Video dosyası hakkında bilgi al"""
+    def get_video_info(file_path: str, use_cache: bool = True) -> Optional[Dict]:
+        """Video dosyası hakkında bilgi al (önbellekli)"""
+        cache = get_probe_cache() if use_cache else None
+        if cache is not None:
+            info = cache.get(file_path)
+            if info is not None:
+                return info
+
+        info = FFmpegUtils._probe_video_info(file_path)
+        if info is not None and cache is not None:
+            cache.put(file_path, info)
+        return info
+
+    @staticmethod
+    def _probe_video_info(file_path: str) -> Optional[Dict]:
+        """FFprobe'u çalıştırıp video bilgisini al (önbelleksiz)"""
         try:
             ffprobe_path = _get_ffprobe_path()
             cmd = [
@@ -319,7 +292,13 @@ class FFmpegUtils:
                     "video_codec": "",
                     "audio_codec": "",
                     "bitrate": 0,
-                    "size": 0
+                    "size": 0,
+                    "video_bitrate": 0,
+                    "audio_bitrate": 0,
+                    "audio_channels": 0,
+                    "pix_fmt": "",
+                    "video_profile": "",
+                    "subtitle_streams": 0
                 }
 
                 # Format bilgisi
@@ -332,22 +311,32 @@ class FFmpegUtils:
                 # Stream bilgileri
                 for stream in data.get("streams", []):
                     if stream["codec_type"] == "video":
+                        # Kapak resmi ve ek video akışlarını atla
+                        if info["video_codec"] or stream.get("disposition", {}).get("attached_pic"):
+                            continue
                         info["width"] = stream.get("width", 0)
                         info["height"] = stream.get("height", 0)
                         info["video_codec"] = stream.get("codec_name", "")
+                        info["video_bitrate"] = int(stream.get("bit_rate", 0) or 0)
+                        info["pix_fmt"] = stream.get("pix_fmt", "")
+                        info["video_profile"] = stream.get("profile", "")
                         # FPS hesapla
                         fps_str = stream.get("r_frame_rate", "0/1")
                         if "/" in fps_str:
                             num, den = fps_str.split("/")
                             if int(den) > 0:
                                 info["fps"] = round(int(num) / int(den), 2)
-                    elif stream["codec_type"] == "audio":
+                    elif stream["codec_type"] == "audio" and not info["audio_codec"]:
                         info["audio_codec"] = stream.get("codec_name", "")
+                        info["audio_bitrate"] = int(stream.get("bit_rate", 0) or 0)
+                        info["audio_channels"] = int(stream.get("channels", 0) or 0)
+                    elif stream["codec_type"] == "subtitle":
+                        info["subtitle_streams"] += 1
 
                 return info
             return None
         except Exception as e:
-            print(f"Video bilgisi alinamadi: {e}")
+            print(f"Video bilgisi alinamadi: {e}", file=sys.stderr)
             return None
 
     @staticmethod
@@ -362,6 +351,14 @@ class FFmpegUtils:
         video_encoders = [
             ("h264_nvenc", "H.264 (NVIDIA GPU)"),
             ("hevc_nvenc", "H.265/HEVC (NVIDIA GPU)"),
+            ("h264_qsv", "H.264 (Intel QSV)"),
+            ("hevc_qsv", "H.265/HEVC (Intel QSV)"),
+            ("h264_amf", "H.264 (AMD AMF)"),
+            ("hevc_amf", "H.265/HEVC (AMD AMF)"),
+            ("h264_vaapi", "H.264 (VAAPI)"),
+            ("hevc_vaapi", "H.265/HEVC (VAAPI)"),
+            ("h264_videotoolbox", "H.264 (Apple VideoToolbox)"),
+            ("hevc_videotoolbox", "H.265/HEVC (Apple VideoToolbox)"),
             ("libx264", "H.264 (CPU)"),
             ("libx265", "H.265/HEVC (CPU)"),
             ("libvpx-vp9", "VP9 (WebM)"),
@@ -377,27 +374,21 @@ class FFmpegUtils:
             ("libvorbis", "Vorbis (OGG)")
         ]
 
-        try:
-            result = subprocess.run(
-                ["ffmpeg", "-hide_banner", "-encoders"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            output = result.stdout
-
-            for codec, name in video_encoders:
-                if codec in output:
-                    encoders["video"].append((codec, name))
-
-            for codec, name in audio_encoders:
-                if codec in output:
-                    encoders["audio"].append((codec, name))
-
-        except Exception:
+        # Anlık görüntüden (yoksa tek bir -encoders çağrısıyla)
+        names = capabilities.encoder_names()
+        if not names:
             # Varsayılan encoder'lar
             encoders["video"] = [("libx264", "H.264 (CPU)")]
             encoders["audio"] = [("aac", "AAC")]
+            return encoders
+
+        for codec, name in video_encoders:
+            if codec in names:
+                encoders["video"].append((codec, name))
+
+        for codec, name in audio_encoders:
+            if codec in names:
+                encoders["audio"].append((codec, name))
 
         return encoders
 
@@ -0,0 +1,303 @@
+"""FFmpeg filtre grafiği: düğümler, sıralama kuralları, tekrar ayıklama, -vf/-af/-filter_complex çıktısı"""
+from itertools import permutations
+from typing import Callable, Any, List, Optional, Tuple
+
+# Düğüm rolleri. Aynı bölüm içindeki GEOMETRY/TIMING/PIXEL düğümleri yer
+# değiştirebilir (piksel başına işlemler ölçeklemeyle, zaman damgası
+# işlemleri her şeyle değişmeli); diğer roller sıralama bariyeridir.
+GEOMETRY = "geometry"
+TIMING = "timing"
+PIXEL = "pixel"
+BARRIER = "barrier"
+
+# Maliyet eşitse tercih edilen sıra (eski davranış: scale, setpts, eq)
+ROLE_RANK = {GEOMETRY: 0, TIMING: 1, PIXEL: 2}
+
+# Bir bölümde en fazla bu kadar düğümün tüm sıraları denenir
+MAX_PERMUTE = 6
+
+
+class FilterNode:
+    """
+    Tek bir mantıksal filtre (ör. scale, eq ya da zincirli atempo)
+
+    filters birden fazla ffmpeg filtresi içerebilir; düğüm sıralamada
+    bölünmez. name tekrar ayıklama anahtarıdır.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        filters: List[str],
+        role: str = BARRIER,
+        size: Optional[Tuple[int, int]] = None,
+        cost: float = 1.0
+    ):
+        self.name = name
+        self.filters = list(filters)
+        self.role = role
+        # GEOMETRY düğümlerinin çıktı boyutu (bilinmiyorsa None)
+        self.size = size
+        # Piksel başına göreli maliyet
+        self.cost = cost
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FilterNode) and self.filters == other.filters
+
+    def __repr__(self) -> str:
+        return f"FilterNode({','.join(self.filters)!r})"
+
+
+def parse_size(resolution: Any) -> Optional[Tuple[int, int]]:
+    """'1280:720' / '1280x720' -> (1280, 720); -1/-2 gibi oranlı değerlerde None"""
+    try:
+        width, height = (int(part) for part in str(resolution).replace("x", ":").split(":"))
+    except ValueError:
+        return None
+    if width <= 0 or height <= 0:
+        return None
+    return width, height
+
+
+def source_size_of(info: Optional[dict]) -> Optional[Tuple[int, int]]:
+    """ffprobe bilgisinden kaynak boyutu"""
+    if info and info.get("width") and info.get("height"):
+        return int(info["width"]), int(info["height"])
+    return None
+
+
+def scale(resolution: str) -> FilterNode:
+    return FilterNode("scale", [f"scale={resolution}"], GEOMETRY, parse_size(resolution), cost=1.5)
+
+
+def setpts(speed: float) -> FilterNode:
+    return FilterNode("setpts", [f"setpts={1/float(speed)}*PTS"], TIMING, cost=0.0)
+
+
+def eq(brightness=None, contrast=None, saturation=None) -> Optional[FilterNode]:
+    """Renk ayarı; nötr değerlerde (0/1/1) None (boş filtre çalıştırılmaz)"""
+    values = {"brightness": brightness, "contrast": contrast, "saturation": saturation}
+    neutral = {"brightness": 0, "contrast": 1, "saturation": 1}
+    options = [f"{key}={value}" for key, value in values.items() if value is not None]
+    if not options or all(float(values[key]) == neutral[key] for key in values if values[key] is not None):
+        return None
+    return FilterNode("eq", [f"eq={':'.join(options)}"], PIXEL)
+
+
+def atempo(speed: float) -> Optional[FilterNode]:
+    """0.5-2.0 dışındaki hızlar için zincirlenmiş atempo; 1.0'da None"""
+    remaining = float(speed)
+    if remaining == 1.0:
+        return None
+    filters = []
+    while remaining > 2.0:
+        filters.append("atempo=2.0")
+        remaining /= 2.0
+    while remaining < 0.5:
+        filters.append("atempo=0.5")
+        remaining /= 0.5
+    filters.append(f"atempo={remaining:.4g}")
+    return FilterNode("atempo", filters, TIMING, cost=0.0)
+
+
+class FilterChain:
+    """Tek akışın (video ya da ses) filtre zinciri"""
+
+    def __init__(self):
+        self.nodes: List[FilterNode] = []
+        # Sıralamadan sonra her zaman en sona eklenen filtreler (ör. hwupload)
+        self.tail: List[str] = []
+        # Sıralanmış filtre listesini dönüştüren kanca (ör. CUDA zinciri)
+        self.transform: Optional[Callable[[List[str]], List[str]]] = None
+
+    def add(self, node: Optional[FilterNode]) -> "FilterChain":
+        """
+        Düğüm ekle; aynı adlı bir düğüm varsa yenisi onun yerini alır
+
+        Bariyer düğümleri ada göre ayıklanmaz, sadece birebir aynıysa atlanır.
+        """
+        if node is None:
+            return self
+        for index, existing in enumerate(self.nodes):
+            if existing == node:
+                return self
+            if node.role != BARRIER and existing.name == node.name:
+                self.nodes[index] = node
+                return self
+        self.nodes.append(node)
+        return self
+
+    def __bool__(self) -> bool:
+        return bool(self.nodes or self.tail)
+
+    def ordered(self, source_size: Optional[Tuple[int, int]] = None) -> List[FilterNode]:
+        """
+        En ucuz geçerli sıra
+
+        Bariyerler yerinde kalır, aralarındaki bölümler ayrı ayrı sıralanır.
+        Kaynak boyutu biliniyorsa işlenen piksel sayısına göre maliyet
+        hesaplanır (küçültmede scale öne, büyütmede arkaya geçer).
+        """
+        result = []
+        segment = []
+        for node in self.nodes + [None]:
+            if node is None or node.role == BARRIER:
+                result.extend(_order_segment(segment, source_size))
+                segment = []
+                if node is not None:
+                    result.append(node)
+                    # Bariyerden sonra boyut bilinmez
+                    source_size = None
+            else:
+                segment.append(node)
+        return result
+
+    def render(self, nodes: List[FilterNode]) -> List[str]:
+        """Verilen sıradaki düğümleri ffmpeg filtrelerine çevir (dönüşüm ve kuyruk dahil)"""
+        filters = [ff_filter for node in nodes for ff_filter in node.filters]
+        if filters and self.transform:
+            filters = self.transform(filters)
+        return filters + self.tail
+
+    def filters(self, source_size: Optional[Tuple[int, int]] = None) -> List[str]:
+        """Çalıştırılacak ffmpeg filtreleri (en ucuz sırada)"""
+        return self.render(self.ordered(source_size))
+
+
+def _order_cost(nodes, source_size: Tuple[int, int]) -> float:
+    pixels = source_size[0] * source_size[1]
+    total = 0.0
+    for node in nodes:
+        if node.role == GEOMETRY:
+            if node.size is None:
+                return float("inf")
+            target = node.size[0] * node.size[1]
+            total += node.cost * max(pixels, target)
+            pixels = target
+        else:
+            total += node.cost * pixels
+    return total
+
+
+def _order_segment(nodes: List[FilterNode], source_size: Optional[Tuple[int, int]]) -> List[FilterNode]:
+    default = sorted(nodes, key=lambda node: ROLE_RANK[node.role])
+    if source_size is None or len(nodes) < 2 or len(nodes) > MAX_PERMUTE:
+        return default
+    if any(node.role == GEOMETRY and node.size is None for node in nodes):
+        return default
+    # Eşit maliyette varsayılan sıra kalsın (min ilk en küçüğü döndürür)
+    return list(min(permutations(default), key=lambda order: _order_cost(order, source_size)))
+
+
+class FilterGraph:
+    """Bir çıktının video ve ses filtreleri"""
+
+    def __init__(self, source_size: Optional[Tuple[int, int]] = None):
+        self.source_size = source_size
+        self.video = FilterChain()
+        self.audio = FilterChain()
+
+    def video_filters(self) -> List[str]:
+        return self.video.filters(self.source_size)
+
+    def audio_filters(self) -> List[str]:
+        return self.audio.filters()
+
+    def args(self) -> List[str]:
+        """Basit grafik argümanları (-vf/-af)"""
+        args = []
+        video = self.video_filters()
+        if video:
+            args.extend(["-vf", ",".join(video)])
+        audio = self.audio_filters()
+        if audio:
+            args.extend(["-af", ",".join(audio)])
+        return args
+
+
+def branch_filters(chains: List[FilterChain], source_size: Optional[Tuple[int, int]] = None) -> List[List[str]]:
+    """
+    Aynı kaynaktan beslenen dalların filtre listeleri
+
+    Tüm dallarda bulunan düğümler öne alınırsa ortak ön ek split'ten önce
+    bir kez çalışır; bu, dalları ayrı ayrı en ucuz sıraya koymaktan daha
+    ucuzsa (ör. küçültülen birden fazla çıktıda aynı renk ayarı) o sıra seçilir.
+    """
+    individual = [chain.filters(source_size) for chain in chains]
+    if len(chains) < 2 or source_size is None:
+        return individual
+    nodes = [node for chain in chains for node in chain.nodes]
+    if any(node.role == BARRIER or (node.role == GEOMETRY and node.size is None) for node in nodes):
+        return individual
+
+    shared = [node for node in chains[0].nodes if all(node in chain.nodes for chain in chains[1:])]
+    if not shared:
+        return individual
+    shared = _order_segment(shared, source_size)
+    shared_size = source_size
+    for node in shared:
+        if node.role == GEOMETRY:
+            shared_size = node.size
+
+    rests = [_order_segment([node for node in chain.nodes if node not in shared], shared_size) for chain in chains]
+    shared_cost = _order_cost(shared, source_size) + sum(_order_cost(rest, shared_size) for rest in rests)
+    individual_cost = sum(_order_cost(chain.ordered(source_size), source_size) for chain in chains)
+    if shared_cost >= individual_cost:
+        return individual
+    return [chain.render(shared + rest) for chain, rest in zip(chains, rests)]
+
+
+def common_prefix(chains: List[List[str]]) -> List[str]:
+    prefix = []
+    for filters in zip(*chains):
+        if any(ff_filter != filters[0] for ff_filter in filters):
+            break
+        prefix.append(filters[0])
+    return prefix
+
+
+def branch(source: str, chains: List[List[str]], kind: str) -> tuple:
+    """
+    Aynı kaynaktan ayrılan filtre dallarını -filter_complex parçalarına çevir
+
+    ffmpeg her girdi akışını bir kez çözer ve tüm tüketicilere dağıtır;
+    split sadece dalların ortak bir ön eki varsa (ör. renk ayarı) onu bir kez
+    çalıştırmak için kullanılır. Döndürülen etiket listesinde None, kaynağın
+    filtresiz doğrudan map edileceğini belirtir.
+
+    Returns:
+        (filtergraph parçaları, dal başına -map etiketi)
+    """
+    count = len(chains)
+    prefix = common_prefix(chains) if count > 1 else []
+    parts = []
+    if prefix:
+        split = "split" if kind == "v" else "asplit"
+        heads = [f"[{kind}s{index}]" for index in range(count)]
+        parts.append(f"[{source}]" + ",".join(prefix + [f"{split}={count}"]) + "".join(heads))
+    else:
+        heads = [f"[{source}]"] * count
+
+    labels = []
+    for index, chain in enumerate(chains):
+        rest = chain[len(prefix):]
+        if rest:
+            parts.append(heads[index] + ",".join(rest) + f"[{kind}{index}]")
+            labels.append(f"[{kind}{index}]")
+        else:
+            labels.append(heads[index] if prefix else None)
+    return parts, labels
+
+
+def complex_args(video_chains: List[List[str]], audio_chains: List[List[str]]) -> tuple:
+    """
+    Çok çıktılı iş için -filter_complex argümanları ve dal etiketleri
+
+    Returns:
+        (argümanlar, video etiketleri, ses etiketleri)
+    """
+    video_parts, video_labels = branch("0:v:0", video_chains, "v")
+    audio_parts, audio_labels = branch("0:a:0", audio_chains, "a")
+    parts = video_parts + audio_parts
+    args = ["-filter_complex", ";".join(parts)] if parts else []
+    return args, video_labels, audio_labels
@@ -0,0 +1,125 @@
+"""NVENC için uçtan uca GPU hattı: CUDA decode, GPU filtreleri, NVENC encode"""
+import subprocess
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional
+
+# CPU filtresi -> tercih sırasına göre CUDA karşılıkları
+GPU_EQUIVALENTS = {
+    "scale": ("scale_cuda", "scale_npp"),
+}
+
+# Donanım karelerini olduğu gibi geçiren (sadece zaman damgası/kare seçen) filtreler
+PASSTHROUGH_FILTERS = {"setpts", "fps", "null", "trim"}
+
+# GPU'dan indirilen karelerin olası yazılım formatları (8/10 bit)
+DOWNLOAD_FORMATS = "nv12|p010le"
+
+# NVDEC'in çözebildiği codec'ler; değer None ise tüm piksel formatları
+NVDEC_CODECS = {
+    "h264": {"yuv420p", "yuvj420p"},
+    "hevc": {"yuv420p", "yuvj420p", "yuv420p10le"},
+    "av1": {"yuv420p", "yuv420p10le"},
+    "vp9": {"yuv420p", "yuv420p10le"},
+    "vp8": None,
+    "mpeg1video": None,
+    "mpeg2video": None,
+    "mpeg4": None,
+    "vc1": None,
+    "mjpeg": None,
+}
+
+
+@lru_cache(maxsize=8)
+def _list_filters(ffmpeg_path: str) -> frozenset:
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-filters"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+    except Exception:
+        return frozenset()
+
+    names = set()
+    for line in result.stdout.splitlines():
+        parts = line.split()
+        # " TSC scale_cuda  V->V  GPU accelerated video resizer"
+        if len(parts) >= 3 and "->" in parts[2]:
+            names.add(parts[1])
+    return frozenset(names)
+
+
+def has_filter(ffmpeg_path: str, name: str) -> bool:
+    """FFmpeg derlemesi bu filtreyi içeriyor mu (süreç başına bir kez sorgulanır)"""
+    return name in _list_filters(ffmpeg_path)
+
+
+def is_enabled(settings: Dict[str, Any]) -> bool:
+    """GPU hattı bu iş için açık mı (NVENC'te varsayılan açık)"""
+    vcodec = settings.get("vcodec") or ""
+    if "nvenc" not in vcodec:
+        return False
+    return settings.get("gpu_pipeline", True) is not False
+
+
+def can_decode(info: Optional[Dict]) -> bool:
+    """Kaynak NVDEC ile çözülebilir mi"""
+    if not info:
+        return False
+    codec = info.get("video_codec") or ""
+    if codec not in NVDEC_CODECS:
+        return False
+    formats = NVDEC_CODECS[codec]
+    pix_fmt = info.get("pix_fmt") or ""
+    return formats is None or not pix_fmt or pix_fmt in formats
+
+
+def adjust_for_source(settings: Dict[str, Any], info: Optional[Dict]) -> Dict[str, Any]:
+    """NVDEC kaynağı çözemiyorsa GPU hattını kapatan ayarları döndür"""
+    if is_enabled(settings) and info and not can_decode(info):
+        settings = dict(settings)
+        settings["gpu_pipeline"] = False
+    return settings
+
+
+def input_args() -> List[str]:
+    """Kareleri decode'dan itibaren GPU belleğinde tutan -i öncesi argümanlar"""
+    return ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+
+
+def build_chain(filters: List[str], available: Callable[[str], bool]) -> List[str]:
+    """
+    CPU filtre zincirini CUDA karelerine uygun zincire çevir
+
+    GPU karşılığı olan filtreler CUDA sürümüyle değiştirilir, geçirgen
+    filtreler olduğu gibi kalır. Karşılığı olmayan ardışık filtreler tek bir
+    hwdownload ... hwupload_cuda bloğunda CPU'da çalıştırılır; zincir her
+    durumda GPU karesiyle biter (NVENC doğrudan CUDA karesi alır).
+    """
+    chain = []
+    cpu_block = []
+
+    def flush():
+        if cpu_block:
+            chain.extend(["hwdownload", f"format={DOWNLOAD_FORMATS}"])
+            chain.extend(cpu_block)
+            chain.append("hwupload_cuda")
+            cpu_block.clear()
+
+    for ff_filter in filters:
+        name, _, args = ff_filter.partition("=")
+        if name in PASSTHROUGH_FILTERS:
+            # CPU bloğunun içindeyse orada kalır (sırayı bozmamak için)
+            (cpu_block if cpu_block else chain).append(ff_filter)
+            continue
+
+        gpu_name = next((candidate for candidate in GPU_EQUIVALENTS.get(name, ()) if available(candidate)), None)
+        if gpu_name:
+            flush()
+            chain.append(f"{gpu_name}={args}" if args else gpu_name)
+        else:
+            cpu_block.append(ff_filter)
+
+    flush()
+    return chain
@@ -0,0 +1,278 @@
+"""Biten işlerin gerçek sonuçları ve bunlardan öğrenilen hız/boyut modeli"""
+import os
+import socket
+import sqlite3
+import statistics
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+from .storage import get_data_path
+from .units import parse_bitrate
+
+
+class EncodeHistory:
+    """
+    Her tamamlanan işin süresini, hızını ve çıktı boyutunu saklar.
+
+    Model makine başınadır (host adı ile süzülür) ve sade tutulmuştur:
+        - Hız: codec+preset için saniyede işlenen piksel (medyan). Tahmin
+          edilecek videonun piksel hızına bölünerek x gerçek zamanlı hız
+          bulunur; böylece 720p geçmişi 4K tahminine de taşınabilir.
+          İşin ölçülen hızı eşzamanlı iş sayısıyla birlikte saklanır;
+          tahminde önce aynı eşzamanlılıktaki örnekler kullanılır.
+        - Boyut: gerçek çıktı / bitrate'ten beklenen çıktı oranı (medyan).
+        - Kopyalama: saniyede yazılan byte (medyan).
+    Yeterli örnek yoksa None döner ve Estimator sabitlere düşer.
+    """
+
+    MIN_SAMPLES = 3
+    # Model için bakılan en yeni kayıt sayısı (donanım değişince hızlı uyum)
+    WINDOW = 50
+
+    def __init__(self, db_path: Optional[str] = None, host: Optional[str] = None):
+        self.db_path = db_path or get_data_path("encode_history.sqlite3")
+        self.host = host or socket.gethostname()
+        self._lock = threading.Lock()
+        self._model_cache: Dict[tuple, Optional[float]] = {}
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS encodes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, host TEXT, "
+                "vcodec TEXT, acodec TEXT, preset TEXT, gpu INTEGER, "
+                "width INTEGER, height INTEGER, fps REAL, duration REAL, "
+                "input_size INTEGER, output_size INTEGER, target_kbps INTEGER, "
+                "wall_time REAL, speed REAL, pixel_rate REAL, concurrency INTEGER, "
+                "created REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS encodes_key ON encodes(host, vcodec, preset)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error:
+            self._conn = None
+
+    @staticmethod
+    def _key(settings: Dict[str, Any]) -> tuple:
+        vcodec = settings.get("vcodec") or "none"
+        if vcodec == "copy" or vcodec == "none":
+            return vcodec, ""
+        return vcodec, settings.get("preset") or ""
+
+    @staticmethod
+    def output_duration(duration: float, settings: Dict[str, Any]) -> float:
+        """
+        Çıktı medyasının süresi
+
+        trim_start girdi zaman çizgisinde kaynaktan düşülür, speed süreyi
+        böler, trim_duration çıktı zaman çizgisinde üst sınırdır.
+        """
+        speed_factor = float(settings.get("speed") or 1.0)
+        seconds = max(0.0, duration - float(settings.get("trim_start") or 0))
+        if speed_factor > 0:
+            seconds /= speed_factor
+        if settings.get("trim_duration"):
+            seconds = min(seconds, float(settings["trim_duration"]))
+        return seconds
+
+    def record(
+        self,
+        info: Optional[Dict],
+        settings: Dict[str, Any],
+        wall_time: float,
+        output_path: str,
+        concurrency: int = 1
+    ):
+        """Tamamlanan işi kaydet"""
+        if self._conn is None or not info or wall_time <= 0:
+            return
+        try:
+            output_size = os.path.getsize(output_path)
+        except OSError:
+            return
+
+        media_seconds = self.output_duration(float(info.get("duration") or 0), settings)
+        if media_seconds <= 0:
+            return
+
+        width = info.get("width") or 0
+        height = info.get("height") or 0
+        resolution = settings.get("resolution")
+        if resolution:
+            try:
+                width, height = (int(part) for part in str(resolution).split(":"))
+            except ValueError:
+                pass
+        fps = float(settings.get("fps") or info.get("fps") or 0)
+
+        speed = media_seconds / wall_time
+        # Ölçülen hız olduğu gibi; eşzamanlılık ayrı sütunda (bkz. _pixel_rate)
+        pixel_rate = speed * width * height * fps
+        vcodec, preset = self._key(settings)
+        target_kbps = (parse_bitrate(settings.get("bitrate")) + parse_bitrate(settings.get("audio_bitrate"))) // 1000
+
+        # duration sütunu çıktının süresidir (size_ratio bitrate'i bununla çarpar)
+        row = (
+            self.host, vcodec, settings.get("acodec") or "", preset, int(bool(settings.get("gpu"))),
+            width, height, fps, media_seconds, int(info.get("size") or 0), output_size, target_kbps,
+            wall_time, speed, pixel_rate, max(1, concurrency), time.time()
+        )
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO encodes (host, vcodec, acodec, preset, gpu, width, height, fps, "
+                    "duration, input_size, output_size, target_kbps, wall_time, speed, pixel_rate, "
+                    "concurrency, created) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                return
+            self._model_cache.clear()
+
+    def _samples(self, vcodec: str, preset: Optional[str]) -> List[tuple]:
+        """En yeni (pixel_rate, eşzamanlı iş sayısı) örnekleri"""
+        if self._conn is None:
+            return []
+        query = "SELECT pixel_rate, concurrency FROM encodes WHERE host=? AND vcodec=?"
+        params: list = [self.host, vcodec]
+        if preset is not None:
+            query += " AND preset=?"
+            params.append(preset)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(self.WINDOW)
+        with self._lock:
+            try:
+                rows = self._conn.execute(query, params).fetchall()
+            except sqlite3.Error:
+                return []
+        return [(rate, max(1, jobs or 1)) for rate, jobs in rows if rate and rate > 0]
+
+    def _pixel_rate(self, vcodec: str, preset: Optional[str], concurrency: int) -> Optional[float]:
+        """
+        concurrency eşzamanlı iş varken tek işin beklenen piksel hızı (medyan)
+
+        Önce aynı eşzamanlılıkta ölçülen örnekler kullanılır; yeterli değilse
+        diğer örnekler paylaşımın doğrusal olduğu varsayılarak ölçeklenir.
+        """
+        cache_key = ("pixel_rate", vcodec, preset, concurrency)
+        if cache_key in self._model_cache:
+            return self._model_cache[cache_key]
+        samples = self._samples(vcodec, preset)
+        same = [rate for rate, jobs in samples if jobs == concurrency]
+        if len(same) >= self.MIN_SAMPLES:
+            result = statistics.median(same)
+        elif len(samples) >= self.MIN_SAMPLES:
+            result = statistics.median([rate * jobs / concurrency for rate, jobs in samples])
+        else:
+            result = None
+        self._model_cache[cache_key] = result
+        return result
+
+    def predict_speed(
+        self,
+        settings: Dict[str, Any],
+        info: Optional[Dict],
+        concurrency: int = 1
+    ) -> Optional[float]:
+        """Bu makinede concurrency iş birlikte koşarken beklenen x gerçek zamanlı encode hızı (yoksa None)"""
+        vcodec, preset = self._key(settings)
+        if vcodec in ("copy", "none") or not info:
+            return None
+
+        width = info.get("width") or 0
+        height = info.get("height") or 0
+        resolution = settings.get("resolution")
+        if resolution:
+            try:
+                width, height = (int(part) for part in str(resolution).split(":"))
+            except ValueError:
+                pass
+        fps = float(settings.get("fps") or info.get("fps") or 0)
+        pixels = width * height * fps
+        if pixels <= 0:
+            return None
+
+        # Önce aynı preset, yoksa aynı codec'in tüm presetleri
+        concurrency = max(1, int(concurrency or 1))
+        pixel_rate = self._pixel_rate(vcodec, preset, concurrency)
+        if pixel_rate is None:
+            pixel_rate = self._pixel_rate(vcodec, None, concurrency)
+        if pixel_rate is None:
+            return None
+        return pixel_rate / pixels
+
+    def size_ratio(self, settings: Dict[str, Any]) -> Optional[float]:
+        """Gerçek çıktı boyutunun bitrate hesabına oranı (yoksa None)"""
+        vcodec, _ = self._key(settings)
+        if vcodec == "copy":
+            return None
+        if self._conn is None:
+            return None
+        cache_key = ("size_ratio", vcodec, None)
+        if cache_key in self._model_cache:
+            return self._model_cache[cache_key]
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT output_size, target_kbps, duration FROM encodes "
+                    "WHERE host=? AND vcodec=? AND target_kbps > 0 AND duration > 0 "
+                    "ORDER BY id DESC LIMIT ?",
+                    (self.host, vcodec, self.WINDOW)
+                ).fetchall()
+            except sqlite3.Error:
+                rows = []
+        ratios = [size / (kbps * 1000 * duration / 8) for size, kbps, duration in rows]
+        result = statistics.median(ratios) if len(ratios) >= self.MIN_SAMPLES else None
+        self._model_cache[cache_key] = result
+        return result
+
+    def copy_throughput(self) -> Optional[float]:
+        """Kopyalama (remux) işlerinde saniyede yazılan byte (yoksa None)"""
+        if self._conn is None:
+            return None
+        cache_key = ("copy_throughput", "copy", None)
+        if cache_key in self._model_cache:
+            return self._model_cache[cache_key]
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(
+                    "SELECT output_size, wall_time FROM encodes "
+                    "WHERE host=? AND vcodec='copy' AND wall_time > 0 ORDER BY id DESC LIMIT ?",
+                    (self.host, self.WINDOW)
+                ).fetchall()
+            except sqlite3.Error:
+                rows = []
+        rates = [size / wall for size, wall in rows if size > 0]
+        result = statistics.median(rates) if len(rates) >= self.MIN_SAMPLES else None
+        self._model_cache[cache_key] = result
+        return result
+
+    def count(self) -> int:
+        """Bu makineye ait kayıt sayısı"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            try:
+                return self._conn.execute(
+                    "SELECT COUNT(*) FROM encodes WHERE host=?", (self.host,)
+                ).fetchone()[0]
+            except sqlite3.Error:
+                return 0
+
+
+_default_history: Optional[EncodeHistory] = None
+_default_lock = threading.Lock()
+
+
+def get_encode_history() -> EncodeHistory:
+    """Uygulama genelinde paylaşılan geçmişi al"""
+    global _default_history
+    with _default_lock:
+        if _default_history is None:
+            _default_history = EncodeHistory()
+        return _default_history
@@ -0,0 +1,264 @@
+"""Donanım encoder arka uçları: NVENC, QSV, VAAPI, AMF, VideoToolbox"""
+import glob
+import subprocess
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .planner import ENCODER_FAMILIES
+
+# Uygulamanın hız adları (x264 ölçeği), en hızlıdan en yavaşa
+SPEED_NAMES = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow")
+
+# Arka uç bulunamazsa kullanılan yazılım encoder'ları
+CPU_FALLBACKS = {"h264": "libx264", "hevc": "libx265", "av1": "libsvtav1"}
+
+
+class HardwareBackend:
+    """
+    Tek bir donanım encoder ailesi
+
+    Attributes:
+        name: Encoder son eki (h264_<name>)
+        label: Arayüzde gösterilen üretici adı
+        families: Desteklenen codec aileleri
+        preset_option: Native hız seçeneği (None: yok)
+        presets: Hız adı -> native değer
+        platforms: sys.platform önekleri
+        speed_factor: NVENC'e göre kabaca göreli hız (tahmin için)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        label: str,
+        families: Tuple[str, ...],
+        preset_option: Optional[str],
+        presets: Dict[str, str],
+        platforms: Tuple[str, ...],
+        speed_factor: float = 1.0
+    ):
+        self.name = name
+        self.label = label
+        self.families = families
+        self.preset_option = preset_option
+        self.presets = presets
+        self.platforms = platforms
+        self.speed_factor = speed_factor
+
+    def encoder(self, family: str) -> str:
+        return f"{family}_{self.name}"
+
+    def encoders(self) -> List[str]:
+        return [self.encoder(family) for family in self.families]
+
+    def supported_here(self) -> bool:
+        return sys.platform.startswith(self.platforms)
+
+    def preset_args(self, preset: Optional[str]) -> List[str]:
+        """Hız adını bu arka ucun native seçeneğine çevir"""
+        if not preset or not self.preset_option:
+            return []
+        value = self.presets.get(preset)
+        if value is None:
+            # Zaten native bir değer verilmiş olabilir (ör. "p4")
+            if preset in self.presets.values():
+                value = preset
+            else:
+                return []
+        return [self.preset_option, value]
+
+    def input_args(self) -> List[str]:
+        """-i öncesi cihaz argümanları"""
+        return []
+
+    def upload_filters(self) -> List[str]:
+        """Yazılım karelerini encoder'a taşıyan -vf sonu filtreleri"""
+        return []
+
+
+class VaapiBackend(HardwareBackend):
+    """VAAPI cihaz açılışı ve kare yüklemesi ister"""
+
+    DEFAULT_DEVICE = "/dev/dri/renderD128"
+
+    def device(self) -> str:
+        devices = sorted(glob.glob("/dev/dri/renderD*"))
+        return devices[0] if devices else self.DEFAULT_DEVICE
+
+    def input_args(self) -> List[str]:
+        return ["-vaapi_device", self.device()]
+
+    def upload_filters(self) -> List[str]:
+        return ["format=nv12", "hwupload"]
+
+
+def _scale(values: Tuple[str, ...]) -> Dict[str, str]:
+    """Hız adlarını sırayla native değerlere eşle (9 ad, len(values) değer)"""
+    count = len(values)
+    return {
+        name: values[min(count - 1, index * count // len(SPEED_NAMES))]
+        for index, name in enumerate(SPEED_NAMES)
+    }
+
+
+# Tercih sırası: iki arka uç aynı makinede varsa öndeki seçilir
+BACKENDS: Tuple[HardwareBackend, ...] = (
+    HardwareBackend(
+        "nvenc", "NVIDIA", ("h264", "hevc", "av1"), "-preset",
+        {
+            "ultrafast": "p1", "superfast": "p2", "veryfast": "p3", "faster": "p3",
+            "fast": "p4", "medium": "p5", "slow": "p6", "slower": "p7", "veryslow": "p7"
+        },
+        ("win", "linux"), 1.0
+    ),
+    HardwareBackend(
+        "qsv", "Intel QSV", ("h264", "hevc", "av1"), "-preset",
+        dict({name: name for name in SPEED_NAMES[2:]}, ultrafast="veryfast", superfast="veryfast"),
+        ("win", "linux"), 0.8
+    ),
+    HardwareBackend(
+        "amf", "AMD AMF", ("h264", "hevc", "av1"), "-quality",
+        _scale(("speed", "balanced", "quality")),
+        ("win", "linux"), 0.8
+    ),
+    HardwareBackend(
+        "videotoolbox", "Apple VideoToolbox", ("h264", "hevc"), "-realtime",
+        {"ultrafast": "1", "superfast": "1", "veryfast": "1"},
+        ("darwin",), 0.7
+    ),
+    # Intel/AMD sürücülerinde 1 en kaliteli, 7 en hızlı
+    VaapiBackend(
+        "vaapi", "VAAPI", ("h264", "hevc", "av1"), "-compression_level",
+        _scale(("7", "6", "5", "4", "3", "2", "1")),
+        ("linux",), 0.7
+    ),
+)
+
+_BY_NAME = {backend.name: backend for backend in BACKENDS}
+
+
+def backend_for(vcodec: Optional[str]) -> Optional[HardwareBackend]:
+    """Encoder adından arka ucu bul (yazılım encoder'ı ise None)"""
+    if not vcodec or "_" not in vcodec:
+        return None
+    return _BY_NAME.get(vcodec.rsplit("_", 1)[1])
+
+
+def is_hardware_encoder(vcodec: Optional[str]) -> bool:
+    return backend_for(vcodec) is not None
+
+
+def codec_family(vcodec: Optional[str]) -> Optional[str]:
+    """h264_qsv -> h264; yazılım encoder'ları için planner eşlemesi kullanılır"""
+    if not vcodec:
+        return None
+    if is_hardware_encoder(vcodec):
+        return vcodec.rsplit("_", 1)[0]
+    return ENCODER_FAMILIES.get(vcodec)
+
+
+_listings: Dict[str, frozenset] = {}
+
+
+def encoder_names(ffmpeg_path: str) -> frozenset:
+    """Derlemedeki encoder adları (-encoders, ffmpeg yolu başına bir kez)"""
+    names = _listings.get(ffmpeg_path)
+    if names is not None:
+        return names
+    try:
+        result = subprocess.run(
+            [ffmpeg_path, "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        output = result.stdout
+    except Exception:
+        return frozenset()
+    # " V....D libx264  libx264 H.264 ..."
+    names = frozenset(line.split()[1] for line in output.splitlines() if len(line.split()) >= 2)
+    _listings[ffmpeg_path] = names
+    return names
+
+
+def _trial_encode(ffmpeg_path: str, backend: HardwareBackend, encoder: str) -> bool:
+    """Gerçekten çalışıyor mu: 1 saniyelik boş görüntüyü encode et"""
+    cmd = [ffmpeg_path, "-hide_banner", *backend.input_args(),
+           "-f", "lavfi", "-i", "nullsrc=s=256x256:d=1"]
+    upload = backend.upload_filters()
+    if upload:
+        cmd.extend(["-vf", ",".join(upload)])
+    cmd.extend(["-c:v", encoder, "-f", "null", "-"])
+    try:
+        return subprocess.run(cmd, capture_output=True, timeout=10).returncode == 0
+    except Exception:
+        return False
+
+
+_detected: Dict[str, Dict[str, List[str]]] = {}
+_detect_lock = threading.Lock()
+
+
+def detect(ffmpeg_path: str = "ffmpeg", refresh: bool = False) -> Dict[str, List[str]]:
+    """
+    Bu makinede kullanılabilir donanım encoder'larını bul
+
+    Her arka uç için derlemede bulunan encoder'lardan ilki ile tek bir deneme
+    encode'u yapılır; başarılı olursa o arka ucun derlemedeki tüm encoder'ları
+    kullanılabilir sayılır. Sonuç ffmpeg yolu başına saklanır.
+
+    Returns:
+        {"nvenc": ["h264_nvenc", ...], ...} (sadece çalışan arka uçlar)
+    """
+    with _detect_lock:
+        if not refresh and ffmpeg_path in _detected:
+            return _detected[ffmpeg_path]
+
+        if refresh:
+            _listings.pop(ffmpeg_path, None)
+        names = encoder_names(ffmpeg_path)
+        result = {}
+        for backend in BACKENDS:
+            if not backend.supported_here():
+                continue
+            built = [encoder for encoder in backend.encoders() if encoder in names]
+            if built and _trial_encode(ffmpeg_path, backend, built[0]):
+                result[backend.name] = built
+
+        _detected[ffmpeg_path] = result
+        return result
+
+
+def prime(ffmpeg_path: str, detected: Dict[str, List[str]], names: Optional[List[str]] = None):
+    """Kayıtlı bir tespit sonucunu deneme encode'u yapmadan kullan"""
+    with _detect_lock:
+        _detected[ffmpeg_path] = {name: list(encoders) for name, encoders in detected.items()}
+        if names is not None:
+            _listings[ffmpeg_path] = frozenset(names)
+
+
+def check_backend(ffmpeg_path: str, name: str) -> Tuple[bool, List[str]]:
+    """Tek arka uç için (kullanılabilir mi, encoder listesi)"""
+    encoders = detect(ffmpeg_path).get(name, [])
+    return bool(encoders), encoders
+
+
+def available_encoders(ffmpeg_path: str = "ffmpeg") -> List[str]:
+    """Tüm çalışan donanım encoder'ları, tercih sırasıyla"""
+    return [encoder for encoders in detect(ffmpeg_path).values() for encoder in encoders]
+
+
+def substitute_encoder(vcodec: Optional[str], available: List[str]) -> Optional[str]:
+    """
+    İstenen donanım encoder'ı yoksa aynı ailede çalışan başka bir arka ucu,
+    o da yoksa yazılım encoder'ını seç (yazılım encoder'ları olduğu gibi kalır)
+    """
+    if not is_hardware_encoder(vcodec) or vcodec in available:
+        return vcodec
+    family = codec_family(vcodec)
+    for backend in BACKENDS:
+        candidate = backend.encoder(family)
+        if candidate in available:
+            return candidate
+    return CPU_FALLBACKS.get(family, "libx264")
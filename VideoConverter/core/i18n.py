@@ -12,41 +12,48 @@ def _resource_dir() -> str:
 
 
 class I18N:
+    """Dil dosyaları ilk kullanımda, dil başına bir kez okunur"""
+
     def __init__(self, locale_dir: str = None, default_language: str = "tr"):
         app_dir = _resource_dir()
         self.locale_dir = locale_dir or os.path.join(app_dir, "locales")
         self.default_language = default_language
         self.language = default_language
         self.translations: Dict[str, Dict[str, str]] = {}
-        self.load_languages()
-
-    def load_languages(self):
-        if not os.path.isdir(self.locale_dir):
-            return
 
-        for name in os.listdir(self.locale_dir):
-            if not name.lower().endswith(".json"):
-                continue
-
-            lang = os.path.splitext(name)[0]
-            path = os.path.join(self.locale_dir, name)
+    def _load(self, language: str) -> Dict[str, str]:
+        if language not in self.translations:
+            path = os.path.join(self.locale_dir, f"{language}.json")
             try:
                 with open(path, "r", encoding="utf-8") as handle:
-                    self.translations[lang] = json.load(handle)
+                    self.translations[language] = json.load(handle)
             except (OSError, json.JSONDecodeError):
-                continue
+                self.translations[language] = {}
+        return self.translations[language]
+
+    def load_languages(self):
+        """Tüm dil dosyalarını şimdi oku"""
+        for language in self.available_languages():
+            self._load(language)
 
     def available_languages(self):
-        return sorted(self.translations.keys()) or [self.default_language]
+        if not os.path.isdir(self.locale_dir):
+            return [self.default_language]
+        languages = [
+            os.path.splitext(name)[0]
+            for name in os.listdir(self.locale_dir)
+            if name.lower().endswith(".json")
+        ]
+        return sorted(languages) or [self.default_language]
 
     def set_language(self, language: str):
-        if language in self.translations:
+        if language in self.available_languages():
             self.language = language
 
     def t(self, key: str, **kwargs) -> str:
         value = (
-            self.translations.get(self.language, {}).get(key)
-            or self.translations.get(self.default_language, {}).get(key)
+            self._load(self.language).get(key)
+            or self._load(self.default_language).get(key)
             or key
         )
         return value.format(**kwargs) if kwargs else value
@@ -5,11 +5,11 @@ import platform
 import os
 import sys
 import re
-import urllib.request
-import zipfile
 import tempfile
 from typing import Tuple, Callable, Optional
 
+from . import capabilities, hw_backends
+
 
 class Installer:
     """Otomatik kurulum yöneticisi"""
@@ -104,19 +104,28 @@ class Installer:
 
         try:
             if system == "windows":
-                return Installer._install_ffmpeg_windows(notify)
+                result = Installer._install_ffmpeg_windows(notify)
             elif system == "linux":
-                return Installer._install_ffmpeg_linux(notify)
+                result = Installer._install_ffmpeg_linux(notify)
             elif system == "darwin":
-                return Installer._install_ffmpeg_macos(notify)
+                result = Installer._install_ffmpeg_macos(notify)
             else:
                 return False, f"Desteklenmeyen sistem: {system}"
         except Exception as e:
             return False, f"Kurulum hatasi: {str(e)}"
 
+        # Yeni ikili başka bir yerde olabilir
+        capabilities.forget_paths()
+        return result
+
     @staticmethod
     def _install_ffmpeg_windows(notify: Callable) -> Tuple[bool, str]:
         """Windows'ta FFmpeg kur - Direkt indirip uygulama klasörüne koy"""
+        # Sadece bu yolda gerekli; açılışta yüklenmesin
+        import urllib.error
+        import urllib.request
+        import zipfile
+
         notify("FFmpeg indiriliyor...", 10)
 
         app_dir = Installer.get_app_dir()
@@ -316,86 +325,43 @@ class Installer:
     @staticmethod
     def check_nvenc() -> Tuple[bool, list]:
         """NVENC encoder desteği kontrol et"""
-        ffmpeg_path = shutil.which("ffmpeg")
-
-        # Yerel kurulumu da kontrol et
+        ffmpeg_path = Installer._find_ffmpeg()
         if not ffmpeg_path:
-            local_path = Installer.get_ffmpeg_local_path()
-            if os.path.exists(local_path):
-                ffmpeg_path = local_path
+            return False, []
+        return hw_backends.check_backend(ffmpeg_path, "nvenc")
 
+    @staticmethod
+    def check_hw_encoders() -> Tuple[bool, list]:
+        """Çalışan tüm donanım encoder'ları (her arka uç için bir deneme encode'u)"""
+        ffmpeg_path = Installer._find_ffmpeg()
         if not ffmpeg_path:
             return False, []
+        encoders = hw_backends.available_encoders(ffmpeg_path)
+        return len(encoders) > 0, encoders
 
-        available_encoders = []
-        nvenc_encoders = ["h264_nvenc", "hevc_nvenc"]
-
-        try:
-            # Encoder listesini al
-            result = subprocess.run(
-                [ffmpeg_path, "-hide_banner", "-encoders"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            for encoder in nvenc_encoders:
-                if encoder in result.stdout:
-                    # Test et
-                    test = subprocess.run(
-                        [ffmpeg_path, "-hide_banner", "-f", "lavfi", "-i",
-                         "nullsrc=s=256x256:d=1", "-c:v", encoder,
-                         "-f", "null", "-"],
-                        capture_output=True,
-                        timeout=10
-                    )
-                    if test.returncode == 0:
-                        available_encoders.append(encoder)
-
-            return len(available_encoders) > 0, available_encoders
-        except:
-            return False, []
+    @staticmethod
+    def _find_ffmpeg() -> Optional[str]:
+        # PATH, sonra yerel kurulum
+        return capabilities.find_binary("ffmpeg")
 
     @staticmethod
     def get_ffmpeg_path() -> str:
-        """Kullanılacak FFmpeg yolunu al"""
-        # Önce sistem PATH'inde ara
-        system_path = shutil.which("ffmpeg")
-        if system_path:
-            return system_path
-
-        # Yerel kurulumu kontrol et
-        local_path = Installer.get_ffmpeg_local_path()
-        if os.path.exists(local_path):
-            # PATH'e ekle (bu oturum için)
-            bin_dir = os.path.dirname(local_path)
+        """Kullanılacak FFmpeg yolunu al (süreç boyunca saklanır)"""
+        path = capabilities.find_binary("ffmpeg")
+        if not path:
+            return "ffmpeg"  # Varsayılan
+
+        # Yerel kurulumsa PATH'e ekle (bu oturum için)
+        if path == Installer.get_ffmpeg_local_path():
+            bin_dir = os.path.dirname(path)
             if bin_dir not in os.environ.get("PATH", ""):
                 os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
-            return local_path
-
-        return "ffmpeg"  # Varsayılan
+        return path
 
     @staticmethod
     def get_ffprobe_path() -> str:
-        """Kullanılacak FFprobe yolunu al"""
-        # Önce sistem PATH'inde ara
-        system_path = shutil.which("ffprobe")
-        if system_path:
-            return system_path
-
-        # Yerel kurulumu kontrol et
-        app_dir = Installer.get_app_dir()
-        system = platform.system().lower()
-
-        if system == "windows":
-            local_path = os.path.join(app_dir, "ffmpeg", "bin", "ffprobe.exe")
-        else:
-            local_path = os.path.join(app_dir, "ffmpeg", "ffprobe")
-
-        if os.path.exists(local_path):
-            return local_path
-
-        return "ffprobe"  # Varsayılan
+        """Kullanılacak FFprobe yolunu al (süreç boyunca saklanır)"""
+        return capabilities.find_binary("ffprobe") or "ffprobe"
 
     @staticmethod
     def install_nvidia_driver(progress_callback: Optional[Callable] = None) -> Tuple[bool, str]:
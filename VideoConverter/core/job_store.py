@@ -0,0 +1,211 @@
+"""Toplu dönüştürme kuyruğu için kalıcı (SQLite/WAL) iş deposu"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from .output_cache import normalize_settings
+from .storage import get_data_path
+
+# Tamamlanmamış sayılan durumlar
+UNFINISHED_STATUSES = ("pending", "processing", "paused")
+# Eski depolara sonradan eklenen sütunlar
+ADDED_COLUMNS = (
+    ("checkpoint", "TEXT"),
+    ("settings_hash", "TEXT"),
+    ("input_size", "INTEGER"),
+    ("input_mtime_ns", "INTEGER"),
+)
+DB_FILE = "jobs.sqlite3"
+# Bitmiş kayıtlar bu kadar gün sonra depo açılırken silinir
+PRUNE_AFTER_DAYS = 30
+
+
+def settings_hash(settings: Dict[str, Any]) -> str:
+    """Çıktıyı etkileyen ayarların özeti (output_cache ile aynı normalizasyon)"""
+    payload = json.dumps(normalize_settings(settings), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def default_db_path() -> str:
+    """Varsayılan depo dosyası (oluşturmaz)"""
+    return get_data_path(DB_FILE)
+
+
+def _input_stat(input_path: str) -> Tuple[Optional[int], Optional[int]]:
+    try:
+        stat = os.stat(input_path)
+    except OSError:
+        return None, None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class JobStore:
+    """
+    Kuyruktaki her işin durumunu, çıktı yolunu ve deneme sayısını saklar.
+
+    Uygulama çökse veya kapansa bile kuyruk yeniden açıldığında
+    doğrulanmış çıktılar atlanır, bekleyen işler kaldığı yerden devam eder.
+    Depo her açılışta PRUNE_AFTER_DAYS günden eski bitmiş kayıtları siler.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_db_path()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "input TEXT NOT NULL, output TEXT NOT NULL, settings TEXT, "
+            "status TEXT NOT NULL, attempts INTEGER DEFAULT 0, error TEXT, "
+            "output_size INTEGER DEFAULT 0, created REAL, updated REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for name, kind in ADDED_COLUMNS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+        self._conn.commit()
+        self.prune()
+
+    def add(self, input_path: str, output_path: str, settings: Dict[str, Any]) -> int:
+        """Yeni iş ekle ve kimliğini döndür (ayar özeti ve girdinin boyut/mtime'ı ile)"""
+        now = time.time()
+        input_size, input_mtime_ns = _input_stat(input_path)
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (input, output, settings, status, created, updated, "
+                "settings_hash, input_size, input_mtime_ns) "
+                "VALUES (?, ?, ?, 'pending', ?, ?, ?, ?, ?)",
+                (input_path, output_path, json.dumps(settings), now, now,
+                 settings_hash(settings), input_size, input_mtime_ns)
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def update(self, job_id: int, **fields):
+        """İş alanlarını güncelle (status, attempts, error, output_size, checkpoint)"""
+        allowed = {key: value for key, value in fields.items()
+                   if key in ("status", "attempts", "error", "output_size", "checkpoint")}
+        if not allowed:
+            return
+        if allowed.get("checkpoint") is not None:
+            allowed["checkpoint"] = json.dumps(allowed["checkpoint"])
+        columns = ", ".join(f"{key}=?" for key in allowed)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns}, updated=? WHERE id=?",
+                (*allowed.values(), time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def mark_completed(self, job_id: int, output_path: str):
+        """Tamamlanan işi çıktı boyutuyla birlikte kaydet"""
+        try:
+            size = os.path.getsize(output_path)
+        except OSError:
+            size = 0
+        self.update(job_id, status="completed", error=None, output_size=size, checkpoint=None)
+
+    def discard(self, job_ids: List[int]):
+        """Yarım kalan işleri bırak (kullanıcı yeni kuyruk başlattı)"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE jobs SET status='discarded', updated=? WHERE id=? AND status IN (?, ?, ?)",
+                [(time.time(), job_id, *UNFINISHED_STATUSES) for job_id in job_ids]
+            )
+            self._conn.commit()
+
+    def discard_unfinished(self):
+        """Tüm yarım kalan işleri bırak"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status='discarded', updated=? WHERE status IN (?, ?, ?)",
+                (time.time(), *UNFINISHED_STATUSES)
+            )
+            self._conn.commit()
+
+    def load_unfinished(self) -> List[Dict[str, Any]]:
+        """Devam ettirilecek işleri kuyruk sözlüğü formatında döndür"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, input, output, settings, status, attempts, error, checkpoint FROM jobs "
+                "WHERE status IN (?, ?, ?) ORDER BY id",
+                UNFINISHED_STATUSES
+            ).fetchall()
+
+        jobs = []
+        for job_id, input_path, output_path, settings, status, attempts, error, checkpoint in rows:
+            try:
+                settings = json.loads(settings or "{}")
+            except ValueError:
+                settings = {}
+            job = {
+                "job_id": job_id,
+                "input": input_path,
+                "output": output_path,
+                "settings": settings,
+                # Çökme anında işleniyor olan iş baştan alınır
+                "status": "pending",
+                "progress": 0,
+                "attempts": attempts or 0
+            }
+            # Duraklatılmış encode parçaları duruyorsa kaldığı yerden devam eder
+            try:
+                checkpoint = json.loads(checkpoint) if checkpoint else None
+            except ValueError:
+                checkpoint = None
+            if checkpoint and all(os.path.exists(part) for part in checkpoint.get("parts", [])):
+                job["checkpoint"] = checkpoint
+                job["interrupted"] = True
+            jobs.append(job)
+        return jobs
+
+    def is_verified_complete(self, job_id: int) -> bool:
+        """İş tamamlandı olarak kayıtlı ve çıktısı hâlâ aynı boyutta mı"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output, status, output_size FROM jobs WHERE id=?", (job_id,)
+            ).fetchone()
+        if not row or row[1] != "completed" or not row[2]:
+            return False
+        try:
+            return os.path.getsize(row[0]) == row[2]
+        except OSError:
+            return False
+
+    def find_verified_output(self, input_path: str, output_path: str, settings: Dict[str, Any]) -> bool:
+        """
+        Aynı iş daha önce doğrulanmış olarak tamamlandı mı
+
+        Girdi/çıktı yolu ve ayar özeti eşleşmeli, girdinin boyutu/mtime'ı
+        kayıttakiyle aynı olmalı; özeti olmayan eski kayıtlar eşleşmez.
+        """
+        input_size, input_mtime_ns = _input_stat(input_path)
+        if input_size is None:
+            return False
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE input=? AND output=? AND status='completed' "
+                "AND settings_hash=? AND input_size=? AND input_mtime_ns=? "
+                "ORDER BY id DESC LIMIT 1",
+                (input_path, output_path, settings_hash(settings), input_size, input_mtime_ns)
+            ).fetchone()
+        return bool(row) and self.is_verified_complete(row[0])
+
+    def prune(self, max_age_days: float = PRUNE_AFTER_DAYS):
+        """Eski bitmiş kayıtları sil"""
+        cutoff = time.time() - max_age_days * 86400
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE updated < ? AND status NOT IN (?, ?, ?)",
+                (cutoff, *UNFINISHED_STATUSES)
+            )
+            self._conn.commit()
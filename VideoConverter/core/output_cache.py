@@ -0,0 +1,357 @@
+"""İçerik adresli çıktı önbelleği: aynı girdi + ayar + ffmpeg için encode tekrarlanmaz"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from .priority import PROCESS_SETTINGS
+from .storage import get_data_path
+
+# Çıktıyı etkilemeyen (arayüz/zamanlama) ayarlar parmak izine girmez
+IGNORED_SETTINGS = {
+    "name", "description", "category", "input_formats", "threads", "progress_url",
+    "segment_parallel", "smart_copy",
+    *PROCESS_SETTINGS,
+}
+
+# Linux FICLONE ioctl'i (btrfs/xfs/bcachefs'te blokları paylaşan kopya)
+FICLONE = 0x40049409
+
+
+def normalize_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Parmak izi için ayarlar: boş/None ve ilgisiz anahtarlar atılır, sayılar tek biçimde"""
+    normalized = {}
+    for key, value in settings.items():
+        if key in IGNORED_SETTINGS or value is None or value == "":
+            continue
+        if isinstance(value, bool):
+            normalized[key] = value
+        elif isinstance(value, (int, float)):
+            normalized[key] = float(value)
+        else:
+            normalized[key] = value
+    return normalized
+
+
+def _reflink(source: str, target: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except (OSError, ImportError):
+        try:
+            os.remove(target)
+        except OSError:
+            pass
+        return False
+
+
+def materialize(source: str, target: str) -> str:
+    """
+    source'u target olarak oluştur: hardlink, reflink, kopya sırasıyla
+
+    Önce geçici dosyaya yazılır, sonra yerine taşınır (yarım dosya kalmaz).
+
+    Returns:
+        Kullanılan yöntem ("hardlink", "reflink" ya da "copy")
+    """
+    try:
+        if os.path.samefile(source, target):
+            # Zaten aynı dosya (rename aynı inode'da hiçbir şey yapmaz)
+            return "hardlink"
+    except OSError:
+        pass
+
+    temp_path = f"{target}.tmvc-cache"
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+    try:
+        os.link(source, temp_path)
+        method = "hardlink"
+    except OSError:
+        if _reflink(source, temp_path):
+            method = "reflink"
+        else:
+            shutil.copyfile(source, temp_path)
+            method = "copy"
+    os.replace(temp_path, target)
+    return method
+
+
+def detach(path: str):
+    """
+    Başka bir dosyayla hardlink paylaşan çıktıyı yeniden yazmadan önce ayır
+
+    ffmpeg mevcut dosyayı kırparak yazar; bağ koparılmazsa önbellekteki
+    kopya da değişirdi.
+    """
+    try:
+        if os.stat(path).st_nlink > 1:
+            os.remove(path)
+    except OSError:
+        pass
+
+
+class OutputCache:
+    """
+    Bitmiş çıktıların parmak izi ile adreslendiği depo
+
+    Parmak izi = girdi (varsayılan yol + boyut + mtime, istenirse tam içerik
+    hash'i) + normalize edilmiş ayarlar + çıktı uzantısı + ffmpeg sürümü.
+    Depo boyutu max_bytes'ı aşınca en uzun süre kullanılmayanlar silinir.
+    """
+
+    SCHEMA_VERSION = 1
+    DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+    HASH_CHUNK = 1024 * 1024
+    # Bellekte tutulan içerik hash'i sayısı (izleme modunda sınırsız büyümesin)
+    MAX_HASHES = 1024
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        use_content_hash: bool = False
+    ):
+        self.root = root or get_data_path("output_cache")
+        self.max_bytes = int(max_bytes if max_bytes is not None else self.DEFAULT_MAX_BYTES)
+        self.use_content_hash = use_content_hash
+        self._lock = threading.Lock()
+        self._hashes: "OrderedDict[tuple, str]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    def _open(self):
+        """İndeksi aç; açılamazsa önbellek devre dışı kalır"""
+        try:
+            os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+            conn = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=10,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS outputs")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outputs ("
+                "fingerprint TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime_ns INTEGER, "
+                "created REAL, last_used REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS outputs_lru ON outputs(last_used)")
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error):
+            self._conn = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    def _input_key(self, input_path: str) -> Optional[str]:
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return None
+        if not self.use_content_hash:
+            return f"{os.path.normcase(os.path.abspath(input_path))}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        # Tam içerik hash'i: aynı dosya başka yerde/adla da eşleşir
+        memo_key = (os.path.abspath(input_path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            cached = self._hashes.get(memo_key)
+            if cached:
+                self._hashes.move_to_end(memo_key)
+                return cached
+        digest = hashlib.blake2b(digest_size=20)
+        try:
+            with open(input_path, "rb") as handle:
+                for chunk in iter(lambda: handle.read(self.HASH_CHUNK), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        value = f"blake2b:{digest.hexdigest()}"
+        with self._lock:
+            self._hashes[memo_key] = value
+            while len(self._hashes) > self.MAX_HASHES:
+                self._hashes.popitem(last=False)
+        return value
+
+    @staticmethod
+    def _ffmpeg_key() -> str:
+        # Sadece stat: anlık görüntü varsa sürüm satırı, yoksa ikilinin kendisi
+        from . import capabilities
+        snapshot = capabilities.current()
+        if snapshot:
+            return snapshot.get("version") or json.dumps(snapshot["ffmpeg"], sort_keys=True)
+        return json.dumps(capabilities.binary_key(capabilities.find_binary("ffmpeg")), sort_keys=True)
+
+    def fingerprint(self, input_path: str, output_path: str, settings: Dict[str, Any]) -> Optional[str]:
+        """İşin parmak izi; girdi okunamazsa None"""
+        input_key = self._input_key(input_path)
+        if input_key is None:
+            return None
+        payload = json.dumps({
+            "input": input_key,
+            "settings": normalize_settings(settings),
+            "format": os.path.splitext(output_path)[1].lower(),
+            "ffmpeg": self._ffmpeg_key(),
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _object_path(self, fingerprint: str, extension: str) -> str:
+        return os.path.join(self.root, "objects", fingerprint[:2], f"{fingerprint}{extension}")
+
+    def lookup(self, fingerprint: str) -> Optional[str]:
+        """Geçerli kayıt varsa depodaki dosya yolunu döndür (LRU zamanını tazeler)"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT path, size, mtime_ns FROM outputs WHERE fingerprint=?", (fingerprint,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if not row:
+                return None
+            path, size, mtime_ns = row
+            # Hardlink'li bir çıktı yerinde değiştirildiyse kayıt da bozulmuştur
+            try:
+                stat = os.stat(path)
+                valid = stat.st_size == size and stat.st_mtime_ns == mtime_ns
+            except OSError:
+                valid = False
+            try:
+                if valid:
+                    self._conn.execute("UPDATE outputs SET last_used=? WHERE fingerprint=?",
+                                       (time.time(), fingerprint))
+                else:
+                    self._conn.execute("DELETE FROM outputs WHERE fingerprint=?", (fingerprint,))
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+        return path if valid else None
+
+    def restore(self, fingerprint: str, output_path: str) -> Optional[str]:
+        """
+        Önbellekteki çıktıyı output_path'e yerleştir
+
+        Returns:
+            Kullanılan yöntem; kayıt yoksa ya da yerleştirilemezse None
+        """
+        path = self.lookup(fingerprint)
+        if path is None:
+            return None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            return materialize(path, output_path)
+        except OSError:
+            return None
+
+    def store(self, fingerprint: str, output_path: str) -> bool:
+        """Bitmiş çıktıyı depoya ekle ve gerekirse eski kayıtları sil"""
+        if self._conn is None:
+            return False
+        try:
+            size = os.path.getsize(output_path)
+        except OSError:
+            return False
+        if size <= 0 or size > self.max_bytes:
+            return False
+
+        path = self._object_path(fingerprint, os.path.splitext(output_path)[1].lower())
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            materialize(output_path, path)
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError as e:
+            if e.errno != errno.ENOSPC:
+                print(f"Cikti onbellege alinamadi: {e}", file=sys.stderr)
+            return False
+
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO outputs (fingerprint, path, size, mtime_ns, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (fingerprint, path, size, mtime_ns, now, now)
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                return False
+        self.evict()
+        return True
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Toplam boyut sınırın altına inene kadar en eski kullanılanları sil"""
+        if self._conn is None:
+            return 0
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        removed = 0
+        with self._lock:
+            try:
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM outputs").fetchone()[0]
+                if total <= limit:
+                    return 0
+                rows = self._conn.execute(
+                    "SELECT fingerprint, path, size FROM outputs ORDER BY last_used"
+                ).fetchall()
+                for fingerprint, path, size in rows:
+                    if total <= limit:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                    self._conn.execute("DELETE FROM outputs WHERE fingerprint=?", (fingerprint,))
+                    total -= size
+                    removed += 1
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """{"entries", "bytes", "max_bytes"}"""
+        entries, total = 0, 0
+        if self._conn is not None:
+            with self._lock:
+                try:
+                    entries, total = self._conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outputs"
+                    ).fetchone()
+                except sqlite3.Error:
+                    pass
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def clear(self):
+        """Tüm önbelleği sil"""
+        self.evict(0)
+
+
+_default_cache: Optional[OutputCache] = None
+_default_lock = threading.Lock()
+
+
+def get_output_cache() -> OutputCache:
+    """Uygulama genelinde paylaşılan çıktı önbelleğini al"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = OutputCache()
+        return _default_cache
@@ -0,0 +1,242 @@
+"""Akıllı remux planlayıcı: yeniden encode gereksizse stream kopyalama"""
+import os
+from typing import Dict, Any, Optional, Tuple
+
+from .units import parse_bitrate
+
+# Encoder -> ffprobe codec_name eşlemesi
+ENCODER_FAMILIES = {
+    "libx264": "h264",
+    "h264_nvenc": "h264",
+    "h264_qsv": "h264",
+    "h264_vaapi": "h264",
+    "h264_amf": "h264",
+    "h264_videotoolbox": "h264",
+    "libx265": "hevc",
+    "hevc_nvenc": "hevc",
+    "hevc_qsv": "hevc",
+    "hevc_vaapi": "hevc",
+    "hevc_amf": "hevc",
+    "hevc_videotoolbox": "hevc",
+    "libvpx-vp9": "vp9",
+    "libaom-av1": "av1",
+    "libsvtav1": "av1",
+    "av1_nvenc": "av1",
+    "libxvid": "mpeg4",
+    "mpeg4": "mpeg4",
+    "aac": "aac",
+    "libfdk_aac": "aac",
+    "libmp3lame": "mp3",
+    "libopus": "opus",
+    "libvorbis": "vorbis",
+    "flac": "flac",
+    "ac3": "ac3",
+    "pcm_s16le": "pcm_s16le",
+}
+
+# Kopyalamanın "uyumlu" sayıldığı piksel formatları ve profiller: 10-bit /
+# 4:2:2 gibi kaynaklar, uyumluluk için seçilmiş bir preset'e kopyalanmaz
+COPY_PIX_FMTS = {
+    "h264": {"yuv420p", "yuvj420p"},
+    "hevc": {"yuv420p", "yuvj420p", "yuv420p10le"},
+    "vp9": {"yuv420p", "yuv420p10le"},
+    "av1": {"yuv420p", "yuv420p10le"},
+    "mpeg4": {"yuv420p"},
+}
+COPY_PROFILES = {
+    "h264": {"constrained baseline", "baseline", "main", "high"},
+    "hevc": {"main", "main 10"},
+    "vp9": {"profile 0", "profile 2"},
+    "av1": {"main"},
+    "mpeg4": {"simple profile", "advanced simple profile"},
+}
+
+# Kapsayıcıların kopyalanarak taşıyabildiği codec'ler
+CONTAINER_CODECS = {
+    ".mp4": {"h264", "hevc", "av1", "vp9", "mpeg4", "aac", "mp3", "opus", "ac3", "flac"},
+    ".m4a": {"aac", "alac"},
+    ".mov": {"h264", "hevc", "mpeg4", "prores", "aac", "mp3", "ac3", "pcm_s16le"},
+    ".mkv": {"h264", "hevc", "av1", "vp9", "mpeg4", "aac", "mp3", "opus", "vorbis", "flac", "ac3",
+             "pcm_s16le"},
+    ".webm": {"vp9", "av1", "opus", "vorbis"},
+    ".avi": {"mpeg4", "h264", "mp3", "ac3", "pcm_s16le"},
+    ".ts": {"h264", "hevc", "mpeg2video", "aac", "mp3", "ac3", "opus"},
+    ".mp3": {"mp3"},
+    ".wav": {"pcm_s16le"},
+    ".flac": {"flac"},
+    ".ogg": {"vorbis", "opus", "flac"},
+    ".aac": {"aac"},
+}
+
+
+class RemuxPlanner:
+    """
+    Girdi stream'lerini istenen ayarlarla karşılaştırır
+
+    Codec ailesi, piksel formatı/profil, çözünürlük, fps ve bitrate hedefle
+    uyumluysa ve filtre yoksa ilgili stream için encode yerine -c copy seçilir. Kaynak
+    bitrate'i hedefin TOLERANCE kadar üstüne kadar "aynı" sayılır;
+    daha düşük bitrate'e encode etmek kaliteyi arttırmaz.
+    """
+
+    TOLERANCE = 0.15
+
+    @staticmethod
+    def _format_mismatch(info: Dict, settings: Dict[str, Any], family: str) -> Optional[str]:
+        """Kaynağın piksel formatı/profili hedefe kopyalanamıyorsa nedeni"""
+        pix_fmt = (info.get("pix_fmt") or "").lower()
+        wanted = settings.get("pix_fmt")
+        if wanted and pix_fmt != str(wanted).lower():
+            return f"piksel formati farkli ({pix_fmt or '?'} -> {wanted})"
+        allowed = COPY_PIX_FMTS.get(family)
+        if allowed and pix_fmt and pix_fmt not in allowed:
+            return f"piksel formati uyumsuz ({pix_fmt})"
+        profile = (info.get("video_profile") or "").lower()
+        profiles = COPY_PROFILES.get(family)
+        if profiles and profile and profile not in profiles:
+            return f"profil uyumsuz ({info.get('video_profile')})"
+        return None
+
+    @staticmethod
+    def _has_video_filters(settings: Dict[str, Any], info: Dict) -> Optional[str]:
+        """Video filtresi gerekiyorsa nedenini döndür"""
+        speed = settings.get("speed")
+        if speed and float(speed) != 1.0:
+            return "hiz degisikligi"
+
+        resolution = settings.get("resolution")
+        if resolution:
+            try:
+                width, height = (int(part) for part in str(resolution).split(":"))
+            except ValueError:
+                return "olcekleme"
+            if (width, height) != (info.get("width"), info.get("height")):
+                return "olcekleme"
+
+        fps = settings.get("fps")
+        if fps and abs(float(fps) - float(info.get("fps") or 0)) > 0.01:
+            return "fps degisikligi"
+
+        # Nötr renk değerleri (0/1/1) filtre sayılmaz
+        neutral = {"brightness": 0, "contrast": 1, "saturation": 1}
+        for key, value in neutral.items():
+            if settings.get(key) is not None and float(settings[key]) != value:
+                return "renk ayari"
+        return None
+
+    @staticmethod
+    def _plan_video(info: Dict, settings: Dict[str, Any], output_format: str) -> Tuple[str, str]:
+        vcodec = settings.get("vcodec")
+        if vcodec is None:
+            return "none", "video yok"
+        if vcodec == "copy":
+            return "copy", "ayarlarda kopyalama secili"
+
+        source = info.get("video_codec") or ""
+        target = ENCODER_FAMILIES.get(vcodec)
+        if not source or target != source:
+            return "encode", f"codec farkli ({source or '?'} -> {target or vcodec})"
+        if source not in CONTAINER_CODECS.get(output_format, set()):
+            return "encode", f"{output_format} {source} tasiyamaz"
+
+        reason = (RemuxPlanner._format_mismatch(info, settings, source)
+                  or RemuxPlanner._has_video_filters(settings, info))
+        if reason:
+            return "encode", reason
+
+        target_rate = parse_bitrate(settings.get("bitrate"))
+        source_rate = info.get("video_bitrate") or 0
+        if not source_rate and info.get("bitrate"):
+            # Stream bitrate'i yoksa (ör. MKV) toplamdan ses payını düş
+            source_rate = info["bitrate"] - (info.get("audio_bitrate") or 0)
+        if target_rate:
+            if not source_rate:
+                return "encode", "kaynak bitrate bilinmiyor"
+            if source_rate > target_rate * (1 + RemuxPlanner.TOLERANCE):
+                return "encode", f"bitrate dusurulecek ({source_rate // 1000}k -> {target_rate // 1000}k)"
+
+        return "copy", f"{source} {info.get('width')}x{info.get('height')} hedefle uyumlu"
+
+    @staticmethod
+    def _plan_audio(info: Dict, settings: Dict[str, Any], output_format: str) -> Tuple[str, str]:
+        acodec = settings.get("acodec")
+        if acodec is None:
+            return "none", "ses yok"
+        if acodec == "copy":
+            return "copy", "ayarlarda kopyalama secili"
+
+        source = info.get("audio_codec") or ""
+        if not source:
+            return "encode", "kaynakta ses yok"
+        target = ENCODER_FAMILIES.get(acodec)
+        if target != source:
+            return "encode", f"codec farkli ({source} -> {target or acodec})"
+        if source not in CONTAINER_CODECS.get(output_format, set()):
+            return "encode", f"{output_format} {source} tasiyamaz"
+
+        speed = settings.get("speed")
+        if speed and float(speed) != 1.0:
+            return "encode", "hiz degisikligi"
+
+        target_rate = parse_bitrate(settings.get("audio_bitrate"))
+        source_rate = info.get("audio_bitrate") or 0
+        if target_rate and source_rate > target_rate * (1 + RemuxPlanner.TOLERANCE):
+            return "encode", f"bitrate dusurulecek ({source_rate // 1000}k -> {target_rate // 1000}k)"
+
+        return "copy", f"{source} hedefle uyumlu"
+
+    @staticmethod
+    def plan(info: Optional[Dict], settings: Dict[str, Any], output_path: str) -> Dict[str, Any]:
+        """
+        Stream başına karar ver
+
+        Returns:
+            {"video": "copy|encode|none", "audio": ..., "reasons": {...},
+             "changed": ayarlar değişti mi}
+        """
+        decision = {"video": "encode", "audio": "encode", "reasons": {}, "changed": False}
+        if not info or settings.get("smart_copy") is False:
+            decision["reasons"]["all"] = "akilli kopyalama kapali" if info else "girdi bilgisi yok"
+            decision["video"] = "none" if settings.get("vcodec") is None else "encode"
+            decision["audio"] = "none" if settings.get("acodec") is None else "encode"
+            return decision
+
+        output_format = os.path.splitext(output_path)[1].lower() or settings.get("output_format", "")
+        decision["video"], decision["reasons"]["video"] = RemuxPlanner._plan_video(
+            info, settings, output_format
+        )
+        decision["audio"], decision["reasons"]["audio"] = RemuxPlanner._plan_audio(
+            info, settings, output_format
+        )
+        decision["changed"] = (
+            (decision["video"] == "copy" and settings.get("vcodec") != "copy")
+            or (decision["audio"] == "copy" and settings.get("acodec") != "copy")
+        )
+        return decision
+
+    @staticmethod
+    def apply(settings: Dict[str, Any], decision: Dict[str, Any]) -> Dict[str, Any]:
+        """Karara göre kopyalanacak stream'leri -c copy yapan yeni ayarlar döndür"""
+        planned = dict(settings)
+        if decision.get("video") == "copy" and planned.get("vcodec") != "copy":
+            planned["vcodec"] = "copy"
+            planned["gpu"] = False
+            for key in ("bitrate", "preset", "threads"):
+                planned.pop(key, None)
+        if decision.get("audio") == "copy" and planned.get("acodec") != "copy":
+            planned["acodec"] = "copy"
+            planned.pop("audio_bitrate", None)
+        return planned
+
+    @staticmethod
+    def describe(decision: Dict[str, Any]) -> str:
+        """Kararı kullanıcıya gösterilecek kısa metne çevir"""
+        labels = {"copy": "kopyalanacak", "encode": "encode edilecek"}
+        parts = []
+        for stream, name in (("video", "Video"), ("audio", "Ses")):
+            action = decision.get(stream)
+            if action in labels:
+                reason = decision.get("reasons", {}).get(stream)
+                text = f"{name} {labels[action]}"
+                parts.append(f"{text} ({reason})" if reason else text)
+        return ", ".join(parts)
@@ -2,10 +2,47 @@
 import json
 import os
 import sys
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-# Preset yapısı
-PRESETS: Dict[str, Dict[str, Any]] = {
+from . import hw_backends
+
+
+class _LazyPresets(dict):
+    """İlk erişimde JSON presetlerini (load_json_presets) ekleyen sözlük"""
+
+    _loaded = False
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self._loaded = True
+            load_json_presets()
+
+
+def _loading(name: str):
+    method = getattr(dict, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._ensure_loaded()
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+# dict'in tüm okuma/yazma giriş noktaları (copy, setdefault, json.dumps'ın
+# kullandığı items, ...) önce JSON presetlerini yükler
+for _name in (
+    "__getitem__", "__setitem__", "__delitem__", "__contains__", "__iter__", "__reversed__", "__len__",
+    "__repr__", "__eq__", "__ne__", "__or__", "__ror__", "__ior__",
+    "get", "keys", "values", "items", "copy", "setdefault", "pop", "popitem", "update", "clear",
+):
+    if hasattr(dict, _name):
+        setattr(_LazyPresets, _name, _loading(_name))
+del _name
+
+
+# Preset yapısı (JSON presetleri ilk kullanımda eklenir)
+PRESETS: Dict[str, Dict[str, Any]] = _LazyPresets({
     # ==================== SADECE FORMAT DEĞİŞTİR (EN HIZLI) ====================
     "Format Degistir (Kalite Korunur)": {
         "description": "Sadece kapsayici degisir, video/ses ayni kalir - ANINDA",
@@ -346,7 +383,7 @@ PRESETS: Dict[str, Dict[str, Any]] = {
         "gpu": False,
         "custom": True
     }
-}
+})
 
 # Video codec preset'leri (encoding hızı/kalite dengesi)
 VIDEO_PRESETS = [
@@ -394,6 +431,7 @@ AUDIO_BITRATES = [
 
 def load_json_presets():
     """config/presets.json ve config/presets.d/*.json dosyalarini yukle."""
+    PRESETS._loaded = True
     if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
         app_dir = sys._MEIPASS
     else:
@@ -420,14 +458,28 @@ def load_json_presets():
             continue
 
 
-load_json_presets()
-
-
 def get_preset(name: str) -> Optional[Dict[str, Any]]:
     """Preset al"""
     return PRESETS.get(name)
 
 
+def adapt_to_host(preset: Dict[str, Any], encoders: List[str]) -> Dict[str, Any]:
+    """
+    Preset'in donanım encoder'ını bu makinede çalışan bir arka uca uyarla
+
+    Örn. h264_nvenc isteyen preset Intel makinede h264_qsv, hiç donanım
+    encoder'ı yoksa libx264 ile çalışır.
+    """
+    vcodec = preset.get("vcodec")
+    substitute = hw_backends.substitute_encoder(vcodec, encoders)
+    if substitute == vcodec:
+        return preset
+    adapted = dict(preset)
+    adapted["vcodec"] = substitute
+    adapted["gpu"] = hw_backends.is_hardware_encoder(substitute)
+    return adapted
+
+
 def get_presets_by_category(category: str) -> Dict[str, Dict[str, Any]]:
     """Kategoriye göre preset'leri filtrele"""
     return {k: v for k, v in PRESETS.items() if v.get("category") == category}
@@ -461,7 +513,7 @@ def create_custom_preset(
         "acodec": acodec,
         "bitrate": bitrate,
         "audio_bitrate": audio_bitrate,
-        "gpu": "nvenc" in vcodec.lower() if vcodec else False
+        "gpu": hw_backends.is_hardware_encoder(vcodec)
     }
 
     if preset:
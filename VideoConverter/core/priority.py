@@ -0,0 +1,354 @@
+"""ffmpeg alt süreçleri: öncelik (nice/ionice), cgroup v2 CPU/bellek sınırları, dondurma/devam"""
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from functools import lru_cache
+from itertools import count
+from typing import Dict, Any, Optional, Tuple
+
+# Roller: tekil (kullanıcının beklediği) dönüştürme ve toplu/izleme işleri
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+IDLE = "idle"
+
+# Rol -> varsayılan süreç seçenekleri. ionice: "sınıf[:seviye]"
+PROFILES: Dict[str, Dict[str, Any]] = {
+    INTERACTIVE: {"nice": 0, "ionice": "best-effort:4"},
+    # Ön plandaki işle yarışırken CPU'nun ~1/10'unu, diskte en düşük önceliği alır
+    BACKGROUND: {"nice": 10, "ionice": "best-effort:7"},
+    # Sadece boşta kalan kapasiteyi kullanır
+    IDLE: {"nice": 19, "ionice": "idle"},
+}
+
+# Ayarlardan okunan, çıktıyı etkilemeyen süreç anahtarları
+PROCESS_SETTINGS = ("priority", "nice", "ionice", "cpu_limit", "memory_limit", "cgroup_root")
+
+IONICE_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+DEFAULT_IONICE = (2, 4)
+
+# Windows öncelik sınıfları (subprocess sabitleri sadece Windows'ta tanımlı)
+BELOW_NORMAL_PRIORITY_CLASS = 0x4000
+IDLE_PRIORITY_CLASS = 0x40
+
+# Yetki devredilmiş (boş, yazılabilir) cgroup v2 klasörü; iş başına alt grup açılır
+CGROUP_ENV = "TMVC_CGROUP_ROOT"
+CGROUP_PREFIX = "tmvc-"
+CPU_PERIOD = 100000
+
+# Bu sürecin açtığı iş grupları: klasör -> ffmpeg PID'i (0: süreç henüz başlamadı)
+_groups: Dict[str, int] = {}
+_groups_lock = threading.Lock()
+_group_ids = count()
+
+_SIZE_UNITS = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+
+def resolve(settings: Optional[Dict[str, Any]], role: str = INTERACTIVE) -> Dict[str, Any]:
+    """
+    Rol ve iş ayarlarından süreç seçenekleri
+
+    settings["priority"] rolü ezer; nice/ionice/cpu_limit/memory_limit
+    tek tek de verilebilir (preset ya da --set ile).
+    """
+    settings = settings or {}
+    options = dict(PROFILES.get(settings.get("priority") or role, PROFILES[INTERACTIVE]))
+    for key in PROCESS_SETTINGS[1:]:
+        if settings.get(key) is not None:
+            options[key] = settings[key]
+    return options
+
+
+def parse_ionice(value: Any) -> Optional[Tuple[int, Optional[int]]]:
+    """"best-effort:7" / "idle" / 7 -> (sınıf, seviye); geçersizse None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return 2, max(0, min(7, value))
+    name, _, level = str(value).partition(":")
+    cls = IONICE_CLASSES.get(name.strip().lower())
+    if cls is None:
+        if name.strip().isdigit():
+            return 2, max(0, min(7, int(name)))
+        return None
+    if cls == 3:
+        return 3, None
+    return cls, max(0, min(7, int(level))) if level.strip().isdigit() else 4
+
+
+def parse_size(value: Any) -> Optional[int]:
+    """2147483648 / "2G" / "512M" -> bayt"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = str(value).strip().lower().rstrip("b")
+    multiplier = _SIZE_UNITS.get(text[-1:], 1)
+    if text[-1:] in _SIZE_UNITS:
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _tool(name: str) -> Optional[str]:
+    return shutil.which(name)
+
+
+def wrap_command(cmd: list, options: Dict[str, Any]) -> list:
+    """
+    Komutu ionice/nice ile sar
+
+    İkisi de hedefi exec eder: PID değişmez, terminate() ve telemetri
+    doğrudan ffmpeg'e ulaşır. Ayarlanamayan öncelik (ör. yetki gerektiren
+    negatif nice ya da realtime sınıfı) işi durdurmaz.
+    """
+    if sys.platform == "win32":
+        return cmd
+    prefix = []
+    ionice = parse_ionice(options.get("ionice"))
+    if ionice and ionice != DEFAULT_IONICE and sys.platform.startswith("linux") and _tool("ionice"):
+        cls, level = ionice
+        prefix.extend([_tool("ionice"), "-t", "-c", str(cls)])
+        if level is not None:
+            prefix.extend(["-n", str(level)])
+    nice = int(options.get("nice") or 0)
+    if nice and _tool("nice"):
+        prefix.extend([_tool("nice"), "-n", str(nice)])
+    return prefix + cmd if prefix else cmd
+
+
+def creation_flags(options: Dict[str, Any]) -> int:
+    """Windows'ta nice değerine karşılık gelen öncelik sınıfı"""
+    if sys.platform != "win32":
+        return 0
+    nice = int(options.get("nice") or 0)
+    if nice >= 15:
+        return IDLE_PRIORITY_CLASS
+    if nice > 0:
+        return BELOW_NORMAL_PRIORITY_CLASS
+    return 0
+
+
+def cgroup_root(options: Dict[str, Any]) -> Optional[str]:
+    """
+    İş gruplarının açılacağı cgroup v2 klasörü (yoksa None)
+
+    Kök, uygulamaya devredilmiş ve kendisinde süreç olmayan bir grup
+    olmalıdır (ör. systemd Delegate=yes ile); cpu/memory denetleyicileri
+    alt gruplar için açık değilse açılmaya çalışılır.
+    """
+    root = options.get("cgroup_root") or os.environ.get(CGROUP_ENV)
+    if not root or not sys.platform.startswith("linux"):
+        return None
+    control = os.path.join(root, "cgroup.subtree_control")
+    try:
+        with open(control, "r") as handle:
+            enabled = set(handle.read().split())
+        missing = {"cpu", "memory"} - enabled
+        if missing:
+            with open(control, "w") as handle:
+                handle.write(" ".join(f"+{name}" for name in sorted(missing)))
+    except OSError:
+        # Denetleyiciler açılamasa da mevcut olanlar kullanılabilir
+        if not os.path.isfile(control):
+            return None
+    return root
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _prune(root: str):
+    """
+    Kalmış boş iş gruplarını sil (ör. çöken bir örnekten)
+
+    Bu süreçte hâlâ kullanılan gruplara ve çalışan başka bir örneğin
+    gruplarına dokunulmaz; dolu gruplarda rmdir zaten başarısız olur.
+    """
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    with _groups_lock:
+        active = set(_groups)
+    for name in names:
+        if not name.startswith(CGROUP_PREFIX):
+            continue
+        path = os.path.join(root, name)
+        owner = name[len(CGROUP_PREFIX):].split("-")[0]
+        if path in active or (owner.isdigit() and int(owner) != os.getpid() and _alive(int(owner))):
+            continue
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+def create_cgroup(options: Dict[str, Any]) -> Optional[str]:
+    """
+    Süreç başlamadan önce CPU/bellek sınırlı iş grubunu aç
+
+    Returns:
+        Grup klasörü; sınır istenmediyse ya da cgroup v2 kullanılamıyorsa None
+    """
+    cpu_limit = options.get("cpu_limit")
+    memory_limit = parse_size(options.get("memory_limit"))
+    if not cpu_limit and not memory_limit:
+        return None
+    root = cgroup_root(options)
+    if root is None:
+        return None
+
+    _prune(root)
+    path = os.path.join(root, f"{CGROUP_PREFIX}{os.getpid()}-{next(_group_ids)}")
+    try:
+        os.makedirs(path, exist_ok=True)
+        if cpu_limit:
+            # cpu_limit çekirdek cinsinden (1.5 = bir buçuk çekirdek)
+            quota = max(1000, int(float(cpu_limit) * CPU_PERIOD))
+            with open(os.path.join(path, "cpu.max"), "w") as handle:
+                handle.write(f"{quota} {CPU_PERIOD}")
+        if memory_limit:
+            with open(os.path.join(path, "memory.max"), "w") as handle:
+                handle.write(str(memory_limit))
+    except (OSError, ValueError) as e:
+        print(f"cgroup sinirlari uygulanamadi: {e}", file=sys.stderr)
+        _remove_group(path)
+        return None
+    with _groups_lock:
+        _groups[path] = 0
+    return path
+
+
+def _join_cgroup(path: str):
+    """
+    preexec_fn: çocuk süreç exec'ten önce kendini gruba yazar
+
+    Böylece ffmpeg ilk komutundan itibaren sınırlar altında çalışır (fork
+    sonrası taşımada sınırsız geçen bir an kalmaz). Fork ile exec arasında
+    sadece os çağrıları kullanılır.
+    """
+    procs = os.path.join(path, "cgroup.procs")
+
+    def join():
+        try:
+            fd = os.open(procs, os.O_WRONLY)
+            try:
+                # "0": yazan sürecin kendisi
+                os.write(fd, b"0")
+            finally:
+                os.close(fd)
+        except OSError:
+            # Sınır uygulanamasa da iş çalışır
+            pass
+    return join
+
+
+def _remove_group(path: str):
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+def release_cgroup(process: subprocess.Popen):
+    """Biten sürecin iş grubunu sil (süreç bittikten sonra çağrılır)"""
+    with _groups_lock:
+        paths = [path for path, pid in _groups.items() if pid == process.pid]
+        for path in paths:
+            del _groups[path]
+    for path in paths:
+        # Süreç hâlâ gruptaysa rmdir başarısız olur; grubu sonraki _prune siler
+        _remove_group(path)
+
+
+def popen(cmd: list, options: Dict[str, Any], **kwargs) -> subprocess.Popen:
+    """
+    Süreç seçenekleri uygulanmış Popen
+
+    cgroup sınırı istendiyse grup önceden açılır ve çocuk exec'ten önce
+    gruba katılır; grup release_cgroup() ile silinir.
+    """
+    flags = creation_flags(options)
+    if flags:
+        kwargs["creationflags"] = kwargs.get("creationflags", 0) | flags
+    group = create_cgroup(options)
+    if group:
+        kwargs["preexec_fn"] = _join_cgroup(group)
+    try:
+        process = subprocess.Popen(wrap_command(cmd, options), **kwargs)
+    except Exception:
+        if group:
+            with _groups_lock:
+                _groups.pop(group, None)
+            _remove_group(group)
+        raise
+    if group:
+        with _groups_lock:
+            _groups[group] = process.pid
+    return process
+
+
+def can_suspend() -> bool:
+    """Süreçler yerinde dondurulabiliyor mu (SIGSTOP ya da NtSuspendProcess)"""
+    return hasattr(signal, "SIGSTOP") or sys.platform == "win32"
+
+
+def _nt_call(name: str, process: subprocess.Popen) -> bool:
+    import ctypes
+    return getattr(ctypes.windll.ntdll, name)(int(process._handle)) == 0
+
+
+def suspend_process(process: subprocess.Popen) -> bool:
+    """Süreci dondur; CPU kullanmaz ama belleği ve dosyaları tutar"""
+    if process.poll() is not None:
+        return False
+    try:
+        if hasattr(signal, "SIGSTOP"):
+            process.send_signal(signal.SIGSTOP)
+            return True
+        if sys.platform == "win32":
+            return _nt_call("NtSuspendProcess", process)
+    except (OSError, AttributeError, ValueError):
+        pass
+    return False
+
+
+def resume_process(process: subprocess.Popen) -> bool:
+    """Dondurulmuş süreci devam ettir"""
+    try:
+        if hasattr(signal, "SIGCONT"):
+            process.send_signal(signal.SIGCONT)
+            return True
+        if sys.platform == "win32":
+            return _nt_call("NtResumeProcess", process)
+    except (OSError, AttributeError, ValueError):
+        pass
+    return False
+
+
+def interrupt_process(process: subprocess.Popen) -> bool:
+    """
+    ffmpeg'i düzgünce durdur (SIGINT): yazılan kısım geçerli bir dosya olarak kapanır
+
+    Windows'ta ayrı konsol grubu olmadan gönderilemez; False döner.
+    """
+    if sys.platform == "win32" or process.poll() is not None:
+        return False
+    try:
+        process.send_signal(signal.SIGINT)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,192 @@
+"""FFprobe sonuçları için kalıcı (SQLite) + bellek içi (LRU) önbellek"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .storage import get_data_path
+
+
+class ProbeCache:
+    """
+    Dosya yolu + boyut + mtime anahtarlı metadata önbelleği.
+
+    Dosya değiştiğinde (boyut/mtime ya da istenirse kısmi içerik hash'i
+    farklıysa) kayıt geçersiz sayılır ve silinir.
+    """
+
+    # info sözlüğünün yapısı değişirse arttırılır; eski kayıtlar atılır
+    SCHEMA_VERSION = 4
+    HASH_CHUNK = 64 * 1024
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        memory_size: int = 2048,
+        use_content_hash: bool = False
+    ):
+        self.db_path = db_path or get_data_path("probe_cache.sqlite3")
+        self.memory_size = max(0, int(memory_size))
+        self.use_content_hash = use_content_hash
+        self._memory: "OrderedDict[str, Tuple[int, int, str, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    def _open(self):
+        """Veritabanını aç; açılamazsa sadece bellek önbelleği kullanılır"""
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS probe_cache")
+                conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS probe_cache ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+                "content_hash TEXT, info TEXT, updated REAL)"
+            )
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error:
+            self._conn = None
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def _content_hash(self, path: str, size: int) -> str:
+        """Dosyanın başından ve sonundan küçük bir parça ile hash üret"""
+        if not self.use_content_hash:
+            return ""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(size).encode())
+        try:
+            with open(path, "rb") as handle:
+                digest.update(handle.read(self.HASH_CHUNK))
+                if size > self.HASH_CHUNK * 2:
+                    handle.seek(-self.HASH_CHUNK, os.SEEK_END)
+                    digest.update(handle.read(self.HASH_CHUNK))
+        except OSError:
+            return ""
+        return digest.hexdigest()
+
+    def _remember(self, key: str, entry: Tuple[int, int, str, Dict]):
+        if not self.memory_size:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, path: str) -> Optional[Dict]:
+        """Geçerli bir kayıt varsa info sözlüğünün kopyasını döndür"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = self._normalize(path)
+        size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT size, mtime_ns, content_hash, info FROM probe_cache WHERE path=?",
+                        (key,)
+                    ).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row:
+                    try:
+                        entry = (row[0], row[1], row[2] or "", json.loads(row[3]))
+                    except (TypeError, ValueError):
+                        entry = None
+
+            if entry is None:
+                return None
+
+            cached_size, cached_mtime, cached_hash, info = entry
+            valid = cached_size == size and cached_mtime == mtime_ns
+
+        if valid and self.use_content_hash:
+            valid = cached_hash == self._content_hash(path, size)
+
+        if not valid:
+            self.invalidate(path)
+            return None
+
+        with self._lock:
+            self._remember(key, entry)
+        return dict(info)
+
+    def put(self, path: str, info: Dict):
+        """Probe sonucunu önbelleğe yaz"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+
+        key = self._normalize(path)
+        content_hash = self._content_hash(path, stat.st_size)
+        entry = (stat.st_size, stat.st_mtime_ns, content_hash, dict(info))
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO probe_cache "
+                    "(path, size, mtime_ns, content_hash, info, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, content_hash, json.dumps(info), time.time())
+                )
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def invalidate(self, path: str):
+        """Bir dosyanın kaydını sil"""
+        key = self._normalize(path)
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("DELETE FROM probe_cache WHERE path=?", (key,))
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+    def clear(self):
+        """Tüm önbelleği temizle"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("DELETE FROM probe_cache")
+                self._conn.commit()
+            except sqlite3.Error:
+                pass
+
+
+_default_cache: Optional[ProbeCache] = None
+_default_lock = threading.Lock()
+
+
+def get_probe_cache() -> ProbeCache:
+    """Uygulama genelinde paylaşılan önbelleği al"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ProbeCache()
+        return _default_cache
@@ -0,0 +1,149 @@
+"""FFmpeg -progress çıktısını blok blok okuyan, kısıtlı hızda ilerleme üreten okuyucu"""
+import re
+import time
+from typing import Callable, Dict, Iterator, Optional
+
+# -progress anahtarı -> ham değerin saklandığı yuva
+_KEYS = {
+    b"frame": "frame",
+    b"fps": "fps",
+    b"out_time_us": "out_time_us",
+    # Eski ffmpeg sürümlerinde adına rağmen mikrosaniye
+    b"out_time_ms": "out_time_us",
+    b"out_time": "out_time",
+    b"speed": "speed",
+    b"total_size": "size",
+}
+_TIME_RE = re.compile(rb"(\d+):(\d+):(\d+(?:\.\d+)?)")
+_NA = (b"", b"N/A")
+
+
+class ProgressReader:
+    """
+    -progress bloklarını okuyup her `progress=` satırında tek bir anlık
+    görüntü üretir
+
+    Blok içindeki satırlar sadece ham byte olarak saklanır; sayıya çevirme
+    yalnızca yayınlanacak bloklar için yapılır. Yayın hızı `rate` (Hz) ile
+    sınırlanır, `progress=end` her zaman yayınlanır. Böylece paralel iş
+    sayısı artsa da arayüze giden callback sayısı sabit kalır.
+    """
+
+    DEFAULT_RATE = 4.0
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        duration: float = 0,
+        rate: Optional[float] = DEFAULT_RATE,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.duration = duration or 0
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._clock = clock
+        self._raw: Dict[str, bytes] = {}
+        self._last_emit: Optional[float] = None
+        self._unsent = False
+        self.blocks = 0
+        self.emitted = 0
+
+    def _snapshot(self, status: str) -> Dict:
+        """Ham değerleri ilerleme sözlüğüne çevir"""
+        raw = self._raw
+        progress = {"ffmpeg_progress": status}
+
+        value = raw.get("frame")
+        if value is not None and value.isdigit():
+            progress["frame"] = int(value)
+
+        for key in ("fps", "speed"):
+            value = raw.get(key)
+            if value is not None and value not in _NA:
+                try:
+                    progress[key] = float(value.rstrip(b"x"))
+                except ValueError:
+                    pass
+
+        value = raw.get("size")
+        if value is not None and value.isdigit():
+            progress["size"] = int(value)
+
+        current_time = None
+        value = raw.get("out_time_us")
+        if value is not None and value.isdigit():
+            current_time = int(value) / 1_000_000
+        elif "out_time" in raw:
+            match = _TIME_RE.match(raw["out_time"])
+            if match:
+                h, m, s = match.groups()
+                current_time = int(h) * 3600 + int(m) * 60 + float(s)
+
+        if current_time is not None:
+            progress["current_time"] = current_time
+            if self.duration > 0:
+                progress["percent"] = min(100, current_time / self.duration * 100)
+        if status == "end":
+            progress["percent"] = 100
+        return progress
+
+    def feed(self, line: bytes) -> Optional[Dict]:
+        """Tek satırı işle; yayınlanacak blok tamamlandıysa sözlüğü döndür"""
+        key, sep, value = line.partition(b"=")
+        if not sep:
+            return None
+
+        if key != b"progress":
+            slot = _KEYS.get(key)
+            if slot is not None:
+                value = value.strip()
+                # "frame=  10 fps= 30 ..." gibi stderr istatistik satırlarını atla
+                if b" " not in value:
+                    self._raw[slot] = value
+            return None
+
+        self.blocks += 1
+        status = value.strip()
+        now = self._clock()
+        if status != b"end" and self._last_emit is not None and now - self._last_emit < self.interval:
+            self._unsent = True
+            return None
+
+        self._last_emit = now
+        self._unsent = False
+        self.emitted += 1
+        return self._snapshot("end" if status == b"end" else "continue")
+
+    def read(self, stream, should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+        """
+        Binary akıştan parça parça oku ve ilerleme sözlüklerini üret
+
+        Akış bittiğinde kısıtlama yüzünden yayınlanmamış son blok da verilir.
+        """
+        read = getattr(stream, "read1", stream.read)
+        pending = b""
+        while True:
+            chunk = read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            if should_stop and should_stop():
+                return
+
+            # stderr ile birleşik akışta istatistik satırları \r ile biter
+            if b"\r" in chunk:
+                chunk = chunk.replace(b"\r", b"\n")
+            lines = (pending + chunk).split(b"\n") if pending else chunk.split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                progress = self.feed(line)
+                if progress is not None:
+                    yield progress
+
+        if pending:
+            progress = self.feed(pending)
+            if progress is not None:
+                yield progress
+
+        if self._unsent:
+            self._unsent = False
+            self.emitted += 1
+            yield self._snapshot("continue")
@@ -0,0 +1,253 @@
+"""Tek girdiden tek ffmpeg sürecinde birden fazla çıktı (ör. 1080p + 720p + MP3)"""
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional, Callable
+
+from . import filter_graph, gpu_pipeline
+from .converter import VideoConverter
+from .history import get_encode_history
+
+
+class MultiRenditionConverter(VideoConverter):
+    """
+    Çoklu çıktı (rendition) dönüştürücüsü
+
+    Girdi bir kez çözülür ve her çıktıya dağıtılır; tüm çıktıların ortak
+    filtreleri (ör. renk ayarı) split/asplit'ten önce bir kez çalışır
+    (bkz. filter_graph.branch). Her çıktının codec ayarları build_command ile
+    üretilir, yani tek dosyalık dönüştürmeyle aynıdır.
+
+    renditions: [{"output": yol, "settings": preset/ayar sözlüğü}, ...]
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.outputs: List[str] = []
+        self._rendition_progress_callback: Optional[Callable] = None
+
+    def set_rendition_callback(self, progress: Optional[Callable] = None):
+        """Çıktı başına ilerleme: progress(index, output, progress_dict)"""
+        self._rendition_progress_callback = progress
+
+    def plan_renditions(
+        self,
+        input_path: str,
+        renditions: List[Dict[str, Any]],
+        video_info: Optional[Dict] = None
+    ) -> List[Dict[str, Any]]:
+        """Her çıktı için remux planını uygula ve GPU hattını ortaklaştır"""
+        planned = []
+        for rendition in renditions:
+            settings = self.plan_settings(input_path, rendition["output"], rendition["settings"], video_info)
+            video_info = self.video_info
+            planned.append({"output": rendition["output"], "settings": settings})
+
+        # CUDA kareleri tüm video dallarına gider: hat ya hepsinde açık ya hiçbirinde
+        encoded = [item for item in planned if item["settings"].get("vcodec") not in (None, "copy")]
+        enabled = [gpu_pipeline.is_enabled(item["settings"]) for item in encoded]
+        if any(enabled) and not all(enabled):
+            for item in encoded:
+                item["settings"] = dict(item["settings"], gpu_pipeline=False)
+        return planned
+
+    def build_multi_command(
+        self,
+        input_path: str,
+        renditions: List[Dict[str, Any]],
+        video_info: Optional[Dict] = None
+    ) -> list:
+        """Tek decode'lu, çok çıktılı FFmpeg komutunu oluştur"""
+        if not renditions:
+            raise ValueError("En az bir cikti gerekli")
+        starts = {float(item["settings"].get("trim_start") or 0) for item in renditions}
+        if len(starts) > 1:
+            raise ValueError("Tum ciktilarin baslangic noktasi (trim_start) ayni olmali")
+
+        has_audio = not video_info or bool(video_info.get("audio_codec"))
+        outputs = []
+        video_chains, audio_chains = [], []
+        input_args: List[str] = []
+        for item in renditions:
+            settings = item["settings"]
+            cmd = self.build_command(input_path, item["output"], settings, video_info)
+            # Sadece çıktı seçenekleri alınır (-i girdi ... -nostats arası);
+            # filtreler tek grafikte birleştirileceğinden -vf/-af çıkarılır
+            args = cmd[cmd.index("-i") + 2:cmd.index("-nostats")]
+            for flag in ("-vf", "-af"):
+                if flag in args:
+                    index = args.index(flag)
+                    del args[index:index + 2]
+
+            graph = self.build_filters(settings, video_info)
+            vcodec = settings.get("vcodec")
+            acodec = settings.get("acodec")
+            output = {"path": item["output"], "args": args, "video": None, "audio": None}
+            if vcodec not in (None, "copy"):
+                extra = self.attach_hardware(graph, settings)
+                output["video"] = len(video_chains)
+                video_chains.append(graph.video)
+                # Cihaz seçenekleri globaldir: her arka uç için bir kez
+                if extra and " ".join(extra) not in " ".join(input_args):
+                    input_args.extend(extra)
+            elif vcodec == "copy":
+                output["video"] = "copy"
+            if acodec not in (None, "copy") and has_audio:
+                output["audio"] = len(audio_chains)
+                audio_chains.append(graph.audio)
+            elif acodec is not None:
+                output["audio"] = "copy"
+            outputs.append(output)
+
+        source_size = filter_graph.source_size_of(video_info)
+        graph_args, video_labels, audio_labels = filter_graph.complex_args(
+            filter_graph.branch_filters(video_chains, source_size),
+            filter_graph.branch_filters(audio_chains)
+        )
+
+        cmd = [self.ffmpeg_path, "-y", "-hide_banner"] + input_args
+        trim_start = starts.pop()
+        if trim_start:
+            cmd.extend(["-ss", f"{trim_start:.3f}"])
+        cmd.extend(["-i", input_path])
+        cmd.extend(graph_args)
+
+        for output in outputs:
+            video, audio = output["video"], output["audio"]
+            if video == "copy":
+                cmd.extend(["-map", "0:v:0"])
+            elif video is not None:
+                cmd.extend(["-map", video_labels[video] or "0:v:0"])
+            if audio == "copy":
+                cmd.extend(["-map", "0:a:0?"])
+            elif audio is not None:
+                cmd.extend(["-map", audio_labels[audio] or "0:a:0"])
+            cmd.extend(output["args"])
+            cmd.append(output["path"])
+
+        # -progress global seçenektir: ilk çıktıdan önce verilmeli
+        first_output = cmd.index("-map") if "-map" in cmd else len(cmd) - 1
+        cmd[first_output:first_output] = ["-nostats", "-progress", "pipe:1"]
+        return cmd
+
+    def convert_renditions(
+        self,
+        input_path: str,
+        renditions: List[Dict[str, Any]],
+        duration: float = 0,
+        video_info: Optional[Dict] = None
+    ):
+        """
+        Çoklu çıktı dönüştürmesini başlat (async thread'de)
+
+        complete callback'i çıktı yollarının listesiyle çağrılır.
+        """
+        if self.is_running:
+            if self._error_callback:
+                self._error_callback("Zaten devam eden bir donusturme var")
+            return
+
+        self.is_running = True
+        self.is_cancelled = False
+        self.outputs = [rendition["output"] for rendition in renditions]
+
+        thread = threading.Thread(
+            target=self._renditions_thread,
+            args=(input_path, renditions, duration, video_info)
+        )
+        thread.daemon = True
+        thread.start()
+
+    def _renditions_thread(
+        self,
+        input_path: str,
+        renditions: List[Dict[str, Any]],
+        duration: float,
+        video_info: Optional[Dict]
+    ):
+        started = time.monotonic()
+        sampler = None
+        capture = None
+        self.last_telemetry = None
+        self.last_log = None
+        try:
+            planned = self.plan_renditions(input_path, renditions, video_info)
+            cmd = self.build_multi_command(input_path, planned, self.video_info)
+
+            # Süreç seçenekleri (öncelik/sınırlar) tüm çıktılar için ilk çıktınınki
+            self.process = self._start_process(cmd, planned[0]["settings"], self.job_label(self.outputs[0]))
+            sampler = self._start_sampler(self.process, self.job_label(self.outputs[0]))
+            for progress in self._iter_progress(self.process, duration):
+                if sampler:
+                    sampler.note_progress(progress)
+                self._report(progress)
+            if sampler:
+                sampler.stop()
+            self.process.wait()
+            self.last_telemetry = self._finish_sampler(sampler, self.process)
+            sampler = None
+            capture = self._finish_stderr(self.process)
+            self.last_log = capture.summary() if capture else None
+
+            if self.is_cancelled:
+                self._remove_outputs()
+                if self._error_callback:
+                    self._error_callback("Dönüştürme iptal edildi")
+            elif self.process.returncode == 0:
+                self._record_renditions(planned, started)
+                if self._complete_callback:
+                    self._complete_callback(list(self.outputs))
+            else:
+                if self._error_callback:
+                    detail = capture.message() if capture else ""
+                    self._error_callback(
+                        f"FFmpeg hatası (kod: {self.process.returncode})" + (f": {detail}" if detail else "")
+                    )
+
+        except Exception as e:
+            if self._error_callback:
+                self._error_callback(str(e))
+        finally:
+            if sampler:
+                self.last_telemetry = self._finish_sampler(sampler, self.process)
+            if self.process is not None and capture is None:
+                self._finish_stderr(self.process)
+            self.is_running = False
+            self.process = None
+
+    def _report(self, progress: Dict[str, Any]):
+        """
+        Ortak ilerlemeyi çıktılara dağıt
+
+        Tüm çıktılar aynı decode'dan beslendiği için süre/yüzde ortaktır;
+        boyut her çıktı dosyasından ayrı okunur.
+        """
+        sizes = []
+        for index, output in enumerate(self.outputs):
+            try:
+                size = os.path.getsize(output)
+            except OSError:
+                size = 0
+            sizes.append(size)
+            if self._rendition_progress_callback:
+                self._rendition_progress_callback(index, output, dict(progress, size=size))
+        if self._progress_callback:
+            self._progress_callback(dict(progress, renditions=len(self.outputs), sizes=sizes))
+
+    def _record_renditions(self, planned: List[Dict[str, Any]], started: float):
+        # Çıktılar aynı süreci paylaştı: geçmişe eşzamanlı işler gibi yazılır
+        elapsed = time.monotonic() - started
+        for item in planned:
+            try:
+                get_encode_history().record(
+                    self.video_info, item["settings"], elapsed, item["output"],
+                    concurrency=len(planned)
+                )
+            except Exception as e:
+                print(f"Gecmis kaydedilemedi: {e}", file=sys.stderr)
+
+    def _remove_outputs(self):
+        for output in self.outputs:
+            if os.path.exists(output):
+                os.remove(output)
@@ -0,0 +1,210 @@
+"""Başarısız encode'lar için hata sınıflandırma, bekleme ve geri düşme (fallback) merdiveni"""
+import os
+import re
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from .hw_backends import CPU_FALLBACKS, codec_family, is_hardware_encoder
+
+# Hata sınıfları
+HARDWARE = "hardware"      # GPU oturum limiti, sürücü/cihaz açılamadı
+CONTAINER = "container"    # Kapsayıcı kopyalanan codec'i kabul etmedi
+STREAM = "stream"          # Altyazı/veri gibi taşınamayan ek stream
+TRANSIENT = "transient"    # Geçici G/Ç, ağ ya da sinyalle öldürülme
+FATAL = "fatal"            # Girdi bozuk/yok, yetki, disk dolu
+UNKNOWN = "unknown"
+
+# Merdiven adımları (RetryPolicy.ladder sırası önemli değil: hata sınıfı adımı seçer)
+STEP_CPU = "cpu"
+STEP_REENCODE = "reencode"
+STEP_DROP_STREAMS = "drop_streams"
+LADDER = (STEP_CPU, STEP_REENCODE, STEP_DROP_STREAMS)
+
+# stderr imzaları (küçük harfe çevrilmiş metinde aranır), kontrol sırasıyla
+SIGNATURES: Tuple[Tuple[str, re.Pattern], ...] = (
+    (HARDWARE, re.compile(
+        r"openencodesessionex failed|no capable devices found|incompatible client key"
+        r"|cannot load (?:libnvidia-encode|libcuda|nvcuda)|nvenc api version|no nvenc capable"
+        r"|cuda_error|cuinit|failed setup for format cuda|device creation failed"
+        r"|failed to initiali[sz]e (?:vaapi|the qsv|mfx)|error creating a mfx session"
+        r"|hardware device setup failed|no va display found|cannot open the drm device"
+        r"|unknown encoder '[a-z0-9]+_(?:nvenc|qsv|vaapi|amf|videotoolbox)'"
+    )),
+    (CONTAINER, re.compile(
+        r"could not find tag for codec|not currently supported in container"
+        r"|incompatible with output codec id|could not write header"
+        r"|tag \S+ incompatible"
+    )),
+    (STREAM, re.compile(
+        r"subtitle encoding currently only possible from text to text|cannot map stream"
+        r"|only audio, video, and subtitles are supported|unsupported codec with id"
+        r"|decoding requested, but no decoder found|data stream encoding not supported"
+        r"|attachment stream"
+    )),
+    (TRANSIENT, re.compile(
+        r"resource temporarily unavailable|input/output error|i/o error|connection reset"
+        r"|connection timed out|connection refused|stale file handle|broken pipe"
+        r"|device or resource busy|interrupted system call|timed out"
+    )),
+    (FATAL, re.compile(
+        r"no such file or directory|permission denied|invalid data found when processing input"
+        r"|no space left on device|moov atom not found|unknown encoder|disk quota exceeded"
+    )),
+)
+
+# Kopyalama reddedilince kapsayıcının varsayılan encoder'ları (video, ses)
+REENCODE_DEFAULTS = {
+    ".webm": ("libvpx-vp9", "libopus"),
+    ".ogg": (None, "libvorbis"),
+    ".mp3": (None, "libmp3lame"),
+    ".m4a": (None, "aac"),
+    ".aac": (None, "aac"),
+    ".wav": (None, "pcm_s16le"),
+    ".flac": (None, "flac"),
+    ".avi": ("mpeg4", "libmp3lame"),
+}
+DEFAULT_ENCODERS = ("libx264", "aac")
+
+# Donanım hattına özgü, yazılım encoder'ında anlamsız ayarlar
+HARDWARE_SETTINGS = ("gpu", "gpu_pipeline")
+# Yazılım encoder'larının anladığı hız adları (native "p4" gibi değerler atılır)
+SOFTWARE_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow",
+                    "slower", "veryslow", "placebo")
+
+
+def classify(error: Optional[str], returncode: Optional[int] = None) -> str:
+    """Hata mesajı (ffmpeg stderr sonu dahil) ve çıkış kodundan hata sınıfı"""
+    text = (error or "").lower()
+    for name, pattern in SIGNATURES:
+        if pattern.search(text):
+            return name
+    # Sinyalle öldürüldü (OOM killer, servis yeniden başlatma): tekrar denenebilir
+    if returncode is not None and returncode < 0:
+        return TRANSIENT
+    return UNKNOWN
+
+
+class RetryPolicy:
+    """
+    Hangi hatanın kaç kez, ne kadar bekleyerek ve hangi ayarlarla tekrar
+    deneneceği
+
+    Geri düşme adımları deterministiktir ve beklemeden uygulanır; aynı
+    ayarlarla tekrar sadece geçici hatalarda, üstel bekleme ile yapılır.
+    max_attempts ilk deneme dahil toplam deneme sayısıdır.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff: float = 5.0,
+        factor: float = 2.0,
+        max_backoff: float = 300.0,
+        ladder: Iterable[str] = LADDER,
+        retry_unknown: bool = False
+    ):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff = max(0.0, float(backoff))
+        self.factor = max(1.0, float(factor))
+        self.max_backoff = max(self.backoff, float(max_backoff))
+        self.ladder = tuple(ladder)
+        self.retry_unknown = retry_unknown
+
+    def delay(self, attempt: int) -> float:
+        """attempt. denemeden sonra beklenecek saniye"""
+        return min(self.max_backoff, self.backoff * self.factor ** max(0, attempt - 1))
+
+    def next_settings(
+        self,
+        settings: Dict[str, Any],
+        failure: str,
+        output_path: str,
+        requested: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Hata sınıfına uyan merdiven adımı
+
+        Args:
+            settings: Başarısız denemenin ayarları
+            requested: Remux planı uygulanmadan önceki ayarlar
+
+        Returns:
+            (adım, yeni ayarlar); uygun adım yoksa None
+        """
+        if failure == HARDWARE and STEP_CPU in self.ladder:
+            return self._to_cpu(settings)
+        if failure == CONTAINER and STEP_REENCODE in self.ladder:
+            return self._to_reencode(settings, output_path, requested)
+        if failure == STREAM and STEP_DROP_STREAMS in self.ladder:
+            return self._drop_streams(settings)
+        return None
+
+    def plan(
+        self,
+        settings: Dict[str, Any],
+        error: Optional[str],
+        returncode: Optional[int],
+        attempts: int,
+        output_path: str,
+        requested: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Başarısız deneme için tekrar planı
+
+        Returns:
+            {"failure", "step", "settings", "delay"}; tekrar denenmeyecekse None
+        """
+        if attempts >= self.max_attempts:
+            return None
+        failure = classify(error, returncode)
+        fallback = self.next_settings(settings, failure, output_path, requested)
+        if fallback:
+            step, new_settings = fallback
+            return {"failure": failure, "step": step, "settings": new_settings, "delay": 0.0}
+        if failure == TRANSIENT or (failure == UNKNOWN and self.retry_unknown):
+            return {"failure": failure, "step": "retry", "settings": settings, "delay": self.delay(attempts)}
+        return None
+
+    @staticmethod
+    def _to_cpu(settings: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        vcodec = settings.get("vcodec")
+        if not is_hardware_encoder(vcodec):
+            return None
+        cpu = dict(settings)
+        cpu["vcodec"] = CPU_FALLBACKS.get(codec_family(vcodec), "libx264")
+        for key in HARDWARE_SETTINGS:
+            cpu.pop(key, None)
+        if cpu.get("preset") not in SOFTWARE_PRESETS:
+            cpu.pop("preset", None)
+        return STEP_CPU, cpu
+
+    @staticmethod
+    def _to_reencode(
+        settings: Dict[str, Any],
+        output_path: str,
+        requested: Optional[Dict[str, Any]]
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if "copy" not in (settings.get("vcodec"), settings.get("acodec")):
+            return None
+        requested = requested or {}
+        video, audio = REENCODE_DEFAULTS.get(os.path.splitext(output_path)[1].lower(), DEFAULT_ENCODERS)
+        encoded = dict(settings)
+        # Planlayıcı tekrar kopyalamaya dönmesin
+        encoded["smart_copy"] = False
+        for key, default in (("vcodec", video), ("acodec", audio)):
+            if encoded.get(key) != "copy":
+                continue
+            wanted = requested.get(key)
+            encoded[key] = wanted if wanted and wanted != "copy" else default
+        for key in ("bitrate", "preset", "audio_bitrate"):
+            if requested.get(key) and not encoded.get(key):
+                encoded[key] = requested[key]
+        return STEP_REENCODE, encoded
+
+    @staticmethod
+    def _drop_streams(settings: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        dropped = set(settings.get("drop_streams") or ())
+        if {"subtitle", "data"} <= dropped:
+            return None
+        stripped = dict(settings)
+        stripped["drop_streams"] = sorted(dropped | {"subtitle", "data"})
+        return STEP_DROP_STREAMS, stripped
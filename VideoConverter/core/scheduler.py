@@ -0,0 +1,119 @@
+"""Kaynak farkındalıklı encode zamanlayıcısı"""
+import os
+import threading
+from typing import Dict, Any, Optional
+
+from .hw_backends import is_hardware_encoder
+
+# İş maliyet sınıfları
+JOB_COPY = "copy"     # -c copy remux: disk I/O ağırlıklı
+JOB_AUDIO = "audio"   # Sadece ses encode: tek çekirdek yeterli
+JOB_CPU = "cpu"       # libx264/libx265 vb.: tüm çekirdekleri doyurur
+JOB_GPU = "gpu"       # Donanım encoder: oturum limitine bağlı
+
+
+def classify_job(settings: Dict[str, Any]) -> str:
+    """Ayarlara bakarak işin maliyet sınıfını belirle"""
+    vcodec = settings.get("vcodec")
+    acodec = settings.get("acodec")
+
+    if vcodec is None or settings.get("audio_only"):
+        return JOB_COPY if acodec in (None, "copy") else JOB_AUDIO
+
+    if vcodec == "copy":
+        return JOB_COPY if acodec in (None, "copy") else JOB_AUDIO
+
+    if settings.get("gpu") or is_hardware_encoder(vcodec):
+        return JOB_GPU
+
+    return JOB_CPU
+
+
+class ResourceScheduler:
+    """
+    İşleri ayrı bütçelere göre kabul eden zamanlayıcı
+
+    Bütçeler:
+        cpu: Kullanılabilir CPU thread sayısı
+        gpu: Eşzamanlı NVENC oturumu
+        io: Eşzamanlı disk ağırlıklı (remux) iş
+        encode: Eşzamanlı ağır encode (CPU/GPU) işi
+
+    Her işe verilen -threads, cpu bütçesinden düşülen miktarla aynıdır.
+    """
+
+    # Tüketici NVIDIA kartlarında sürücü oturum limiti
+    DEFAULT_GPU_SESSIONS = 3
+    DEFAULT_IO_SLOTS = 8
+    # CPU encode'ları bu kadar thread'i hafif (ses/GPU) işlere bırakır
+    LIGHT_RESERVE = 2
+
+    def __init__(
+        self,
+        cpu_threads: Optional[int] = None,
+        gpu_sessions: Optional[int] = None,
+        io_slots: Optional[int] = None,
+        encode_slots: int = 1
+    ):
+        self.budgets = {
+            "cpu": max(1, int(cpu_threads or os.cpu_count() or 1)),
+            "gpu": max(1, int(gpu_sessions or self.DEFAULT_GPU_SESSIONS)),
+            "io": max(1, int(io_slots or self.DEFAULT_IO_SLOTS)),
+            "encode": max(1, int(encode_slots or 1)),
+        }
+        self.in_use = {name: 0 for name in self.budgets}
+        self.running = 0
+        self._cond = threading.Condition()
+
+    def threads_for(self, job_class: str) -> Optional[int]:
+        """İş sınıfı için ffmpeg'e verilecek -threads değeri (düşülen cpu payı)"""
+        return self.job_cost(job_class).get("cpu")
+
+    def job_cost(self, job_class: str) -> Dict[str, int]:
+        """İş sınıfının bütçelerden tükettiği miktar"""
+        if job_class == JOB_COPY:
+            return {"io": 1}
+        if job_class == JOB_AUDIO:
+            return {"cpu": 1}
+        if job_class == JOB_GPU:
+            # Decode ve filtreler için
+            return {"gpu": 1, "cpu": min(2, self.budgets["cpu"]), "encode": 1}
+        return {"cpu": self.cpu_cost(), "encode": 1}
+
+    def cpu_cost(self) -> int:
+        """
+        CPU encode'unun cpu bütçesinden düştüğü miktar
+
+        encode'lar bütçeyi tamamen doldurmaz: LIGHT_RESERVE thread ses/GPU
+        işlerine kalır, bunlar encode'ların arkasında beklemeden kabul edilir.
+        """
+        cpu = self.budgets["cpu"]
+        reserve = min(self.LIGHT_RESERVE, cpu - 1)
+        return max(1, (cpu - reserve) // self.budgets["encode"])
+
+    def fits(self, cost: Dict[str, int]) -> bool:
+        """Maliyet mevcut bütçeye sığıyor mu (boşta iken her iş kabul edilir)"""
+        if self.running == 0:
+            return True
+        return all(self.in_use[name] + amount <= self.budgets[name] for name, amount in cost.items())
+
+    def try_acquire(self, cost: Dict[str, int]) -> bool:
+        """Sığıyorsa bütçeyi ayır (çağıran condition kilidini tutmalı)"""
+        if not self.fits(cost):
+            return False
+        for name, amount in cost.items():
+            self.in_use[name] += amount
+        self.running += 1
+        return True
+
+    def release(self, cost: Dict[str, int]):
+        """İş bittiğinde bütçeyi geri ver ve bekleyenleri uyandır"""
+        with self._cond:
+            for name, amount in cost.items():
+                self.in_use[name] = max(0, self.in_use[name] - amount)
+            self.running = max(0, self.running - 1)
+            self._cond.notify_all()
+
+    @property
+    def condition(self) -> threading.Condition:
+        return self._cond
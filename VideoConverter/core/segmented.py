@@ -0,0 +1,395 @@
+"""Tek bir uzun dosyayı parçalara bölüp paralel encode eden dönüştürücü"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from . import priority, telemetry
+from .converter import VideoConverter
+from .ffmpeg_utils import FFmpegUtils
+from .hw_backends import is_hardware_encoder
+
+
+class SegmentedConverter(VideoConverter):
+    """
+    Parçalı (chunked) dönüştürme modu
+
+    1. Girdi, keyframe sınırlarından kopyalanarak parçalara bölünür
+    2. Parçalar build_command ayarlarıyla paralel encode edilir (sessiz)
+    3. Ses tüm dosyadan tek seferde encode edilir (kesintisiz ses için)
+    4. Parçalar concat demuxer ile yeniden encode edilmeden birleştirilir
+
+    Kısa dosyalar, kırpılmış ve copy/ses-only işler ile GPU encoder'lar normal
+    yoldan gider.
+    """
+
+    # Bu süreden kısa videolarda bölmek kazandırmaz
+    MIN_DURATION = 600
+    MIN_SEGMENT_SECONDS = 30
+    # İlerleme ağırlıkları (bölme / encode / birleştirme)
+    SPLIT_WEIGHT = 3.0
+    CONCAT_WEIGHT = 2.0
+
+    def __init__(self, workers: Optional[int] = None, segment_seconds: Optional[float] = None):
+        super().__init__()
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.segment_seconds = segment_seconds
+        self._processes = set()
+        self._proc_lock = threading.Lock()
+        # Parça süreçlerinin telemetri özetleri (iş sonunda birleştirilir)
+        self._summaries: List[Dict[str, Any]] = []
+        self._job = ""
+        self._settings: Dict[str, Any] = {}
+        # Başarısız ilk parça sürecinin hata çıktısı
+        self._error_detail = ""
+
+    def can_segment(
+        self,
+        settings: Dict[str, Any],
+        duration: float,
+        info: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """Bu iş parçalı moda uygun mu"""
+        forced = settings.get("segment_parallel")
+        if forced is False:
+            return False
+        # Altyazılar normal yolda çıktı kapsayıcısına göre seçilip encode edilir;
+        # birleştirmede aynı seçim yapılamadığından bu dosyalar bölünmez
+        if (info or {}).get("subtitle_streams") and "subtitle" not in (settings.get("drop_streams") or ()):
+            return False
+
+        # Parçalar kaynağın tamamından kesilir; her parçaya aynı kırpma
+        # uygulanacağından kırpılmış (ya da checkpoint'ten devam eden) işler bölünmez
+        if settings.get("trim_start") or settings.get("trim_duration"):
+            return False
+
+        vcodec = settings.get("vcodec")
+        if not vcodec or vcodec == "copy" or settings.get("audio_only"):
+            return False
+        # GPU oturum limiti paralel parçalardan kazanç sağlamaz
+        if settings.get("gpu") or is_hardware_encoder(vcodec):
+            return False
+        if self.workers < 2 or duration < self.MIN_SEGMENT_SECONDS * 2:
+            return False
+        return bool(forced) or duration >= self.MIN_DURATION
+
+    def _segment_length(self, duration: float) -> float:
+        if self.segment_seconds:
+            return max(1.0, float(self.segment_seconds))
+        # İş dengesi için çekirdek başına ~2 parça
+        return max(self.MIN_SEGMENT_SECONDS, duration / (self.workers * 2))
+
+    def _convert_thread(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        duration: float
+    ):
+        # Kaynak stream'leri sadece bölmeye aday işlerde taranır (önbellekli)
+        if not (self.can_segment(settings, duration)
+                and self.can_segment(settings, duration, FFmpegUtils.get_video_info(input_path))):
+            super()._convert_thread(input_path, output_path, settings, duration)
+            return
+
+        work_dir = None
+        self.last_telemetry = None
+        self._summaries = []
+        self._job = self.job_label(output_path)
+        self._settings = settings
+        self._error_detail = ""
+        self.last_returncode = None
+        self.last_log = None
+        try:
+            work_dir = tempfile.mkdtemp(
+                prefix=".tmvc_segments_",
+                dir=os.path.dirname(os.path.abspath(output_path)) or None
+            )
+            self._run_segmented(input_path, output_path, settings, duration, work_dir)
+        except Exception as e:
+            if self._error_callback:
+                self._error_callback(str(e))
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            self.is_running = False
+            self.process = None
+
+    def _run(self, cmd: list, duration: float = 0, on_progress=None) -> int:
+        """Bir ffmpeg sürecini çalıştır, iptal edilebilir şekilde takip et"""
+        label = f"{self._job}/{os.path.basename(cmd[-1])}"
+        process = self._start_process(cmd, self._settings, label)
+        sampler = self._start_sampler(process, label)
+        capture = None
+        with self._proc_lock:
+            self._processes.add(process)
+            # Duraklatılmış işte yeni parça başlamaz
+            if self.is_paused:
+                priority.suspend_process(process)
+        try:
+            for progress in self._iter_progress(process, duration):
+                if sampler:
+                    sampler.note_progress(progress)
+                if on_progress:
+                    on_progress(progress)
+            if sampler:
+                sampler.stop()
+            process.wait()
+            capture = self._finish_stderr(process)
+            if process.returncode != 0 and not self.is_cancelled:
+                with self._proc_lock:
+                    if self.last_returncode is None:
+                        self.last_returncode = process.returncode
+                        self._error_detail = capture.message() if capture else ""
+                        # Parçalı işte stderr özeti ilk başarısız parçanınkidir
+                        self.last_log = capture.summary() if capture else None
+            return process.returncode
+        finally:
+            if capture is None:
+                self._finish_stderr(process)
+            summary = self._finish_sampler(sampler, process)
+            with self._proc_lock:
+                self._processes.discard(process)
+                if summary:
+                    self._summaries.append(summary)
+
+    def _split(self, input_path: str, work_dir: str, duration: float) -> List[str]:
+        """Videoyu keyframe'lerden kopyalayarak parçalara ayır"""
+        pattern = os.path.join(work_dir, "src_%05d.mkv")
+        cmd = [
+            self.ffmpeg_path, "-y", "-hide_banner",
+            "-i", input_path,
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "segment",
+            "-segment_time", f"{self._segment_length(duration):.3f}",
+            "-reset_timestamps", "1",
+            "-nostats", "-progress", "pipe:1",
+            pattern
+        ]
+        if self._run(cmd) != 0:
+            raise RuntimeError("Video parcalara ayrilamadi")
+
+        segments = sorted(
+            os.path.join(work_dir, name)
+            for name in os.listdir(work_dir)
+            if name.startswith("src_")
+        )
+        if not segments:
+            raise RuntimeError("Video parcalara ayrilamadi")
+        return segments
+
+    def _run_segmented(
+        self,
+        input_path: str,
+        output_path: str,
+        settings: Dict[str, Any],
+        duration: float,
+        work_dir: str
+    ):
+        speed = float(settings.get("speed") or 1.0)
+        started = time.monotonic()
+        total_weight = self.SPLIT_WEIGHT + 100.0 + self.CONCAT_WEIGHT
+        state = {"done": {}, "fps": {}, "size": {}, "last_report": 0.0}
+        state_lock = threading.Lock()
+        interval = 1.0 / self.progress_rate if self.progress_rate else 0.0
+
+        def report(percent: float, extra: Optional[Dict] = None):
+            if not self._progress_callback:
+                return
+            # Parça sayısı kadar okuyucu var: birleşik callback hızını sınırla
+            now = time.monotonic()
+            if percent < 100 and now - state["last_report"] < interval:
+                return
+            state["last_report"] = now
+            progress = {"percent": min(100.0, percent), "current_time": duration * percent / 100 / speed}
+            elapsed = time.monotonic() - started
+            if elapsed > 0:
+                progress["speed"] = (duration * percent / 100) / elapsed
+            if extra:
+                progress.update(extra)
+            self._progress_callback(progress)
+
+        # 1) Bölme
+        segments = self._split(input_path, work_dir, duration)
+        if self.is_cancelled:
+            self._finish_cancelled(output_path)
+            return
+        report(self.SPLIT_WEIGHT * 100 / total_weight)
+
+        seg_durations = []
+        for segment in segments:
+            info = FFmpegUtils.get_video_info(segment, use_cache=False)
+            seg_durations.append(info.get("duration", 0) if info else 0)
+        known = sum(seg_durations) or duration
+
+        # 2) Ses: tüm dosyadan tek parça (parça sınırlarında boşluk/priming olmaz)
+        audio_path = None
+        audio_result = {"code": 0}
+        audio_thread = None
+        source_info = FFmpegUtils.get_video_info(input_path) or {}
+        has_audio = bool(source_info.get("audio_codec")) or not source_info
+        if settings.get("acodec") is not None and has_audio:
+            audio_path = os.path.join(work_dir, "audio.mka")
+            audio_settings = dict(settings)
+            audio_settings["vcodec"] = None
+            audio_settings.pop("threads", None)
+            # Altyazı/veri birleştirmede kaynaktan alınmaz; ses dosyasına girmesin
+            audio_settings["drop_streams"] = ["subtitle", "data"]
+            audio_cmd = self.build_command(input_path, audio_path, audio_settings, self.video_info)
+
+            def run_audio():
+                audio_result["code"] = self._run(audio_cmd)
+
+            audio_thread = threading.Thread(target=run_audio, daemon=True)
+            audio_thread.start()
+
+        # 3) Video parçalarını paralel encode et
+        video_settings = dict(settings)
+        video_settings["acodec"] = None
+        if not video_settings.get("threads"):
+            video_settings["threads"] = max(1, (os.cpu_count() or 1) // self.workers)
+
+        def encode(index: int) -> int:
+            if self.is_cancelled:
+                return -1
+            seg_duration = seg_durations[index] or known / len(segments)
+            target = os.path.join(work_dir, f"enc_{index:05d}.mkv")
+            cmd = self.build_command(segments[index], target, video_settings, self.video_info)
+
+            def on_progress(progress):
+                with state_lock:
+                    if "current_time" in progress:
+                        state["done"][index] = min(seg_duration, progress["current_time"] * speed)
+                    if "fps" in progress:
+                        state["fps"][index] = progress["fps"]
+                    if "size" in progress:
+                        state["size"][index] = progress["size"]
+                    processed = sum(state["done"].values())
+                    fps = sum(state["fps"].values())
+                    size = sum(state["size"].values())
+                encode_percent = processed / known * 100 if known else 0
+                report(
+                    (self.SPLIT_WEIGHT + encode_percent) * 100 / total_weight,
+                    {"fps": fps, "size": size, "segments_total": len(segments)}
+                )
+
+            code = self._run(cmd, seg_duration / speed, on_progress)
+            if code == 0:
+                with state_lock:
+                    state["done"][index] = seg_duration
+                    state["fps"].pop(index, None)
+            return code
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(segments))) as pool:
+            codes = list(pool.map(encode, range(len(segments))))
+
+        if audio_thread:
+            audio_thread.join()
+
+        if self.is_cancelled:
+            self._finish_cancelled(output_path)
+            return
+
+        detail = f": {self._error_detail}" if self._error_detail else ""
+        failed = [code for code in codes if code != 0]
+        if failed:
+            raise RuntimeError(f"FFmpeg hatası (parca kodu: {failed[0]}){detail}")
+        if audio_result["code"] != 0:
+            raise RuntimeError(f"FFmpeg hatası (ses kodu: {audio_result['code']}){detail}")
+
+        # 4) Yeniden encode etmeden birleştir
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, "w", encoding="utf-8") as handle:
+            for index in range(len(segments)):
+                encoded = os.path.join(work_dir, f"enc_{index:05d}.mkv").replace("'", "'\\''")
+                handle.write(f"file '{encoded}'\n")
+
+        cmd = [self.ffmpeg_path, "-y", "-hide_banner", "-f", "concat", "-safe", "0", "-i", list_path]
+        if audio_path:
+            cmd.extend(["-i", audio_path])
+        # Genel metadata ve bölümler normal yoldaki gibi kaynaktan
+        source = 2 if audio_path else 1
+        cmd.extend(["-i", input_path, "-map", "0:v:0"])
+        if audio_path:
+            cmd.extend(["-map", "1:a:0?"])
+        cmd.extend([
+            "-map_metadata", str(source), "-map_chapters", str(source),
+            "-c", "copy", "-nostats", "-progress", "pipe:1", output_path
+        ])
+
+        if self._run(cmd) != 0:
+            # Yarım kalan çıktı tamamlanmış gibi görünmesin
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise RuntimeError("Parcalar birlestirilemedi" + (f": {self._error_detail}" if self._error_detail else ""))
+
+        report(100.0)
+        if self._summaries:
+            self.last_telemetry = telemetry.merge(self._summaries, self._job, time.monotonic() - started)
+        self._record_history(output_path, settings, started)
+        if self._complete_callback:
+            self._complete_callback(output_path)
+
+    def _finish_cancelled(self, output_path: str):
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        if self._error_callback:
+            self._error_callback("Dönüştürme duraklatıldı" if self.is_stopping else "Dönüştürme iptal edildi")
+
+    def cancel(self):
+        """Tüm parça süreçlerini iptal et"""
+        self.is_cancelled = True
+        with self._proc_lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+        if self.process is not None:
+            super().cancel()
+        elif self.is_paused:
+            for process in processes:
+                priority.resume_process(process)
+            self._mark_resumed()
+
+    def pause(self) -> bool:
+        """Tüm parça süreçlerini dondur (parçalı modda disk checkpoint'i yok)"""
+        if self.process is not None:
+            return super().pause()
+        if not self.is_running or self.is_paused:
+            return False
+        with self._proc_lock:
+            # Kilit altında: yeni başlayan parça is_paused'u görür
+            processes = list(self._processes)
+            if processes and not all(priority.suspend_process(p) for p in processes):
+                for process in processes:
+                    priority.resume_process(process)
+                return False
+            self._mark_paused()
+        return True
+
+    def resume(self) -> bool:
+        """Dondurulmuş parça süreçlerini devam ettir"""
+        if not self.is_paused:
+            return False
+        with self._proc_lock:
+            processes = list(self._processes)
+            self._mark_resumed()
+        for process in processes:
+            priority.resume_process(process)
+        return True
+
+    def stop_at_checkpoint(self) -> bool:
+        """Parçalı işi duraklatma olarak bitir; devam edince baştan başlar"""
+        if self.process is not None:
+            return super().stop_at_checkpoint()
+        if not self.is_running:
+            return False
+        self.is_stopping = True
+        self.cancel()
+        return False
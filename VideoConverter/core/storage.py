@@ -0,0 +1,30 @@
+"""Kalıcı veri (cache, geçmiş, kuyruk) klasörü yardımcıları"""
+import os
+import sys
+import platform
+
+
+def get_data_dir() -> str:
+    """Uygulamanın kalıcı veri klasörünü al (yoksa oluştur)"""
+    override = os.environ.get("TMVC_DATA_DIR")
+    if override:
+        path = override
+    elif platform.system().lower() == "windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        path = os.path.join(base, "TMVideoConverter")
+    elif sys.platform == "darwin":
+        path = os.path.join(os.path.expanduser("~"), "Library", "Caches", "TMVideoConverter")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path = os.path.join(base, "tmvideoconverter")
+
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        pass
+    return path
+
+
+def get_data_path(name: str) -> str:
+    """Veri klasöründeki bir dosyanın tam yolunu al"""
+    return os.path.join(get_data_dir(), name)
@@ -0,0 +1,259 @@
+"""Diske ara dosya yazmadan akış dönüştürme: stdin/pipe/URL girdi, pipe/FIFO çıktı"""
+import os
+import subprocess
+import sys
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .converter import VideoConverter
+from .progress import ProgressReader
+
+# Akış formatı -> remux planı için eşdeğer uzantı
+STREAM_EXTENSIONS = {"fmp4": ".mp4", "mpegts": ".ts", "matroska": ".mkv"}
+
+# ffmpeg'in kendisinin açabildiği ağ girdileri
+URL_SCHEMES = ("http://", "https://", "tcp://", "udp://", "rtmp://", "rtsp://", "srt://", "pipe:")
+
+Source = Union[str, bytes, bytearray, Iterable[bytes], Any]
+
+
+def is_url(value: str) -> bool:
+    return value.lower().startswith(URL_SCHEMES)
+
+
+def make_fifo(path: str) -> str:
+    """Adlandırılmış pipe oluştur (POSIX); zaten varsa olduğu gibi bırak"""
+    if not os.path.exists(path):
+        os.mkfifo(path)
+    return path
+
+
+class StreamConverter:
+    """
+    Pipe tabanlı dönüştürücü
+
+    Girdi: dosya yolu, ffmpeg'in açabildiği URL, "-" (bu sürecin stdin'i),
+    bytes, okunabilir dosya nesnesi ya da bytes üreten bir iterable. Dosya
+    nesneleri/iterable'lar ayrı bir thread ile ffmpeg stdin'ine pompalanır.
+
+    Çıktı: iter_chunks() ile parça parça bytes, ya da convert() ile dosya
+    yolu/FIFO, yazılabilir dosya nesnesi veya "-" (stdout). Çıktı geri
+    sarılamadığından parçalı MP4 (fmp4), MPEG-TS veya Matroska kullanılır.
+
+    İlerleme stdout yerine stderr'den okunur (ya da ayarlardaki
+    progress_url'e, ör. tcp://, gönderilir). stderr diğer dönüştürücülerdeki
+    gibi StderrCapture ile boşaltılır; son işin özeti last_log'dadır.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    STREAM_FORMATS = tuple(STREAM_EXTENSIONS)
+
+    def __init__(self, converter: Optional[VideoConverter] = None):
+        self.converter = converter or VideoConverter()
+        self.process: Optional[subprocess.Popen] = None
+        self.last_log: Optional[Dict[str, Any]] = None
+        self.is_cancelled = False
+        self._progress_callback: Optional[Callable] = None
+
+    def set_callbacks(self, progress: Optional[Callable] = None):
+        """İlerleme callback'i (stderr okuyucu thread'inden çağrılır)"""
+        self._progress_callback = progress
+
+    @staticmethod
+    def _input_target(source: Source):
+        """(ffmpeg -i değeri, stdin'e pompalanacak kaynak ya da None)"""
+        if isinstance(source, str):
+            if source == "-":
+                return "pipe:0", sys.stdin.buffer
+            return source, None
+        if isinstance(source, (bytes, bytearray)):
+            return "pipe:0", [bytes(source)]
+        return "pipe:0", source
+
+    def _plan(self, source: Source, settings: Dict[str, Any], stream_format: str,
+              video_info: Optional[Dict]) -> Tuple[Dict[str, Any], Optional[Dict]]:
+        """
+        Yerel dosya ya da hazır ffprobe bilgisi varsa remux planı uygula
+
+        Returns:
+            (ayarlar, kaynak bilgisi); plan yapılamadıysa bilgi None
+        """
+        if video_info is None and not (isinstance(source, str) and os.path.isfile(source)):
+            # Pipe girdisi ffprobe için tekrar okunamaz: ayarlar olduğu gibi,
+            # önceki işin kaynak bilgisi de bu akışa taşınmaz
+            self.converter.video_info = None
+            return settings, None
+        source_path = source if isinstance(source, str) else "pipe:0"
+        output_name = f"stream{STREAM_EXTENSIONS.get(stream_format, '.mp4')}"
+        settings = self.converter.plan_settings(source_path, output_name, settings, video_info)
+        return settings, self.converter.video_info
+
+    def build_command(self, input_target: str, output_target: str, settings: Dict[str, Any],
+                      stream_format: str = "fmp4", video_info: Optional[Dict] = None) -> list:
+        """Akış ayarlarıyla FFmpeg komutunu oluştur"""
+        if stream_format not in VideoConverter.STREAM_MUXERS:
+            raise ValueError(f"Desteklenmeyen akis formati: {stream_format}")
+        settings = dict(settings)
+        settings["stream_format"] = stream_format
+        settings.setdefault("progress_url", "pipe:2")
+        cmd = self.converter.build_command(input_target, output_target, settings, video_info)
+        # stderr'de sadece hatalar ve -progress satırları kalsın
+        cmd[1:1] = ["-loglevel", "error"]
+        return cmd
+
+    def _pump(self, feed, stdin):
+        """Kaynağı ffmpeg stdin'ine yaz (ffmpeg erken çıkarsa sessizce dur)"""
+        try:
+            if hasattr(feed, "read"):
+                read = getattr(feed, "read1", feed.read)
+                while not self.is_cancelled:
+                    chunk = read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    stdin.write(chunk)
+            else:
+                for chunk in feed:
+                    if self.is_cancelled:
+                        break
+                    stdin.write(chunk)
+        except (BrokenPipeError, OSError, ValueError):
+            pass
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
+
+    def _progress_lines(self, duration: float) -> Callable[[bytes], bool]:
+        """stderr'deki -progress satırlarını okuyan StderrCapture kancası"""
+        reader = ProgressReader(duration, rate=self.converter.progress_rate)
+
+        def on_line(line: bytes) -> bool:
+            progress = reader.feed(line)
+            if progress is not None and self._progress_callback:
+                self._progress_callback(progress)
+            # key=value satırları ilerlemedir; hata mesajlarının anahtarında boşluk olur
+            key, sep, _ = line.partition(b"=")
+            return bool(sep) and b" " not in key.strip()
+
+        return on_line
+
+    def _start(self, source: Source, output_target: str, settings: Dict[str, Any], stream_format: str,
+               duration: float, video_info: Optional[Dict]):
+        self.is_cancelled = False
+        self.last_log = None
+        settings, video_info = self._plan(source, settings, stream_format, video_info)
+        input_target, feed = self._input_target(source)
+        cmd = self.build_command(input_target, output_target, settings, stream_format, video_info)
+
+        self.process = self.converter._start_process(
+            cmd,
+            settings,
+            self.converter.job_label("stream" if output_target.startswith("pipe:") else output_target),
+            stdin=subprocess.PIPE if feed is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE if output_target == "pipe:1" else subprocess.DEVNULL,
+            on_line=self._progress_lines(duration)
+        )
+        threads = []
+        if feed is not None:
+            threads.append(threading.Thread(target=self._pump, args=(feed, self.process.stdin), daemon=True))
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _finish(self, threads):
+        process = self.process
+        if process.poll() is None:
+            if self.is_cancelled:
+                process.terminate()
+            process.wait()
+        capture = self.converter._finish_stderr(process)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.process = None
+        self.last_log = capture.summary() if capture else None
+
+        if self.is_cancelled:
+            raise RuntimeError("Akis iptal edildi")
+        if process.returncode != 0:
+            detail = capture.message() if capture else ""
+            raise RuntimeError(f"FFmpeg hatası (kod: {process.returncode})" + (f": {detail}" if detail else ""))
+
+    def iter_chunks(
+        self,
+        source: Source,
+        settings: Dict[str, Any],
+        stream_format: str = "fmp4",
+        duration: float = 0,
+        video_info: Optional[Dict] = None
+    ) -> Iterator[bytes]:
+        """
+        Dönüştürülmüş çıktıyı üretildikçe parça parça ver
+
+        Tüketici erken bırakırsa (generator kapatılırsa) ffmpeg durdurulur.
+        Hata/iptal durumunda RuntimeError fırlatılır.
+        """
+        threads = self._start(source, "pipe:1", settings, stream_format, duration, video_info)
+        stdout = self.process.stdout
+        read = getattr(stdout, "read1", stdout.read)
+        finished = False
+        try:
+            while True:
+                chunk = read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+            finished = True
+        finally:
+            if not finished:
+                # Tüketici vazgeçti: süreci sessizce kapat
+                self.is_cancelled = True
+                try:
+                    self._finish(threads)
+                except RuntimeError:
+                    pass
+        self._finish(threads)
+
+    def convert(
+        self,
+        source: Source,
+        destination: Any,
+        settings: Dict[str, Any],
+        stream_format: str = "fmp4",
+        duration: float = 0,
+        video_info: Optional[Dict] = None
+    ) -> tuple:
+        """
+        Akışı bir hedefe yaz
+
+        Args:
+            destination: Dosya yolu/FIFO (ffmpeg doğrudan yazar), "-" (stdout)
+                ya da write() destekleyen nesne (ör. yükleme gövdesi)
+
+        Returns:
+            (success: bool, message: str)
+        """
+        try:
+            if isinstance(destination, str) and destination != "-":
+                threads = self._start(source, destination, settings, stream_format, duration, video_info)
+                self._finish(threads)
+                return True, "Dönüştürme başarılı"
+
+            sink = sys.stdout.buffer if destination == "-" else destination
+            for chunk in self.iter_chunks(source, settings, stream_format, duration, video_info):
+                sink.write(chunk)
+            if hasattr(sink, "flush"):
+                sink.flush()
+            return True, "Dönüştürme başarılı"
+        except Exception as e:
+            return False, str(e)
+
+    def cancel(self):
+        """Akışı durdur"""
+        self.is_cancelled = True
+        process = self.process
+        if process:
+            try:
+                process.terminate()
+            except OSError:
+                pass
@@ -0,0 +1,431 @@
+"""İş telemetrisi: ffmpeg süreçlerinin /proc örnekleri, JSONL metrik dosyası ve Prometheus uç noktası"""
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):  # Windows
+    CLOCK_TICKS = 100
+    PAGE_SIZE = 4096
+
+# Blok I/O beklemesi / duvar süresi bu oranı aşan iş I/O'ya takılmış sayılır
+IO_WAIT_RATIO = 0.2
+# Çalıştırma kuyruğunda bekleme / CPU süresi bu oranı aşarsa çekirdekler yetmiyor
+RUNQUEUE_RATIO = 0.25
+# Toplu işte CPU kullanımı bunun altındaysa daha fazla işçi kaldırılabilir
+LOW_UTILIZATION = 0.6
+
+
+def supported() -> bool:
+    """Süreç örnekleme bu platformda mümkün mü (/proc)"""
+    return sys.platform.startswith("linux") and os.path.isdir("/proc/self")
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def read_process(pid: int) -> Optional[Dict[str, Any]]:
+    """
+    Sürecin anlık kaynak sayaçları; süreç yoksa None
+
+    Returns:
+        {"cpu_seconds", "rss", "threads", "read_bytes", "write_bytes",
+         "io_wait_seconds", "runqueue_wait_seconds"}
+    """
+    stat = _read(f"/proc/{pid}/stat")
+    if not stat:
+        return None
+    # comm alanı boşluk/parantez içerebilir: son ')' sonrasından böl
+    fields = stat[stat.rfind(")") + 2:].split()
+    try:
+        stats = {
+            "cpu_seconds": (int(fields[11]) + int(fields[12])) / CLOCK_TICKS,
+            "threads": int(fields[17]),
+            # delayacct kapalıysa hep 0
+            "io_wait_seconds": int(fields[39]) / CLOCK_TICKS if len(fields) > 39 else 0.0,
+        }
+    except (IndexError, ValueError):
+        return None
+
+    statm = _read(f"/proc/{pid}/statm")
+    stats["rss"] = int(statm.split()[1]) * PAGE_SIZE if statm else 0
+
+    io = {}
+    for line in (_read(f"/proc/{pid}/io") or "").splitlines():
+        key, _, value = line.partition(":")
+        io[key] = int(value) if value.strip().isdigit() else 0
+    # read_bytes/write_bytes depolamaya gideni sayar; yoksa syscall toplamları
+    stats["read_bytes"] = io.get("read_bytes", io.get("rchar", 0))
+    stats["write_bytes"] = io.get("write_bytes", io.get("wchar", 0))
+
+    schedstat = _read(f"/proc/{pid}/schedstat")
+    try:
+        stats["runqueue_wait_seconds"] = int(schedstat.split()[1]) / 1e9 if schedstat else 0.0
+    except (IndexError, ValueError):
+        stats["runqueue_wait_seconds"] = 0.0
+    return stats
+
+
+class JobSampler:
+    """
+    Tek işin ffmpeg sürecini arka planda örnekler
+
+    Her örnekte CPU%, RSS, okuma/yazma hızı ve ilerleme satırlarından gelen
+    fps/speed metriklere yayınlanır. stop() süreç toplanmadan (zombi iken)
+    çağrılırsa son CPU/I/O toplamları da yakalanır.
+    """
+
+    DEFAULT_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        pid: int,
+        job: str,
+        registry: Optional["MetricsRegistry"] = None,
+        interval: float = DEFAULT_INTERVAL
+    ):
+        self.pid = pid
+        self.job = job
+        self.registry = registry
+        self.interval = interval
+        self.started = time.monotonic()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._previous: Optional[tuple] = None
+        self._last: Optional[Dict[str, Any]] = None
+        self._fps: Optional[float] = None
+        self._speed: Optional[float] = None
+        self._fps_total = 0.0
+        self._fps_samples = 0
+        self.peak_rss = 0
+        self.samples = 0
+        self.summary: Optional[Dict[str, Any]] = None
+
+    def start(self) -> "JobSampler":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def note_progress(self, progress: Dict[str, Any]):
+        """ffmpeg'in bildirdiği fps/speed değerlerini bir sonraki örneğe ekle"""
+        if progress.get("fps") is not None:
+            self._fps = progress["fps"]
+        if progress.get("speed") is not None:
+            self._speed = progress["speed"]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.sample() is None:
+                break
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Bir örnek al ve yayınla; süreç bittiyse None"""
+        stats = read_process(self.pid)
+        if stats is None:
+            return None
+        now = time.monotonic()
+        sample = dict(stats, job=self.job, pid=self.pid, elapsed=round(now - self.started, 3))
+
+        if self._previous:
+            last_time, last = self._previous
+            delta = max(now - last_time, 1e-6)
+            sample["cpu_percent"] = round((stats["cpu_seconds"] - last["cpu_seconds"]) / delta * 100, 1)
+            sample["read_rate"] = int((stats["read_bytes"] - last["read_bytes"]) / delta)
+            sample["write_rate"] = int((stats["write_bytes"] - last["write_bytes"]) / delta)
+        else:
+            elapsed = max(now - self.started, 1e-6)
+            sample["cpu_percent"] = round(stats["cpu_seconds"] / elapsed * 100, 1)
+            sample["read_rate"] = int(stats["read_bytes"] / elapsed)
+            sample["write_rate"] = int(stats["write_bytes"] / elapsed)
+        self._previous = (now, stats)
+
+        if self._fps is not None:
+            sample["fps"] = self._fps
+            self._fps_total += self._fps
+            self._fps_samples += 1
+        if self._speed is not None:
+            sample["speed"] = self._speed
+
+        self.peak_rss = max(self.peak_rss, stats["rss"])
+        self.samples += 1
+        self._last = sample
+        if self.registry:
+            self.registry.publish(sample)
+        return sample
+
+    def stop(self) -> Dict[str, Any]:
+        """Örneklemeyi durdur ve iş özetini döndür (tekrar çağrılabilir)"""
+        if self.summary is not None:
+            return self.summary
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.sample()
+
+        wall = time.monotonic() - self.started
+        last = self._last or {}
+        cpu_seconds = last.get("cpu_seconds", 0.0)
+        self.summary = {
+            "job": self.job,
+            "wall_seconds": round(wall, 3),
+            "cpu_seconds": round(cpu_seconds, 2),
+            "cpu_percent": round(cpu_seconds / wall * 100, 1) if wall > 0 else 0.0,
+            "peak_rss": self.peak_rss,
+            "threads": last.get("threads", 0),
+            "read_bytes": last.get("read_bytes", 0),
+            "write_bytes": last.get("write_bytes", 0),
+            "io_wait_seconds": round(last.get("io_wait_seconds", 0.0), 2),
+            "runqueue_wait_seconds": round(last.get("runqueue_wait_seconds", 0.0), 2),
+            "avg_fps": round(self._fps_total / self._fps_samples, 2) if self._fps_samples else None,
+            "samples": self.samples,
+        }
+        return self.summary
+
+
+def merge(summaries: List[Dict[str, Any]], job: str, wall_seconds: float) -> Dict[str, Any]:
+    """Aynı işe ait birden fazla sürecin (ör. parçalı encode) özetini birleştir"""
+    merged = {"job": job, "wall_seconds": round(wall_seconds, 3), "status": "completed"}
+    for key in ("cpu_seconds", "io_wait_seconds", "runqueue_wait_seconds"):
+        merged[key] = round(sum(item.get(key, 0) for item in summaries), 2)
+    for key in ("read_bytes", "write_bytes", "samples"):
+        merged[key] = sum(item.get(key, 0) for item in summaries)
+    # Parçalar eşzamanlı çalışır: tepe değerlerin toplamı (üst sınır)
+    merged["peak_rss"] = sum(item.get("peak_rss", 0) for item in summaries)
+    merged["threads"] = max((item.get("threads", 0) for item in summaries), default=0)
+    merged["cpu_percent"] = round(merged["cpu_seconds"] / wall_seconds * 100, 1) if wall_seconds > 0 else 0.0
+    merged["avg_fps"] = None
+    merged["processes"] = len(summaries)
+    return merged
+
+
+def classify(summary: Dict[str, Any]) -> Optional[str]:
+    """İş özetinden darboğaz: "io_starved", "oversubscribed" ya da None"""
+    wall = summary.get("wall_seconds") or 0
+    if wall > 0 and summary.get("io_wait_seconds", 0) / wall > IO_WAIT_RATIO:
+        return "io_starved"
+    cpu_seconds = summary.get("cpu_seconds") or 0
+    if cpu_seconds > 0 and summary.get("runqueue_wait_seconds", 0) / cpu_seconds > RUNQUEUE_RATIO:
+        return "oversubscribed"
+    return None
+
+
+def summarize(
+    summaries: List[Dict[str, Any]],
+    wall_seconds: float = 0,
+    workers: int = 1
+) -> Dict[str, Any]:
+    """
+    Toplu işin telemetri özeti ve eşzamanlılık önerisi
+
+    concurrency_hint: işlerin yarısından fazlası I/O'ya takıldıysa ya da
+    çekirdek bekliyorsa "decrease", makine boşta kaldıysa "increase".
+    """
+    cpu_count = os.cpu_count() or 1
+    cpu_seconds = sum(item.get("cpu_seconds", 0) for item in summaries)
+    io_starved = [item["job"] for item in summaries if classify(item) == "io_starved"]
+    oversubscribed = [item["job"] for item in summaries if classify(item) == "oversubscribed"]
+    utilization = cpu_seconds / (wall_seconds * cpu_count) if wall_seconds > 0 else 0.0
+    fps = [item["avg_fps"] for item in summaries if item.get("avg_fps")]
+
+    hint = "keep"
+    if summaries:
+        if (len(io_starved) + len(oversubscribed)) * 2 > len(summaries):
+            hint = "decrease"
+        elif utilization < LOW_UTILIZATION and not io_starved and not oversubscribed:
+            hint = "increase"
+
+    return {
+        "jobs": len(summaries),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 2),
+        "cpu_utilization": round(utilization, 3),
+        "peak_rss": max((item.get("peak_rss", 0) for item in summaries), default=0),
+        "read_bytes": sum(item.get("read_bytes", 0) for item in summaries),
+        "write_bytes": sum(item.get("write_bytes", 0) for item in summaries),
+        "avg_fps": round(sum(fps) / len(fps), 2) if fps else None,
+        "io_starved": io_starved,
+        "oversubscribed": oversubscribed,
+        "concurrency_hint": hint,
+    }
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Prometheus adı -> (örnek anahtarı, tür, açıklama)
+_JOB_METRICS = [
+    ("tmvc_job_cpu_percent", "cpu_percent", "gauge", "ffmpeg CPU kullanimi (yuzde, tum cekirdekler)"),
+    ("tmvc_job_cpu_seconds", "cpu_seconds", "counter", "ffmpeg CPU suresi"),
+    ("tmvc_job_rss_bytes", "rss", "gauge", "ffmpeg bellek kullanimi"),
+    ("tmvc_job_threads", "threads", "gauge", "ffmpeg thread sayisi"),
+    ("tmvc_job_read_bytes", "read_bytes", "counter", "Okunan bayt"),
+    ("tmvc_job_write_bytes", "write_bytes", "counter", "Yazilan bayt"),
+    ("tmvc_job_read_rate_bytes", "read_rate", "gauge", "Okuma hizi (bayt/s)"),
+    ("tmvc_job_write_rate_bytes", "write_rate", "gauge", "Yazma hizi (bayt/s)"),
+    ("tmvc_job_io_wait_seconds", "io_wait_seconds", "counter", "Blok I/O beklemesi"),
+    ("tmvc_job_runqueue_wait_seconds", "runqueue_wait_seconds", "counter", "Calistirma kuyrugunda bekleme"),
+    ("tmvc_job_fps", "fps", "gauge", "Encode hizi (kare/s)"),
+    ("tmvc_job_speed", "speed", "gauge", "Gercek zamana gore hiz"),
+]
+
+
+class MetricsRegistry:
+    """
+    Çalışan işlerin son örnekleri ve biten işlerin toplamları
+
+    Örnekler isteğe bağlı olarak JSONL dosyasına eklenir ve/veya yerel bir
+    HTTP uç noktasından Prometheus metin biçiminde sunulur.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active: Dict[str, Dict[str, Any]] = {}
+        self.jobs_total: Dict[str, int] = {}
+        self.totals = {"cpu_seconds": 0.0, "read_bytes": 0, "write_bytes": 0}
+        self._file = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def open_file(self, path: str):
+        """Örnekleri ve iş özetlerini JSONL dosyasına ekle"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._file = open(path, "a", encoding="utf-8")
+
+    def _write(self, record: Dict[str, Any]):
+        # Kilit tutulurken çağrılır
+        if self._file:
+            try:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+            except (OSError, ValueError):
+                self._file = None
+
+    def publish(self, sample: Dict[str, Any]):
+        with self._lock:
+            self.active[sample["job"]] = sample
+            self._write(dict(sample, type="sample", time=round(time.time(), 3)))
+
+    def finish(self, summary: Dict[str, Any]):
+        """Biten işi aktiflerden çıkar ve toplamlara ekle"""
+        status = summary.get("status", "completed")
+        with self._lock:
+            self.active.pop(summary["job"], None)
+            self.jobs_total[status] = self.jobs_total.get(status, 0) + 1
+            for key in self.totals:
+                self.totals[key] += summary.get(key, 0) or 0
+            self._write(dict(summary, type="job", time=round(time.time(), 3)))
+
+    def record(self, record_type: str, **fields):
+        """Serbest kayıt (ör. toplu iş özeti) yaz"""
+        with self._lock:
+            self._write(dict(fields, type=record_type, time=round(time.time(), 3)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": [dict(sample) for sample in self.active.values()],
+                "jobs_total": dict(self.jobs_total),
+                "totals": dict(self.totals),
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus metin biçimi (0.0.4)"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, key, kind, help_text in _JOB_METRICS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample in snapshot["active"]:
+                if sample.get(key) is not None:
+                    lines.append(f'{name}{{job="{_escape(sample["job"])}"}} {sample[key]}')
+
+        lines.append("# HELP tmvc_active_jobs Calisan ffmpeg isleri")
+        lines.append("# TYPE tmvc_active_jobs gauge")
+        lines.append(f"tmvc_active_jobs {len(snapshot['active'])}")
+        lines.append("# HELP tmvc_jobs_total Biten isler")
+        lines.append("# TYPE tmvc_jobs_total counter")
+        for status, count in sorted(snapshot["jobs_total"].items()):
+            lines.append(f'tmvc_jobs_total{{status="{_escape(status)}"}} {count}')
+        for key, value in snapshot["totals"].items():
+            name = f"tmvc_{key}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """
+        /metrics (Prometheus) ve /metrics.json uç noktasını arka planda başlat
+
+        Returns:
+            Dinlenen port (0 verilirse işletim sisteminin seçtiği)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path in ("/", "/metrics"):
+                    body = registry.render_prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif path == "/metrics.json":
+                    body = json.dumps(registry.snapshot(), default=str).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.stop_server()
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._server = server
+        return server.server_address[1]
+
+    def stop_server(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def close(self):
+        self.stop_server()
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+_default_registry: Optional[MetricsRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Uygulama genelinde paylaşılan metrik kaydını al"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = MetricsRegistry()
+        return _default_registry
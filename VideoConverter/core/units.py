@@ -0,0 +1,23 @@
+"""Ayar değerlerindeki birim ekli sayılar"""
+from typing import Any
+
+# ffmpeg bitrate ekleri ondalıktır (k = 1000)
+_BITRATE_UNITS = {"k": 1000, "m": 1000 ** 2, "g": 1000 ** 3}
+
+
+def parse_bitrate(value: Any) -> int:
+    """'5000k' / '5M' / '192K' / 5000000 -> bit/s (okunamazsa 0)"""
+    if value is None or value == "" or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return max(0, int(value))
+    text = str(value).strip().lower()
+    if text.endswith("bps"):
+        text = text[:-3]
+    multiplier = _BITRATE_UNITS.get(text[-1:], 1)
+    if text[-1:] in _BITRATE_UNITS:
+        text = text[:-1]
+    try:
+        return max(0, int(float(text) * multiplier))
+    except ValueError:
+        return 0
@@ -0,0 +1,454 @@
+"""Klasör izleme: yeni kayıtları algılayıp toplu kuyruğa ekleme"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .presets import PRESETS
+
+# inotify olay maskeleri (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY | IN_DELETE_SELF
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class _PollingBackend:
+    """
+    Yoklama tabanlı izleyici
+
+    Her turda tüm ağacı taramak yerine sadece klasörlerin mtime değerine
+    bakar; yeni girdi eklenen klasörler yeniden listelenir.
+    """
+
+    def __init__(self, roots: List[str], recursive: bool):
+        self.roots = roots
+        self.recursive = recursive
+        self.dir_mtimes: Dict[str, int] = {}
+
+    def initial_scan(self) -> Iterable[str]:
+        for root in self.roots:
+            yield from self._scan_dir(root)
+
+    def _scan_dir(self, directory: str) -> Iterable[str]:
+        try:
+            self.dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            entries = list(os.scandir(directory))
+        except OSError:
+            self.dir_mtimes.pop(directory, None)
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if self.recursive:
+                        yield from self._scan_dir(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+
+    def poll(self, timeout: float) -> Iterable[str]:
+        time.sleep(timeout)
+        changed = []
+        for directory, mtime in list(self.dir_mtimes.items()):
+            try:
+                current = os.stat(directory).st_mtime_ns
+            except OSError:
+                self.dir_mtimes.pop(directory, None)
+                continue
+            if current != mtime:
+                changed.append(directory)
+
+        paths = []
+        for directory in changed:
+            try:
+                self.dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive and entry.path not in self.dir_mtimes:
+                            paths.extend(self._scan_dir(entry.path))
+                    elif entry.is_file():
+                        paths.append(entry.path)
+                except OSError:
+                    continue
+        return paths
+
+    def close(self):
+        pass
+
+
+class _InotifyBackend:
+    """Linux inotify tabanlı izleyici (ek bağımlılık olmadan ctypes ile)"""
+
+    def __init__(self, roots: List[str], recursive: bool):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.recursive = recursive
+        self.roots = roots
+        self.watches: Dict[int, str] = {}
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 basarisiz")
+        self.overflowed = False
+
+    def _add_watch(self, directory: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            # ENOSPC: max_user_watches doldu -> çağıran yoklamaya düşer
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch basarisiz: {directory}")
+        self.watches[wd] = directory
+
+    def initial_scan(self) -> Iterable[str]:
+        for root in self.roots:
+            yield from self._watch_tree(root)
+
+    def _watch_tree(self, directory: str) -> Iterable[str]:
+        try:
+            self._add_watch(directory)
+        except OSError as e:
+            # ENOSPC'de tüm ağaç izlenemez: çağıran yoklamaya düşer. Diğer
+            # hatalar (klasör izleme kurulmadan silindi, yetki) o klasörü atlar.
+            if e.errno == errno.ENOSPC:
+                raise
+            return
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if self.recursive:
+                        yield from self._watch_tree(entry.path)
+                elif entry.is_file():
+                    yield entry.path
+            except OSError:
+                continue
+
+    def poll(self, timeout: float) -> Iterable[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+
+        paths = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_DELETE_SELF:
+                self.watches.pop(wd, None)
+                continue
+            if not name:
+                continue
+
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    paths.extend(self._watch_tree(path))
+                continue
+            paths.append(path)
+
+        if self.overflowed:
+            # Olay kuyruğu taştı: kaçan dosyalar için bir kez yeniden tara
+            self.overflowed = False
+            for root in self.roots:
+                paths.extend(self._watch_tree(root))
+        return paths
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class FolderWatcher:
+    """
+    Klasörleri izler, büyümesi duran dosyaları bildirir
+
+    Bir dosya ancak boyutu settle_seconds boyunca değişmezse hazır
+    sayılır. Mevcut dosyalar başlangıçta bir kez taranır; sonraki turlarda
+    sadece değişen klasörler/dosyalar işlenir.
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        on_file_ready: Callable[[str], None],
+        extensions: Optional[Set[str]] = None,
+        recursive: bool = True,
+        settle_seconds: float = 5.0,
+        poll_interval: float = 1.0,
+        include_existing: bool = False,
+        force_polling: bool = False,
+        on_fallback: Optional[Callable[[str], None]] = None
+    ):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.on_file_ready = on_file_ready
+        self.extensions = {ext.lower() for ext in extensions} if extensions else None
+        self.recursive = recursive
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.include_existing = include_existing
+        self.force_polling = force_polling
+        # inotify çalışırken yoklamaya düşülürse nedeni ile çağrılır
+        self.on_fallback = on_fallback
+        self.backend_name = ""
+        # path -> (boyut, mtime_ns, değişmediği andan beri)
+        self._candidates: Dict[str, Tuple[int, int, float]] = {}
+        # İşlenmiş dosyalar: path -> (boyut, mtime_ns)
+        self._seen: Dict[str, Tuple[int, int]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backend = None
+
+    def _wanted(self, path: str) -> bool:
+        name = os.path.basename(path)
+        if name.startswith("."):
+            return False
+        if self.extensions is None:
+            return True
+        return os.path.splitext(name)[1].lower() in self.extensions
+
+    def _create_backend(self):
+        if not self.force_polling and sys.platform.startswith("linux"):
+            backend = None
+            try:
+                backend = _InotifyBackend(self.paths, self.recursive)
+                existing = list(backend.initial_scan())
+                self.backend_name = "inotify"
+                return backend, existing
+            except (OSError, AttributeError):
+                if backend:
+                    backend.close()
+        backend = _PollingBackend(self.paths, self.recursive)
+        existing = list(backend.initial_scan())
+        self.backend_name = "polling"
+        return backend, existing
+
+    def start(self):
+        """İzlemeyi arka planda başlat"""
+        self._stop.clear()
+        self._backend, existing = self._create_backend()
+        for path in existing:
+            if not self._wanted(path):
+                continue
+            if self.include_existing:
+                self._touch(path)
+            else:
+                self._mark_seen(path)
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """İzlemeyi durdur"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._backend:
+            self._backend.close()
+
+    def _mark_seen(self, path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return
+        self._seen[path] = (stat.st_size, stat.st_mtime_ns)
+
+    def _touch(self, path: str):
+        """Dosyayı aday listesine ekle/güncelle"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._candidates.pop(path, None)
+            return
+
+        if self._seen.get(path) == (stat.st_size, stat.st_mtime_ns):
+            return
+
+        current = self._candidates.get(path)
+        if current is None or current[:2] != (stat.st_size, stat.st_mtime_ns):
+            self._candidates[path] = (stat.st_size, stat.st_mtime_ns, time.monotonic())
+
+    def _check_candidates(self):
+        now = time.monotonic()
+        for path, (size, mtime, since) in list(self._candidates.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                self._candidates.pop(path, None)
+                continue
+
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self._candidates[path] = (stat.st_size, stat.st_mtime_ns, now)
+                continue
+
+            if stat.st_size == 0 or now - since < self.settle_seconds:
+                continue
+
+            self._candidates.pop(path, None)
+            self._seen[path] = (size, mtime)
+            try:
+                self.on_file_ready(path)
+            except Exception as e:
+                print(f"Izlenen dosya islenemedi ({path}): {e}", file=sys.stderr)
+
+    def _fall_back_to_polling(self, error: OSError):
+        """inotify kullanılamaz hale geldi (ör. ENOSPC): yoklamayla sürdür"""
+        self._backend.close()
+        self._backend = _PollingBackend(self.paths, self.recursive)
+        self.backend_name = "polling"
+        reason = f"inotify kullanilamiyor, yoklamaya gecildi: {error}"
+        if self.on_fallback:
+            self.on_fallback(reason)
+        else:
+            print(reason, file=sys.stderr)
+        # Geçişte kaçmış olabilecek dosyalar; işlenmiş olanları _touch atlar
+        for path in self._backend.initial_scan():
+            if self._wanted(path):
+                self._touch(path)
+
+    def _run(self):
+        while not self._stop.is_set():
+            timeout = self.poll_interval
+            try:
+                paths = self._backend.poll(timeout)
+            except OSError as e:
+                if isinstance(self._backend, _InotifyBackend):
+                    self._fall_back_to_polling(e)
+                else:
+                    print(f"Izleme hatasi: {e}", file=sys.stderr)
+                continue
+            for path in paths:
+                if self._wanted(path):
+                    self._touch(path)
+            self._check_candidates()
+
+
+def match_preset(path: str, preset_names: List[str]) -> Optional[str]:
+    """
+    Dosya uzantısına göre preset seç
+
+    Uzantıyı açıkça listeleyen preset'ler '*' kabul edenlerden önce gelir.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    wildcard = None
+    for name in preset_names:
+        preset = PRESETS.get(name)
+        if not preset:
+            continue
+        formats = [fmt.lower() for fmt in preset.get("input_formats", ["*"])]
+        if ext in formats:
+            return name
+        if "*" in formats and wildcard is None:
+            wildcard = name
+    return wildcard
+
+
+class WatchIngest:
+    """FolderWatcher ile BatchConverter'ı bağlayan izleme servisi"""
+
+    MAX_OUTPUTS = 10000
+
+    def __init__(
+        self,
+        batch,
+        paths: List[str],
+        preset_names: List[str],
+        output_dir: Optional[str] = None,
+        settings_for: Optional[Callable[[str], Dict]] = None,
+        on_enqueue: Optional[Callable] = None,
+        **watcher_options
+    ):
+        self.batch = batch
+        self.preset_names = preset_names
+        self.output_dir = output_dir
+        self.settings_for = settings_for or self._preset_settings
+        self.on_enqueue = on_enqueue
+        # Kendi ürettiğimiz çıktılar izlenen klasöre düşerse tekrar işlenmez
+        # (ekleme sırasıyla; uzun süren serviste en eski MAX_OUTPUTS ötesi atılır)
+        self._outputs: Dict[str, None] = {}
+
+        if "extensions" not in watcher_options:
+            formats = set()
+            for name in preset_names:
+                formats.update(fmt.lower() for fmt in PRESETS.get(name, {}).get("input_formats", ["*"]))
+            watcher_options["extensions"] = None if "*" in formats else formats
+        self.watcher = FolderWatcher(paths, self._on_file_ready, **watcher_options)
+
+    @staticmethod
+    def _preset_settings(preset_name: str) -> Dict:
+        settings = dict(PRESETS[preset_name])
+        if settings.get("audio_only"):
+            settings["vcodec"] = None
+        return settings
+
+    def _output_path(self, input_path: str, output_format: str) -> str:
+        output_dir = self.output_dir or os.path.dirname(input_path)
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        candidate = os.path.join(output_dir, f"{base}_converted{output_format}")
+        counter = 2
+        while os.path.exists(candidate) or candidate in self._outputs:
+            candidate = os.path.join(output_dir, f"{base}_converted_{counter}{output_format}")
+            counter += 1
+        return candidate
+
+    def _on_file_ready(self, path: str):
+        if path in self._outputs:
+            return
+
+        preset_name = match_preset(path, self.preset_names)
+        if preset_name is None:
+            return
+
+        settings = self.settings_for(preset_name)
+        output_path = self._output_path(path, settings.get("output_format", ".mp4"))
+        self._outputs[output_path] = None
+        while len(self._outputs) > self.MAX_OUTPUTS:
+            del self._outputs[next(iter(self._outputs))]
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        item = self.batch.enqueue(path, output_path, settings)
+        if self.on_enqueue:
+            self.on_enqueue(item, preset_name)
+
+    def start(self, max_workers: int = 1):
+        """Dispatcher'ı servis modunda, ardından izleyiciyi başlat"""
+        self.batch.start(max_workers=max_workers, keep_alive=True)
+        self.watcher.start()
+
+    def stop(self):
+        """Yeni dosya almayı bırak; kuyruktaki işler bitince durur"""
+        self.watcher.stop()
+        self.batch.stop()
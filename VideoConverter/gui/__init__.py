@@ -1,4 +1,21 @@
-from .main_window import MainWindow
-from .settings_panel import SettingsPanel
-from .progress_dialog import ProgressDialog
-from .startup_wizard import StartupWizard, check_and_setup
+"""Tkinter arayüzü (pencereler ilk erişimde yüklenir)"""
+import importlib
+
+_EXPORTS = {
+    "MainWindow": ".main_window",
+    "SettingsPanel": ".settings_panel",
+    "ProgressDialog": ".progress_dialog",
+    "StartupWizard": ".startup_wizard",
+    "check_and_setup": ".startup_wizard",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -2,16 +2,21 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 
-from core.ffmpeg_utils import FFmpegUtils
-from core.converter import VideoConverter, BatchConverter
+from core import capabilities, hw_backends, priority
 from core.presets import PRESETS, get_preset, get_all_preset_names
-from core.estimator import Estimator
 from core.i18n import I18N
+from core.planner import RemuxPlanner
 from .settings_panel import SettingsPanel
 from .progress_dialog import ProgressDialog, BatchProgressDialog
 
+if TYPE_CHECKING:
+    from core.converter import BatchConverter
+    from core.job_store import JobStore
+    from core.output_cache import OutputCache
+    from core.segmented import SegmentedConverter
+
 
 class MainWindow:
     """Ana uygulama penceresi"""
@@ -26,8 +31,10 @@ class MainWindow:
         self.video_info: Optional[Dict] = None
         self.nvenc_available = nvenc_available
         self.nvenc_encoders = nvenc_encoders or []
-        self.converter = VideoConverter()
-        self.batch_converter = BatchConverter()
+        # Dönüştürme motoru (subprocess, sqlite...) ilk kullanımda yüklenir
+        self._converter: Optional["SegmentedConverter"] = None
+        self._batch_converter: Optional["BatchConverter"] = None
+        self._job_store: Optional["JobStore"] = None
         self.source_files = []
         self.i18n = I18N(default_language="tr")
 
@@ -40,6 +47,103 @@ class MainWindow:
         # Başlangıç tahminini güncelle
         self._update_estimate()
 
+        # Yarım kalan toplu işleri devam ettirmeyi öner
+        self.root.after(500, self._offer_resume)
+
+        # Eski yetenek anlık görüntüsünü pencereyi bekletmeden tazele
+        self.root.after(1000, self._refresh_capabilities)
+
+    def _update_gpu_label(self):
+        backends = []
+        for encoder in self.nvenc_encoders:
+            backend = hw_backends.backend_for(encoder)
+            if backend and backend.label not in backends:
+                backends.append(backend.label)
+        gpu_text = f"GPU: Aktif ({', '.join(backends) or 'NVENC'})" if self.nvenc_available else "GPU: Pasif (CPU)"
+        gpu_color = "green" if self.nvenc_available else "gray"
+        self.gpu_label.config(text=gpu_text, foreground=gpu_color)
+
+    def _refresh_capabilities(self):
+        """Donanım testlerini arka planda yenile; sonuç değişirse arayüzü güncelle"""
+        snapshot = capabilities.current()
+        if snapshot and not capabilities.is_stale(snapshot):
+            return
+
+        def on_changed(snapshot):
+            self.root.after(0, lambda: self._apply_hw_encoders(snapshot["hw_encoders"]))
+
+        capabilities.refresh_async(on_changed)
+
+    def _apply_hw_encoders(self, encoders: list):
+        self.nvenc_encoders = list(encoders)
+        self.nvenc_available = bool(encoders)
+        self.settings_panel.set_nvenc_available(self.nvenc_available, self.nvenc_encoders)
+        self._update_gpu_label()
+
+    @property
+    def converter(self) -> "SegmentedConverter":
+        """Tek dosya dönüştürücü (uzun CPU encode'ları otomatik parçalı/paralel)"""
+        if self._converter is None:
+            from core.segmented import SegmentedConverter
+            self._converter = SegmentedConverter()
+        return self._converter
+
+    @property
+    def batch_converter(self) -> "BatchConverter":
+        if self._batch_converter is None:
+            from core.converter import BatchConverter
+            self._batch_converter = BatchConverter(
+                job_store=self._job_store or self._open_job_store(),
+                output_cache=self._open_output_cache()
+            )
+        return self._batch_converter
+
+    @staticmethod
+    def _open_output_cache() -> Optional["OutputCache"]:
+        try:
+            from core.output_cache import get_output_cache
+            return get_output_cache()
+        except Exception:
+            return None
+
+    @staticmethod
+    def _open_job_store() -> Optional["JobStore"]:
+        try:
+            from core.job_store import JobStore
+            return JobStore()
+        except Exception:
+            return None
+
+    def _offer_resume(self):
+        """Önceki oturumdan yarım kalan toplu işleri sor"""
+        # Depo dosyası yoksa devam edecek iş de yoktur: dönüştürme motoru yüklenmez
+        from core.job_store import default_db_path
+        if self._batch_converter is None and not os.path.exists(default_db_path()):
+            return
+
+        store = self._batch_converter.job_store if self._batch_converter else self._open_job_store()
+        if not store:
+            return
+        # BatchConverter ilk gerektiğinde aynı depoyu kullanır
+        self._job_store = store
+
+        pending = store.load_unfinished()
+        if not pending:
+            return
+
+        if not messagebox.askyesno(
+            "Yarim Kalan Isler",
+            f"Onceki oturumdan {len(pending)} dosya tamamlanmamis.\n"
+            "Kaldigi yerden devam edilsin mi?"
+        ):
+            store.discard_unfinished()
+            return
+
+        self.batch_converter.clear_queue()
+        count = self.batch_converter.resume_from_store()
+        if count:
+            self._run_batch(count)
+
     def _setup_style(self):
         """Tkinter stilini ayarla"""
         style = ttk.Style()
@@ -67,10 +171,9 @@ class MainWindow:
         title_label.pack(side="left")
 
         # GPU durumu
-        gpu_text = "GPU: Aktif (NVENC)" if self.nvenc_available else "GPU: Pasif (CPU)"
-        gpu_color = "green" if self.nvenc_available else "gray"
-        self.gpu_label = ttk.Label(title_frame, text=gpu_text, foreground=gpu_color)
+        self.gpu_label = ttk.Label(title_frame)
         self.gpu_label.pack(side="right")
+        self._update_gpu_label()
 
         self.language_var = tk.StringVar(value="tr")
         self.language_combo = ttk.Combobox(
@@ -164,7 +267,7 @@ class MainWindow:
         # ==================== AYARLAR PANELİ ====================
         self.settings_panel = SettingsPanel(main_frame, on_change=self._on_settings_change)
         self.settings_panel.pack(fill="x", pady=5)
-        self.settings_panel.set_nvenc_available(self.nvenc_available)
+        self.settings_panel.set_nvenc_available(self.nvenc_available, self.nvenc_encoders)
 
         # ==================== TAHMİN ====================
         estimate_frame = ttk.LabelFrame(main_frame, text="Tahmin", padding=10)
@@ -240,6 +343,7 @@ class MainWindow:
         self.status_label.config(text="Video bilgisi yukleniyor...")
         self.root.update()
 
+        from core.ffmpeg_utils import FFmpegUtils
         self.video_info = FFmpegUtils.get_video_info(path)
 
         if self.video_info:
@@ -301,6 +405,7 @@ class MainWindow:
             self.est_info_label.config(text="-")
             return
 
+        from core.estimator import Estimator
         settings = self.settings_panel.get_settings()
         estimate = Estimator.estimate_with_preset(self.video_info, settings)
 
@@ -364,14 +469,24 @@ class MainWindow:
         self.progress_dialog = ProgressDialog(
             self.root,
             title="Donusturuluyor...",
-            on_cancel=self._cancel_convert
+            on_cancel=self._cancel_convert,
+            on_pause=self.converter.pause if priority.can_suspend() else None,
+            on_resume=self.converter.resume
         )
         self.progress_dialog.set_file_info(os.path.basename(source), duration)
 
         # Callback'leri ayarla
+        status = {"text": "Kodlaniyor..."}
+
+        def on_plan(decision):
+            if decision.get("video") in ("copy", "none") and decision.get("audio") in ("copy", "none"):
+                status["text"] = "Kopyalaniyor (remux)..."
+            message = RemuxPlanner.describe(decision)
+            self.root.after(0, lambda: self.status_label.config(text=message))
+
         def on_progress(progress):
             progress["total_time"] = duration
-            progress["status"] = "Kodlaniyor..."
+            progress["status"] = status["text"]
             self.root.after(0, lambda: self.progress_dialog.update_progress(progress))
 
         def on_complete(output):
@@ -383,7 +498,8 @@ class MainWindow:
         self.converter.set_callbacks(
             progress=on_progress,
             complete=on_complete,
-            error=on_error
+            error=on_error,
+            plan=on_plan
         )
 
         # Dönüştürmeyi başlat
@@ -418,19 +534,50 @@ class MainWindow:
             planned_outputs.add(output_path.lower())
             self.batch_converter.add_to_queue(source, output_path, settings.copy())
 
+        self._run_batch(len(sources))
+
+    def _run_batch(self, total_files: int):
+        """Hazırlanan kuyruğu ilerleme penceresiyle başlat"""
         self.batch_dialog = BatchProgressDialog(
             self.root,
-            total_files=len(sources),
-            on_cancel=self._cancel_batch_convert
+            total_files=total_files,
+            on_cancel=self._cancel_batch_convert,
+            on_pause=self._pause_batch_convert,
+            on_resume=self.batch_converter.resume
         )
 
+        def on_probe_complete(summary):
+            remuxed = sum(1 for item in self.batch_converter.queue
+                          if item.get("plan", {}).get("changed"))
+
+            def update():
+                self.batch_dialog.set_probe_summary(summary)
+                notes = []
+                if remuxed:
+                    notes.append(f"{remuxed} dosya yeniden encode edilmeden kopyalanacak")
+                if summary.get("cached"):
+                    notes.append(f"{summary['cached']} dosya onbellekten alindi")
+                if notes:
+                    self.status_label.config(text=f"Toplu donusturme calisiyor... ({', '.join(notes)})")
+            self.root.after(0, update)
+
         def on_batch_progress(completed, total, queue):
-            self.root.after(0, lambda: self.batch_dialog.update_overall(completed))
+            processed, media_total = self.batch_converter.media_progress()
+
+            def update():
+                self.batch_dialog.update_overall(completed)
+                self.batch_dialog.update_eta(processed, media_total)
+            self.root.after(0, update)
 
         def on_item_progress(index, item, progress):
             filename = os.path.basename(item["input"])
             percent = progress.get("percent", item.get("progress", 0))
-            self.root.after(0, lambda: self.batch_dialog.update_current(filename, percent))
+            processed, media_total = self.batch_converter.media_progress()
+
+            def update():
+                self.batch_dialog.update_current(filename, percent)
+                self.batch_dialog.update_eta(processed, media_total)
+            self.root.after(0, update)
 
         def on_batch_complete(queue):
             self.root.after(0, lambda: self._on_batch_complete(queue))
@@ -438,7 +585,8 @@ class MainWindow:
         self.batch_converter.set_callbacks(
             batch_progress=on_batch_progress,
             item_progress=on_item_progress,
-            complete=on_batch_complete
+            complete=on_batch_complete,
+            probe_complete=on_probe_complete
         )
 
         self.convert_btn.config(state="disabled")
@@ -460,6 +608,10 @@ class MainWindow:
     def _cancel_batch_convert(self):
         self.batch_converter.cancel()
 
+    def _pause_batch_convert(self):
+        # Dondurma yoksa uzun işler kontrol noktasında durdurulur
+        self.batch_converter.pause(checkpoint=not priority.can_suspend())
+
     def _cancel_convert(self):
         """Dönüştürmeyi iptal et"""
         self.converter.cancel()
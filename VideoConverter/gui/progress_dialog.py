@@ -1,4 +1,5 @@
 """İlerleme gösterge penceresi"""
+import time
 import tkinter as tk
 from tkinter import ttk
 from typing import Optional, Callable
@@ -11,11 +12,16 @@ class ProgressDialog(tk.Toplevel):
         self,
         parent,
         title: str = "Dönüştürülüyor...",
-        on_cancel: Optional[Callable] = None
+        on_cancel: Optional[Callable] = None,
+        on_pause: Optional[Callable] = None,
+        on_resume: Optional[Callable] = None
     ):
         super().__init__(parent)
         self.title(title)
         self.on_cancel = on_cancel
+        self.on_pause = on_pause
+        self.on_resume = on_resume
+        self.is_paused = False
 
         # Pencere ayarları
         self.geometry("500x280")
@@ -112,13 +118,26 @@ class ProgressDialog(tk.Toplevel):
         )
         self.status_label.pack(pady=5)
 
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=10)
+
+        # Duraklat/Devam butonu (dondurma destekleniyorsa)
+        self.pause_btn = None
+        if self.on_pause and self.on_resume:
+            self.pause_btn = ttk.Button(
+                button_frame,
+                text="Duraklat",
+                command=self._on_pause_click
+            )
+            self.pause_btn.pack(side="left", padx=5)
+
         # İptal butonu
         self.cancel_btn = ttk.Button(
-            main_frame,
+            button_frame,
             text="İptal",
             command=self._on_cancel_click
         )
-        self.cancel_btn.pack(pady=10)
+        self.cancel_btn.pack(side="left", padx=5)
 
     def _center_window(self):
         """Pencereyi ortala"""
@@ -133,9 +152,32 @@ class ProgressDialog(tk.Toplevel):
         """İptal butonuna tıklandı"""
         self.status_label.config(text="İptal ediliyor...", foreground="orange")
         self.cancel_btn.config(state="disabled")
+        if self.pause_btn:
+            self.pause_btn.config(state="disabled")
         if self.on_cancel:
             self.on_cancel()
 
+    def _on_pause_click(self):
+        """Duraklat/Devam butonuna tıklandı"""
+        if self.is_paused:
+            if self.on_resume and self.on_resume() is False:
+                return
+            self.set_paused(False)
+        else:
+            if self.on_pause and self.on_pause() is False:
+                return
+            self.set_paused(True)
+
+    def set_paused(self, paused: bool):
+        """Duraklatma durumunu göster"""
+        self.is_paused = paused
+        if self.pause_btn:
+            self.pause_btn.config(text="Devam" if paused else "Duraklat")
+        if paused:
+            self.status_label.config(text="Duraklatıldı", foreground="orange")
+        else:
+            self.status_label.config(text="Devam ediliyor...", foreground="gray")
+
     def _on_close(self):
         """Pencere kapatılmaya çalışıldı"""
         self._on_cancel_click()
@@ -170,7 +212,7 @@ class ProgressDialog(tk.Toplevel):
             else:
                 self.size_label.config(text=f"{size_mb:.1f} MB")
 
-        if "status" in progress:
+        if "status" in progress and not self.is_paused:
             self.status_label.config(text=progress["status"], foreground="gray")
 
         self.update_idletasks()
@@ -191,12 +233,16 @@ class ProgressDialog(tk.Toplevel):
         self.percent_label.config(text="100%")
         self.status_label.config(text="Tamamlandı!", foreground="green")
         self.cancel_btn.config(text="Kapat", command=self.destroy)
+        if self.pause_btn:
+            self.pause_btn.config(state="disabled")
 
     def set_error(self, message: str):
         """Hata durumu"""
         self.grab_release()
         self.status_label.config(text=f"Hata: {message}", foreground="red")
         self.cancel_btn.config(text="Kapat", command=self.destroy)
+        if self.pause_btn:
+            self.pause_btn.config(state="disabled")
 
     @staticmethod
     def _format_time(seconds: float) -> str:
@@ -214,13 +260,25 @@ class ProgressDialog(tk.Toplevel):
 class BatchProgressDialog(tk.Toplevel):
     """Toplu dönüştürme ilerleme penceresi"""
 
-    def __init__(self, parent, total_files: int, on_cancel: Optional[Callable] = None):
+    def __init__(
+        self,
+        parent,
+        total_files: int,
+        on_cancel: Optional[Callable] = None,
+        on_pause: Optional[Callable] = None,
+        on_resume: Optional[Callable] = None
+    ):
         super().__init__(parent)
         self.title("Toplu Dönüştürme")
         self.on_cancel = on_cancel
+        self.on_pause = on_pause
+        self.on_resume = on_resume
+        self.is_paused = False
         self.total_files = total_files
+        self.started_at = time.time()
+        self._paused_at: Optional[float] = None
 
-        self.geometry("500x200")
+        self.geometry("500x250")
         self.resizable(False, False)
         self.transient(parent)
         self.grab_set()
@@ -247,6 +305,13 @@ class BatchProgressDialog(tk.Toplevel):
         self.overall_label = ttk.Label(main_frame, text="0 / 0 dosya")
         self.overall_label.pack(anchor="w")
 
+        # Ön tarama sonucu ve kalan süre
+        self.probe_label = ttk.Label(main_frame, text="Dosyalar taraniyor...", foreground="gray")
+        self.probe_label.pack(anchor="w")
+
+        self.eta_label = ttk.Label(main_frame, text="Kalan sure: -", foreground="gray")
+        self.eta_label.pack(anchor="w")
+
         # Mevcut dosya
         ttk.Label(main_frame, text="Mevcut Dosya:", font=("", 10, "bold")).pack(anchor="w", pady=(15, 0))
 
@@ -262,9 +327,18 @@ class BatchProgressDialog(tk.Toplevel):
         self.current_label = ttk.Label(main_frame, text="Hazırlanıyor...")
         self.current_label.pack(anchor="w")
 
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(pady=15)
+
+        # Duraklat/Devam: bekleyen işler başlamaz, çalışanlar dondurulur
+        self.pause_btn = None
+        if self.on_pause and self.on_resume:
+            self.pause_btn = ttk.Button(button_frame, text="Duraklat", command=self._on_pause)
+            self.pause_btn.pack(side="left", padx=5)
+
         # İptal
-        self.cancel_btn = ttk.Button(main_frame, text="İptal", command=self._on_cancel)
-        self.cancel_btn.pack(pady=15)
+        self.cancel_btn = ttk.Button(button_frame, text="İptal", command=self._on_cancel)
+        self.cancel_btn.pack(side="left", padx=5)
 
     def _center_window(self):
         self.update_idletasks()
@@ -277,18 +351,76 @@ class BatchProgressDialog(tk.Toplevel):
             self.on_cancel()
         self.current_label.config(text="İptal ediliyor...")
         self.cancel_btn.config(state="disabled")
+        if self.pause_btn:
+            self.pause_btn.config(state="disabled")
+
+    def _on_pause(self):
+        if self.is_paused:
+            if self.on_resume:
+                self.on_resume()
+            # Duraklatılan süre kalan süre hesabına girmesin
+            if self._paused_at is not None:
+                self.started_at += time.time() - self._paused_at
+            self._paused_at = None
+            self.is_paused = False
+            self.current_label.config(text="Devam ediliyor...")
+        else:
+            if self.on_pause:
+                self.on_pause()
+            self._paused_at = time.time()
+            self.is_paused = True
+            self.current_label.config(text="Duraklatıldı")
+            self.eta_label.config(text="Kalan sure: duraklatildi")
+        if self.pause_btn:
+            self.pause_btn.config(text="Devam" if self.is_paused else "Duraklat")
 
     def update_overall(self, completed: int):
         percent = (completed / self.total_files) * 100
         self.overall_var.set(percent)
         self.overall_label.config(text=f"{completed} / {self.total_files} dosya")
 
+    def set_probe_summary(self, summary: dict):
+        """Ön tarama sonucunu göster (toplam medya süresi ve girdi boyutu)"""
+        size_mb = summary.get("total_bytes", 0) / (1024 * 1024)
+        size_text = f"{size_mb / 1024:.2f} GB" if size_mb >= 1024 else f"{size_mb:.1f} MB"
+        text = (
+            f"Toplam sure: {ProgressDialog._format_time(summary.get('total_duration', 0))} | "
+            f"Toplam boyut: {size_text}"
+        )
+        if summary.get("unreadable"):
+            text += f" | Okunamayan: {summary['unreadable']}"
+        self.probe_label.config(text=text)
+        calibration = summary.get("calibration") or {}
+        if calibration.get("calibrated"):
+            low, middle, high = calibration["seconds"]
+            self.eta_label.config(
+                text=f"Tahmini sure: ~{ProgressDialog._format_time(middle)} "
+                     f"({ProgressDialog._format_time(low)} - {ProgressDialog._format_time(high)})"
+            )
+        elif summary.get("estimated_seconds"):
+            self.eta_label.config(
+                text=f"Tahmini sure: ~{ProgressDialog._format_time(summary['estimated_seconds'])}"
+            )
+        self.started_at = time.time()
+
+    def update_eta(self, processed: float, total: float):
+        """İşlenen medya süresine göre kalan süreyi güncelle"""
+        if self.is_paused:
+            return
+        elapsed = time.time() - self.started_at
+        if processed <= 0 or total <= 0 or elapsed <= 0:
+            return
+        remaining = elapsed * max(0.0, total - processed) / processed
+        self.eta_label.config(text=f"Kalan sure: ~{ProgressDialog._format_time(remaining)}")
+
     def update_current(self, filename: str, percent: float):
         self.current_var.set(percent)
-        self.current_label.config(text=filename)
+        self.current_label.config(text=f"{filename} (duraklatildi)" if self.is_paused else filename)
 
     def set_complete(self):
         self.grab_release()
         self.overall_var.set(100)
         self.current_label.config(text="Tamamlandı!")
         self.cancel_btn.config(text="Kapat", command=self.destroy)
+        if self.pause_btn:
+            self.pause_btn.config(state="disabled")
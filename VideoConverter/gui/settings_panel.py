@@ -1,7 +1,8 @@
 """Ayarlar paneli"""
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, Callable, List, Optional
+from core import hw_backends
 from core.presets import (
     VIDEO_PRESETS, RESOLUTIONS, FPS_OPTIONS,
     VIDEO_BITRATES, AUDIO_BITRATES
@@ -44,6 +45,7 @@ class SettingsPanel(ttk.LabelFrame):
         super().__init__(parent, text="Ayarlar", padding=10)
         self.on_change = on_change
         self.nvenc_available = False
+        self.hw_encoders: List[str] = []
         self.use_gpu = True  # Varsayılan GPU
 
         self._create_widgets()
@@ -183,22 +185,54 @@ class SettingsPanel(ttk.LabelFrame):
         self.audio_bitrate_combo.bind("<<ComboboxSelected>>", self._on_setting_change)
 
         # ==================== HIZ AYARLARI ====================
-        speed_frame = ttk.LabelFrame(self, text="Hiz Ayarlari", padding=5)
-        speed_frame.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
+        # Kaydırıcılar ilk açılışta oluşturulur (_build_speed_body)
+        self.speed_frame = ttk.LabelFrame(self, text="Hiz Ayarlari", padding=5)
+        self.speed_frame.grid(row=2, column=0, sticky="nsew", padx=5, pady=5)
 
         # Hız aktif/pasif
         self.speed_enabled_var = tk.BooleanVar(value=False)
         self.speed_check = ttk.Checkbutton(
-            speed_frame,
+            self.speed_frame,
             text="Video Hizini Degistir",
             variable=self.speed_enabled_var,
             command=self._toggle_speed
         )
         self.speed_check.grid(row=0, column=0, columnspan=3, sticky="w", pady=2)
+        self.speed_var = tk.DoubleVar(value=1.0)
+        self.speed_scale = None
+
+        # ==================== RENK AYARLARI ====================
+        # Kaydırıcılar ilk açılışta oluşturulur (_build_color_body)
+        self.color_frame = ttk.LabelFrame(self, text="Renk Ayarlari", padding=5)
+        self.color_frame.grid(row=2, column=1, sticky="nsew", padx=5, pady=5)
+
+        # Renk aktif/pasif
+        self.color_enabled_var = tk.BooleanVar(value=False)
+        self.color_check = ttk.Checkbutton(
+            self.color_frame,
+            text="Renk Duzenle",
+            variable=self.color_enabled_var,
+            command=self._toggle_color
+        )
+        self.color_check.grid(row=0, column=0, columnspan=3, sticky="w", pady=2)
+        self.brightness_var = tk.DoubleVar(value=0)
+        self.contrast_var = tk.DoubleVar(value=1.0)
+        self.saturation_var = tk.DoubleVar(value=1.0)
+        self.brightness_scale = None
+
+        # Grid weight
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+
+        # Başlangıç codec listesini güncelle
+        self._update_video_codecs()
+
+    def _build_speed_body(self):
+        """Hız kaydırıcısı ve hazır hız butonları"""
+        speed_frame = self.speed_frame
 
         # Hız değeri
         ttk.Label(speed_frame, text="Hiz:").grid(row=1, column=0, sticky="w", pady=2)
-        self.speed_var = tk.DoubleVar(value=1.0)
         self.speed_scale = ttk.Scale(
             speed_frame,
             from_=0.25,
@@ -211,7 +245,7 @@ class SettingsPanel(ttk.LabelFrame):
         self.speed_scale.grid(row=1, column=1, sticky="w", padx=5, pady=2)
         self.speed_scale.state(["disabled"])
 
-        self.speed_label = ttk.Label(speed_frame, text="1.0x", width=6)
+        self.speed_label = ttk.Label(speed_frame, text=f"{round(self.speed_var.get(), 2)}x", width=6)
         self.speed_label.grid(row=1, column=2, sticky="w", padx=5)
 
         # Hızlı preset butonları
@@ -227,23 +261,12 @@ class SettingsPanel(ttk.LabelFrame):
             )
             btn.pack(side="left", padx=2)
 
-        # ==================== RENK AYARLARI ====================
-        color_frame = ttk.LabelFrame(self, text="Renk Ayarlari", padding=5)
-        color_frame.grid(row=2, column=1, sticky="nsew", padx=5, pady=5)
-
-        # Renk aktif/pasif
-        self.color_enabled_var = tk.BooleanVar(value=False)
-        self.color_check = ttk.Checkbutton(
-            color_frame,
-            text="Renk Duzenle",
-            variable=self.color_enabled_var,
-            command=self._toggle_color
-        )
-        self.color_check.grid(row=0, column=0, columnspan=3, sticky="w", pady=2)
+    def _build_color_body(self):
+        """Parlaklık/kontrast/doygunluk kaydırıcıları"""
+        color_frame = self.color_frame
 
         # Parlaklık
         ttk.Label(color_frame, text="Parlaklik:").grid(row=1, column=0, sticky="w", pady=2)
-        self.brightness_var = tk.DoubleVar(value=0)
         self.brightness_scale = ttk.Scale(
             color_frame,
             from_=-1.0,
@@ -260,7 +283,6 @@ class SettingsPanel(ttk.LabelFrame):
 
         # Kontrast
         ttk.Label(color_frame, text="Kontrast:").grid(row=2, column=0, sticky="w", pady=2)
-        self.contrast_var = tk.DoubleVar(value=1.0)
         self.contrast_scale = ttk.Scale(
             color_frame,
             from_=0.0,
@@ -277,7 +299,6 @@ class SettingsPanel(ttk.LabelFrame):
 
         # Doygunluk
         ttk.Label(color_frame, text="Doygunluk:").grid(row=3, column=0, sticky="w", pady=2)
-        self.saturation_var = tk.DoubleVar(value=1.0)
         self.saturation_scale = ttk.Scale(
             color_frame,
             from_=0.0,
@@ -301,13 +322,6 @@ class SettingsPanel(ttk.LabelFrame):
         )
         self.reset_color_btn.grid(row=4, column=0, columnspan=3, pady=5)
 
-        # Grid weight
-        self.columnconfigure(0, weight=1)
-        self.columnconfigure(1, weight=1)
-
-        # Başlangıç codec listesini güncelle
-        self._update_video_codecs()
-
     def _update_video_codecs(self):
         """İşlemciye göre video codec listesini güncelle"""
         processor = self.processor_var.get()
@@ -318,14 +332,15 @@ class SettingsPanel(ttk.LabelFrame):
             # Copy modunda diğer ayarları devre dışı bırak
             self._set_encoding_options_state("disabled")
         elif processor == "gpu" and self.nvenc_available:
-            codecs = GPU_VIDEO_CODECS + CPU_VIDEO_CODECS + COPY_CODEC
-            if "nvenc" not in self.vcodec_var.get():
-                self.vcodec_var.set("h264_nvenc")
+            gpu_codecs = self._gpu_codecs()
+            codecs = gpu_codecs + CPU_VIDEO_CODECS + COPY_CODEC
+            if not hw_backends.is_hardware_encoder(self.vcodec_var.get()):
+                self.vcodec_var.set(gpu_codecs[0][0])
             self._set_encoding_options_state("!disabled")
         else:
             # CPU veya GPU yok
             codecs = CPU_VIDEO_CODECS + COPY_CODEC
-            if "nvenc" in self.vcodec_var.get():
+            if hw_backends.is_hardware_encoder(self.vcodec_var.get()):
                 self.vcodec_var.set("libx264")
             self._set_encoding_options_state("!disabled")
 
@@ -376,6 +391,8 @@ class SettingsPanel(ttk.LabelFrame):
 
     def _on_color_change(self, value=None):
         """Renk slider değişti"""
+        if self.brightness_scale is None:
+            return
         self.brightness_label.config(text=f"{self.brightness_var.get():.1f}")
         self.contrast_label.config(text=f"{self.contrast_var.get():.1f}")
         self.saturation_label.config(text=f"{self.saturation_var.get():.1f}")
@@ -384,21 +401,26 @@ class SettingsPanel(ttk.LabelFrame):
     def _toggle_speed(self):
         """Hız ayarlarını aç/kapat"""
         if self.speed_enabled_var.get():
+            if self.speed_scale is None:
+                self._build_speed_body()
             self.speed_scale.state(["!disabled"])
         else:
-            self.speed_scale.state(["disabled"])
             self.speed_var.set(1.0)
-            self.speed_label.config(text="1.0x")
+            if self.speed_scale is not None:
+                self.speed_scale.state(["disabled"])
+                self.speed_label.config(text="1.0x")
         self._on_setting_change()
 
     def _toggle_color(self):
         """Renk ayarlarını aç/kapat"""
         if self.color_enabled_var.get():
+            if self.brightness_scale is None:
+                self._build_color_body()
             self.brightness_scale.state(["!disabled"])
             self.contrast_scale.state(["!disabled"])
             self.saturation_scale.state(["!disabled"])
             self.reset_color_btn.config(state="normal")
-        else:
+        elif self.brightness_scale is not None:
             self.brightness_scale.state(["disabled"])
             self.contrast_scale.state(["disabled"])
             self.saturation_scale.state(["disabled"])
@@ -421,9 +443,21 @@ class SettingsPanel(ttk.LabelFrame):
         self.saturation_var.set(1.0)
         self._on_color_change()
 
-    def set_nvenc_available(self, available: bool):
-        """NVENC kullanılabilirliğini ayarla"""
+    def _gpu_codecs(self) -> list:
+        """Bu makinede çalışan donanım encoder'ları (bilinmiyorsa NVENC listesi)"""
+        if not self.hw_encoders:
+            return GPU_VIDEO_CODECS
+        names = {"h264": "H.264", "hevc": "H.265/HEVC", "av1": "AV1"}
+        return [
+            (encoder, f"{names.get(hw_backends.codec_family(encoder), encoder)} "
+                      f"(GPU - {hw_backends.backend_for(encoder).label})")
+            for encoder in self.hw_encoders
+        ]
+
+    def set_nvenc_available(self, available: bool, encoders: Optional[List[str]] = None):
+        """Donanım encoder kullanılabilirliğini ayarla (encoders: çalışan encoder'lar)"""
         self.nvenc_available = available
+        self.hw_encoders = [encoder for encoder in encoders or [] if hw_backends.is_hardware_encoder(encoder)]
         if not available:
             # GPU seçeneğini devre dışı bırak
             self.gpu_radio.config(state="disabled")
@@ -446,9 +480,9 @@ class SettingsPanel(ttk.LabelFrame):
 
         if "vcodec" in preset and preset["vcodec"]:
             vcodec = preset["vcodec"]
-            # GPU yoksa CPU'ya düş
-            if not self.nvenc_available and "nvenc" in vcodec:
-                vcodec = "libx264" if "264" in vcodec else "libx265"
+            # Bu makinede yoksa başka donanım arka ucuna, o da yoksa CPU'ya düş
+            available = [codec for codec, _ in self._gpu_codecs()] if self.nvenc_available else []
+            vcodec = hw_backends.substitute_encoder(vcodec, available)
             self.vcodec_var.set(vcodec)
             # Combobox'ta göster
             for item in self.vcodec_combo.cget("values"):
@@ -499,7 +533,7 @@ class SettingsPanel(ttk.LabelFrame):
             "bitrate": f"{self.bitrate_var.get()}k",
             "audio_bitrate": f"{self.audio_bitrate_var.get()}k",
             "preset": self.preset_var.get(),
-            "gpu": "nvenc" in vcodec,
+            "gpu": hw_backends.is_hardware_encoder(vcodec),
             "copy_mode": vcodec == "copy" and acodec == "copy"
         }
 
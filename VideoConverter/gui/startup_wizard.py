@@ -5,6 +5,7 @@ import threading
 import platform
 from typing import Callable, Optional
 
+from core import capabilities, hw_backends
 from core.installer import Installer
 
 
@@ -206,19 +207,24 @@ class StartupWizard:
         # NVIDIA GPU var mı?
         gpu_ok, gpu_name = Installer.check_nvidia_gpu()
 
-        if gpu_ok:
-            # NVENC çalışıyor mu?
-            self.nvenc_ok, self.nvenc_encoders = Installer.check_nvenc()
-
-            if self.nvenc_ok:
-                self._set_gpu_ok(gpu_name)
-            else:
-                # GPU var ama NVENC yok - sürücü sorunu
-                self._set_gpu_driver_issue(gpu_name)
+        # Çalışan donanım encoder'ları (NVENC/QSV/AMF/VAAPI/VideoToolbox)
+        self.nvenc_ok, self.nvenc_encoders = Installer.check_hw_encoders()
+        has_nvenc = any("nvenc" in encoder for encoder in self.nvenc_encoders)
+
+        if gpu_ok and not has_nvenc:
+            # GPU var ama NVENC yok - sürücü sorunu
+            self._set_gpu_driver_issue(gpu_name)
+        elif self.nvenc_ok:
+            if not gpu_ok:
+                gpu_name = hw_backends.backend_for(self.nvenc_encoders[0]).label
+            self._set_gpu_ok(gpu_name)
         else:
             # GPU yok
             self._set_gpu_missing()
 
+        # Sonraki açılışlar bu kontrolleri atlasın (testler tekrar yapılmaz)
+        capabilities.probe()
+
     def _set_gpu_ok(self, gpu_name: str):
         """GPU hazır"""
         def update():
@@ -255,9 +261,10 @@ class StartupWizard:
             if result:
                 self._install_nvidia_driver()
             else:
-                # CPU ile devam et
+                # CPU (veya diğer donanım encoder'ları) ile devam et
                 self.gpu_status.config(
-                    text="GPU pasif - CPU kullanilacak",
+                    text="NVENC pasif - diger donanim encoder'lari kullanilacak"
+                    if self.nvenc_ok else "GPU pasif - CPU kullanilacak",
                     foreground="gray"
                 )
                 self.progress_var.set(100)
@@ -372,9 +379,18 @@ def check_and_setup() -> tuple:
     """
     Sistem kontrolü ve kurulum
 
+    FFmpeg ikilisi değişmediyse kayıtlı yetenek anlık görüntüsü kullanılır ve
+    sihirbaz hiç açılmaz; tazeleme ana pencere açıldıktan sonra arka planda
+    yapılır.
+
     Returns:
         (ffmpeg_ok, nvenc_ok, nvenc_encoders) veya None (iptal)
     """
+    snapshot = capabilities.current()
+    if snapshot and snapshot.get("ffmpeg_ok"):
+        encoders = list(snapshot.get("hw_encoders", []))
+        return True, bool(encoders), encoders
+
     wizard = StartupWizard()
     ffmpeg_ok, nvenc_ok, nvenc_encoders = wizard.run()
 
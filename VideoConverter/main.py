@@ -3,21 +3,46 @@
 TM Video Converter - Kapsamli Video Donusturucu
 Python + Tkinter ile gelistirilmis, FFmpeg tabanli video donusturme araci.
 NVIDIA NVENC GPU hizlandirma destekli.
+
+    python main.py [--profile-startup[=RAPOR_YOLU]]
 """
 import sys
 import os
+from contextlib import nullcontext
 
 # Proje klasorunu path'e ekle
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from gui.startup_wizard import check_and_setup
+
+def _profile_path(argv: list):
+    """--profile-startup[=yol] verildiyse rapor yolunu döndür (yoksa None)"""
+    for arg in argv:
+        if arg == "--profile-startup":
+            from core.storage import get_data_path
+            return get_data_path("startup_profile.txt")
+        if arg.startswith("--profile-startup="):
+            return arg.split("=", 1)[1]
+    return None
 
 
 def main():
     """Ana fonksiyon"""
+    profiler = None
+    report_path = _profile_path(sys.argv[1:])
+    if report_path:
+        from utils.startup_profile import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install()
+
+    def phase(name):
+        return profiler.phase(name) if profiler else nullcontext()
+
     try:
-        # Sistem kontrolü ve kurulum sihirbazı
-        result = check_and_setup()
+        # Sistem kontrolü ve kurulum sihirbazı (geçerli yetenek kaydı varsa atlanır)
+        with phase("import gui.startup_wizard"):
+            from gui.startup_wizard import check_and_setup
+        with phase("check_and_setup"):
+            result = check_and_setup()
 
         if result is None:
             # Kullanıcı iptal etti veya FFmpeg kurulamadı
@@ -31,9 +56,20 @@ def main():
             sys.exit(1)
 
         # Ana uygulamayı başlat
-        from gui.main_window import MainWindow
+        with phase("import gui.main_window"):
+            from gui.main_window import MainWindow
+
+        with phase("MainWindow()"):
+            app = MainWindow(nvenc_available=nvenc_ok, nvenc_encoders=nvenc_encoders)
+
+        if profiler:
+            def finish():
+                profiler.mark("ilk pencere cizildi")
+                profiler.uninstall()
+                if profiler.write(report_path):
+                    print(f"Acilis profili yazildi: {report_path}")
+            app.root.after_idle(finish)
 
-        app = MainWindow(nvenc_available=nvenc_ok, nvenc_encoders=nvenc_encoders)
         app.run()
 
     except Exception as e:
@@ -0,0 +1,286 @@
+"""
+Encode benchmark'ı (sentetik lavfi kaynakları)
+
+Belirli dosyalara bağlı değildir: testsrc2 + sine ile farklı çözünürlük ve
+sürelerde deterministik MPEG-TS girdileri üretir, her yerleşik preseti
+VideoConverter.convert_sync ile çalıştırır ve fps, gerçek zamana göre hız,
+en yüksek RSS, CPU% ve çıktı boyutunu JSON'a yazar. Bir taban çizgisiyle
+karşılaştırıldığında gerilemelerde 1 ile çıkar.
+
+    python run_benchmarks.py --quick
+    python run_benchmarks.py --save-baseline baseline.json
+    python run_benchmarks.py --baseline baseline.json --preset "MP4 Donustur (CPU - Hizli)"
+
+Her iş ayrı bir Python sürecinde çalışır; böylece getrusage(RUSAGE_CHILDREN)
+sadece o işin ffmpeg sürecini ölçer (Linux/macOS).
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource
+except ImportError:  # Windows: RSS/CPU ölçülmez
+    resource = None
+
+from core import capabilities, hw_backends
+from core.storage import get_data_path
+
+FRAME_RATE = 30
+DEFAULT_RESOLUTIONS = ["640x360", "1280x720", "1920x1080"]
+DEFAULT_DURATIONS = [10]
+QUICK_RESOLUTIONS = ["640x360"]
+QUICK_DURATIONS = [3]
+
+# Gerileme eşikleri (oran): hız düşüşü, boyut ve bellek artışı
+SPEED_TOLERANCE = 0.15
+SIZE_TOLERANCE = 0.05
+RSS_TOLERANCE = 0.25
+
+
+def source_name(resolution: str, duration: float) -> str:
+    return f"src_{resolution}_{duration:g}s.ts"
+
+
+def generate_source(ffmpeg_path: str, work_dir: str, resolution: str, duration: float) -> str:
+    """
+    Deterministik girdi üret (varsa yeniden kullanılır)
+
+    Kaynak MPEG-2 + MP2'dir: hiçbir encode preseti kaynağı kopyalayarak
+    (remux) geçemez, copy presetleri ise gerçekten remux ölçer.
+    """
+    path = os.path.join(work_dir, source_name(resolution, duration))
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        return path
+    cmd = [
+        ffmpeg_path, "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=size={resolution}:rate={FRAME_RATE}:duration={duration:g}",
+        "-f", "lavfi", "-i", f"sine=frequency=440:sample_rate=48000:duration={duration:g}",
+        "-c:v", "mpeg2video", "-q:v", "2", "-g", str(FRAME_RATE), "-pix_fmt", "yuv420p",
+        "-c:a", "mp2", "-b:a", "192k",
+        "-fflags", "+bitexact", "-flags", "+bitexact", "-map_metadata", "-1",
+        "-shortest", path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0 or not os.path.exists(path):
+        raise RuntimeError(f"Kaynak uretilemedi ({resolution}, {duration:g}s): {result.stderr[-500:]}")
+    return path
+
+
+def preset_settings(preset: dict) -> dict:
+    """CLI ile aynı: audio_only presetlerinde video kapalı"""
+    settings = dict(preset)
+    if settings.get("audio_only"):
+        settings["vcodec"] = None
+    return settings
+
+
+def slug(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", text).strip("_").lower()
+
+
+def run_case(case: dict) -> dict:
+    """Tek işi bu süreçte çalıştır (--run-case ile çağrılır)"""
+    from core.converter import VideoConverter
+
+    if os.path.exists(case["output"]):
+        os.remove(case["output"])
+    converter = VideoConverter()
+    before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    started = time.perf_counter()
+    ok, message = converter.convert_sync(case["input"], case["output"], case["settings"])
+    wall = time.perf_counter() - started
+
+    result = {"ok": ok, "wall_seconds": round(wall, 3)}
+    if not ok:
+        result["error"] = (message or "")[-500:]
+        return result
+
+    duration = case["duration"]
+    result["fps"] = round(duration * FRAME_RATE / wall, 2) if wall else 0
+    result["speed"] = round(duration / wall, 3) if wall else 0
+    result["output_size"] = os.path.getsize(case["output"]) if os.path.exists(case["output"]) else 0
+    result["plan"] = (converter.last_plan or {}).get("video")
+    if resource:
+        after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+        result["cpu_percent"] = round(cpu / wall * 100, 1) if wall else 0
+        # ru_maxrss: Linux'ta KB, macOS'ta bayt
+        scale = 1 if sys.platform == "darwin" else 1024
+        result["peak_rss"] = after.ru_maxrss * scale
+    return result
+
+
+def run_isolated(case: dict, timeout: float, data_dir: str) -> dict:
+    """
+    İşi ayrı süreçte çalıştır (RSS/CPU sadece bu işe ait olsun)
+
+    Alt süreç kendi veri klasörünü kullanır: sentetik encode'lar kullanıcının
+    encode geçmişine, probe önbelleğine ve yetenek anlık görüntüsüne yazılmaz.
+    """
+    env = dict(os.environ, TMVC_DATA_DIR=data_dir)
+    try:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-case", json.dumps(case)],
+            capture_output=True, text=True, timeout=timeout, env=env
+        )
+    except subprocess.TimeoutExpired:
+        return {"ok": False, "error": f"zaman asimi ({timeout:g}s)"}
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        return {"ok": False, "error": (completed.stderr or "cikti yok")[-500:]}
+    return json.loads(lines[-1])
+
+
+def compare(results: dict, baseline: dict, speed_tol: float, size_tol: float, rss_tol: float) -> list:
+    """Taban çizgisine göre gerilemeleri listele"""
+    regressions = []
+    for key, base in baseline.get("cases", {}).items():
+        current = results["cases"].get(key)
+        if current is None or current.get("skipped"):
+            continue
+        if base.get("ok") and not current.get("ok"):
+            regressions.append(f"{key}: basarisiz ({current.get('error', '')[:120]})")
+            continue
+        if not (base.get("ok") and current.get("ok")):
+            continue
+        if base.get("speed") and current["speed"] < base["speed"] * (1 - speed_tol):
+            regressions.append(f"{key}: hiz {base['speed']:.2f}x -> {current['speed']:.2f}x")
+        if base.get("output_size") and current["output_size"] > base["output_size"] * (1 + size_tol):
+            regressions.append(f"{key}: boyut {base['output_size']} -> {current['output_size']}")
+        if base.get("peak_rss") and current.get("peak_rss", 0) > base["peak_rss"] * (1 + rss_tol):
+            regressions.append(
+                f"{key}: bellek {base['peak_rss'] // 1024 ** 2}MB -> {current['peak_rss'] // 1024 ** 2}MB")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik kaynaklarla preset encode benchmark'i")
+    parser.add_argument("--preset", action="append", help="Sadece bu preset(ler) (varsayilan: hepsi)")
+    parser.add_argument("--resolutions", help="Virgulle ayrilmis, orn. 640x360,1280x720")
+    parser.add_argument("--durations", help="Virgulle ayrilmis saniyeler, orn. 5,30")
+    parser.add_argument("--quick", action="store_true", help="Tek kucuk kaynakla hizli tur")
+    parser.add_argument("--work-dir", default=get_data_path("benchmarks"), help="Kaynak/cikti klasoru")
+    parser.add_argument("--output", help="Sonuc JSON'u (varsayilan: work-dir/results.json)")
+    parser.add_argument("--baseline", help="Karsilastirilacak taban cizgisi JSON'u")
+    parser.add_argument("--save-baseline", help="Sonuclari taban cizgisi olarak da yaz")
+    parser.add_argument("--speed-tolerance", type=float, default=SPEED_TOLERANCE)
+    parser.add_argument("--size-tolerance", type=float, default=SIZE_TOLERANCE)
+    parser.add_argument("--rss-tolerance", type=float, default=RSS_TOLERANCE)
+    parser.add_argument("--timeout", type=float, default=1800, help="Is basina zaman asimi (s)")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.run_case:
+        print(json.dumps(run_case(json.loads(args.run_case))))
+        return 0
+
+    from core.presets import PRESETS
+
+    snapshot = capabilities.current() or capabilities.probe()
+    if snapshot is None:
+        print("FFmpeg bulunamadi")
+        return 3
+    ffmpeg_path = snapshot["ffmpeg"]["path"]
+    hw_available = set(snapshot.get("hw_encoders", []))
+
+    resolutions = (args.resolutions.split(",") if args.resolutions
+                   else QUICK_RESOLUTIONS if args.quick else DEFAULT_RESOLUTIONS)
+    durations = ([float(value) for value in args.durations.split(",")] if args.durations
+                 else QUICK_DURATIONS if args.quick else DEFAULT_DURATIONS)
+    names = args.preset or list(PRESETS)
+    unknown = [name for name in names if name not in PRESETS]
+    if unknown:
+        print(f"Bilinmeyen preset: {', '.join(unknown)}")
+        return 2
+
+    os.makedirs(os.path.join(args.work_dir, "out"), exist_ok=True)
+    data_dir = os.path.join(args.work_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    sources = []
+    for duration in durations:
+        for resolution in resolutions:
+            print(f"Kaynak hazirlaniyor: {resolution} {duration:g}s")
+            sources.append((resolution, duration, generate_source(ffmpeg_path, args.work_dir, resolution, duration)))
+
+    results = {
+        "created": time.time(),
+        "host": {
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "ffmpeg": snapshot.get("version"),
+            "hw_encoders": sorted(hw_available),
+        },
+        "cases": {},
+    }
+
+    for name in names:
+        settings = preset_settings(PRESETS[name])
+        vcodec = settings.get("vcodec")
+        for resolution, duration, source in sources:
+            # Ses presetlerinde çözünürlük fark etmez: her süre için en küçük kaynak
+            if vcodec is None and resolution != resolutions[0]:
+                continue
+            key = f"{name} | {resolution} {duration:g}s"
+            if hw_backends.is_hardware_encoder(vcodec) and vcodec not in hw_available:
+                results["cases"][key] = {"skipped": f"{vcodec} bu makinede yok"}
+                print(f"{key}: atlandi ({vcodec} yok)")
+                continue
+
+            output = os.path.join(args.work_dir, "out",
+                                  f"{slug(name)}_{resolution}_{duration:g}s{settings.get('output_format', '.mp4')}")
+            case = {"input": source, "output": output, "settings": settings, "duration": duration}
+            result = run_isolated(case, args.timeout, data_dir)
+            result.update({"preset": name, "resolution": resolution, "duration": duration})
+            results["cases"][key] = result
+            if result.get("ok"):
+                rss = f" rss={result['peak_rss'] // 1024 ** 2}MB" if "peak_rss" in result else ""
+                cpu = f" cpu={result['cpu_percent']:.0f}%" if "cpu_percent" in result else ""
+                print(f"{key}: {result['fps']:.1f} fps {result['speed']:.2f}x{cpu}{rss} "
+                      f"boyut={result['output_size']}")
+            else:
+                print(f"{key}: HATA {result.get('error', '')[:200]}")
+
+    output_path = args.output or os.path.join(args.work_dir, "results.json")
+    for path in filter(None, (output_path, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2, ensure_ascii=False)
+    print(f"\nSonuclar: {output_path}")
+
+    # Taban çizgisinde olmayan ya da orada da başarısız olan işler dahil
+    failed = [key for key, case in results["cases"].items() if not case.get("skipped") and not case.get("ok")]
+    if failed:
+        print(f"\n{len(failed)} basarisiz is:")
+        for key in failed:
+            print(f"  {key}")
+    if not args.baseline:
+        return 1 if failed else 0
+
+    with open(args.baseline, "r", encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    regressions = compare(results, baseline, args.speed_tolerance, args.size_tolerance, args.rss_tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} gerileme:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    if failed:
+        return 1
+    print("\nTaban cizgisine gore gerileme yok")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
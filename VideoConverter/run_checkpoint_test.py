@@ -0,0 +1,122 @@
+"""
+Kontrol noktası testi
+
+FFmpeg gerekmez: kaldığı yerden devam ayarlarını (_resume_settings),
+ilerlemenin tüm işe göre kaydırılmasını (_shift_progress), hangi işlerin
+checkpoint'lenebildiğini, ffmpeg başlamadan gelen duraklatma isteklerini
+ve geçersiz kalan parçaların silinmesini doğrular.
+"""
+import os
+import sys
+import tempfile
+
+from core import priority
+from core.converter import BatchConverter, VideoConverter
+from test_support import Checks, finish
+
+X264 = {"vcodec": "libx264", "acodec": "aac", "smart_copy": False}
+SOURCE = {"video_codec": "h264", "audio_codec": "aac", "duration": 600,
+          "width": 1920, "height": 1080, "pix_fmt": "yuv420p"}
+
+
+def write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def run_tests():
+    check = Checks()
+
+    settings = dict(X264, trim_start=10, trim_duration=100)
+    check("resume_noop", VideoConverter._resume_settings(settings, 0) is settings, "done=0 ayni ayarlar")
+    resumed = VideoConverter._resume_settings(settings, 40)
+    check("resume_shifts_trim", resumed["trim_start"] == 50 and resumed["trim_duration"] == 60
+          and settings["trim_start"] == 10, resumed)
+    resumed = VideoConverter._resume_settings(dict(X264, speed=2.0), 30)
+    check("resume_speed_input_timeline", resumed["trim_start"] == 60 and "trim_duration" not in resumed, resumed)
+    resumed = VideoConverter._resume_settings(dict(X264, trim_duration=10), 10)
+    check("resume_min_duration", resumed["trim_duration"] == 0.001, resumed)
+
+    progress = VideoConverter._shift_progress({"current_time": 30.0, "percent": 50}, 60, 120)
+    check("shift_progress", progress["current_time"] == 90 and progress["percent"] == 75, progress)
+    progress = VideoConverter._shift_progress({"current_time": 30.0, "percent": 100, "ffmpeg_progress": "end"},
+                                              60, 120)
+    check("shift_keeps_end", progress["percent"] == 100, progress)
+    progress = VideoConverter._shift_progress({"current_time": 90.0}, 60, 120)
+    check("shift_caps_percent", progress["percent"] == 100, progress)
+    check("shift_without_time", VideoConverter._shift_progress({"fps": 30}, 60, 120) == {"fps": 30}, "zaman yok")
+
+    converter = VideoConverter()
+    long_job = VideoConverter.CHECKPOINT_MIN_DURATION
+    allowed = [
+        converter.can_checkpoint(X264, long_job),
+        converter.can_checkpoint(X264, long_job - 1),
+        converter.can_checkpoint(dict(X264, vcodec="copy"), long_job),
+        converter.can_checkpoint({"vcodec": None, "acodec": "aac"}, long_job),
+        converter.can_checkpoint(dict(X264, stream_format="hls"), long_job),
+    ]
+    check("can_checkpoint", allowed == [sys.platform != "win32", False, False, False, False], allowed)
+    check("part_path", VideoConverter._part_path("/a/out.mp4", 2) == "/a/out.part2.mp4", "parca adi")
+
+    # ffmpeg başlamadan (planlama sürerken) gelen istekler
+    if priority.can_suspend():
+        converter = VideoConverter()
+        converter.is_running = True
+        check("pending_pause", converter.pause() and converter.is_paused and converter._pause_pending,
+              "surec yokken duraklatma kaydedilmeli")
+        check("pending_resume", converter.resume() and not converter.is_paused and not converter._pause_pending,
+              "bekleyen duraklatma kaldirilmali")
+    converter = VideoConverter()
+    converter.is_running = True
+    converter.checkpoint = {"parts": ["a.part0.mp4"], "done": 30.0}
+    check("pending_stop", converter.stop_at_checkpoint() and converter.is_stopping, "checkpoint'li is")
+    try:
+        converter._start_process(["true"], X264)
+        started = True
+    except RuntimeError:
+        started = False
+    check("stop_before_start", not started and converter.process is None, "ffmpeg baslatilmamali")
+    check("idle_pause_rejected", not VideoConverter().pause() and not VideoConverter().stop_at_checkpoint(),
+          "calismayan is")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def parts(*names):
+            paths = [os.path.join(tmp, name) for name in names]
+            for path in paths:
+                write(path, b"p")
+            return {"parts": paths, "done": 10.0}
+
+        checkpoint = parts("a.part0.mp4", "a.part1.mp4")
+        VideoConverter.discard_checkpoint(checkpoint)
+        check("discard_checkpoint", not any(os.path.exists(path) for path in checkpoint["parts"]), checkpoint)
+        VideoConverter.discard_checkpoint(None)
+
+        # Plan ayarları değiştirirse eski parçalar birleştirilemez
+        batch = BatchConverter()
+        checkpoint = parts("b.part0.mp4")
+        item = {"input": "in.mkv", "output": os.path.join(tmp, "b.mp4"), "settings": {"vcodec": "libx264",
+                "acodec": "aac"}, "info": SOURCE, "checkpoint": checkpoint, "interrupted": True}
+        batch._plan_item(item)
+        check("replan_discards_parts", item["settings"].get("vcodec") == "copy" and "checkpoint" not in item
+              and "interrupted" not in item and not os.path.exists(checkpoint["parts"][0]), item)
+
+        checkpoint = parts("c.part0.mp4")
+        item = {"input": "in.mkv", "output": os.path.join(tmp, "c.mp4"), "settings": dict(X264),
+                "info": SOURCE, "checkpoint": checkpoint}
+        batch._plan_item(item)
+        check("unchanged_plan_keeps_parts", item.get("checkpoint") == checkpoint
+              and os.path.exists(checkpoint["parts"][0]), item)
+
+        converter = VideoConverter()
+        checkpoint = parts("d.part0.mp4")
+        converter.checkpoint = checkpoint
+        converter.plan_settings("in.mkv", os.path.join(tmp, "d.mp4"), {"vcodec": "libx264", "acodec": "aac"},
+                                SOURCE)
+        check("plan_settings_discards_parts", converter.checkpoint is None
+              and not os.path.exists(checkpoint["parts"][0]), converter.checkpoint)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "kontrol noktasi")
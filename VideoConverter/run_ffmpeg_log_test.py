@@ -0,0 +1,107 @@
+"""
+ffmpeg stderr yakalama testi
+
+FFmpeg gerekmez: elle yazılmış stderr akışlarıyla halka tamponun
+sınırını, uyarı/hata dizinini (tekrar sayımı, taşmada önce uyarıların
+düşmesi), kullanıcı mesajını, iş özetini, stderr'deki -progress
+satırlarını alan on_line kancasını ve gzip'li günlük dosyasını doğrular.
+"""
+import gzip
+import io
+import os
+import tempfile
+import time
+
+from core import ffmpeg_log
+from core.ffmpeg_log import StderrCapture
+from test_support import Checks, finish
+
+
+def capture(data, **options):
+    result = StderrCapture(io.BytesIO(data), job=options.pop("job", "test"), **options)
+    result.close()
+    return result
+
+
+def run_tests():
+    check = Checks()
+
+    levels = [ffmpeg_log.line_level(line) for line in (
+        "Error while decoding stream #0:0", "Past duration 0.999 too large", "Stream #0:0: Video: h264")]
+    check("line_level", levels == ["error", "warning", None], levels)
+
+    data = b"Input #0, mpegts\nframe=  100 fps= 25 q=28.0 size=  512kB\rframe=  200 fps= 25\r\n\nOutput #0\n"
+    result = capture(data)
+    check("skips_stats_and_blank", result.tail() == ["Input #0, mpegts", "Output #0"] and result.lines == 2,
+          result.tail())
+    check("counts_bytes", result.bytes == len(data), result.bytes)
+
+    data = b"".join(b"line %d\n" % number for number in range(StderrCapture.RING_LINES + 50))
+    result = capture(data)
+    tail = result.tail(StderrCapture.RING_LINES + 10)
+    check("ring_bounded", len(tail) == StderrCapture.RING_LINES and tail[-1] == f"line {StderrCapture.RING_LINES + 49}"
+          and result.lines == StderrCapture.RING_LINES + 50, (len(tail), tail[-1:]))
+
+    data = (b"[h264 @ 0x55d1] error while decoding MB 12 34\n" * 3
+            + b"[mp4 @ 0x55d2] Non-monotonous DTS in output stream 0:1\n"
+            + b"[h264 @ 0x77aa] error while decoding MB 56 78\n")
+    result = capture(data)
+    issues = result.issues()
+    check("dedupe_normalized", len(issues) == 2 and issues[-1]["count"] == 4 and issues[-1]["level"] == "error"
+          and issues[-1]["first_line"] == 1 and issues[-1]["last_line"] == 5, issues)
+    check("counts_levels", result.counts == {"error": 4, "warning": 1}, result.counts)
+
+    data = b"Error opening output file out.mp4\nInvalid argument\nConversion failed!\nexiting\n"
+    message = capture(data).message()
+    check("message_errors_then_context", message.splitlines() == [
+        "Error opening output file out.mp4", "Invalid argument", "Conversion failed!", "exiting"], message)
+    message = capture(b"Stream mapping:\n  Stream #0:0 -> #0:0\nPress [q] to stop\n").message(2)
+    check("message_tail_fallback", message.splitlines() == ["Stream #0:0 -> #0:0", "Press [q] to stop"], message)
+
+    # Dizin taşınca önce en eski uyarı düşer, hatalar korunur
+    lines = [b"fatal error A\n", b"warning: first\n"]
+    # Sayılar normalize edildiğinden anahtarlar harflerden üretilir
+    lines += [b"deprecated option %c%c\n" % (97 + number // 26, 97 + number % 26)
+              for number in range(StderrCapture.MAX_ISSUES)]
+    result = capture(b"".join(lines))
+    texts = [item["text"] for item in result.issues()]
+    check("issues_bounded", len(texts) == StderrCapture.MAX_ISSUES and "fatal error A" in texts
+          and "warning: first" not in texts, texts[:3])
+
+    summary = capture(b"warning: a\nerror: b\nwarning: c\nerror: d\n", job="iş/1").summary(3)
+    check("summary_errors_first", [item["text"] for item in summary["issues"]] == ["error: d", "error: b", "warning: c"]
+          and summary["errors"] == 2 and summary["warnings"] == 2 and summary["log"] is None, summary)
+
+    long_line = b"x" * (StderrCapture.MAX_LINE * 10)
+    result = capture(long_line + b"\nend\n")
+    check("long_line_truncated", all(len(line) <= StderrCapture.MAX_LINE for line in result.tail()), result.tail())
+
+    seen = []
+    result = capture(b"out_time_us=100\nprogress=end\nerror: x=1 failed\n",
+                     on_line=lambda line: seen.append(line) or line.startswith((b"out_time", b"progress")))
+    check("on_line_consumes", seen == [b"out_time_us=100", b"progress=end", b"error: x=1 failed"]
+          and result.tail() == ["error: x=1 failed"] and result.counts["error"] == 1, (seen, result.tail()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = b"Input #0\nerror: broken\n"
+        result = capture(data, job="kayit/1.mp4", log_dir=tmp, pid=42)
+        name = os.path.basename(result.log_path or "")
+        check("log_written", name.startswith("kayit_1.mp4-") and name.endswith("-42.log.gz")
+              and gzip.open(result.log_path).read() == data, name)
+        check("summary_log_path", result.summary()["log"] == result.log_path, result.summary())
+
+        for number in range(5):
+            path = os.path.join(tmp, f"old{number}.log.gz")
+            with open(path, "wb") as handle:
+                handle.write(b"x")
+            os.utime(path, (time.time() - 100 + number, time.time() - 100 + number))
+        ffmpeg_log.prune_logs(tmp, 3)
+        remaining = sorted(name for name in os.listdir(tmp) if name.endswith(".log.gz"))
+        check("prune_keeps_newest", len(remaining) == 3 and "old0.log.gz" not in remaining
+              and name in remaining, remaining)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "ffmpeg gunlugu")
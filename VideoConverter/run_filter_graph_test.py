@@ -0,0 +1,99 @@
+"""
+Filtre grafiği testi
+
+FFmpeg gerekmez: build_command ve çoklu çıktı komutunun filtre sırasını,
+tekrar ayıklamayı ve atempo zincirini doğrular.
+"""
+from core import filter_graph
+from core.converter import VideoConverter
+from core.renditions import MultiRenditionConverter
+from test_support import Checks, finish
+
+SOURCE = {"video_codec": "mpeg2video", "audio_codec": "ac3", "duration": 60,
+          "width": 1920, "height": 1080, "pix_fmt": "yuv420p"}
+X264 = {"vcodec": "libx264", "acodec": "aac", "smart_copy": False}
+
+
+def arg(cmd, flag):
+    return cmd[cmd.index(flag) + 1] if flag in cmd else None
+
+
+def run_tests():
+    check = Checks()
+
+    converter = VideoConverter()
+    converter.ffmpeg_path = "ffmpeg"
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, resolution="1280:720", brightness=0.1, speed=2.0))
+    check("default_order", arg(cmd, "-vf") == "scale=1280:720,setpts=0.5*PTS,eq=brightness=0.1", cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, speed=8.0))
+    check("atempo_once", cmd.count("-af") == 1 and arg(cmd, "-af") == "atempo=2.0,atempo=2.0,atempo=2", cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, speed=0.2))
+    check("atempo_slow", arg(cmd, "-af") == "atempo=0.5,atempo=0.5,atempo=0.8", cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, brightness=0, contrast=1, saturation=1))
+    check("neutral_eq_dropped", "-vf" not in cmd, cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, resolution="3840:2160", contrast=1.2), SOURCE)
+    check("upscale_last", arg(cmd, "-vf") == "eq=contrast=1.2,scale=3840:2160", cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, resolution="854:480", contrast=1.2), SOURCE)
+    check("downscale_first", arg(cmd, "-vf") == "scale=854:480,eq=contrast=1.2", cmd)
+
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, resolution="1920:1080"), SOURCE)
+    check("same_size_scale_dropped", "-vf" not in cmd, cmd)
+
+    # Önceki işin kaynak bilgisi, bilgisi verilmeyen bir komuta taşınmaz
+    converter.video_info = SOURCE
+    cmd = converter.build_command("in.ts", "out.mp4", dict(X264, resolution="1920:1080"))
+    check("stale_info_ignored", arg(cmd, "-vf") == "scale=1920:1080", cmd)
+
+    chain = filter_graph.FilterChain()
+    chain.add(filter_graph.scale("1280:720")).add(filter_graph.scale("854:480")).add(filter_graph.setpts(2.0))
+    chain.add(filter_graph.setpts(2.0))
+    check("dedupe", chain.filters() == ["scale=854:480", "setpts=0.5*PTS"], chain.nodes)
+
+    # Çoklu çıktı: ortak renk ayarı, daha ucuzsa split'ten önce bir kez
+    multi = MultiRenditionConverter()
+    multi.ffmpeg_path = "ffmpeg"
+    ladder = [
+        {"output": "a.mp4", "settings": dict(X264, brightness=0.1)},
+        {"output": "b.mp4", "settings": dict(X264, resolution="1280:720", brightness=0.1)},
+        {"output": "c.mp4", "settings": dict(X264, resolution="854:480", brightness=0.1)},
+    ]
+    cmd = multi.build_multi_command("in.ts", multi.plan_renditions("in.ts", ladder, SOURCE), SOURCE)
+    check("shared_prefix",
+          arg(cmd, "-filter_complex") == "[0:v:0]eq=brightness=0.1,split=3[vs0][vs1][vs2];"
+                                         "[vs1]scale=1280:720[v1];[vs2]scale=854:480[v2]"
+          and cmd[cmd.index("[vs0]") - 1] == "-map", cmd)
+
+    cmd = multi.build_multi_command("in.ts", multi.plan_renditions("in.ts", ladder[1:], SOURCE), SOURCE)
+    check("branch_local_when_cheaper",
+          arg(cmd, "-filter_complex") == "[0:v:0]scale=1280:720,eq=brightness=0.1[v0];"
+                                         "[0:v:0]scale=854:480,eq=brightness=0.1[v1]", cmd)
+
+    # Kaynak boyutundaki çıktı ölçeklenmez, doğrudan girdiden beslenir
+    renditions = [
+        {"output": "a.mp4", "settings": dict(X264, resolution="1920:1080")},
+        {"output": "b.mp4", "settings": dict(X264, resolution="1280:720")},
+    ]
+    cmd = multi.build_multi_command("in.ts", multi.plan_renditions("in.ts", renditions, SOURCE), SOURCE)
+    check("same_size_rendition_unscaled", arg(cmd, "-filter_complex") == "[0:v:0]scale=1280:720[v1]"
+          and arg(cmd, "-map") == "0:v:0", cmd)
+
+    renditions = [
+        {"output": "a.mp4", "settings": dict(X264, resolution="1280:720")},
+        {"output": "b.mp3", "settings": {"vcodec": None, "acodec": "libmp3lame", "smart_copy": False}},
+    ]
+    cmd = multi.build_multi_command("in.ts", multi.plan_renditions("in.ts", renditions, SOURCE), SOURCE)
+    check("single_decode_maps",
+          arg(cmd, "-filter_complex") == "[0:v:0]scale=1280:720[v0]"
+          and cmd.count("-i") == 1 and cmd.count("-map") == 3 and cmd[-1] == "b.mp3", cmd)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "filtre grafigi")
@@ -0,0 +1,170 @@
+"""
+GPU hattı ve donanım encoder arka uçları testi
+
+Gerçek GPU/FFmpeg gerekmez: argümanlarını kaydeden, -filters/-encoders
+çıktısını ve deneme encode'larının sonucunu ortam değişkenlerinden üreten
+sahte bir ffmpeg ile build_command, convert_sync ve arka uç tespitini
+doğrular.
+"""
+import json
+import os
+import stat
+import sys
+import tempfile
+
+from core import gpu_pipeline, hw_backends
+from core.converter import VideoConverter
+from core.presets import adapt_to_host
+from test_support import Checks, finish
+
+
+STANDIN_SOURCE = r'''
+import json, os, sys
+args = sys.argv[1:]
+with open(os.environ["STANDIN_LOG"], "a") as handle:
+    handle.write(json.dumps(args) + "\n")
+if "-filters" in args:
+    for name in os.environ.get("STANDIN_FILTERS", "").split(","):
+        if name:
+            print(f" ... {name}  V->V  stand-in")
+    sys.exit(0)
+if "-encoders" in args:
+    for name in os.environ.get("STANDIN_ENCODERS", "").split(","):
+        if name:
+            print(f" V....D {name}  stand-in")
+    sys.exit(0)
+if "null" in args:
+    codec = args[args.index("-c:v") + 1]
+    sys.exit(0 if codec in os.environ.get("STANDIN_WORKING", "").split(",") else 1)
+sys.stdout.write("frame=1\nout_time_us=1000000\nprogress=end\n")
+with open(args[-1], "wb") as handle:
+    handle.write(b"x" * 100)
+'''
+
+NVENC = {"vcodec": "h264_nvenc", "acodec": "aac", "bitrate": "5000k", "preset": "fast", "gpu": True,
+         "smart_copy": False}
+
+
+def make_standin(work_dir):
+    script = os.path.join(work_dir, "ffmpeg_standin.py")
+    with open(script, "w") as handle:
+        handle.write(STANDIN_SOURCE)
+
+    if os.name == "nt":
+        launcher = os.path.join(work_dir, "ffmpeg.bat")
+        with open(launcher, "w") as handle:
+            handle.write(f'@"{sys.executable}" "{script}" %*\n')
+    else:
+        launcher = os.path.join(work_dir, "ffmpeg")
+        with open(launcher, "w") as handle:
+            handle.write(f"#!{sys.executable}\n" + STANDIN_SOURCE)
+        os.chmod(launcher, os.stat(launcher).st_mode | stat.S_IEXEC)
+    return launcher
+
+
+def build(converter, filters, **overrides):
+    os.environ["STANDIN_FILTERS"] = ",".join(filters)
+    gpu_pipeline._list_filters.cache_clear()
+    settings = dict(NVENC)
+    settings.update(overrides)
+    return converter.build_command("in.mp4", "out.mp4", settings)
+
+
+def vf(cmd):
+    return cmd[cmd.index("-vf") + 1] if "-vf" in cmd else None
+
+
+def run_tests(converter):
+    check = Checks()
+
+    cmd = build(converter, ["scale_cuda"])
+    hw = cmd.index("-hwaccel")
+    check("decode_on_gpu",
+          cmd[hw:hw + 4] == ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"] and hw < cmd.index("-i")
+          and vf(cmd) is None, cmd)
+
+    cmd = build(converter, ["scale_cuda", "scale_npp"], resolution="1280:720")
+    check("scale_cuda", vf(cmd) == "scale_cuda=1280:720", cmd)
+
+    cmd = build(converter, ["scale_npp"], resolution="1280:720")
+    check("scale_npp_fallback", vf(cmd) == "scale_npp=1280:720", cmd)
+
+    cmd = build(converter, [], resolution="1280:720")
+    check("scale_cpu_fallback",
+          vf(cmd) == "hwdownload,format=nv12|p010le,scale=1280:720,hwupload_cuda", cmd)
+
+    cmd = build(converter, ["scale_cuda"], resolution="1280:720", speed=2.0,
+                brightness=0.1, contrast=1.2, saturation=1.0)
+    check("eq_download_block",
+          vf(cmd) == "scale_cuda=1280:720,setpts=0.5*PTS,hwdownload,format=nv12|p010le,"
+                     "eq=brightness=0.1:contrast=1.2:saturation=1.0,hwupload_cuda", cmd)
+
+    cmd = build(converter, ["scale_cuda"], resolution="1280:720", gpu_pipeline=False)
+    check("pipeline_disabled", "-hwaccel" not in cmd and vf(cmd) == "scale=1280:720", cmd)
+
+    cmd = build(converter, ["scale_cuda"], vcodec="libx264", gpu=False, resolution="1280:720")
+    check("cpu_encoder_untouched", "-hwaccel" not in cmd and vf(cmd) == "scale=1280:720", cmd)
+
+    ten_bit = {"video_codec": "h264", "pix_fmt": "yuv420p10le", "duration": 1}
+    check("nvdec_unsupported_source",
+          gpu_pipeline.adjust_for_source(dict(NVENC), ten_bit).get("gpu_pipeline") is False, ten_bit)
+
+    # Uçtan uca: convert_sync sahte ffmpeg'i gerçekten çalıştırır
+    log_path = os.environ["STANDIN_LOG"]
+    open(log_path, "w").close()
+    output = os.path.join(os.path.dirname(log_path), "out.mp4")
+    info = {"video_codec": "h264", "pix_fmt": "yuv420p", "duration": 1, "width": 1920, "height": 1080, "fps": 30}
+    settings = dict(NVENC, resolution="1280:720")
+    os.environ["STANDIN_FILTERS"] = "scale_cuda"
+    gpu_pipeline._list_filters.cache_clear()
+    ok, message = converter.convert_sync("in.mp4", output, settings, video_info=info)
+    with open(log_path) as handle:
+        calls = [json.loads(line) for line in handle if line.strip()]
+    encode = [call for call in calls if "-filters" not in call]
+    check("convert_sync_graph",
+          ok and encode and encode[-1][:6] == ["-y", "-hide_banner", "-hwaccel", "cuda",
+                                              "-hwaccel_output_format", "cuda"]
+          and "scale_cuda=1280:720" in encode[-1], encode or message)
+
+    # Donanım arka uçları: derlemede olan ama deneme encode'u başarısız olan elenir
+    os.environ["STANDIN_ENCODERS"] = "h264_nvenc,hevc_nvenc,h264_qsv,hevc_qsv,h264_vaapi"
+    os.environ["STANDIN_WORKING"] = "h264_qsv,h264_vaapi"
+    detected = hw_backends.detect(converter.ffmpeg_path, refresh=True)
+    expected = {"qsv": ["h264_qsv", "hevc_qsv"]}
+    if sys.platform.startswith("linux"):
+        expected["vaapi"] = ["h264_vaapi"]
+    check("detect_backends", detected == expected, detected)
+
+    with open(log_path) as handle:
+        trials = [json.loads(line) for line in handle if "null" in line]
+    check("one_trial_per_backend",
+          sorted(call[call.index("-c:v") + 1] for call in trials)
+          == sorted(["h264_nvenc", "h264_qsv"] + (["h264_vaapi"] if "vaapi" in expected else [])), trials)
+
+    nvenc_preset = {"vcodec": "h264_nvenc", "gpu": True}
+    adapted = adapt_to_host(nvenc_preset, hw_backends.available_encoders(converter.ffmpeg_path))
+    check("preset_falls_back_to_qsv", adapted["vcodec"] == "h264_qsv" and adapted["gpu"], adapted)
+    check("preset_falls_back_to_cpu",
+          adapt_to_host({"vcodec": "hevc_amf", "gpu": True}, [])["vcodec"] == "libx265", None)
+
+    cmd = converter.build_command("in.mp4", "out.mp4", {"vcodec": "h264_qsv", "acodec": "aac", "preset": "ultrafast"})
+    check("qsv_preset", cmd[cmd.index("-preset") + 1] == "veryfast", cmd)
+
+    cmd = converter.build_command("in.mp4", "out.mp4", {"vcodec": "h264_vaapi", "acodec": "aac", "preset": "slow",
+                                                        "resolution": "1280:720"})
+    check("vaapi_upload",
+          "-vaapi_device" in cmd and cmd.index("-vaapi_device") < cmd.index("-i")
+          and vf(cmd) == "scale=1280:720,format=nv12,hwupload"
+          and cmd[cmd.index("-compression_level") + 1] == "3", cmd)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["STANDIN_LOG"] = os.path.join(work_dir, "calls.log")
+        converter = VideoConverter()
+        converter.ffmpeg_path = make_standin(work_dir)
+        failures = run_tests(converter)
+
+    finish(failures, "GPU hatti ve arka uc")
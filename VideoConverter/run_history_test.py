@@ -0,0 +1,58 @@
+"""
+Encode geçmişi testi
+
+FFmpeg gerekmez: geçici SQLite deposuyla çıktı süresinin (speed,
+trim_start, trim_duration) hesabını ve size_ratio'nun hızlandırılmış ya
+da kırpılmış işlerde de çıktı süresine göre ölçülmesini doğrular.
+"""
+import os
+import tempfile
+
+from core.estimator import Estimator
+from core.history import EncodeHistory
+from test_support import Checks, finish
+
+INFO = {"duration": 100.0, "width": 1280, "height": 720, "fps": 30.0, "size": 10_000_000}
+X264 = {"vcodec": "libx264", "preset": "medium", "bitrate": "1000k", "audio_bitrate": "0"}
+
+
+def run_tests():
+    check = Checks()
+
+    output_duration = EncodeHistory.output_duration
+    check("output_duration_plain", output_duration(100, {}) == 100, output_duration(100, {}))
+    check("output_duration_speed", output_duration(100, {"speed": 2.0}) == 50,
+          output_duration(100, {"speed": 2.0}))
+    check("output_duration_trim", output_duration(100, {"trim_start": 30, "trim_duration": 20}) == 20
+          and output_duration(100, {"trim_start": 90, "trim_duration": 20}) == 10
+          and output_duration(100, {"trim_start": 40, "speed": 2.0, "trim_duration": 60}) == 30,
+          "trim_start girdi, trim_duration cikti zaman cizgisinde")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        history = EncodeHistory(os.path.join(tmp, "history.sqlite3"), host="test")
+        output = os.path.join(tmp, "out.mp4")
+
+        # 1000 kbps ile 25 saniyelik çıktı: beklenen boyutun tam 1.2 katı
+        with open(output, "wb") as handle:
+            handle.write(b"x" * int(1000 * 1000 * 25 / 8 * 1.2))
+        jobs = [dict(X264, speed=4.0), dict(X264, trim_start=10, trim_duration=25),
+                dict(X264, speed=2.0, trim_duration=25)]
+        for settings in jobs:
+            history.record(INFO, settings, wall_time=10, output_path=output)
+
+        ratio = history.size_ratio(X264)
+        check("size_ratio_uses_output_duration", ratio is not None and abs(ratio - 1.2) < 1e-6, ratio)
+
+        history.record(INFO, X264, wall_time=10, output_path=output)
+        speeds = [row[0] for row in history._conn.execute("SELECT speed FROM encodes ORDER BY id")]
+        check("speed_uses_output_duration", speeds == [2.5, 2.5, 2.5, 10.0], speeds)
+
+        # Tahmin de aynı çıktı süresiyle çarpar
+        estimate = Estimator.estimate_file_size(25, 1000, 0, size_ratio=ratio)
+        check("estimate_matches_output", estimate == os.path.getsize(output), estimate)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "encode gecmisi")
@@ -0,0 +1,152 @@
+"""
+İş deposu testi
+
+FFmpeg gerekmez: geçici SQLite deposuyla yarım kalan işlerin yüklenmesini,
+checkpoint parçalarının korunmasını, doğrulanmış çıktı eşleşmesini (ayar
+özeti, girdi boyutu/mtime'ı), açılışta eski bitmiş kayıtların silinmesini
+ve BatchConverter.resume_from_store'un doğrulanmış işleri atlamasını
+doğrular.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+
+from core.converter import BatchConverter
+from core.job_store import PRUNE_AFTER_DAYS, JobStore, settings_hash
+from test_support import Checks, finish
+
+X264 = {"vcodec": "libx264", "acodec": "aac", "crf": 23}
+
+
+def write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def run_tests():
+    check = Checks()
+
+    check("hash_ignores_process_settings",
+          settings_hash(X264) == settings_hash(dict(X264, priority="idle", nice=19, crf=23.0)),
+          "surec ayarlari ve sayi bicimi ozeti degistirmemeli")
+    check("hash_tracks_output_settings", settings_hash(X264) != settings_hash(dict(X264, crf=28)),
+          "crf ozeti degistirmeli")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "jobs.sqlite3")
+        source = os.path.join(tmp, "in.mkv")
+        output = os.path.join(tmp, "out.mp4")
+        part = os.path.join(tmp, "out.part0.mp4")
+        write(source, b"s" * 100)
+
+        store = JobStore(db)
+        running = store.add(source, output, X264)
+        paused = store.add(source, os.path.join(tmp, "p.mp4"), X264)
+        stale = store.add(source, os.path.join(tmp, "q.mp4"), X264)
+        done = store.add(source, os.path.join(tmp, "d.mp4"), X264)
+        write(part, b"p")
+        store.update(running, status="processing", attempts=2)
+        store.update(paused, status="paused", checkpoint={"parts": [part], "done": 30.0})
+        store.update(stale, status="paused", checkpoint={"parts": [os.path.join(tmp, "yok.mp4")], "done": 5.0})
+        store.update(done, status="completed")
+
+        jobs = {job["job_id"]: job for job in JobStore(db).load_unfinished()}
+        check("load_unfinished", sorted(jobs) == [running, paused, stale], sorted(jobs))
+        check("processing_restarts_pending", jobs[running]["status"] == "pending"
+              and jobs[running]["attempts"] == 2 and jobs[running]["settings"] == X264, jobs[running])
+        check("checkpoint_kept", jobs[paused].get("checkpoint") == {"parts": [part], "done": 30.0}
+              and jobs[paused].get("interrupted"), jobs[paused])
+        check("missing_parts_dropped", "checkpoint" not in jobs[stale] and "interrupted" not in jobs[stale],
+              jobs[stale])
+
+        store.discard([paused, stale])
+        check("discard", sorted(job["job_id"] for job in store.load_unfinished()) == [running],
+              store.load_unfinished())
+
+        check("unverified_before_output", not store.find_verified_output(source, output, X264),
+              "cikti yokken dogrulanmamali")
+        write(output, b"o" * 50)
+        store.mark_completed(running, output)
+        check("verified_complete", store.is_verified_complete(running)
+              and store.find_verified_output(source, output, X264), "ayni is dogrulanmali")
+        check("verified_ignores_process_settings",
+              store.find_verified_output(source, output, dict(X264, priority="idle")), "oncelik ciktiyi etkilemez")
+        check("settings_change_unverified", not store.find_verified_output(source, output, dict(X264, crf=28)),
+              "farkli ayar eslesmemeli")
+
+        write(output, b"o" * 60)
+        check("output_size_change_unverified", not store.is_verified_complete(running)
+              and not store.find_verified_output(source, output, X264), "cikti degisti")
+        write(output, b"o" * 50)
+
+        write(source, b"t" * 120)
+        check("input_change_unverified", not store.find_verified_output(source, output, X264), "girdi degisti")
+        write(source, b"s" * 100)
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        check("input_mtime_change_unverified", not store.find_verified_output(source, output, X264),
+              "girdi mtime'i degisti")
+
+        # Eski şemalı depo: eksik sütunlar eklenir, özeti olmayan kayıt eşleşmez
+        legacy_db = os.path.join(tmp, "legacy.sqlite3")
+        conn = sqlite3.connect(legacy_db)
+        conn.execute(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, input TEXT NOT NULL, "
+            "output TEXT NOT NULL, settings TEXT, status TEXT NOT NULL, attempts INTEGER DEFAULT 0, "
+            "error TEXT, output_size INTEGER DEFAULT 0, created REAL, updated REAL)"
+        )
+        conn.execute("INSERT INTO jobs (input, output, settings, status, output_size) VALUES (?, ?, ?, ?, ?)",
+                     (source, output, json.dumps(X264), "completed", 50))
+        conn.commit()
+        conn.close()
+        legacy = JobStore(legacy_db)
+        columns = {row[1] for row in legacy._conn.execute("PRAGMA table_info(jobs)")}
+        check("legacy_columns_added", {"checkpoint", "settings_hash", "input_size", "input_mtime_ns"} <= columns,
+              columns)
+        check("legacy_row_unverified", not legacy.find_verified_output(source, output, X264),
+              "ozeti olmayan eski kayit eslesmemeli")
+
+        # Devam: doğrulanmış aynı iş atlanır (checkpoint'i silinir), diğeri sıraya girer
+        resume_db = os.path.join(tmp, "resume.sqlite3")
+        store = JobStore(resume_db)
+        finished = store.add(source, output, X264)
+        store.mark_completed(finished, output)
+        again = store.add(source, output, X264)
+        write(part, b"p")
+        store.update(again, status="paused", checkpoint={"parts": [part], "done": 10.0})
+        other = store.add(source, os.path.join(tmp, "other.mp4"), X264)
+        gone = store.add(os.path.join(tmp, "silindi.mkv"), os.path.join(tmp, "g.mp4"), X264)
+
+        batch = BatchConverter(job_store=JobStore(resume_db))
+        loaded = batch.resume_from_store()
+        statuses = {item["job_id"]: item["status"] for item in batch.queue}
+        check("resume_loads_existing_inputs", loaded == 2 and sorted(statuses) == [again, other], statuses)
+        skipped = next(item for item in batch.queue if item["job_id"] == again)
+        check("resume_skips_verified", skipped["status"] == "completed" and skipped.get("skipped")
+              and "checkpoint" not in skipped and not os.path.exists(part), skipped)
+        check("resume_keeps_other_pending", statuses[other] == "pending", statuses)
+        check("resume_marks_missing_failed", gone not in [job["job_id"] for job in store.load_unfinished()],
+              "girdisi olmayan is basarisiz sayilmali")
+
+        # Açılışta eski bitmiş kayıtlar silinir, yarım kalanlar kalır
+        prune_db = os.path.join(tmp, "prune.sqlite3")
+        store = JobStore(prune_db)
+        old_done = store.add(source, os.path.join(tmp, "eski.mp4"), X264)
+        old_pending = store.add(source, os.path.join(tmp, "bekleyen.mp4"), X264)
+        new_done = store.add(source, os.path.join(tmp, "yeni.mp4"), X264)
+        store.update(old_done, status="completed")
+        store.update(new_done, status="completed")
+        with sqlite3.connect(prune_db) as conn:
+            conn.execute("UPDATE jobs SET updated = updated - ? WHERE id IN (?, ?)",
+                         ((PRUNE_AFTER_DAYS + 1) * 86400, old_done, old_pending))
+        JobStore(prune_db)
+        with sqlite3.connect(prune_db) as conn:
+            kept = sorted(row[0] for row in conn.execute("SELECT id FROM jobs"))
+        check("prune_on_open", kept == [old_pending, new_done], kept)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "is deposu")
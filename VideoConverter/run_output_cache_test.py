@@ -0,0 +1,145 @@
+"""
+Çıktı önbelleği testi
+
+FFmpeg gerekmez: geçici depo ile parmak izinin neye bağlı olduğunu,
+saklama/geri yükleme yöntemlerini, yerinde değiştirilmiş kayıtların
+atılmasını, bellekteki içerik hash'lerinin sınırını, LRU silmeyi ve
+BatchConverter'ın önbellekten tamamlamasını doğrular.
+"""
+import os
+import tempfile
+import time
+
+from core.converter import BatchConverter
+from core.output_cache import OutputCache, detach, materialize, normalize_settings
+from test_support import Checks, finish
+
+X264 = {"vcodec": "libx264", "acodec": "aac", "crf": 23}
+
+
+def write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def read(path):
+    with open(path, "rb") as handle:
+        return handle.read()
+
+
+def open_cache(root, **options):
+    cache = OutputCache(root, **options)
+    # ffmpeg sürümü sabit: test makinedeki ffmpeg'e bağlı olmasın
+    cache._ffmpeg_key = lambda: "ffmpeg-test"
+    return cache
+
+
+def run_tests():
+    check = Checks()
+
+    normalized = normalize_settings(dict(X264, name="Preset", threads=4, priority="idle", resolution="", fps=None))
+    check("normalize_settings", normalized == {"vcodec": "libx264", "acodec": "aac", "crf": 23.0}, normalized)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = open_cache(os.path.join(tmp, "cache"))
+        source = os.path.join(tmp, "in.mkv")
+        write(source, b"s" * 100)
+        output = os.path.join(tmp, "out.mp4")
+
+        key = cache.fingerprint(source, output, X264)
+        check("fingerprint_stable", key == cache.fingerprint(source, os.path.join(tmp, "other.mp4"),
+                                                             dict(X264, crf=23.0, threads=8)), key)
+        check("fingerprint_settings", key != cache.fingerprint(source, output, dict(X264, crf=28)),
+              "crf parmak izini degistirmeli")
+        check("fingerprint_format", key != cache.fingerprint(source, os.path.join(tmp, "out.mkv"), X264),
+              "cikti uzantisi parmak izini degistirmeli")
+        other = open_cache(os.path.join(tmp, "cache"))
+        other._ffmpeg_key = lambda: "ffmpeg-other"
+        check("fingerprint_ffmpeg", key != other.fingerprint(source, output, X264), "ffmpeg surumu")
+        check("fingerprint_missing_input", cache.fingerprint(os.path.join(tmp, "yok.mkv"), output, X264) is None,
+              "okunamayan girdi")
+
+        write(source, b"t" * 120)
+        check("fingerprint_input_change", key != cache.fingerprint(source, output, X264), "girdi degisti")
+
+        # İçerik hash'i: aynı içerik başka yolda da eşleşir
+        hashed = open_cache(os.path.join(tmp, "hashed"), use_content_hash=True)
+        copy = os.path.join(tmp, "copy.mkv")
+        write(copy, read(source))
+        check("content_hash_matches_copy",
+              hashed.fingerprint(source, output, X264) == hashed.fingerprint(copy, output, X264), "ayni icerik")
+
+        # Bellekteki hash'ler LRU ile sınırlı: son kullanılan kalır
+        hashed.MAX_HASHES = 2
+        third = os.path.join(tmp, "third.mkv")
+        write(third, b"u" * 10)
+        hashed.fingerprint(source, output, X264)
+        hashed.fingerprint(third, output, X264)
+        paths = [path for path, _, _ in hashed._hashes]
+        check("content_hashes_bounded", paths == [os.path.abspath(source), os.path.abspath(third)], paths)
+
+        key = cache.fingerprint(source, output, X264)
+        check("restore_miss", cache.restore(key, output) is None, "bos depo")
+        write(output, b"o" * 50)
+        check("store", cache.store(key, output) and cache.stats()["entries"] == 1, cache.stats())
+        restored = os.path.join(tmp, "restored", "out.mp4")
+        method = cache.restore(key, restored)
+        check("restore", method in ("hardlink", "reflink", "copy") and read(restored) == b"o" * 50, method)
+
+        # Hardlink'li çıktı üzerine yazılmadan önce ayrılır: depo bozulmaz
+        detach(restored)
+        write(restored, b"x" * 10)
+        check("detach_protects_cache", cache.restore(key, os.path.join(tmp, "again.mp4")) is not None,
+              "depodaki kopya degismemeli")
+
+        # Depodaki dosya yerinde değiştiyse kayıt atılır
+        stored = cache.lookup(key)
+        write(stored, b"z" * 70)
+        check("modified_entry_dropped", cache.lookup(key) is None and cache.stats()["entries"] == 0,
+              cache.stats())
+
+        check("empty_output_not_stored", not cache.store(key, os.path.join(tmp, "bos.mp4")), "olmayan cikti")
+
+        target = os.path.join(tmp, "materialized.bin")
+        write(target, b"eski")
+        method = materialize(source, target)
+        check("materialize_replaces", read(target) == read(source)
+              and not os.path.exists(f"{target}.tmvc-cache"), method)
+
+        # LRU: sınır aşılınca en uzun süredir kullanılmayan silinir
+        small = open_cache(os.path.join(tmp, "small"), max_bytes=100)
+        keys = []
+        for number in range(3):
+            path = os.path.join(tmp, f"lru{number}.mp4")
+            write(path, bytes([number]) * 40)
+            keys.append(f"{number:02d}" + "0" * 62)
+            small.store(keys[-1], path)
+            time.sleep(0.01)
+            if number == 1:
+                small.lookup(keys[0])
+                time.sleep(0.01)
+        check("evict_lru", small.lookup(keys[1]) is None and small.lookup(keys[0])
+              and small.lookup(keys[2]) and small.stats()["bytes"] == 80, small.stats())
+        small.clear()
+        check("clear", small.stats()["entries"] == 0, small.stats())
+        large = os.path.join(tmp, "large.mp4")
+        write(large, b"l" * 200)
+        check("too_large_not_stored", not small.store("ff" + "0" * 62, large) and small.stats()["entries"] == 0,
+              small.stats())
+
+        # Toplu kuyruk: önbellekteki iş encode edilmeden tamamlanır
+        detach(output)
+        write(output, b"o" * 50)
+        batch = BatchConverter(output_cache=cache)
+        item = batch.add_to_queue(source, os.path.join(tmp, "batch", "out.mp4"), dict(X264))
+        check("batch_miss_keeps_key", not batch._restore_cached(item) and item.get("cache_key"), item)
+        cache.store(item["cache_key"], output)
+        item = batch.add_to_queue(source, os.path.join(tmp, "batch", "out2.mp4"), dict(X264))
+        check("batch_restores", batch._restore_cached(item) and item["status"] == "completed"
+              and item.get("cached") and read(item["output"]) == b"o" * 50, item)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "cikti onbellegi")
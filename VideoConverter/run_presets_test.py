@@ -0,0 +1,53 @@
+"""
+Preset yükleme testi
+
+FFmpeg gerekmez: her kontrol yeni bir Python sürecinde çalışır ve
+config/presets.json'daki presetlerin içe aktarmada yüklenmediğini,
+sözlüğün her giriş noktasında (copy, setdefault, json.dumps, ...) ise
+eklendiğini doğrular.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from test_support import Checks, finish
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PREFIX = "import json\nfrom core.presets import PRESETS\n"
+
+
+def run(code):
+    result = subprocess.run([sys.executable, "-c", PREFIX + code], cwd=HERE,
+                            capture_output=True, text=True, timeout=60)
+    return result.stdout.strip() or result.stderr.strip()
+
+
+def run_tests():
+    check = Checks()
+
+    with open(os.path.join(HERE, "config", "presets.json"), encoding="utf-8") as handle:
+        name = next(iter(json.load(handle)["presets"]))
+
+    check("import_does_not_load", run("print(PRESETS._loaded)") == "False", run("print(PRESETS._loaded)"))
+
+    expressions = {
+        "getitem": "PRESETS[name] is not None",
+        "contains": "name in PRESETS",
+        "get": "PRESETS.get(name) is not None",
+        "copy": "name in PRESETS.copy()",
+        "setdefault": "PRESETS.setdefault(name, None) is not None",
+        "json_dumps": "name in json.loads(json.dumps(PRESETS))",
+        "dict_copy": "name in dict(PRESETS)",
+        "unpack": "name in {**PRESETS}",
+        "repr": "repr(name) in repr(PRESETS)",
+    }
+    for label, expression in expressions.items():
+        output = run(f"name = {name!r}\nprint({expression})")
+        check(f"loads_on_{label}", output == "True", output)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "preset")
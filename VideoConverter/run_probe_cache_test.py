@@ -0,0 +1,102 @@
+"""
+Probe önbelleği testi
+
+FFmpeg gerekmez: geçici klasördeki dosyalarla anahtar (yol/boyut/mtime,
+kısmi içerik hash'i), geçersizleştirme, LRU sınırı, kalıcılık ve şema
+sürümü değişiminde kayıtların atılmasını doğrular.
+"""
+import os
+import sqlite3
+import tempfile
+
+from core.probe_cache import ProbeCache
+from test_support import Checks, finish
+
+INFO = {"video_codec": "h264", "audio_codec": "aac", "duration": 12.5, "width": 1280, "height": 720}
+
+
+def write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def run_tests():
+    check = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "probe.sqlite3")
+        media = os.path.join(tmp, "a.mp4")
+        write(media, b"a" * 1000)
+
+        cache = ProbeCache(db)
+        check("miss_before_put", cache.get(media) is None, "bos onbellek")
+        cache.put(media, INFO)
+        info = cache.get(media)
+        check("hit_after_put", info == INFO, info)
+        info["duration"] = 0
+        check("returns_copy", cache.get(media)["duration"] == 12.5, "donen sozluk onbellegi degistirmemeli")
+
+        relative = os.path.relpath(media)
+        check("normalized_path", cache.get(relative) == INFO, relative)
+
+        check("persisted", ProbeCache(db).get(media) == INFO, "yeni ornek SQLite'tan okumali")
+
+        write(media, b"b" * 2000)
+        check("size_change_invalidates", cache.get(media) is None, "boyut degisti")
+        check("invalid_row_deleted", ProbeCache(db).get(media) is None, "gecersiz kayit silinmeli")
+
+        cache.put(media, INFO)
+        stat = os.stat(media)
+        os.utime(media, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        check("mtime_change_invalidates", cache.get(media) is None, "mtime degisti")
+
+        # Aynı boyut ve mtime, farklı içerik: sadece içerik hash'i yakalar
+        hashed = ProbeCache(os.path.join(tmp, "hashed.sqlite3"), use_content_hash=True)
+        write(media, b"c" * 2000)
+        hashed.put(media, INFO)
+        stat = os.stat(media)
+        write(media, b"d" * 2000)
+        os.utime(media, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        check("content_hash_invalidates", hashed.get(media) is None, "icerik degisti")
+
+        small = ProbeCache(os.path.join(tmp, "small.sqlite3"), memory_size=2)
+        paths = []
+        for name in ("x", "y", "z"):
+            path = os.path.join(tmp, f"{name}.mp4")
+            write(path, name.encode())
+            paths.append(path)
+        small.put(paths[0], INFO)
+        small.put(paths[1], INFO)
+        small.get(paths[0])
+        small.put(paths[2], INFO)
+        # En uzun süredir kullanılmayan (y) bellekten düşer, SQLite'ta kalır
+        check("lru_evicts_oldest", list(small._memory) == [ProbeCache._normalize(paths[0]),
+                                                           ProbeCache._normalize(paths[2])], list(small._memory))
+        check("lru_falls_back_to_db", small.get(paths[1]) == INFO and len(small._memory) == 2,
+              list(small._memory))
+
+        cache.put(media, INFO)
+        cache.invalidate(media)
+        check("invalidate", cache.get(media) is None and ProbeCache(db).get(media) is None, "kayit silinmeli")
+
+        cache.put(media, INFO)
+        cache.clear()
+        check("clear", cache.get(media) is None and ProbeCache(db).get(media) is None, "tum kayitlar silinmeli")
+
+        cache.put(media, INFO)
+        conn = sqlite3.connect(db)
+        conn.execute(f"PRAGMA user_version={ProbeCache.SCHEMA_VERSION - 1}")
+        conn.commit()
+        conn.close()
+        check("schema_change_drops", ProbeCache(db).get(media) is None, "eski surum kayitlari atilmali")
+
+        unopenable = ProbeCache(os.path.join(tmp, "yok", "probe.sqlite3"))
+        unopenable.put(media, INFO)
+        check("memory_only_fallback", unopenable._conn is None and unopenable.get(media) == INFO,
+              "veritabani acilamazsa bellek onbellegi calismali")
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "probe onbellegi")
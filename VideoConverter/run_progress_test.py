@@ -0,0 +1,120 @@
+"""
+İlerleme okuyucusu testi
+
+FFmpeg gerekmez: elle yazılmış -progress bloklarıyla alan dönüşümünü,
+N/A değerlerini, stderr istatistik satırlarının atlanmasını, parça
+sınırında bölünen satırları ve yayın hızı kısıtlamasını (sahte saatle)
+doğrular.
+"""
+import io
+
+from core.progress import ProgressReader
+from test_support import Checks, finish
+
+
+def block(out_time_us, status="continue", frame=None, fps="30.00", speed="1.5x", size=1024):
+    lines = []
+    if frame is not None:
+        lines.append(f"frame={frame}")
+    lines += [f"fps={fps}", f"total_size={size}", f"out_time_us={out_time_us}",
+              "out_time=00:00:00.000000", f"speed={speed}", f"progress={status}"]
+    return ("\n".join(lines) + "\n").encode()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Trickle(io.BytesIO):
+    """Her read1 çağrısında en fazla size bayt döndüren akış"""
+
+    def __init__(self, data, size):
+        super().__init__(data)
+        self.size = size
+
+    def read1(self, size=-1):
+        return super().read1(self.size)
+
+
+def run_tests():
+    check = Checks()
+
+    reader = ProgressReader(duration=20, rate=None)
+    results = list(reader.read(io.BytesIO(block(5_000_000, frame=150))))
+    progress = results[0] if results else {}
+    check("fields", progress.get("frame") == 150 and progress.get("fps") == 30.0
+          and progress.get("speed") == 1.5 and progress.get("size") == 1024
+          and progress.get("current_time") == 5.0 and progress.get("percent") == 25.0
+          and progress.get("ffmpeg_progress") == "continue", progress)
+
+    reader = ProgressReader(duration=0, rate=None)
+    data = b"frame=0\nfps=N/A\nout_time_us=N/A\nout_time=N/A\nspeed=N/A\nprogress=continue\n"
+    progress = next(reader.read(io.BytesIO(data)), {})
+    check("na_values_skipped", "fps" not in progress and "speed" not in progress
+          and "current_time" not in progress and "percent" not in progress, progress)
+
+    reader = ProgressReader(duration=100, rate=None)
+    data = b"out_time=00:01:02.500000\nprogress=continue\n"
+    progress = next(reader.read(io.BytesIO(data)), {})
+    check("out_time_fallback", progress.get("current_time") == 62.5, progress)
+
+    reader = ProgressReader(duration=100, rate=None)
+    data = b"out_time_ms=4000000\nprogress=continue\n"
+    progress = next(reader.read(io.BytesIO(data)), {})
+    check("out_time_ms_is_micro", progress.get("current_time") == 4.0, progress)
+
+    reader = ProgressReader(duration=10, rate=None)
+    data = b"frame=  10 fps= 30 q=28.0 size=  256kB time=00:00:01.00\r" + block(2_000_000, frame=60)
+    progress = next(reader.read(io.BytesIO(data)), {})
+    check("stderr_stats_ignored", progress.get("frame") == 60, progress)
+
+    reader = ProgressReader(duration=10, rate=None)
+    progress = next(reader.read(io.BytesIO(block(50_000_000))), {})
+    check("percent_capped", progress.get("percent") == 100, progress)
+    progress = next(ProgressReader(duration=10, rate=None).read(io.BytesIO(block(1_000_000, status="end"))), {})
+    check("end_is_100", progress.get("ffmpeg_progress") == "end" and progress.get("percent") == 100, progress)
+
+    data = b"".join(block(second * 1_000_000, frame=second * 30) for second in range(1, 6))
+    results = list(ProgressReader(duration=10, rate=None).read(Trickle(data, 7)))
+    check("split_lines_across_chunks", [item.get("frame") for item in results] == [30, 60, 90, 120, 150],
+          [item.get("frame") for item in results])
+
+    # Kısıtlama: 1 Hz'de 0.25 s arayla gelen bloklardan saniyede biri yayınlanır
+    clock = Clock()
+    reader = ProgressReader(duration=10, rate=1.0, clock=clock)
+    emitted = []
+    for second in range(1, 10):
+        clock.now = second * 0.25
+        progress = reader.feed(b"out_time_us=%d" % (second * 1_000_000))
+        progress = reader.feed(b"progress=continue")
+        if progress:
+            emitted.append(progress["current_time"])
+    check("throttled", emitted == [1.0, 5.0, 9.0] and reader.blocks == 9 and reader.emitted == 3, emitted)
+
+    clock.now = 2.3
+    reader.feed(b"out_time_us=10000000")
+    progress = reader.feed(b"progress=end")
+    check("end_bypasses_throttle", progress and progress["ffmpeg_progress"] == "end", progress)
+
+    # Akış biterken kısıtlamaya takılmış son blok da verilir
+    clock = Clock()
+    reader = ProgressReader(duration=10, rate=1.0, clock=clock)
+    data = block(1_000_000) + block(2_000_000)
+    results = list(reader.read(io.BytesIO(data)))
+    check("flush_unsent_on_eof", [item.get("current_time") for item in results] == [1.0, 2.0], results)
+
+    data = b"".join(block(second * 1_000_000) for second in range(1, 4))
+    calls = []
+    results = list(ProgressReader(duration=10, rate=None).read(
+        Trickle(data, 40), should_stop=lambda: calls.append(1) or len(calls) > 2))
+    check("should_stop", len(results) < 3, results)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "ilerleme okuyucusu")
@@ -0,0 +1,91 @@
+"""
+Tekrar deneme testi
+
+FFmpeg gerekmez: ffmpeg hata metinlerinin sınıflandırılmasını, bekleme
+süresini ve RetryPolicy.plan'ın geri düşme merdivenini (donanım -> CPU,
+kapsayıcı -> yeniden encode, stream -> ek stream'leri at) doğrular.
+"""
+from core import retry
+from core.retry import RetryPolicy
+from test_support import Checks, finish
+
+NVENC = {"vcodec": "h264_nvenc", "acodec": "aac", "gpu": True, "gpu_pipeline": True, "preset": "p4"}
+REMUX = {"vcodec": "copy", "acodec": "copy"}
+
+
+def run_tests():
+    check = Checks()
+
+    cases = [
+        ("[h264_nvenc @ 0x1] OpenEncodeSessionEx failed: out of memory (10)", None, retry.HARDWARE),
+        ("Cannot load libnvidia-encode.so.1", None, retry.HARDWARE),
+        ("Unknown encoder 'hevc_qsv'", None, retry.HARDWARE),
+        ("Unknown encoder 'libfoo'", None, retry.FATAL),
+        ("[mp4 @ 0x1] Could not find tag for codec pcm_s16le in stream #1", None, retry.CONTAINER),
+        ("Subtitle encoding currently only possible from text to text or bitmap to bitmap", None, retry.STREAM),
+        ("av_interleaved_write_frame(): Input/output error", None, retry.TRANSIENT),
+        ("in.mkv: No such file or directory", None, retry.FATAL),
+        ("Error writing trailer: No space left on device", None, retry.FATAL),
+        ("", -9, retry.TRANSIENT),
+        ("Conversion failed!", 1, retry.UNKNOWN),
+        (None, None, retry.UNKNOWN),
+    ]
+    for error, returncode, expected in cases:
+        result = retry.classify(error, returncode)
+        if result != expected:
+            check("classify", False, (error, returncode, result, expected))
+            break
+    else:
+        check("classify", True, "")
+
+    policy = RetryPolicy(backoff=5, factor=2, max_backoff=30)
+    delays = [policy.delay(attempt) for attempt in range(1, 6)]
+    check("backoff", delays == [5, 10, 20, 30, 30], delays)
+
+    plan = policy.plan(NVENC, "OpenEncodeSessionEx failed", 1, 1, "out.mp4")
+    check("ladder_cpu", plan and plan["step"] == retry.STEP_CPU and plan["delay"] == 0
+          and plan["settings"]["vcodec"] == "libx264" and "gpu" not in plan["settings"]
+          and "gpu_pipeline" not in plan["settings"] and "preset" not in plan["settings"]
+          and NVENC["vcodec"] == "h264_nvenc", plan)
+    plan = policy.plan(dict(NVENC, vcodec="hevc_nvenc", preset="slow"), "No capable devices found", 1, 1, "o.mkv")
+    check("ladder_cpu_family", plan and plan["settings"]["vcodec"] == "libx265"
+          and plan["settings"]["preset"] == "slow", plan)
+    check("cpu_encoder_no_ladder", policy.plan({"vcodec": "libx264"}, "OpenEncodeSessionEx failed", 1, 1,
+                                               "out.mp4") is None, "yazilim encoder'inda CPU adimi yok")
+
+    plan = policy.plan(REMUX, "Could not find tag for codec pcm_s16le", 1, 1, "out.mp4",
+                       requested={"vcodec": "libx265", "acodec": "copy", "bitrate": "4M"})
+    check("ladder_reencode_requested", plan and plan["step"] == retry.STEP_REENCODE
+          and plan["settings"]["vcodec"] == "libx265" and plan["settings"]["acodec"] == "aac"
+          and plan["settings"]["bitrate"] == "4M" and plan["settings"]["smart_copy"] is False, plan)
+    plan = policy.plan(REMUX, "not currently supported in container", 1, 1, "out.webm")
+    check("ladder_reencode_container_default", plan and plan["settings"]["vcodec"] == "libvpx-vp9"
+          and plan["settings"]["acodec"] == "libopus", plan)
+    check("encoded_no_reencode", policy.plan({"vcodec": "libx264", "acodec": "aac"}, "could not write header",
+                                             1, 1, "out.mp4") is None, "kopyalama yoksa adim yok")
+
+    plan = policy.plan(REMUX, "Cannot map stream #0:3", 1, 1, "out.mp4")
+    check("ladder_drop_streams", plan and plan["step"] == retry.STEP_DROP_STREAMS
+          and plan["settings"]["drop_streams"] == ["data", "subtitle"], plan)
+    check("drop_streams_once", policy.plan(plan["settings"], "Cannot map stream #0:3", 1, 2, "out.mp4") is None,
+          "stream'ler zaten atildi")
+
+    plan = policy.plan(REMUX, "Connection reset by peer", 1, 2, "out.mp4")
+    check("transient_retry", plan and plan["step"] == "retry" and plan["delay"] == 10
+          and plan["settings"] is REMUX, plan)
+    check("fatal_no_retry", policy.plan(REMUX, "Permission denied", 1, 1, "out.mp4") is None, "kalici hata")
+    check("unknown_no_retry", policy.plan(REMUX, "Conversion failed!", 1, 1, "out.mp4") is None, "bilinmeyen")
+    plan = RetryPolicy(retry_unknown=True).plan(REMUX, "Conversion failed!", 1, 1, "out.mp4")
+    check("unknown_retry_opt_in", plan and plan["step"] == "retry", plan)
+    check("max_attempts", RetryPolicy(max_attempts=2).plan(REMUX, "Broken pipe", 1, 2, "out.mp4") is None,
+          "deneme hakki bitti")
+
+    limited = RetryPolicy(ladder=(retry.STEP_REENCODE,))
+    check("ladder_subset", limited.plan(NVENC, "OpenEncodeSessionEx failed", 1, 1, "out.mp4") is None
+          and limited.plan(REMUX, "could not find tag for codec", 1, 1, "out.mp4"), "sadece reencode adimi")
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "tekrar deneme")
@@ -0,0 +1,95 @@
+"""
+Zamanlayıcı testi
+
+FFmpeg gerekmez: iş sınıflandırmasını, bütçe maliyetlerini, kabul
+kurallarını (hafif işlere ayrılan CPU payı, -threads ile düşülen payın
+eşitliği) ve toplu kuyruğun bütçeye sığan ilk işi sınıf sırasını bozmadan
+seçmesini doğrular.
+"""
+from core.converter import BatchConverter
+from core.scheduler import ResourceScheduler, classify_job, JOB_AUDIO, JOB_COPY, JOB_CPU, JOB_GPU
+from test_support import Checks, finish
+
+X264 = {"vcodec": "libx264", "acodec": "aac"}
+REMUX = {"vcodec": "copy", "acodec": "copy"}
+MP3 = {"vcodec": None, "acodec": "libmp3lame"}
+NVENC = {"vcodec": "h264_nvenc", "acodec": "aac"}
+
+
+def admit(scheduler, job_class):
+    return scheduler.try_acquire(scheduler.job_cost(job_class))
+
+
+def batch_with(settings_list, scheduler):
+    batch = BatchConverter()
+    for number, settings in enumerate(settings_list):
+        batch.add_to_queue(f"in{number}.mkv", f"out{number}.mp4", dict(settings))
+    batch.scheduler = scheduler
+    return batch
+
+
+def run_tests():
+    check = Checks()
+
+    classes = [classify_job(settings) for settings in (X264, REMUX, MP3, NVENC, {"vcodec": "copy", "acodec": "aac"})]
+    check("classify", classes == [JOB_CPU, JOB_COPY, JOB_AUDIO, JOB_GPU, JOB_AUDIO], classes)
+
+    scheduler = ResourceScheduler(cpu_threads=8, encode_slots=2)
+    check("cpu_cost_leaves_reserve", scheduler.job_cost(JOB_CPU) == {"cpu": 3, "encode": 1},
+          scheduler.job_cost(JOB_CPU))
+    threads = [scheduler.threads_for(job_class) for job_class in (JOB_CPU, JOB_AUDIO, JOB_GPU, JOB_COPY)]
+    costs = [scheduler.job_cost(job_class).get("cpu") for job_class in (JOB_CPU, JOB_AUDIO, JOB_GPU, JOB_COPY)]
+    check("threads_match_cost", threads == costs == [3, 1, 2, None], (threads, costs))
+    check("single_core_cost", ResourceScheduler(cpu_threads=1).cpu_cost() == 1, "tek cekirdekte maliyet 1")
+
+    check("idle_admits_anything", admit(ResourceScheduler(cpu_threads=1, gpu_sessions=1), JOB_CPU),
+          "bosta her is kabul edilmeli")
+
+    scheduler = ResourceScheduler(cpu_threads=8, encode_slots=2)
+    first, second, third = admit(scheduler, JOB_CPU), admit(scheduler, JOB_CPU), admit(scheduler, JOB_CPU)
+    check("encode_slots_bound_cpu_jobs", first and second and not third, scheduler.in_use)
+    check("light_jobs_fit_beside_encodes", admit(scheduler, JOB_AUDIO) and admit(scheduler, JOB_AUDIO),
+          scheduler.in_use)
+    check("copy_uses_io_budget", admit(scheduler, JOB_COPY) and scheduler.in_use["io"] == 1, scheduler.in_use)
+
+    scheduler = ResourceScheduler(cpu_threads=16, io_slots=2)
+    admitted = [admit(scheduler, JOB_COPY) for _ in range(3)]
+    check("io_slots_bound_copies", admitted == [True, True, False] and scheduler.running == 2, admitted)
+    scheduler.release(scheduler.job_cost(JOB_COPY))
+    check("release_frees_slot", scheduler.running == 1 and admit(scheduler, JOB_COPY), scheduler.running)
+
+    scheduler = ResourceScheduler(cpu_threads=8, gpu_sessions=1)
+    check("gpu_sessions", admit(scheduler, JOB_GPU) and not admit(scheduler, JOB_GPU), scheduler.in_use)
+    scheduler.release({"gpu": 1, "cpu": 1, "encode": 1})
+    check("release_never_negative", all(value >= 0 for value in scheduler.in_use.values())
+          and scheduler.running == 0, scheduler.in_use)
+
+    # Sıradaki encode beklerken arkasındaki remux kabul edilir; aynı sınıfta sıra korunur
+    scheduler = ResourceScheduler(cpu_threads=8, encode_slots=1)
+    batch = batch_with([X264, X264, REMUX, X264], scheduler)
+    picked = [batch._next_admissible()[0] for _ in range(3)]
+    check("admission_skips_blocked_class", picked == [0, 2, None], picked)
+    check("admission_marks_processing", [item["status"] for item in batch.queue]
+          == ["processing", "pending", "processing", "pending"]
+          and batch.queue[0]["attempts"] == 1, [item["status"] for item in batch.queue])
+
+    # Tek işçide de remux'lar kendi bütçesinden ağır encode'un yanında koşar
+    batch = batch_with([REMUX] * 8 + [X264], None)
+    batch.max_workers = 1
+    batch.scheduler = ResourceScheduler(encode_slots=batch.max_workers)
+    picked = [batch._next_admissible()[0] for _ in range(10)]
+    check("copies_beside_encode", picked == list(range(9)) + [None] and batch.scheduler.running == 9, picked)
+
+    scheduler = ResourceScheduler(cpu_threads=8, encode_slots=2)
+    batch = batch_with([REMUX, REMUX], scheduler)
+    batch.queue[0]["interrupted"] = True
+    batch.queue[0]["attempts"] = 1
+    batch._next_admissible()
+    check("resumed_job_keeps_attempts", batch.queue[0]["attempts"] == 1
+          and "interrupted" not in batch.queue[0], batch.queue[0])
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "zamanlayici")
@@ -0,0 +1,67 @@
+"""
+Telemetri testi
+
+FFmpeg gerekmez: /proc okumasını (Linux'ta bu sürecin kendisi), darboğaz
+sınıflandırmasını, toplu iş özetini ve Prometheus çıktısını doğrular.
+"""
+import os
+
+from core import telemetry
+from test_support import Checks, finish
+
+
+def job(name, wall=10.0, cpu=10.0, io_wait=0.0, runqueue=0.0, fps=None):
+    return {"job": name, "wall_seconds": wall, "cpu_seconds": cpu, "io_wait_seconds": io_wait,
+            "runqueue_wait_seconds": runqueue, "peak_rss": 100, "read_bytes": 10, "write_bytes": 5,
+            "avg_fps": fps}
+
+
+def run_tests():
+    check = Checks()
+
+    if telemetry.supported():
+        stats = telemetry.read_process(os.getpid())
+        keys = {"cpu_seconds", "rss", "threads", "read_bytes", "write_bytes",
+                "io_wait_seconds", "runqueue_wait_seconds"}
+        check("read_process_self", stats is not None and keys <= set(stats)
+              and stats["rss"] > 0 and stats["threads"] >= 1 and stats["cpu_seconds"] >= 0, stats)
+    check("read_process_missing", telemetry.read_process(2 ** 31 - 1) is None, "olmayan PID None olmali")
+
+    check("classify_io", telemetry.classify(job("a", io_wait=3.0)) == "io_starved", job("a", io_wait=3.0))
+    check("classify_runqueue", telemetry.classify(job("b", runqueue=5.0)) == "oversubscribed",
+          job("b", runqueue=5.0))
+    check("classify_none", telemetry.classify(job("c", io_wait=1.0, runqueue=1.0)) is None, job("c"))
+    check("classify_empty", telemetry.classify({}) is None, "bos ozet")
+
+    cpus = os.cpu_count() or 1
+    summary = telemetry.summarize([job("a", io_wait=5.0), job("b", runqueue=5.0), job("c")], 10.0, 2)
+    check("summarize_decrease", summary["concurrency_hint"] == "decrease"
+          and summary["io_starved"] == ["a"] and summary["oversubscribed"] == ["b"], summary)
+    summary = telemetry.summarize([job("a", cpu=1.0, fps=30.0), job("b", cpu=1.0, fps=50.0)], 10.0, 1)
+    check("summarize_increase", summary["concurrency_hint"] == "increase" and summary["avg_fps"] == 40.0
+          and summary["cpu_seconds"] == 2.0 and summary["read_bytes"] == 20, summary)
+    busy = [job(str(i), cpu=10.0) for i in range(cpus)]
+    summary = telemetry.summarize(busy, 10.0, cpus)
+    check("summarize_keep", summary["concurrency_hint"] == "keep" and summary["cpu_utilization"] == 1.0, summary)
+    summary = telemetry.summarize([], 0, 1)
+    check("summarize_empty", summary["jobs"] == 0 and summary["concurrency_hint"] == "keep"
+          and summary["avg_fps"] is None, summary)
+
+    registry = telemetry.MetricsRegistry()
+    registry.publish({"job": 'a"b', "pid": 1, "cpu_percent": 150.0, "rss": 2048, "fps": None})
+    registry.publish({"job": "done", "pid": 2, "cpu_percent": 10.0})
+    registry.finish({"job": "done", "status": "failed", "cpu_seconds": 2.5, "read_bytes": 7})
+    text = registry.render_prometheus()
+    lines = text.splitlines()
+    check("prometheus_escape", 'tmvc_job_cpu_percent{job="a\\"b"} 150.0' in lines, text)
+    check("prometheus_skip_missing", not any(line.startswith("tmvc_job_fps{") for line in lines), text)
+    check("prometheus_finished_removed", 'job="done"' not in text and "tmvc_active_jobs 1" in lines, text)
+    check("prometheus_totals", 'tmvc_jobs_total{status="failed"} 1' in lines
+          and "tmvc_cpu_seconds_total 2.5" in lines and "tmvc_read_bytes_total 7" in lines, text)
+    check("prometheus_help_type", "# TYPE tmvc_job_rss_bytes gauge" in lines and text.endswith("\n"), text)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "telemetri")
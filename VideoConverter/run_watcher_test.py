@@ -0,0 +1,181 @@
+"""
+Klasör izleme testi
+
+FFmpeg gerekmez: geçici klasörlerle dosya süzgecini, büyümesi duran
+dosyaların hazır sayılmasını (settle), inotify/yoklama arka uçlarının yeni
+dosya ve klasörleri bulmasını, ENOSPC'de yoklamaya düşülmesini ve izleme
+modunda biten işlerin kuyruktan atılmasını doğrular.
+"""
+import errno
+import os
+import sys
+import tempfile
+import time
+
+from core import watcher as watcher_module
+from core.converter import BatchConverter
+from core.watcher import FolderWatcher, WatchIngest, _PollingBackend
+from test_support import Checks, finish
+
+SETTLE = 0.2
+COPY_PRESET = "Format Degistir (Kalite Korunur)"
+
+
+def write(path, data):
+    with open(path, "wb") as handle:
+        handle.write(data)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return condition()
+
+
+def run_tests():
+    check = Checks()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ready = []
+        folder = FolderWatcher([tmp], ready.append, extensions={".mkv"}, settle_seconds=SETTLE)
+        wanted = [folder._wanted(os.path.join(tmp, name)) for name in ("a.MKV", "b.mp4", ".c.mkv")]
+        check("extension_and_hidden_filter", wanted == [True, False, False], wanted)
+
+        # Settle: boyutu değişen dosya beklemeye devam eder, boş dosya hazır sayılmaz
+        growing = os.path.join(tmp, "growing.mkv")
+        empty = os.path.join(tmp, "empty.mkv")
+        write(growing, b"a" * 10)
+        write(empty, b"")
+        folder._touch(growing)
+        folder._touch(empty)
+        folder._check_candidates()
+        check("not_ready_before_settle", ready == [], ready)
+        time.sleep(SETTLE / 2)
+        write(growing, b"a" * 20)
+        time.sleep(SETTLE / 2 + 0.05)
+        folder._check_candidates()
+        check("growth_resets_settle", ready == [], ready)
+        time.sleep(SETTLE + 0.05)
+        folder._check_candidates()
+        check("ready_after_settle", ready == [growing], ready)
+        check("empty_never_ready", empty in folder._candidates and empty not in ready, ready)
+
+        folder._touch(growing)
+        check("seen_not_reported_again", growing not in folder._candidates, folder._candidates)
+        write(growing, b"b" * 30)
+        folder._touch(growing)
+        check("modified_reported_again", growing in folder._candidates, folder._candidates)
+
+        # Yoklama arka ucu: sadece mtime'ı değişen klasörler yeniden listelenir
+        poll_root = os.path.join(tmp, "poll")
+        os.makedirs(os.path.join(poll_root, "sub"))
+        write(os.path.join(poll_root, "old.mkv"), b"x")
+        backend = _PollingBackend([poll_root], recursive=True)
+        existing = sorted(backend.initial_scan())
+        check("polling_initial_scan", existing == [os.path.join(poll_root, "old.mkv")], existing)
+        time.sleep(0.01)
+        os.makedirs(os.path.join(poll_root, "sub", "new"))
+        write(os.path.join(poll_root, "sub", "new", "deep.mkv"), b"x")
+        found = backend.poll(0)
+        check("polling_new_subdir", os.path.join(poll_root, "sub", "new", "deep.mkv") in found, found)
+
+        if sys.platform.startswith("linux"):
+            tree = os.path.join(tmp, "tree")
+            os.makedirs(os.path.join(tree, "sub"))
+            write(os.path.join(tree, "sub", "old.mkv"), b"x")
+            inotify = watcher_module._InotifyBackend([tree], recursive=True)
+            try:
+                existing = list(inotify.initial_scan())
+                check("inotify_initial_scan", existing == [os.path.join(tree, "sub", "old.mkv")]
+                      and len(inotify.watches) == 2, (existing, inotify.watches))
+                write(os.path.join(tree, "new.mkv"), b"x")
+                os.makedirs(os.path.join(tree, "added"))
+                found = []
+                wait_for(lambda: found.extend(inotify.poll(0.1)) or os.path.join(tree, "new.mkv") in found)
+                write(os.path.join(tree, "added", "inner.mkv"), b"x")
+                wait_for(lambda: found.extend(inotify.poll(0.1))
+                         or os.path.join(tree, "added", "inner.mkv") in found)
+                check("inotify_events", os.path.join(tree, "new.mkv") in found
+                      and os.path.join(tree, "added", "inner.mkv") in found, found)
+
+                def fail(error_number):
+                    def add_watch(directory):
+                        raise OSError(error_number, "test")
+                    return add_watch
+                inotify._add_watch = fail(errno.EACCES)
+                check("inotify_skips_unreadable_dir", list(inotify._watch_tree(tree)) == [], "EACCES atlanmali")
+                inotify._add_watch = fail(errno.ENOSPC)
+                try:
+                    list(inotify._watch_tree(tree))
+                    raised = False
+                except OSError as e:
+                    raised = e.errno == errno.ENOSPC
+                check("inotify_enospc_raises", raised, "ENOSPC yukari iletilmeli")
+            finally:
+                inotify.close()
+
+            # Çalışırken ENOSPC: izleyici yoklamaya düşer ve dosya almaya devam eder
+            live = os.path.join(tmp, "live")
+            os.makedirs(live)
+            ready = []
+            reasons = []
+            folder = FolderWatcher([live], ready.append, settle_seconds=SETTLE, poll_interval=0.05,
+                                   on_fallback=reasons.append)
+            folder.start()
+            try:
+                check("inotify_selected", folder.backend_name == "inotify", folder.backend_name)
+
+                def enospc(timeout):
+                    raise OSError(errno.ENOSPC, "No space left on device")
+                folder._backend.poll = enospc
+                wait_for(lambda: folder.backend_name == "polling")
+                check("enospc_falls_back", folder.backend_name == "polling" and len(reasons) == 1, reasons)
+                write(os.path.join(live, "after.mkv"), b"x")
+                wait_for(lambda: ready)
+                check("polling_after_fallback", ready == [os.path.join(live, "after.mkv")], ready)
+            finally:
+                folder.stop()
+
+        # İzleme modu: baştaki bitmiş işler atılır, indeksler kaymaz
+        batch = BatchConverter()
+        batch.keep_alive = True
+        batch.keep_finished = 2
+        for number in range(6):
+            batch.add_to_queue(f"in{number}.mkv", f"out{number}.mp4", {})
+            batch.queue[-1]["duration"] = 10
+        for item in batch.queue[:4]:
+            item["status"] = "completed"
+        batch._prune_finished()
+        check("prune_finished", batch.queue_offset == 2 and len(batch.queue) == 4
+              and batch._completed_count() == 4, (batch.queue_offset, len(batch.queue)))
+        targets = batch._targets(5)
+        check("targets_use_global_index", targets and targets[0][1]["input"] == "in5.mkv"
+              and batch._targets(1) == [], targets)
+        check("media_progress_keeps_pruned", batch.media_progress() == (40, 60), batch.media_progress())
+
+        # Kendi çıktılarımızın kaydı sınırlı: en eskiler atılır
+        class Recorder:
+            def __init__(self):
+                self.enqueued = []
+
+            def enqueue(self, input_path, output_path, settings):
+                self.enqueued.append(output_path)
+                return {"input": input_path, "output": output_path}
+
+        recorder = Recorder()
+        ingest = WatchIngest(recorder, [tmp], [COPY_PRESET], output_dir=os.path.join(tmp, "out"))
+        ingest.MAX_OUTPUTS = 3
+        for number in range(5):
+            ingest._on_file_ready(os.path.join(tmp, f"v{number}.ts"))
+        ingest._on_file_ready(recorder.enqueued[-1])
+        check("outputs_bounded", list(ingest._outputs) == recorder.enqueued[2:5], list(ingest._outputs))
+        check("own_output_ignored", len(recorder.enqueued) == 5, recorder.enqueued)
+
+    return check.failures
+
+
+if __name__ == "__main__":
+    finish(run_tests(), "klasor izleme")
@@ -0,0 +1,27 @@
+"""
+run_*_test.py betiklerinin ortak kontrol yardımcıları
+
+Betikler pytest olmadan doğrudan çalıştırılır: her kontrol adıyla
+birlikte ok/FAIL yazdırır, başarısız kontroller çıkış koduna yansır.
+"""
+import sys
+from typing import Any, List
+
+
+class Checks:
+    """Kontrol sonuçlarını yazdırıp başarısız olanları biriktirir"""
+
+    def __init__(self):
+        self.failures: List[str] = []
+
+    def __call__(self, name: str, condition: Any, detail: Any = ""):
+        print(f"{name}: {'ok' if condition else 'FAIL'}")
+        if not condition:
+            print(f"  {detail}")
+            self.failures.append(name)
+
+
+def finish(failures: List[str], subject: str):
+    """Özeti yazdır; hata varsa 1 ile çık"""
+    print(f"\n{len(failures)} hata" if failures else f"\nTum {subject} testleri gecti")
+    sys.exit(1 if failures else 0)
@@ -1 +1,19 @@
-from .helpers import format_time, format_size, get_video_info
+"""Yardımcılar (helpers ilk erişimde yüklenir; FFmpeg modüllerini çeker)"""
+import importlib
+
+_EXPORTS = {
+    "format_time": ".helpers",
+    "format_size": ".helpers",
+    "get_video_info": ".helpers",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
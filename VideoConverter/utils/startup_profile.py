@@ -0,0 +1,102 @@
+"""Açılış profili: modül içe aktarma süreleri ve aşama süreleri (--profile-startup)"""
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupProfiler:
+    """
+    builtins.__import__'u sararak yeni modül yükleyen her içe aktarmanın
+    toplam ve kendi (alt içe aktarmalar hariç) süresini, ayrıca adlandırılmış
+    aşamaların sürelerini toplar. Sadece ana thread ölçülür.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self.started = clock()
+        self.phases: List[Tuple[str, float, float]] = []
+        self.imports: Dict[str, List[float]] = {}
+        self._stack: List[float] = []
+        self._original_import = None
+
+    def install(self):
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if threading.current_thread() is not threading.main_thread():
+            return original(name, globals, locals, fromlist, level)
+
+        loaded = len(sys.modules)
+        start = self._clock()
+        self._stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = self._clock() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            if len(sys.modules) > loaded:
+                if level and globals:
+                    package = globals.get("__package__") or ""
+                    name = f"{package}.{name}" if name else package
+                entry = self.imports.setdefault(name, [0.0, 0.0])
+                entry[0] += elapsed
+                entry[1] += elapsed - children
+
+    @contextmanager
+    def phase(self, name: str):
+        """Bir açılış aşamasını ölç"""
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.phases.append((name, start - self.started, self._clock() - start))
+
+    def mark(self, name: str):
+        """Başlangıçtan bu ana kadar geçen süreyi aşama olarak kaydet"""
+        now = self._clock()
+        self.phases.append((name, now - self.started, 0.0))
+
+    def report(self, top: int = 30) -> str:
+        """Okunabilir metin raporu"""
+        total = self._clock() - self.started
+        lines = [
+            "TM Video Converter acilis profili",
+            f"Toplam: {total * 1000:.1f} ms",
+            "",
+            "Asamalar (baslangic / sure, ms):",
+        ]
+        for name, offset, duration in self.phases:
+            lines.append(f"  {offset * 1000:8.1f}  {duration * 1000:8.1f}  {name}")
+
+        imports = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+        import_total = sum(self_time for _, (_, self_time) in imports)
+        lines += [
+            "",
+            f"Ice aktarmalar: {len(imports)} adet, {import_total * 1000:.1f} ms",
+            f"En yavas {min(top, len(imports))} (kendi / toplam, ms):",
+        ]
+        for name, (total_time, self_time) in imports[:top]:
+            lines.append(f"  {self_time * 1000:8.1f}  {total_time * 1000:8.1f}  {name}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, top: int = 30) -> Optional[str]:
+        """Raporu dosyaya yaz; yazılamazsa None"""
+        try:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(self.report(top))
+        except OSError:
+            return None
+        return path